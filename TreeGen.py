@@ -1,96 +1,123 @@
 import sys
 import os
-import json
 import csv
-import ctypes
-import humanize
+import threading
+import time
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QFileDialog, QTreeView, QAbstractItemView, QInputDialog, QMessageBox,
     QTextEdit, QSplitter, QLabel, QLineEdit, QCheckBox, QSizePolicy, QComboBox,
-    QShortcut
+    QShortcut, QProgressBar, QSpinBox, QDialog, QPlainTextEdit
+)
+from PyQt5.QtGui import QColor, QIcon, QPixmap, QFont, QFontDatabase, QKeySequence, QTextCursor
+from PyQt5.QtCore import (
+    Qt, QAbstractItemModel, QModelIndex, QSortFilterProxyModel, QSettings, QSignalBlocker,
+    QObject, QThread, QTimer, pyqtSignal
 )
-from PyQt5.QtGui import QStandardItemModel, QStandardItem, QIcon, QPixmap, QFont, QKeySequence
-from PyQt5.QtCore import Qt, QSortFilterProxyModel, QRegExp, QSettings, QSignalBlocker
 
-from localization import Localization, DEFAULT_LANGUAGE
+from treegen.batch import OUTPUT_SUFFIXES, run_batch
+from treegen.checksums import (
+    ChecksumCache, ChecksumCancelled, checksum_cache_path, compute_checksums, load_checksum_cache, save_checksum_cache,
+    write_manifest
+)
+from treegen.descriptions import DescriptionStore
+from treegen.diff import (
+    STATUS_ADDED, STATUS_CHANGED_BELOW, STATUS_MODIFIED, STATUS_RESIZED, ComparisonCancelled, SnapshotComparison
+)
+from treegen.instrumentation import format_summary, metrics
+from treegen.inventory import have_pyarrow, write_inventory
+from treegen.localization import Localization, DEFAULT_LANGUAGE
+from treegen.rendering import (
+    CSV_CHECKSUM_HEADER, CSV_HEADER, DIFF_CSV_HEADER, RenderBudget, TreeTextRenderer, common_affixes, iter_csv_rows,
+    iter_diff_csv_rows, iter_diff_lines, iter_markdown_lines, naturalsize, scan_date, statistics_lines, summary_lines,
+    write_lines
+)
+from treegen.scanner import (
+    ROOT_NODE, ScanCancelled, list_directory, refresh_snapshot, scan_directory, split_extension_patterns
+)
+from treegen.scan_cache import cache_path_for, load_snapshot, save_snapshot
+from treegen.search import compile_wildcard
+from treegen.statistics import collect_statistics
 
 LOGO_PATH = "Alliance_Logo.jpeg"
 
-FILE_ATTRIBUTE_HIDDEN = 0x2
-FILE_ATTRIBUTE_SYSTEM = 0x4
+# Scan results are streamed to the GUI in batches of this many entries, or at least this often.
+SCAN_BATCH_SIZE = 500
+SCAN_BATCH_INTERVAL = 0.1
 
+DEFAULT_SCAN_WORKERS = 8
+MAX_SCAN_WORKERS = 64
+
+# Upper bounds of the render budget spin boxes; 0 means no limit.
+MAX_RENDER_DEPTH = 999
+MAX_RENDER_CHILDREN = 1_000_000
+
+# Watch mode waits for this long without new events before refreshing the tree, but never
+# postpones a refresh by more than WATCH_MAX_DELAY_MS after the first event of a burst.
+WATCH_DEBOUNCE_MS = 500
+WATCH_MAX_DELAY_MS = 3000
+
+# Description edits, filter keystrokes and language switches refresh the preview once they
+# have been quiet for this long.
+PREVIEW_DEBOUNCE_MS = 250
+
+# Description edits are appended to the folder's journal once they have been quiet for this long.
+DESCRIPTION_FLUSH_MS = 1000
+
+# Exports are streamed to disk through a buffer of this size.
+EXPORT_BUFFER_SIZE = 1 << 20
 
-def is_hidden_path(path):
-    """
-    Determine whether a path should be treated as hidden.
-    On Windows this checks the hidden/system file attributes; elsewhere it falls back to dot-prefix.
-    """
-    path_str = os.fspath(path)
-    if sys.platform.startswith("win"):
-        try:
-            attrs = ctypes.windll.kernel32.GetFileAttributesW(path_str)
-        except (AttributeError, ValueError):
-            attrs = 0xFFFFFFFF
-        if attrs == 0xFFFFFFFF:
-            return os.path.basename(path_str).startswith(".")
-        return bool(attrs & (FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM))
-    return os.path.basename(path_str).startswith(".")
-
-
-def should_exclude_entry(path, is_dir, exclude_hidden=False, exclude_extensions=None):
-    exclude_extensions = exclude_extensions or []
-    if exclude_hidden and is_hidden_path(path):
-        return True
-    if not is_dir and exclude_extensions:
-        lower_path = os.fspath(path).lower()
-        for ext in exclude_extensions:
-            if lower_path.endswith(ext):
-                return True
-    return False
-
-
-def iter_visible_children(path, exclude_hidden=False, exclude_extensions=None):
-    exclude_extensions = exclude_extensions or []
-    entries = []
-    with os.scandir(path) as iterator:
-        for entry in iterator:
-            child_path = entry.path
-            is_dir = entry.is_dir(follow_symlinks=False)
-            if should_exclude_entry(child_path, is_dir, exclude_hidden, exclude_extensions):
-                continue
-            entries.append((entry.name, child_path, is_dir))
-    entries.sort(key=lambda item: item[0].lower())
-    return entries
-
-
-def calculate_folder_size(path, exclude_hidden=False, exclude_extensions=None):
-    exclude_extensions = exclude_extensions or []
-    total_size = 0
-    try:
-        with os.scandir(path) as iterator:
-            for entry in iterator:
-                entry_path = entry.path
-                is_dir = entry.is_dir(follow_symlinks=False)
-                if should_exclude_entry(entry_path, is_dir, exclude_hidden, exclude_extensions):
-                    continue
-                if is_dir:
-                    total_size += calculate_folder_size(entry_path, exclude_hidden, exclude_extensions)
-                else:
-                    try:
-                        total_size += entry.stat(follow_symlinks=False).st_size
-                    except (OSError, PermissionError):
-                        pass
-    except (PermissionError, FileNotFoundError):
-        pass
-    return total_size
 
 class FileFilterProxyModel(QSortFilterProxyModel):
+    """
+    Applies the hidden/extension filters and the search bar on top of SnapshotTreeModel.
+    The type, hidden flag and lowercase extension recorded at scan time are read from item data
+    roles, so re-filtering never touches the filesystem.
+    The search bar is answered from the snapshot's NameIndex: a row is accepted when its name or
+    a name anywhere below it matches, without walking its subtree through the model. While a
+    scan is still running, folders stay visible and files are matched by name until
+    refreshSearch().
+    """
     def __init__(self, parent=None):
         super(FileFilterProxyModel, self).__init__(parent)
         self.exclude_extensions = []
         self.exclude_hidden = False
-        self.setRecursiveFilteringEnabled(True)
+        # ".ext" patterns are looked up in a set; other suffixes (".tar.gz") are matched on the name.
+        self._excluded_extensions = frozenset()
+        self._excluded_suffixes = ()
+        self.search_text = ""
+        self._search_query = None
+        self._search = None
+
+    def setSourceModel(self, model):
+        super(FileFilterProxyModel, self).setSourceModel(model)
+        # Connected after the proxy's own handlers, but these fire before the source changes.
+        model.modelAboutToBeReset.connect(self.clearSearchResult)
+        model.layoutAboutToBeChanged.connect(self.clearSearchResult)
+
+    def setSearchText(self, text):
+        self.search_text = text
+        self._search_query = compile_wildcard(text)
+        self.clearSearchResult()
+        with metrics.timed("search"):
+            self.invalidateFilter()
+
+    def refreshSearch(self):
+        """Re-run an active search, e.g. once a scan has found every entry."""
+        if self.search_text:
+            self.setSearchText(self.search_text)
+
+    def clearSearchResult(self):
+        self._search = None
+
+    def _name_search(self, snapshot):
+        search = self._search
+        if search is None or search.index is not snapshot.name_index():
+            excluded = None
+            if self.exclude_hidden or self.exclude_extensions:
+                excluded = snapshot.filtered(self.exclude_hidden, self.exclude_extensions).is_excluded
+            search = self._search = snapshot.name_index().search(self._search_query, excluded)
+        return search
     
     def setExcludeExtensions(self, extensions_str):
         if extensions_str.strip():
@@ -99,38 +126,603 @@ class FileFilterProxyModel(QSortFilterProxyModel):
             ]
         else:
             self.exclude_extensions = []
-        self.invalidateFilter()
+        self._excluded_extensions, self._excluded_suffixes = split_extension_patterns(self.exclude_extensions)
+        self.clearSearchResult()
+        with metrics.timed("filtering"):
+            self.invalidateFilter()
     
     def setExcludeHidden(self, exclude):
         self.exclude_hidden = exclude
-        self.invalidateFilter()
+        self.clearSearchResult()
+        with metrics.timed("filtering"):
+            self.invalidateFilter()
 
     def filterAcceptsRow(self, source_row, source_parent):
         index = self.sourceModel().index(source_row, 0, source_parent)
         if not index.isValid():
             return False
         
-        item = self.sourceModel().itemFromIndex(index)
-        file_path = item.data(Qt.UserRole)
-        if not file_path:
+        if self.exclude_hidden and index.data(SnapshotTreeModel.HIDDEN_ROLE):
             return False
         
-        if self.exclude_hidden and is_hidden_path(file_path):
-            return False
+        if self.exclude_extensions and not index.data(SnapshotTreeModel.IS_DIR_ROLE):
+            if index.data(SnapshotTreeModel.EXTENSION_ROLE) in self._excluded_extensions:
+                return False
+            if self._excluded_suffixes and index.data(Qt.DisplayRole).lower().endswith(self._excluded_suffixes):
+                return False
         
-        if self.exclude_extensions and os.path.isfile(file_path):
-            lower_path = file_path.lower()
-            for ext in self.exclude_extensions:
-                if lower_path.endswith(ext):
-                    return False
+        if self._search_query is not None:
+            model = self.sourceModel()
+            if not model.complete:
+                return bool(index.data(SnapshotTreeModel.IS_DIR_ROLE)) \
+                    or self._search_query.matches(index.data(Qt.DisplayRole))
+            return self._name_search(model.snapshot).accepts(index.internalId())
         
-        # Apply the inherited QSortFilterProxyModel's filter (for the Search bar).
-        if not super(FileFilterProxyModel, self).filterAcceptsRow(source_row, source_parent):
+        return True
+
+
+class SnapshotTreeModel(QAbstractItemModel):
+    """
+    Read-only tree model served directly from a ScanSnapshot.
+
+    Rows are only created for directories the view asks about (canFetchMore/fetchMore), in
+    chunks of FETCH_BATCH_SIZE, so a million-entry snapshot costs no per-entry Qt objects.
+    Node ids are stored as the index internalId; because the children of a directory are
+    contiguous in the snapshot, row numbers and parents are plain arithmetic.
+    While a scan is still running, only directories reported through directories_listed()
+    are expanded and folder sizes are shown as pending.
+    After set_comparison(), names are coloured by their SnapshotComparison status.
+    """
+    FETCH_BATCH_SIZE = 1000
+    # Name-column roles read by FileFilterProxyModel; HIDDEN_ROLE also covers entries of hidden folders.
+    IS_DIR_ROLE = Qt.UserRole + 1
+    HIDDEN_ROLE = Qt.UserRole + 2
+    EXTENSION_ROLE = Qt.UserRole + 3
+    COLUMN_NAME = 0
+    COLUMN_SIZE = 1
+    COLUMN_DESCRIPTION = 2
+    CHANGE_COLORS = {
+        STATUS_ADDED: QColor("#2e7d32"),
+        STATUS_RESIZED: QColor("#c62828"),
+        STATUS_MODIFIED: QColor("#1565c0"),
+        STATUS_CHANGED_BELOW: QColor("#8d6e00"),
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.snapshot = None
+        self.descriptions = {}
+        self.complete = True
+        self.header_labels = ["", "", ""]
+        self.change_status = None
+        self.change_labels = {}
+        self._fetched = {}
+        self._listed = set()
+        self._wanted = set()
+        self._folder_icon = QIcon.fromTheme("folder")
+        self._file_icon = QIcon.fromTheme("text-x-generic")
+
+    def set_snapshot(self, snapshot, complete=True):
+        self.beginResetModel()
+        self.snapshot = snapshot
+        self.complete = complete
+        self.change_status = None
+        self._fetched = {}
+        self._listed = set()
+        self._wanted = set()
+        self.endResetModel()
+
+    def replace_snapshot(self, snapshot, node_map):
+        """
+        Swap in a refreshed snapshot of the same root.
+        node_map[old] gives the new id of each node, or -1 for removed ones; fetched rows,
+        expansion and selection are carried over through a layout change. Change marks are
+        dropped until the comparison is run again.
+        """
+        old_snapshot = self.snapshot
+        self.layoutAboutToBeChanged.emit()
+        fetched = {}
+        for node, count in self._fetched.items():
+            new_node = node_map[node]
+            if new_node < 0:
+                continue
+            if count >= old_snapshot.child_count[node]:
+                count = snapshot.child_count[new_node]
+            fetched[new_node] = min(count, snapshot.child_count[new_node])
+        old_indexes = self.persistentIndexList()
+        new_indexes = []
+        for index in old_indexes:
+            new_node = node_map[index.internalId()]
+            if new_node <= ROOT_NODE:
+                new_indexes.append(QModelIndex())
+                continue
+            row = new_node - snapshot.first_child[snapshot.parents[new_node]]
+            if row >= fetched.get(snapshot.parents[new_node], 0):
+                new_indexes.append(QModelIndex())
+            else:
+                new_indexes.append(self.createIndex(row, index.column(), new_node))
+        self.snapshot = snapshot
+        self.change_status = None
+        self._fetched = fetched
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    def set_descriptions(self, descriptions):
+        self.descriptions = descriptions
+        self._emit_column_changed(self.COLUMN_DESCRIPTION)
+
+    def set_comparison(self, status):
+        """Colour names by ``status`` (SnapshotComparison.status of the current snapshot), or stop with None."""
+        self.change_status = status
+        self._emit_column_changed(self.COLUMN_NAME)
+
+    def set_change_labels(self, labels):
+        """Tooltips of the change marks, by status."""
+        self.change_labels = dict(labels)
+
+    def set_header_labels(self, labels):
+        self.header_labels = list(labels)
+        self.headerDataChanged.emit(Qt.Horizontal, 0, len(self.header_labels) - 1)
+
+    def directories_listed(self, nodes):
+        """Expose directories the running scan has finished listing."""
+        for node in nodes:
+            self._listed.add(node)
+            if node in self._wanted:
+                self._wanted.discard(node)
+                self.fetchMore(self.index_for_node(node))
+
+    def set_complete(self):
+        """Mark the scan as finished so folder sizes are shown and every directory can expand."""
+        self.complete = True
+        self._listed = set()
+        self._emit_column_changed(self.COLUMN_SIZE)
+        if self.snapshot is not None and self.snapshot.member_start is not None:
+            # Archives were shown as plain files until their members were listed at the end.
+            self.layoutAboutToBeChanged.emit()
+            self.layoutChanged.emit()
+        for node in list(self._wanted):
+            self.fetchMore(self.index_for_node(node))
+        self._wanted = set()
+
+    def _emit_column_changed(self, column):
+        for node, count in self._fetched.items():
+            if count:
+                parent = self.index_for_node(node)
+                self.dataChanged.emit(self.index(0, column, parent), self.index(count - 1, column, parent))
+
+    def _is_listed(self, node):
+        return self.complete or node in self._listed
+
+    def node_from_index(self, index):
+        return index.internalId() if index.isValid() else ROOT_NODE
+
+    def index_for_node(self, node, column=0):
+        if self.snapshot is None or node == ROOT_NODE:
+            return QModelIndex()
+        row = node - self.snapshot.first_child[self.snapshot.parents[node]]
+        return self.createIndex(row, column, node)
+
+    # --- QAbstractItemModel interface ---
+    def columnCount(self, parent=QModelIndex()):
+        return 3
+
+    def rowCount(self, parent=QModelIndex()):
+        if self.snapshot is None or parent.column() > 0:
+            return 0
+        return self._fetched.get(self.node_from_index(parent), 0)
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        node = self.snapshot.first_child[self.node_from_index(parent)] + row
+        return self.createIndex(row, column, node)
+
+    def parent(self, index):
+        if not index.isValid() or self.snapshot is None:
+            return QModelIndex()
+        return self.index_for_node(self.snapshot.parents[index.internalId()])
+
+    def hasChildren(self, parent=QModelIndex()):
+        if self.snapshot is None or parent.column() > 0:
             return False
-        
+        node = self.node_from_index(parent)
+        if not self.snapshot.is_dir(node):
+            # An archive expands like a folder once its members are listed.
+            return self.snapshot.is_archive(node) and self._is_listed(node)
+        if not self._is_listed(node):
+            return True
+        return self.snapshot.child_count[node] > 0
+
+    def canFetchMore(self, parent):
+        if self.snapshot is None:
+            return False
+        node = self.node_from_index(parent)
+        if not self.snapshot.is_dir(node) and not self.snapshot.is_archive(node):
+            return False
+        if not self._is_listed(node):
+            self._wanted.add(node)
+            return False
+        return self._fetched.get(node, 0) < self.snapshot.child_count[node]
+
+    def fetchMore(self, parent):
+        node = self.node_from_index(parent)
+        fetched = self._fetched.get(node, 0)
+        remaining = self.snapshot.child_count[node] - fetched
+        if remaining <= 0:
+            return
+        count = min(remaining, self.FETCH_BATCH_SIZE)
+        with metrics.timed("model_population"):
+            self.beginInsertRows(parent, fetched, fetched + count - 1)
+            self._fetched[node] = fetched + count
+            self.endInsertRows()
+        metrics.add(rows_created=count)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(self.header_labels):
+            return self.header_labels[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self.snapshot is None:
+            return None
+        snapshot = self.snapshot
+        node = index.internalId()
+        column = index.column()
+        if column == self.COLUMN_NAME:
+            if role == Qt.DisplayRole:
+                return snapshot.name(node)
+            if role == Qt.DecorationRole:
+                return self._folder_icon if snapshot.is_dir(node) else self._file_icon
+            if role == Qt.UserRole:
+                return snapshot.path(node)
+            if role == self.IS_DIR_ROLE:
+                return snapshot.is_dir(node)
+            if role == self.HIDDEN_ROLE:
+                return snapshot.in_hidden_path(node)
+            if role == self.EXTENSION_ROLE:
+                return snapshot.extension(node)
+            if role in (Qt.ForegroundRole, Qt.ToolTipRole) and self.change_status is not None:
+                status = self.change_status[node]
+                if status:
+                    return self.CHANGE_COLORS[status] if role == Qt.ForegroundRole else self.change_labels.get(status)
+        elif column == self.COLUMN_SIZE:
+            pending = snapshot.is_dir(node) and not self.complete
+            if role == Qt.DisplayRole:
+                return "…" if pending else naturalsize(snapshot.sizes[node])
+            if role == Qt.UserRole:
+                return 0 if pending else snapshot.sizes[node]
+        elif column == self.COLUMN_DESCRIPTION:
+            if role in (Qt.DisplayRole, Qt.EditRole, Qt.UserRole):
+                return self.descriptions.get(snapshot.path(node), "")
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or index.column() != self.COLUMN_DESCRIPTION or role != Qt.EditRole:
+            return False
+        self.descriptions[self.snapshot.path(index.internalId())] = value
+        self.dataChanged.emit(index, index)
         return True
 
 
+class ScanWorker(QObject):
+    """
+    Runs scan_directory() on a worker thread and reports its progress to the GUI.
+    Each batch carries the (growing) snapshot and the ids of the directories listed since the
+    previous batch, in scan order, so a parent is always reported before its children.
+    With a cache_path, the snapshot saved there by the previous session is used to rescan only
+    the directories that changed, and the new snapshot is saved back for the next one.
+    allocated, one_filesystem and archives are the scan options of scan_directory().
+    """
+    batch_ready = pyqtSignal(object, list)
+    progress = pyqtSignal(int, int, str)
+    finished = pyqtSignal(object)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, directory, workers=1, cache_path=None, allocated=False, one_filesystem=False, archives=False):
+        super().__init__()
+        self.directory = directory
+        self.workers = workers
+        self.cache_path = cache_path
+        self.allocated = allocated
+        self.one_filesystem = one_filesystem
+        self.archives = archives
+        self.cancel_event = threading.Event()
+        self._batch = []
+        self._entries_seen = 0
+        self._entries_flushed = 0
+        self._bytes_seen = 0
+        self._last_flush = time.monotonic()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            snapshot = scan_directory(
+                self.directory, self._on_directory, self.cancel_event, self.workers, self._load_cached(),
+                allocated=self.allocated, one_filesystem=self.one_filesystem, archives=self.archives,
+            )
+        except ScanCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        # Built here so that filter changes in the GUI only subtract precomputed totals, the
+        # search bar only runs one regular expression and statistics only combine counts.
+        snapshot.filter_aggregates()
+        snapshot.name_index()
+        snapshot.file_statistics()
+        self._flush(snapshot, snapshot.root)
+        self._save_cached(snapshot)
+        self.finished.emit(snapshot)
+
+    def _load_cached(self):
+        if self.cache_path is None:
+            return None
+        try:
+            return load_snapshot(self.cache_path, root=self.directory)
+        except (OSError, ValueError):
+            # A missing, stale or unreadable cache only means a full scan.
+            return None
+
+    def _save_cached(self, snapshot):
+        if self.cache_path is None:
+            return
+        try:
+            save_snapshot(snapshot, self.cache_path)
+        except OSError:
+            pass
+
+    def _on_directory(self, snapshot, node):
+        self._batch.append(node)
+        sizes = snapshot.sizes
+        # Archive members are listed after the walk; their uncompressed sizes are not on disk.
+        if snapshot.member_start is None:
+            self._bytes_seen += sum(sizes[child] for child in snapshot.children(node) if not snapshot.is_dir(child))
+        self._entries_seen += snapshot.child_count[node]
+        if self._entries_seen - self._entries_flushed >= SCAN_BATCH_SIZE \
+                or time.monotonic() - self._last_flush >= SCAN_BATCH_INTERVAL:
+            self._flush(snapshot, snapshot.path(node))
+
+    def _flush(self, snapshot, current_directory):
+        if self._batch:
+            self.batch_ready.emit(snapshot, self._batch)
+            self._batch = []
+        self._entries_flushed = self._entries_seen
+        self.progress.emit(self._entries_seen, self._bytes_seen, current_directory)
+        self._last_flush = time.monotonic()
+
+
+class RefreshWorker(QObject):
+    """
+    Runs refresh_snapshot() on a worker thread for watch mode.
+    changed_directories is None for a stat-based check of every directory.
+    """
+    finished = pyqtSignal(object, object)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, snapshot, changed_directories=None, workers=1, cache_path=None):
+        super().__init__()
+        self.snapshot = snapshot
+        self.changed_directories = changed_directories
+        self.workers = workers
+        self.cache_path = cache_path
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            snapshot, node_map = refresh_snapshot(
+                self.snapshot, self.changed_directories, self.cancel_event, self.workers
+            )
+        except ScanCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        if snapshot.same_entries(self.snapshot):
+            self.finished.emit(snapshot, None)
+            return
+        snapshot.filter_aggregates()
+        snapshot.name_index()
+        snapshot.file_statistics()
+        if self.cache_path is not None:
+            try:
+                save_snapshot(snapshot, self.cache_path)
+            except OSError:
+                pass
+        self.finished.emit(snapshot, node_map)
+
+
+class BatchWorker(QObject):
+    """
+    Runs run_batch() on a worker thread. The folders are exported by a pool of processes; this
+    thread waits for them and reports each finished folder to the GUI.
+    """
+    progress = pyqtSignal(int, int, str)
+    finished = pyqtSignal(list, str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, roots, output_dir, options):
+        super().__init__()
+        self.roots = roots
+        self.output_dir = output_dir
+        self.options = options
+        self.cancel_event = threading.Event()
+        self._done = 0
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            results, index_path = run_batch(
+                self.roots, self.output_dir, self.options, on_result=self._on_result, cancel_event=self.cancel_event
+            )
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(results, index_path)
+
+    def _on_result(self, result):
+        self._done += 1
+        self.progress.emit(self._done, len(self.roots), result["root"])
+
+
+class ChecksumWorker(QObject):
+    """
+    Runs compute_checksums() over a filtered view on a worker thread, reading files on a pool
+    of threads, and reports its progress to the GUI. With a cache_path, digests saved there by an
+    earlier export are reused for the files that did not change, and the cache is saved back.
+    finished carries the view, the digests by node id and the paths of unreadable files.
+    """
+    progress = pyqtSignal(int, int, object)
+    finished = pyqtSignal(object, object, list)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, view, workers=1, cache_path=None):
+        super().__init__()
+        self.view = view
+        self.workers = workers
+        self.cache_path = cache_path
+        self.cancel_event = threading.Event()
+        self._last_progress = time.monotonic()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        cache = self._load_cached()
+        unreadable = []
+        try:
+            checksums = compute_checksums(
+                self.view, self.workers, cache, self._on_progress, self.cancel_event, unreadable
+            )
+        except ChecksumCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        if cache is not None:
+            try:
+                save_checksum_cache(cache, self.cache_path)
+            except OSError:
+                pass
+        self.finished.emit(self.view, checksums, unreadable)
+
+    def _load_cached(self):
+        if self.cache_path is None:
+            return None
+        root = self.view.snapshot.root
+        try:
+            return load_checksum_cache(self.cache_path, root)
+        except (OSError, ValueError):
+            # A missing or stale cache only means every file is read.
+            return ChecksumCache(root)
+
+    def _on_progress(self, done, total, bytes_read):
+        if done == total or time.monotonic() - self._last_progress >= SCAN_BATCH_INTERVAL:
+            self.progress.emit(done, total, bytes_read)
+            self._last_progress = time.monotonic()
+
+
+class CompareWorker(QObject):
+    """
+    Loads a saved snapshot (unless one is given) and compares it with the current one on a
+    worker thread. finished carries the saved snapshot and the SnapshotComparison.
+    """
+    finished = pyqtSignal(object, object)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, snapshot, path=None, old_snapshot=None):
+        super().__init__()
+        self.snapshot = snapshot
+        self.path = path
+        self.old_snapshot = old_snapshot
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            old_snapshot = self.old_snapshot or load_snapshot(self.path)
+            # Every entry is compared; the tree filters hide the marks of filtered entries.
+            comparison = SnapshotComparison(
+                old_snapshot.filtered(False, []), self.snapshot.filtered(False, []), self.cancel_event
+            )
+        except ComparisonCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(old_snapshot, comparison)
+
+
+class WatchBridge(QObject):
+    """Carries watcher callbacks from the watcher thread to the GUI thread."""
+    changed = pyqtSignal(object)
+
+
+def splice_preview(text_edit, old_lines, new_lines):
+    """
+    Show ``new_lines`` in ``text_edit``, which currently holds ``old_lines``, by replacing only the
+    run of lines that differs. Falls back to ``setPlainText`` when the widget does not hold exactly
+    ``old_lines`` (for example after it was cleared).
+    """
+    document = text_edit.document()
+    if not old_lines or not new_lines or document.blockCount() != len(old_lines):
+        text_edit.setPlainText('\n'.join(new_lines))
+        return
+    prefix, suffix = common_affixes(old_lines, new_lines)
+    old_stop = len(old_lines) - suffix
+    new_stop = len(new_lines) - suffix
+    if prefix == old_stop and prefix == new_stop:
+        return
+    inserted = new_lines[prefix:new_stop]
+    cursor = QTextCursor(document)
+    if prefix < old_stop:
+        # Select the changed lines, without the line break that ends the last one.
+        cursor.setPosition(document.findBlockByNumber(prefix).position())
+        last = document.findBlockByNumber(old_stop - 1)
+        cursor.setPosition(last.position() + last.length() - 1, QTextCursor.KeepAnchor)
+        if inserted:
+            cursor.insertText('\n'.join(inserted))
+        elif old_stop < len(old_lines):
+            # Drop the line break after the removed lines too.
+            cursor.setPosition(document.findBlockByNumber(old_stop).position(), QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+        else:
+            # The removed lines end the document: drop the line break before them instead.
+            before = document.findBlockByNumber(prefix - 1)
+            cursor.setPosition(last.position() + last.length() - 1)
+            cursor.setPosition(before.position() + before.length() - 1, QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+    elif prefix < len(old_lines):
+        cursor.setPosition(document.findBlockByNumber(prefix).position())
+        cursor.insertText('\n'.join(inserted) + '\n')
+    else:
+        last = document.lastBlock()
+        cursor.setPosition(last.position() + last.length() - 1)
+        cursor.insertText('\n' + '\n'.join(inserted))
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -141,6 +733,20 @@ class MainWindow(QMainWindow):
         self.setWindowTitle(self.localization.tr("app_title"))
         self.resize(1100, 700)
         self.current_directory = None
+        self.snapshot = None
+        self.scan_thread = None
+        self.scan_worker = None
+        self.batch_thread = None
+        self.batch_worker = None
+        self.batch_output_dir = None
+        self.checksum_thread = None
+        self.checksum_worker = None
+        self.checksum_on_finished = None
+        self.compare_thread = None
+        self.compare_worker = None
+        self.comparison_snapshot = None
+        self.comparison_root = None
+        self.comparison = None
         self.descriptions = {}
         self.folder_count = 0
         self.file_count = 0
@@ -152,6 +758,37 @@ class MainWindow(QMainWindow):
         self.exclude_ext_label = None
         self.language_label = None
         self.language_combo = None
+        self.scan_workers_label = None
+        self.scan_workers_spinbox = None
+        self.scan_cache_checkbox = None
+        self.allocated_size_checkbox = None
+        self.one_filesystem_checkbox = None
+        self.archives_checkbox = None
+        self.csv_checksums_checkbox = None
+        self.statistics_checkbox = None
+        self.watch_checkbox = None
+        self.render_depth_label = None
+        self.watcher = None
+        self.refresh_thread = None
+        self.refresh_worker = None
+        self.watch_pending = set()
+        self.watch_check_all = False
+        self.watch_burst_started = None
+        self.watch_bridge = WatchBridge(self)
+        self.watch_bridge.changed.connect(self.on_watch_changed)
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.timeout.connect(self.start_refresh)
+        self.renderer = TreeTextRenderer(self.localization.tr)
+        self.preview_lines = None
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.timeout.connect(self.update_markdown_preview)
+        self.description_store = None
+        self.description_timer = QTimer(self)
+        self.description_timer.setSingleShot(True)
+        self.description_timer.timeout.connect(self.save_descriptions)
+        metrics.tracing = self.saved_record_trace()
         self.init_ui()
         self.retranslate_ui()
 
@@ -221,15 +858,52 @@ class MainWindow(QMainWindow):
         self.about_button = QPushButton()
         self.about_button.clicked.connect(self.show_about_info)
 
+        self.diagnostics_button = QPushButton()
+        self.diagnostics_button.clicked.connect(self.show_diagnostics)
+
         self.language_label = QLabel()
         self.language_combo = QComboBox()
         self.language_combo.currentIndexChanged.connect(self.on_language_changed)
         self.language_combo.setSizeAdjustPolicy(QComboBox.AdjustToContents)
 
+        self.scan_workers_label = QLabel()
+        self.scan_workers_spinbox = QSpinBox()
+        self.scan_workers_spinbox.setRange(1, MAX_SCAN_WORKERS)
+        self.scan_workers_spinbox.setValue(self.saved_scan_workers())
+        self.scan_workers_spinbox.valueChanged.connect(self.on_scan_workers_changed)
+
+        self.scan_cache_checkbox = QCheckBox()
+        self.scan_cache_checkbox.setChecked(self.saved_use_scan_cache())
+        self.scan_cache_checkbox.toggled.connect(self.on_scan_cache_toggled)
+
+        self.allocated_size_checkbox = QCheckBox()
+        self.allocated_size_checkbox.setChecked(self.saved_allocated_size())
+        self.allocated_size_checkbox.toggled.connect(self.on_allocated_size_toggled)
+
+        self.one_filesystem_checkbox = QCheckBox()
+        self.one_filesystem_checkbox.setChecked(self.saved_one_filesystem())
+        self.one_filesystem_checkbox.toggled.connect(self.on_one_filesystem_toggled)
+
+        self.archives_checkbox = QCheckBox()
+        self.archives_checkbox.setChecked(self.saved_expand_archives())
+        self.archives_checkbox.toggled.connect(self.on_expand_archives_toggled)
+
+        self.watch_checkbox = QCheckBox()
+        self.watch_checkbox.setChecked(self.saved_watch_changes())
+        self.watch_checkbox.toggled.connect(self.on_watch_toggled)
+
         top_buttons_layout.addWidget(self.select_dir_button)
+        top_buttons_layout.addWidget(self.scan_workers_label)
+        top_buttons_layout.addWidget(self.scan_workers_spinbox)
+        top_buttons_layout.addWidget(self.scan_cache_checkbox)
+        top_buttons_layout.addWidget(self.allocated_size_checkbox)
+        top_buttons_layout.addWidget(self.one_filesystem_checkbox)
+        top_buttons_layout.addWidget(self.archives_checkbox)
+        top_buttons_layout.addWidget(self.watch_checkbox)
         top_buttons_layout.addStretch(1)
         top_buttons_layout.addWidget(self.language_label)
         top_buttons_layout.addWidget(self.language_combo)
+        top_buttons_layout.addWidget(self.diagnostics_button)
         top_buttons_layout.addWidget(self.about_button)
         header_layout.addLayout(top_buttons_layout)
 
@@ -252,6 +926,33 @@ class MainWindow(QMainWindow):
         self.exclude_hidden_checkbox.stateChanged.connect(self.on_exclude_hidden_changed)
         filter_layout.addWidget(self.exclude_hidden_checkbox)
 
+        max_depth, max_children, order = self.saved_render_budget()
+        self.render_depth_label = QLabel()
+        self.render_depth_spinbox = QSpinBox()
+        self.render_depth_spinbox.setRange(0, MAX_RENDER_DEPTH)
+        self.render_depth_spinbox.setValue(max_depth)
+        self.render_depth_spinbox.valueChanged.connect(self.on_render_budget_changed)
+        self.render_children_label = QLabel()
+        self.render_children_spinbox = QSpinBox()
+        self.render_children_spinbox.setRange(0, MAX_RENDER_CHILDREN)
+        self.render_children_spinbox.setSingleStep(50)
+        self.render_children_spinbox.setValue(max_children)
+        self.render_children_spinbox.valueChanged.connect(self.on_render_budget_changed)
+        self.render_order_combo = QComboBox()
+        self.render_order_combo.addItem("", "name")
+        self.render_order_combo.addItem("", "size")
+        self.render_order_combo.setCurrentIndex(max(0, self.render_order_combo.findData(order)))
+        self.render_order_combo.currentIndexChanged.connect(self.on_render_budget_changed)
+        self.statistics_checkbox = QCheckBox()
+        self.statistics_checkbox.setChecked(self.saved_flag("show_statistics", False))
+        self.statistics_checkbox.toggled.connect(self.on_statistics_toggled)
+        filter_layout.addWidget(self.render_depth_label)
+        filter_layout.addWidget(self.render_depth_spinbox)
+        filter_layout.addWidget(self.render_children_label)
+        filter_layout.addWidget(self.render_children_spinbox)
+        filter_layout.addWidget(self.render_order_combo)
+        filter_layout.addWidget(self.statistics_checkbox)
+
         header_layout.addLayout(filter_layout)
         header_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
 
@@ -288,12 +989,11 @@ class MainWindow(QMainWindow):
         left_layout.addWidget(self.tree_view)
 
 
-        self.model = QStandardItemModel()
-        self.model.setHorizontalHeaderLabels(["", "", ""])
+        self.model = SnapshotTreeModel(self)
+        self.model.set_descriptions(self.descriptions)
 
         self.proxy_model = FileFilterProxyModel()
         self.proxy_model.setSourceModel(self.model)
-        self.proxy_model.setFilterKeyColumn(0)
         self.tree_view.setModel(self.proxy_model)
 
         # Adjust the header sections
@@ -326,11 +1026,56 @@ class MainWindow(QMainWindow):
         self.export_csv_button.setEnabled(False)
         self.export_csv_button.clicked.connect(self.export_csv)
 
+        self.export_inventory_button = QPushButton()
+        self.export_inventory_button.setEnabled(False)
+        self.export_inventory_button.clicked.connect(self.export_inventory)
+
+        self.export_checksums_button = QPushButton()
+        self.export_checksums_button.setEnabled(False)
+        self.export_checksums_button.clicked.connect(self.export_checksums)
+
+        self.save_snapshot_button = QPushButton()
+        self.save_snapshot_button.setEnabled(False)
+        self.save_snapshot_button.clicked.connect(self.save_scan_snapshot)
+
+        self.compare_snapshot_button = QPushButton()
+        self.compare_snapshot_button.setEnabled(False)
+        self.compare_snapshot_button.clicked.connect(self.compare_with_snapshot)
+
+        self.export_changes_button = QPushButton()
+        self.export_changes_button.setEnabled(False)
+        self.export_changes_button.clicked.connect(self.export_changes)
+
+        self.csv_checksums_checkbox = QCheckBox()
+        self.csv_checksums_checkbox.setChecked(self.saved_flag("csv_checksums", False))
+        self.csv_checksums_checkbox.toggled.connect(self.on_csv_checksums_toggled)
+
+        self.batch_export_button = QPushButton()
+        self.batch_export_button.clicked.connect(self.batch_export)
+
+        self.scan_status_label = QLabel()
+        self.scan_progress_bar = QProgressBar()
+        self.scan_progress_bar.setRange(0, 0)  # Busy indicator: the total is unknown while scanning.
+        self.scan_progress_bar.setMaximumWidth(150)
+        self.cancel_scan_button = QPushButton()
+        self.cancel_scan_button.clicked.connect(self.cancel_scan)
+        self.scan_progress_bar.setVisible(False)
+        self.cancel_scan_button.setVisible(False)
+
+        export_layout.addWidget(self.scan_progress_bar)
+        export_layout.addWidget(self.scan_status_label, 1)
+        export_layout.addWidget(self.cancel_scan_button)
         export_layout.addStretch(1)
         export_layout.addWidget(self.export_md_button)
         export_layout.addWidget(self.export_txt_button)
         export_layout.addWidget(self.export_csv_button)
-        export_layout.addWidget(self.export_csv_button)
+        export_layout.addWidget(self.csv_checksums_checkbox)
+        export_layout.addWidget(self.export_inventory_button)
+        export_layout.addWidget(self.export_checksums_button)
+        export_layout.addWidget(self.save_snapshot_button)
+        export_layout.addWidget(self.compare_snapshot_button)
+        export_layout.addWidget(self.export_changes_button)
+        export_layout.addWidget(self.batch_export_button)
         content_layout.addLayout(export_layout)
 
         # Accessibility: Accessible Names (Moved here to ensure buttons exist)
@@ -339,14 +1084,41 @@ class MainWindow(QMainWindow):
         
         self.about_button.setAccessibleName("About")
         self.about_button.setAccessibleDescription("Show application information.")
+        self.diagnostics_button.setAccessibleName("Diagnostics")
+        self.diagnostics_button.setAccessibleDescription("Show phase timings and counters, and save a trace.")
         
         self.export_md_button.setAccessibleName("Export Markdown")
         self.export_txt_button.setAccessibleName("Export Plain Text")
         self.export_csv_button.setAccessibleName("Export CSV")
+        self.export_inventory_button.setAccessibleName("Export Inventory")
+        self.export_inventory_button.setAccessibleDescription("Save every entry as NDJSON, Parquet or NumPy data.")
+        self.export_checksums_button.setAccessibleName("Export Checksums")
+        self.export_checksums_button.setAccessibleDescription("Save a BagIt SHA-256 manifest of every visible file.")
+        self.save_snapshot_button.setAccessibleName("Save Snapshot")
+        self.save_snapshot_button.setAccessibleDescription("Save the scan to compare a later version with it.")
+        self.compare_snapshot_button.setAccessibleName("Compare with Snapshot")
+        self.compare_snapshot_button.setAccessibleDescription("Mark the entries that changed since a saved scan.")
+        self.export_changes_button.setAccessibleName("Export Changes")
+        self.export_changes_button.setAccessibleDescription("Save the changes since the snapshot as Markdown or CSV.")
+        self.csv_checksums_checkbox.setAccessibleName("SHA-256 in CSV")
+        self.batch_export_button.setAccessibleName("Batch Export")
+        self.batch_export_button.setAccessibleDescription("Export every folder inside a chosen folder at once.")
+        self.cancel_scan_button.setAccessibleName("Cancel Scan")
+        self.scan_workers_spinbox.setAccessibleName("Scan Threads")
+        self.scan_workers_spinbox.setAccessibleDescription("Number of directories listed in parallel while scanning.")
+        self.scan_cache_checkbox.setAccessibleName("Reuse Scan Cache")
+        self.allocated_size_checkbox.setAccessibleName("Disk Usage")
+        self.one_filesystem_checkbox.setAccessibleName("Stay on One Filesystem")
+        self.archives_checkbox.setAccessibleName("List Archive Contents")
+        self.watch_checkbox.setAccessibleName("Watch for Changes")
         
         self.search_bar.setAccessibleName("Search")
         self.exclude_ext_input.setAccessibleName("Exclude Extensions")
         self.exclude_hidden_checkbox.setAccessibleName("Exclude Hidden Files")
+        self.render_depth_spinbox.setAccessibleName("Maximum Depth")
+        self.render_children_spinbox.setAccessibleName("Entries per Folder")
+        self.render_order_combo.setAccessibleName("Entries Kept per Folder")
+        self.statistics_checkbox.setAccessibleName("Statistics")
 
 
         vertical_splitter.addWidget(header_widget)
@@ -379,8 +1151,29 @@ class MainWindow(QMainWindow):
             self.select_dir_button.setText(self.localization.tr("select_directory_button"))
         if self.about_button is not None:
             self.about_button.setText(self.localization.tr("about_button"))
+        if self.diagnostics_button is not None:
+            self.diagnostics_button.setText(self.localization.tr("diagnostics_button"))
         if self.language_label is not None:
             self.language_label.setText(self.localization.tr("language_label"))
+        if self.scan_workers_label is not None:
+            self.scan_workers_label.setText(self.localization.tr("scan_workers_label"))
+        if self.scan_workers_spinbox is not None:
+            self.scan_workers_spinbox.setToolTip(self.localization.tr("scan_workers_tooltip"))
+        if self.scan_cache_checkbox is not None:
+            self.scan_cache_checkbox.setText(self.localization.tr("scan_cache_checkbox"))
+            self.scan_cache_checkbox.setToolTip(self.localization.tr("scan_cache_tooltip"))
+        if self.allocated_size_checkbox is not None:
+            self.allocated_size_checkbox.setText(self.localization.tr("allocated_size_checkbox"))
+            self.allocated_size_checkbox.setToolTip(self.localization.tr("allocated_size_tooltip"))
+        if self.one_filesystem_checkbox is not None:
+            self.one_filesystem_checkbox.setText(self.localization.tr("one_filesystem_checkbox"))
+            self.one_filesystem_checkbox.setToolTip(self.localization.tr("one_filesystem_tooltip"))
+        if self.archives_checkbox is not None:
+            self.archives_checkbox.setText(self.localization.tr("archives_checkbox"))
+            self.archives_checkbox.setToolTip(self.localization.tr("archives_tooltip"))
+        if self.watch_checkbox is not None:
+            self.watch_checkbox.setText(self.localization.tr("watch_checkbox"))
+            self.watch_checkbox.setToolTip(self.localization.tr("watch_tooltip"))
         self.populate_language_combo()
         if self.search_label is not None:
             self.search_label.setText(self.localization.tr("search_label"))
@@ -392,19 +1185,53 @@ class MainWindow(QMainWindow):
             self.exclude_ext_input.setPlaceholderText(self.localization.tr("exclude_extensions_placeholder"))
         if self.exclude_hidden_checkbox is not None:
             self.exclude_hidden_checkbox.setText(self.localization.tr("exclude_hidden_checkbox"))
+        if self.render_depth_label is not None:
+            self.render_depth_label.setText(self.localization.tr("render_depth_label"))
+            self.render_depth_spinbox.setSpecialValueText(self.localization.tr("render_no_limit"))
+            self.render_depth_spinbox.setToolTip(self.localization.tr("render_depth_tooltip"))
+            self.render_children_label.setText(self.localization.tr("render_children_label"))
+            self.render_children_spinbox.setSpecialValueText(self.localization.tr("render_no_limit"))
+            self.render_children_spinbox.setToolTip(self.localization.tr("render_children_tooltip"))
+            self.render_order_combo.setItemText(0, self.localization.tr("render_order_name"))
+            self.render_order_combo.setItemText(1, self.localization.tr("render_order_size"))
+        if self.statistics_checkbox is not None:
+            self.statistics_checkbox.setText(self.localization.tr("statistics_checkbox"))
+            self.statistics_checkbox.setToolTip(self.localization.tr("statistics_tooltip"))
         if self.export_md_button is not None:
             self.export_md_button.setText(self.localization.tr("export_md_button"))
         if self.export_txt_button is not None:
             self.export_txt_button.setText(self.localization.tr("export_txt_button"))
         if self.export_csv_button is not None:
             self.export_csv_button.setText(self.localization.tr("export_csv_button"))
-        self.model.setHorizontalHeaderLabels([
+        if self.export_inventory_button is not None:
+            self.export_inventory_button.setText(self.localization.tr("export_inventory_button"))
+        if self.export_checksums_button is not None:
+            self.export_checksums_button.setText(self.localization.tr("export_checksums_button"))
+        if self.save_snapshot_button is not None:
+            self.save_snapshot_button.setText(self.localization.tr("save_snapshot_button"))
+        if self.compare_snapshot_button is not None:
+            self.compare_snapshot_button.setText(self.localization.tr("compare_snapshot_button"))
+        if self.export_changes_button is not None:
+            self.export_changes_button.setText(self.localization.tr("export_changes_button"))
+        if self.csv_checksums_checkbox is not None:
+            self.csv_checksums_checkbox.setText(self.localization.tr("csv_checksums_checkbox"))
+            self.csv_checksums_checkbox.setToolTip(self.localization.tr("csv_checksums_tooltip"))
+        if self.batch_export_button is not None:
+            self.batch_export_button.setText(self.localization.tr("batch_export_button"))
+        if self.cancel_scan_button is not None:
+            self.cancel_scan_button.setText(self.localization.tr("cancel_scan_button"))
+        self.model.set_change_labels({
+            STATUS_ADDED: self.localization.tr("change_added"),
+            STATUS_RESIZED: self.localization.tr("change_resized"),
+            STATUS_MODIFIED: self.localization.tr("change_modified"),
+            STATUS_CHANGED_BELOW: self.localization.tr("change_below"),
+        })
+        self.model.set_header_labels([
             self.localization.tr("tree_column_name"),
             self.localization.tr("tree_column_size"),
             self.localization.tr("tree_column_description"),
         ])
-        if self.current_directory:
-            self.update_markdown_preview()
+        self.schedule_preview_update()
 
     def on_language_changed(self, index):
         if not self.language_combo:
@@ -416,20 +1243,104 @@ class MainWindow(QMainWindow):
         self.settings.setValue("language", lang_code)
         self.retranslate_ui()
 
+    def saved_scan_workers(self):
+        try:
+            workers = int(self.settings.value("scan_workers", DEFAULT_SCAN_WORKERS))
+        except (TypeError, ValueError):
+            workers = DEFAULT_SCAN_WORKERS
+        return max(1, min(workers, MAX_SCAN_WORKERS))
+
+    def on_scan_workers_changed(self, value):
+        self.settings.setValue("scan_workers", value)
+
+    def saved_flag(self, key, default):
+        value = self.settings.value(key, default)
+        if isinstance(value, str):
+            return value.lower() == "true"
+        return bool(value)
+
+    def saved_use_scan_cache(self):
+        return self.saved_flag("use_scan_cache", True)
+
+    def on_scan_cache_toggled(self, checked):
+        self.settings.setValue("use_scan_cache", checked)
+
+    def saved_allocated_size(self):
+        return self.saved_flag("allocated_size", False)
+
+    def on_allocated_size_toggled(self, checked):
+        self.settings.setValue("allocated_size", checked)
+
+    def saved_one_filesystem(self):
+        return self.saved_flag("one_filesystem", False)
+
+    def on_one_filesystem_toggled(self, checked):
+        self.settings.setValue("one_filesystem", checked)
+
+    def saved_expand_archives(self):
+        return self.saved_flag("expand_archives", False)
+
+    def on_expand_archives_toggled(self, checked):
+        self.settings.setValue("expand_archives", checked)
+
+    def on_csv_checksums_toggled(self, checked):
+        self.settings.setValue("csv_checksums", checked)
+
+    def on_statistics_toggled(self, checked):
+        self.settings.setValue("show_statistics", checked)
+        self.schedule_preview_update()
+
+    def saved_watch_changes(self):
+        return self.saved_flag("watch_changes", False)
+
+    def on_watch_toggled(self, checked):
+        self.settings.setValue("watch_changes", checked)
+        if checked:
+            self.start_watching()
+        else:
+            self.stop_watching()
+            if self.snapshot is not None:
+                self.scan_status_label.setText(self.localization.tr("watch_stopped"))
+
     # ------------------- Filter callbacks --------------------
     def on_search_text_changed(self, text):
-        reg_exp = QRegExp(text, Qt.CaseInsensitive, QRegExp.Wildcard)
-        self.proxy_model.setFilterRegExp(reg_exp)
+        self.proxy_model.setSearchText(text)
 
     def on_exclude_ext_changed(self, text):
         self.proxy_model.setExcludeExtensions(text)
-        if self.current_directory:
-            self.update_markdown_preview()
+        self.schedule_preview_update()
 
     def on_exclude_hidden_changed(self, state):
         self.proxy_model.setExcludeHidden(state == Qt.Checked)
-        if self.current_directory:
-            self.update_markdown_preview()
+        self.schedule_preview_update()
+
+    def saved_render_budget(self):
+        """The saved ``(max_depth, max_children, order)`` of the preview and exports."""
+        try:
+            max_depth = int(self.settings.value("render_max_depth", 0))
+            max_children = int(self.settings.value("render_max_children", 0))
+        except (TypeError, ValueError):
+            max_depth = max_children = 0
+        order = self.settings.value("render_order", "name")
+        if order not in RenderBudget.ORDERS:
+            order = "name"
+        return (
+            max(0, min(max_depth, MAX_RENDER_DEPTH)), max(0, min(max_children, MAX_RENDER_CHILDREN)), order
+        )
+
+    def render_budget(self):
+        return RenderBudget(
+            self.render_depth_spinbox.value(),
+            self.render_children_spinbox.value(),
+            self.render_order_combo.currentData(),
+        )
+
+    def on_render_budget_changed(self, *_):
+        budget = self.render_budget()
+        self.settings.setValue("render_max_depth", budget.max_depth)
+        self.settings.setValue("render_max_children", budget.max_children)
+        self.settings.setValue("render_order", budget.order)
+        self.schedule_preview_update()
 
     # ------------------- Directory selection & Tree building --------------------
     def select_directory(self):
@@ -437,69 +1348,277 @@ class MainWindow(QMainWindow):
         if directory:
             self.current_directory = directory
             self.load_descriptions()
+            self.start_scan(directory)
+
+    def start_scan(self, directory):
+        self.stop_scan()
+        self.stop_checksums()
+        self.stop_comparison()
+        self.stop_watching()
+        if self.comparison_root is not None and not self.same_root(directory, self.comparison_root):
+            # The snapshot was compared with another folder; keep it only for a rescan of that folder.
+            self.comparison_snapshot = None
+            self.comparison_root = None
+        self.snapshot = None
+        self.comparison = None
+        self.set_exports_enabled(False)
+        self.preview_timer.stop()
+        self.renderer.reset()
+        self.preview_lines = None
+        self.preview_text_edit.clear()
+        self.model.set_snapshot(None)
+
+        self.scan_thread = QThread(self)
+        cache_path = cache_path_for(directory) if self.scan_cache_checkbox.isChecked() else None
+        self.scan_worker = ScanWorker(
+            directory, self.scan_workers_spinbox.value(), cache_path,
+            self.allocated_size_checkbox.isChecked(), self.one_filesystem_checkbox.isChecked(),
+            self.archives_checkbox.isChecked(),
+        )
+        self.scan_worker.moveToThread(self.scan_thread)
+        self.scan_thread.started.connect(self.scan_worker.run)
+        self.scan_worker.batch_ready.connect(self.on_scan_batch)
+        self.scan_worker.progress.connect(self.on_scan_progress)
+        self.scan_worker.finished.connect(self.on_scan_finished)
+        self.scan_worker.cancelled.connect(self.on_scan_cancelled)
+        self.scan_worker.failed.connect(self.on_scan_failed)
+        for signal in (self.scan_worker.finished, self.scan_worker.cancelled, self.scan_worker.failed):
+            signal.connect(self.scan_thread.quit)
+        self.scan_thread.finished.connect(self.scan_worker.deleteLater)
+        self.scan_thread.finished.connect(self.scan_thread.deleteLater)
+
+        self.scan_progress_bar.setVisible(True)
+        self.cancel_scan_button.setVisible(True)
+        self.cancel_scan_button.setEnabled(True)
+        self.scan_status_label.setText(self.localization.tr("scan_started"))
+        self.scan_thread.start()
+
+    @staticmethod
+    def same_root(first, second):
+        return os.path.normcase(os.path.abspath(first)) == os.path.normcase(os.path.abspath(second))
+
+    def stop_scan(self):
+        """Cancel a running scan and wait for its thread to exit."""
+        if self.scan_worker is not None:
+            self.scan_worker.cancel()
+        if self.scan_thread is not None:
+            self.scan_thread.quit()
+            self.scan_thread.wait()
+        self.scan_thread = None
+        self.scan_worker = None
+
+    def cancel_scan(self):
+        if self.scan_worker is not None:
+            self.scan_worker.cancel()
+            self.cancel_scan_button.setEnabled(False)
+        if self.checksum_worker is not None:
+            self.checksum_worker.cancel()
+            self.cancel_scan_button.setEnabled(False)
+
+    def finish_scan(self, status_text):
+        self.scan_progress_bar.setVisible(False)
+        self.cancel_scan_button.setVisible(False)
+        self.scan_status_label.setText(status_text)
+        self.scan_thread = None
+        self.scan_worker = None
+
+    def set_exports_enabled(self, enabled):
+        self.export_md_button.setEnabled(enabled)
+        self.export_txt_button.setEnabled(enabled)
+        self.export_csv_button.setEnabled(enabled)
+        self.export_inventory_button.setEnabled(enabled)
+        self.export_checksums_button.setEnabled(enabled)
+        self.save_snapshot_button.setEnabled(enabled)
+        self.compare_snapshot_button.setEnabled(enabled)
+        self.export_changes_button.setEnabled(enabled and self.comparison_snapshot is not None)
+
+    def on_scan_batch(self, snapshot, nodes):
+        if self.sender() is not self.scan_worker:
+            return
+        if self.model.snapshot is not snapshot:
+            self.model.set_snapshot(snapshot, complete=False)
+        self.model.directories_listed(nodes)
+
+    def on_scan_progress(self, entries, bytes_seen, current_directory):
+        if self.sender() is not self.scan_worker:
+            return
+        self.scan_status_label.setText(self.localization.tr(
+            "scan_progress",
+            entries=entries,
+            size=naturalsize(bytes_seen),
+            directory=current_directory,
+        ))
+
+    def on_scan_finished(self, snapshot):
+        if self.sender() is not self.scan_worker:
+            return
+        self.snapshot = snapshot
+        # Folder sizes are only known once the whole walk has been aggregated.
+        if self.model.snapshot is snapshot:
+            self.model.set_complete()
+        else:
             self.populate_tree()
-            self.export_md_button.setEnabled(True)
-            self.export_txt_button.setEnabled(True)
-            self.export_csv_button.setEnabled(True) # Enabled CSV button
+        self.proxy_model.refreshSearch()
+        self.finish_scan(self.localization.tr("scan_complete", entries=len(snapshot) - 1))
+        self.set_exports_enabled(True)
+        self.renderer.reset()
+        self.update_markdown_preview()
+        self.start_watching()
+        if self.comparison_snapshot is not None:
+            # Keep marking the changes since the same snapshot after a rescan.
+            self.start_comparison(old_snapshot=self.comparison_snapshot)
+
+    def on_scan_cancelled(self):
+        if self.sender() is not self.scan_worker:
+            return
+        self.model.set_snapshot(None)
+        self.current_directory = None
+        self.finish_scan(self.localization.tr("scan_cancelled"))
+
+    def on_scan_failed(self, error):
+        if self.sender() is not self.scan_worker:
+            return
+        self.model.set_snapshot(None)
+        self.current_directory = None
+        self.finish_scan("")
+        QMessageBox.critical(
+            self,
+            self.localization.tr("scan_failed_title"),
+            self.localization.tr("scan_failed_message", error=error),
+        )
+
+    def closeEvent(self, event):
+        self.stop_scan()
+        self.stop_checksums()
+        self.stop_comparison()
+        self.stop_batch()
+        self.stop_watching()
+        self.close_descriptions()
+        super().closeEvent(event)
+
+    # ------------------- Watch mode --------------------
+    def start_watching(self):
+        self.stop_watching()
+        if self.snapshot is None or not self.watch_checkbox.isChecked():
+            return
+        try:
+            # watchdog is only imported once watch mode is actually used.
+            from treegen.watcher import create_watcher
+            self.watcher = create_watcher(self.snapshot.root, self.watch_bridge.changed.emit)
+        except OSError as e:
+            self.scan_status_label.setText(self.localization.tr("watch_failed", error=str(e)))
+            return
+        self.scan_status_label.setText(self.localization.tr(
+            "watch_started", backend=self.localization.tr(f"watch_backend_{self.watcher.backend}")
+        ))
+
+    def stop_watching(self):
+        """Stop the watcher, drop pending events and wait for a running refresh to exit."""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        self.watch_timer.stop()
+        self.watch_pending = set()
+        self.watch_check_all = False
+        self.watch_burst_started = None
+        if self.refresh_worker is not None:
+            self.refresh_worker.cancel()
+        if self.refresh_thread is not None:
+            self.refresh_thread.quit()
+            self.refresh_thread.wait()
+        self.refresh_thread = None
+        self.refresh_worker = None
+
+    def on_watch_changed(self, directories):
+        if self.watcher is None:
+            return
+        if directories is None:
+            self.watch_check_all = True
+        else:
+            self.watch_pending.update(directories)
+        # Restart the debounce timer on every event, until the burst has been delayed for too long.
+        now = time.monotonic()
+        if self.watch_burst_started is None:
+            self.watch_burst_started = now
+        if (now - self.watch_burst_started) * 1000 < WATCH_MAX_DELAY_MS or not self.watch_timer.isActive():
+            self.watch_timer.start(WATCH_DEBOUNCE_MS)
+
+    def start_refresh(self):
+        if self.refresh_worker is not None or self.snapshot is None:
+            return
+        if not self.watch_pending and not self.watch_check_all:
+            return
+        changed_directories = None if self.watch_check_all else self.watch_pending
+        self.watch_pending = set()
+        self.watch_check_all = False
+        self.watch_burst_started = None
+
+        cache_path = cache_path_for(self.snapshot.root) if self.scan_cache_checkbox.isChecked() else None
+        self.refresh_thread = QThread(self)
+        self.refresh_worker = RefreshWorker(
+            self.snapshot, changed_directories, self.scan_workers_spinbox.value(), cache_path
+        )
+        self.refresh_worker.moveToThread(self.refresh_thread)
+        self.refresh_thread.started.connect(self.refresh_worker.run)
+        self.refresh_worker.finished.connect(self.on_refresh_finished)
+        self.refresh_worker.failed.connect(self.on_refresh_failed)
+        for signal in (self.refresh_worker.finished, self.refresh_worker.cancelled, self.refresh_worker.failed):
+            signal.connect(self.refresh_thread.quit)
+        self.refresh_thread.finished.connect(self.refresh_worker.deleteLater)
+        self.refresh_thread.finished.connect(self.refresh_thread.deleteLater)
+        self.refresh_thread.start()
+
+    def finish_refresh(self):
+        self.refresh_thread = None
+        self.refresh_worker = None
+        if self.watch_pending or self.watch_check_all:
+            self.watch_timer.start(WATCH_DEBOUNCE_MS)
+
+    def on_refresh_finished(self, snapshot, node_map):
+        if self.sender() is not self.refresh_worker:
+            return
+        if node_map is not None:
+            self.model.replace_snapshot(snapshot, node_map)
+            self.snapshot = snapshot
+            self.renderer.reset()
             self.update_markdown_preview()
+            self.scan_status_label.setText(self.localization.tr(
+                "watch_updated", time=time.strftime("%H:%M:%S"), entries=len(snapshot) - 1
+            ))
+            if self.comparison_snapshot is not None:
+                self.start_comparison(old_snapshot=self.comparison_snapshot)
+        self.finish_refresh()
+
+    def on_refresh_failed(self, error):
+        if self.sender() is not self.refresh_worker:
+            return
+        self.scan_status_label.setText(self.localization.tr("watch_failed", error=error))
+        self.finish_refresh()
 
     def load_descriptions(self):
-        desc_file = os.path.join(self.current_directory, ".descriptions.json")
-        if os.path.exists(desc_file):
-            with open(desc_file, 'r', encoding='utf-8') as f:
-                self.descriptions = json.load(f)
-        else:
-            self.descriptions = {}
+        self.close_descriptions()
+        self.description_store = DescriptionStore(self.current_directory)
+        self.descriptions = self.description_store.load()
+        self.model.set_descriptions(self.descriptions)
+        self.renderer.reset()
 
     def save_descriptions(self):
-        desc_file = os.path.join(self.current_directory, ".descriptions.json")
-        with open(desc_file, 'w', encoding='utf-8') as f:
-            json.dump(self.descriptions, f, indent=4)
+        self.description_timer.stop()
+        if self.description_store is not None:
+            self.description_store.flush()
 
-    def populate_tree(self):
-        self.model.removeRows(0, self.model.rowCount())
-        root_item = self.model.invisibleRootItem()
-        self.add_items(root_item, self.current_directory)
-        self.tree_view.expandAll()
+    def close_descriptions(self):
+        """Write pending edits and compact the journal of the folder being left."""
+        self.description_timer.stop()
+        if self.description_store is not None:
+            self.description_store.close()
+            self.description_store = None
 
-    def add_items(self, parent_item, path):
-        try:
-            items = os.listdir(path)
-            items.sort()
-            for item_name in items:
-                item_path = os.path.join(path, item_name)
-                if os.path.isdir(item_path):
-                    size = self.get_folder_size(item_path)
-                    icon = QIcon.fromTheme("folder")
-                else:
-                    size = os.path.getsize(item_path)
-                    icon = QIcon.fromTheme("text-x-generic")
-
-                size_human_readable = humanize.naturalsize(size)
-                description = self.descriptions.get(item_path, "")
-
-                item = QStandardItem(item_name)
-                size_item = QStandardItem(size_human_readable)
-                desc_item = QStandardItem(description)
-
-                item.setData(item_path, Qt.UserRole)
-                item.setIcon(icon)
-                size_item.setData(size, Qt.UserRole)
-                desc_item.setData(description, Qt.UserRole)
-
-                parent_item.appendRow([item, size_item, desc_item])
-
-                # Recursively process subdirectories
-                if os.path.isdir(item_path):
-                    self.add_items(item, item_path)
-
-        except PermissionError:
-            pass
+    def populate_tree(self):
+        self.model.set_snapshot(self.snapshot)
 
-    def get_folder_size(self, path, respect_filters=False):
-        exclude_hidden = self.proxy_model.exclude_hidden if respect_filters else False
-        exclude_extensions = self.proxy_model.exclude_extensions if respect_filters else []
-        return calculate_folder_size(path, exclude_hidden, exclude_extensions)
+    def filtered_view(self):
+        return self.snapshot.filtered(self.proxy_model.exclude_hidden, self.proxy_model.exclude_extensions)
 
     def handle_enter_key(self):
         # Enter key should toggle expansion or edit description depending on context.
@@ -514,10 +1633,10 @@ class MainWindow(QMainWindow):
 
     def add_description(self, index):
         source_index = self.proxy_model.mapToSource(index)
-        item = self.model.itemFromIndex(source_index.sibling(source_index.row(), 0))
-        desc_item = self.model.itemFromIndex(source_index.sibling(source_index.row(), 2))
-        item_path = item.data(Qt.UserRole)
-        current_desc = desc_item.text()
+        name_index = source_index.sibling(source_index.row(), SnapshotTreeModel.COLUMN_NAME)
+        desc_index = source_index.sibling(source_index.row(), SnapshotTreeModel.COLUMN_DESCRIPTION)
+        item_path = name_index.data(Qt.UserRole)
+        current_desc = desc_index.data(Qt.EditRole) or ""
 
         text, ok = QInputDialog.getMultiLineText(
             self,
@@ -526,33 +1645,39 @@ class MainWindow(QMainWindow):
             current_desc,
         )
         if ok:
-            desc_item.setText(text)
-            self.descriptions[item_path] = text
-            self.save_descriptions()
-            self.update_markdown_preview()
+            self.model.setData(desc_index, text, Qt.EditRole)
+            self.description_store.set(item_path, text)
+            self.description_timer.start(DESCRIPTION_FLUSH_MS)
+            if self.snapshot is not None:
+                # While a scan runs there is no preview yet; it is rendered once the scan finishes.
+                self.renderer.description_changed(self.snapshot, source_index.internalId())
+                self.schedule_preview_update()
 
     # ------------------- Markdown generation & preview --------------------
-    def generate_markdown_content(self):
-        self.folder_count = 0
-        self.file_count = 0
-        self.total_size = 0
-        markdown_lines = []
-
+    def generate_markdown_lines(self):
         root_name = os.path.basename(self.current_directory) or self.current_directory
-        markdown_lines.append(f"{root_name}")
-
-        self.build_tree(self.current_directory, markdown_lines, prefix='', is_last=True)
-
-        # Summary
-        markdown_lines.append('')
-        markdown_lines.append('---')
-        markdown_lines.append(self.localization.tr("summary_heading"))
-        markdown_lines.append(self.localization.tr("summary_total_folders", count=self.folder_count))
-        markdown_lines.append(self.localization.tr("summary_total_files", count=self.file_count))
-        total_size_hr = humanize.naturalsize(self.total_size)
-        markdown_lines.append(self.localization.tr("summary_total_size", size=total_size_hr))
+        view = self.filtered_view()
+        signature = (view.exclude_hidden, view.exclude_extensions, self.localization.language)
+        markdown_lines = [f"{root_name}"]
+        markdown_lines.extend(self.renderer.render_lines(view, self.descriptions, signature, self.render_budget()))
+        self.folder_count = self.renderer.folder_count
+        self.file_count = self.renderer.file_count
+        self.total_size = self.renderer.total_size
+        markdown_lines.extend(summary_lines(self.localization.tr, self.folder_count, self.file_count, self.total_size))
+        if self.statistics_checkbox.isChecked():
+            markdown_lines.extend(statistics_lines(self.localization.tr, collect_statistics(view)))
+        return markdown_lines
+
+    def iter_export_lines(self):
+        """Stream the Markdown/plain-text export line by line, without the preview cache."""
+        root_name = os.path.basename(self.current_directory) or self.current_directory
+        return iter_markdown_lines(
+            self.filtered_view(), self.descriptions, self.localization.tr, root_name, self.render_budget(),
+            self.statistics_checkbox.isChecked(),
+        )
 
-        return '\n'.join(markdown_lines)
+    def generate_markdown_content(self):
+        return '\n'.join(self.generate_markdown_lines())
 
     def generate_plain_text_content(self):
         # For plain text, we can reuse the markdown generation logic,
@@ -562,101 +1687,18 @@ class MainWindow(QMainWindow):
         # implemented with its own build_plain_text helper.
         return self.generate_markdown_content()
 
-    def update_markdown_preview(self):
-        if self.current_directory:
-            md_content = self.generate_markdown_content()
-            self.preview_text_edit.setPlainText(md_content)
-
-    # ------------------- Build tree text recursively --------------------
-    def build_tree(self, path, lines, prefix='', is_last=True):
-        exclude_hidden = self.proxy_model.exclude_hidden
-        exclude_extensions = self.proxy_model.exclude_extensions
-
-        try:
-            items = iter_visible_children(path, exclude_hidden, exclude_extensions)
-        except PermissionError:
-            connector = '\\-- ' if is_last else '|-- '
-            lines.append(f"{prefix}{connector}{self.localization.tr('permission_denied')}")
-            return
-        except FileNotFoundError:
-            connector = '\\-- ' if is_last else '|-- '
-            lines.append(f"{prefix}{connector}{self.localization.tr('not_found')}")
-            return
-
-        self.folder_count += 1
-
-        if not items:
-            connector = '\\-- ' if is_last else '|-- '
-            lines.append(f"{prefix}{connector}{self.localization.tr('empty_folder')}")
-            return
-
-        connectors = ['|-- '] * (len(items) - 1) + ['\\-- ']
-
-        for index, (item_name, item_path, is_dir) in enumerate(items):
-            connector = connectors[index]
-            size = self.get_folder_size(item_path, respect_filters=True) if is_dir else 0
-
-            if not is_dir:
-                try:
-                    size = os.path.getsize(item_path)
-                except (OSError, PermissionError):
-                    size = 0
-
-            size_hr = humanize.naturalsize(size)
-
-            if is_dir:
-                line = f"{prefix}{connector}**{item_name}**"
-            else:
-                line = f"{prefix}{connector}{item_name}"
-                self.file_count += 1
-                self.total_size += size
-
-            line += f" [ {size_hr} ]"
-            lines.append(line)
-
-            description = self.descriptions.get(item_path, "")
-            if description:
-                comment_prefix = prefix + ('    ' if connector == '\\-- ' else '|   ')
-                lines.append(f"{comment_prefix}<!-- {description} -->")
-
-            if is_dir:
-                new_prefix = prefix + ('    ' if connector == '\\-- ' else '|   ')
-                self.build_tree(item_path, lines, prefix=new_prefix, is_last=(connector == '\\-- '))
+    def schedule_preview_update(self):
+        self.preview_timer.start(PREVIEW_DEBOUNCE_MS)
 
-    def generate_csv_content(self, writer):
-        self.build_csv_rows(self.current_directory, writer)
-
-    def build_csv_rows(self, path, writer):
-        exclude_hidden = self.proxy_model.exclude_hidden
-        exclude_extensions = self.proxy_model.exclude_extensions
+    def update_markdown_preview(self):
+        self.preview_timer.stop()
+        if self.current_directory and self.snapshot is not None:
+            lines = self.generate_markdown_lines()
+            splice_preview(self.preview_text_edit, self.preview_lines, lines)
+            self.preview_lines = lines
 
-        try:
-            items = iter_visible_children(path, exclude_hidden, exclude_extensions)
-        except (PermissionError, FileNotFoundError):
-            return
-
-        for index, (item_name, item_path, is_dir) in enumerate(items):
-            # Calculate logic
-            size = 0
-            type_str = "File"
-            if is_dir:
-                type_str = "Directory"
-                size = self.get_folder_size(item_path, respect_filters=True)
-            else:
-                try:
-                    size = os.path.getsize(item_path)
-                except (OSError, PermissionError):
-                    size = 0
-            
-            description = self.descriptions.get(item_path, "")
-            
-            # Relative path for cleaner export (optional, but requested implicitly by 'structure')
-            rel_path = os.path.relpath(item_path, self.current_directory)
-            
-            writer.writerow([rel_path, type_str, item_name, size, description])
-
-            if is_dir:
-                self.build_csv_rows(item_path, writer)
+    def generate_csv_content(self, writer, view=None, checksums=None):
+        writer.writerows(iter_csv_rows(view or self.filtered_view(), self.descriptions, checksums))
 
     # ------------------- Exporters --------------------
     def export_markdown(self):
@@ -679,10 +1721,10 @@ class MainWindow(QMainWindow):
             options=options
         )
         if file_path:
-            md_content = self.generate_markdown_content()
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(md_content)
+                with metrics.timed("export", format="text"), \
+                        open(file_path, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+                    write_lines(f, self.iter_export_lines())
                 QMessageBox.information(
                     self,
                     self.localization.tr("export_success_title"),
@@ -713,10 +1755,10 @@ class MainWindow(QMainWindow):
         )
 
         if file_path:
-            content = self.generate_plain_text_content()
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                with metrics.timed("export", format="text"), \
+                        open(file_path, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+                    write_lines(f, self.iter_export_lines())
                 QMessageBox.information(
                     self,
                     self.localization.tr("export_success_title"),
@@ -747,11 +1789,342 @@ class MainWindow(QMainWindow):
         )
 
         if file_path:
+            if self.csv_checksums_checkbox.isChecked():
+                self.start_checksums(lambda view, checksums: self.write_csv_file(file_path, view, checksums))
+            else:
+                self.write_csv_file(file_path)
+
+    def write_csv_file(self, file_path, view=None, checksums=None):
+        try:
+            with metrics.timed("export", format="csv"), \
+                    open(file_path, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+                writer = csv.writer(f)
+                writer.writerow(CSV_HEADER if checksums is None else CSV_HEADER + [CSV_CHECKSUM_HEADER])
+                self.generate_csv_content(writer, view, checksums)
+            QMessageBox.information(
+                self,
+                self.localization.tr("export_success_title"),
+                self.localization.tr("export_success_message", path=file_path)
+            )
+        except Exception as e:
+            QMessageBox.critical(
+                self,
+                self.localization.tr("export_failed_title"),
+                self.localization.tr("export_failed_message", error=str(e))
+            )
+
+    def export_checksums(self):
+        """Save a BagIt manifest-sha256.txt of the visible files, hashed on a worker thread."""
+        if not self.current_directory or self.snapshot is None:
+            QMessageBox.warning(
+                self,
+                self.localization.tr("no_directory_title"),
+                self.localization.tr("no_directory_message")
+            )
+            return
+
+        default_filename = self.localization.tr("save_manifest_default_filename")
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            self.localization.tr("save_manifest_dialog"),
+            os.path.join(self.current_directory, default_filename),
+            self.localization.tr("manifest_file_filter")
+        )
+        if file_path:
+            self.start_checksums(lambda view, checksums: self.write_manifest_file(file_path, view, checksums))
+
+    def write_manifest_file(self, file_path, view, checksums):
+        try:
+            with metrics.timed("export", format="manifest"), \
+                    open(file_path, 'w', newline='\n', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+                write_manifest(view, checksums, f)
+            QMessageBox.information(
+                self,
+                self.localization.tr("export_success_title"),
+                self.localization.tr("export_success_message", path=file_path)
+            )
+        except Exception as e:
+            QMessageBox.critical(
+                self,
+                self.localization.tr("export_failed_title"),
+                self.localization.tr("export_failed_message", error=str(e))
+            )
+
+    # ------------------- Checksums --------------------
+    def start_checksums(self, on_finished):
+        """
+        Hash the visible files with the scan threads setting, showing progress in the status bar,
+        then call on_finished(view, checksums) with the view that was hashed.
+        """
+        self.stop_checksums()
+        self.checksum_on_finished = on_finished
+        cache_path = checksum_cache_path(self.snapshot.root) if self.scan_cache_checkbox.isChecked() else None
+        self.checksum_thread = QThread(self)
+        self.checksum_worker = ChecksumWorker(self.filtered_view(), self.scan_workers_spinbox.value(), cache_path)
+        self.checksum_worker.moveToThread(self.checksum_thread)
+        self.checksum_thread.started.connect(self.checksum_worker.run)
+        self.checksum_worker.progress.connect(self.on_checksum_progress)
+        self.checksum_worker.finished.connect(self.on_checksum_finished)
+        self.checksum_worker.cancelled.connect(self.on_checksum_cancelled)
+        self.checksum_worker.failed.connect(self.on_checksum_failed)
+        for signal in (self.checksum_worker.finished, self.checksum_worker.cancelled, self.checksum_worker.failed):
+            signal.connect(self.checksum_thread.quit)
+        self.checksum_thread.finished.connect(self.checksum_worker.deleteLater)
+        self.checksum_thread.finished.connect(self.checksum_thread.deleteLater)
+
+        self.set_exports_enabled(False)
+        self.scan_progress_bar.setVisible(True)
+        self.cancel_scan_button.setVisible(True)
+        self.cancel_scan_button.setEnabled(True)
+        self.scan_status_label.setText(self.localization.tr("checksum_started"))
+        self.checksum_thread.start()
+
+    def stop_checksums(self):
+        """Cancel running checksums and wait for their thread to exit."""
+        if self.checksum_worker is not None:
+            self.checksum_worker.cancel()
+        if self.checksum_thread is not None:
+            self.checksum_thread.quit()
+            self.checksum_thread.wait()
+        self.checksum_thread = None
+        self.checksum_worker = None
+        self.checksum_on_finished = None
+
+    def finish_checksums(self, status_text):
+        self.scan_progress_bar.setRange(0, 0)
+        self.scan_progress_bar.setVisible(False)
+        self.cancel_scan_button.setVisible(False)
+        self.scan_status_label.setText(status_text)
+        self.set_exports_enabled(self.snapshot is not None)
+        self.checksum_thread = None
+        self.checksum_worker = None
+        on_finished, self.checksum_on_finished = self.checksum_on_finished, None
+        return on_finished
+
+    def on_checksum_progress(self, done, total, bytes_read):
+        if self.sender() is not self.checksum_worker:
+            return
+        self.scan_progress_bar.setRange(0, total)
+        self.scan_progress_bar.setValue(done)
+        self.scan_status_label.setText(self.localization.tr(
+            "checksum_progress", done=done, total=total, size=naturalsize(bytes_read)
+        ))
+
+    def on_checksum_finished(self, view, checksums, unreadable):
+        if self.sender() is not self.checksum_worker:
+            return
+        on_finished = self.finish_checksums(self.localization.tr("checksum_complete", count=len(checksums)))
+        if unreadable:
+            QMessageBox.warning(
+                self,
+                self.localization.tr("checksum_unreadable_title"),
+                self.localization.tr(
+                    "checksum_unreadable_message", count=len(unreadable), paths="\n".join(unreadable[:20])
+                ),
+            )
+        on_finished(view, checksums)
+
+    def on_checksum_cancelled(self):
+        if self.sender() is not self.checksum_worker:
+            return
+        self.finish_checksums(self.localization.tr("checksum_cancelled"))
+
+    def on_checksum_failed(self, error):
+        if self.sender() is not self.checksum_worker:
+            return
+        self.finish_checksums("")
+        QMessageBox.critical(
+            self,
+            self.localization.tr("export_failed_title"),
+            self.localization.tr("export_failed_message", error=error),
+        )
+
+    def export_inventory(self):
+        """Save every visible entry as NDJSON, Parquet (when pyarrow is installed) or a NumPy archive."""
+        if not self.current_directory:
+            QMessageBox.warning(
+                self,
+                self.localization.tr("no_directory_title"),
+                self.localization.tr("no_directory_message")
+            )
+            return
+
+        filters = {self.localization.tr("inventory_ndjson_filter"): "ndjson"}
+        if have_pyarrow():
+            filters[self.localization.tr("inventory_parquet_filter")] = "parquet"
+        filters[self.localization.tr("inventory_npz_filter")] = "npz"
+        default_filename = self.localization.tr("save_inventory_default_filename")
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            self.localization.tr("save_inventory_dialog"),
+            os.path.join(self.current_directory, default_filename),
+            ";;".join(filters)
+        )
+
+        if file_path:
+            # A typed suffix wins over the selected filter; without one, the filter's suffix is added.
+            suffix = os.path.splitext(file_path)[1].lower()
+            output_format = next((name for name, known in OUTPUT_SUFFIXES.items() if known == suffix), None)
+            if output_format not in filters.values():
+                output_format = filters.get(selected_filter, "ndjson")
+                file_path += OUTPUT_SUFFIXES[output_format]
+            try:
+                write_inventory(self.filtered_view(), self.descriptions, output_format, file_path)
+                QMessageBox.information(
+                    self,
+                    self.localization.tr("export_success_title"),
+                    self.localization.tr("export_success_message", path=file_path)
+                )
+            except Exception as e:
+                QMessageBox.critical(
+                    self,
+                    self.localization.tr("export_failed_title"),
+                    self.localization.tr("export_failed_message", error=str(e))
+                )
+
+    # ------------------- Snapshot comparison --------------------
+    def save_scan_snapshot(self):
+        """Save the current scan, to compare a later version of the folder with it."""
+        if self.snapshot is None:
+            QMessageBox.warning(
+                self,
+                self.localization.tr("no_directory_title"),
+                self.localization.tr("no_directory_message")
+            )
+            return
+
+        default_filename = self.localization.tr("save_snapshot_default_filename")
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            self.localization.tr("save_snapshot_dialog"),
+            os.path.join(self.current_directory, default_filename),
+            self.localization.tr("snapshot_file_filter")
+        )
+        if file_path:
+            try:
+                save_snapshot(self.snapshot, file_path)
+                QMessageBox.information(
+                    self,
+                    self.localization.tr("export_success_title"),
+                    self.localization.tr("snapshot_saved_message", path=file_path)
+                )
+            except Exception as e:
+                QMessageBox.critical(
+                    self,
+                    self.localization.tr("export_failed_title"),
+                    self.localization.tr("export_failed_message", error=str(e))
+                )
+
+    def compare_with_snapshot(self):
+        """Mark the entries that changed since a saved snapshot, of this folder or of a copy of it."""
+        if self.snapshot is None:
+            QMessageBox.warning(
+                self,
+                self.localization.tr("no_directory_title"),
+                self.localization.tr("no_directory_message")
+            )
+            return
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            self.localization.tr("open_snapshot_dialog"),
+            self.current_directory,
+            self.localization.tr("snapshot_file_filter")
+        )
+        if file_path:
+            self.start_comparison(path=file_path)
+
+    def start_comparison(self, path=None, old_snapshot=None):
+        """Compare the current scan with the snapshot saved at path, or with old_snapshot, on a worker thread."""
+        self.stop_comparison()
+        self.compare_thread = QThread(self)
+        self.compare_worker = CompareWorker(self.snapshot, path, old_snapshot)
+        self.compare_worker.moveToThread(self.compare_thread)
+        self.compare_thread.started.connect(self.compare_worker.run)
+        self.compare_worker.finished.connect(self.on_compare_finished)
+        self.compare_worker.failed.connect(self.on_compare_failed)
+        for signal in (self.compare_worker.finished, self.compare_worker.cancelled, self.compare_worker.failed):
+            signal.connect(self.compare_thread.quit)
+        self.compare_thread.finished.connect(self.compare_worker.deleteLater)
+        self.compare_thread.finished.connect(self.compare_thread.deleteLater)
+        self.scan_status_label.setText(self.localization.tr("compare_started"))
+        self.compare_thread.start()
+
+    def stop_comparison(self):
+        """Cancel a running comparison and wait for its thread to exit; its result is dropped."""
+        if self.compare_worker is not None:
+            self.compare_worker.cancel()
+        if self.compare_thread is not None:
+            self.compare_thread.quit()
+            self.compare_thread.wait()
+        self.compare_thread = None
+        self.compare_worker = None
+
+    def on_compare_finished(self, old_snapshot, comparison):
+        if self.sender() is not self.compare_worker:
+            return
+        self.compare_thread = None
+        self.compare_worker = None
+        if self.model.snapshot is not self.snapshot or len(comparison.status) != len(self.snapshot):
+            # The tree was rescanned or refreshed meanwhile; that will start a new comparison.
+            return
+        self.comparison_snapshot = old_snapshot
+        self.comparison_root = self.snapshot.root
+        self.comparison = comparison
+        self.model.set_comparison(comparison.status)
+        self.export_changes_button.setEnabled(self.export_md_button.isEnabled())
+        self.scan_status_label.setText(self.localization.tr(
+            "compare_complete", date=scan_date(comparison.old_scanned_at_ns),
+            count=sum(counts[0] + counts[1] for counts in comparison.totals.counts.values()),
+        ))
+
+    def on_compare_failed(self, error):
+        if self.sender() is not self.compare_worker:
+            return
+        self.compare_thread = None
+        self.compare_worker = None
+        self.scan_status_label.setText("")
+        QMessageBox.critical(
+            self,
+            self.localization.tr("compare_failed_title"),
+            self.localization.tr("compare_failed_message", error=error),
+        )
+
+    def export_changes(self):
+        """Save the changes since the compared snapshot as Markdown or CSV, with the current filters."""
+        if self.snapshot is None or self.comparison_snapshot is None:
+            return
+
+        filters = {
+            self.localization.tr("changes_markdown_filter"): "markdown",
+            self.localization.tr("changes_csv_filter"): "csv",
+        }
+        default_filename = self.localization.tr("save_changes_default_filename")
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            self.localization.tr("save_changes_dialog"),
+            os.path.join(self.current_directory, default_filename),
+            ";;".join(filters)
+        )
+
+        if file_path:
+            suffix = os.path.splitext(file_path)[1].lower()
+            output_format = next((name for name, known in OUTPUT_SUFFIXES.items() if known == suffix), None)
+            if output_format not in filters.values():
+                output_format = filters.get(selected_filter, "markdown")
+                file_path += OUTPUT_SUFFIXES[output_format]
+            old_view = self.comparison_snapshot.filtered(
+                self.proxy_model.exclude_hidden, self.proxy_model.exclude_extensions
+            )
+            root_name = os.path.basename(self.current_directory) or self.current_directory
             try:
-                with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['Path', 'Type', 'Name', 'Size (Bytes)', 'Description'])
-                    self.generate_csv_content(writer)
+                with metrics.timed("export", format=output_format), \
+                        open(file_path, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+                    if output_format == "csv":
+                        writer = csv.writer(f)
+                        writer.writerow(DIFF_CSV_HEADER)
+                        writer.writerows(iter_diff_csv_rows(old_view, self.filtered_view()))
+                    else:
+                        write_lines(f, iter_diff_lines(old_view, self.filtered_view(), self.localization.tr, root_name))
                 QMessageBox.information(
                     self,
                     self.localization.tr("export_success_title"),
@@ -764,6 +2137,221 @@ class MainWindow(QMainWindow):
                     self.localization.tr("export_failed_message", error=str(e))
                 )
 
+    # ------------------- Batch export --------------------
+    def batch_export(self):
+        """Export every folder inside a chosen folder with the current filters, budget and language."""
+        parent = QFileDialog.getExistingDirectory(self, self.localization.tr("batch_parent_dialog"))
+        if not parent:
+            return
+        exclude_hidden = self.proxy_model.exclude_hidden
+        try:
+            roots = sorted(
+                os.path.join(parent, name) for name, is_dir, _, hidden, *_ in list_directory(parent)
+                if is_dir and not (exclude_hidden and hidden)
+            )
+        except OSError as e:
+            QMessageBox.critical(
+                self,
+                self.localization.tr("export_failed_title"),
+                self.localization.tr("export_failed_message", error=str(e)),
+            )
+            return
+        if not roots:
+            QMessageBox.warning(
+                self,
+                self.localization.tr("batch_format_title"),
+                self.localization.tr("batch_no_folders_message", path=parent),
+            )
+            return
+        formats = {
+            self.localization.tr("export_md_button"): "markdown",
+            self.localization.tr("export_txt_button"): "text",
+            self.localization.tr("export_csv_button"): "csv",
+            self.localization.tr("inventory_ndjson_filter"): "ndjson",
+            self.localization.tr("inventory_npz_filter"): "npz",
+            self.localization.tr("batch_format_manifest"): "manifest",
+        }
+        if have_pyarrow():
+            formats[self.localization.tr("inventory_parquet_filter")] = "parquet"
+        label, ok = QInputDialog.getItem(
+            self,
+            self.localization.tr("batch_format_title"),
+            self.localization.tr("batch_format_prompt", count=len(roots), path=parent),
+            list(formats), 0, False,
+        )
+        if not ok:
+            return
+        output_dir = QFileDialog.getExistingDirectory(self, self.localization.tr("batch_output_dialog"), parent)
+        if not output_dir:
+            return
+        self.start_batch(roots, output_dir, {
+            "format": formats[label],
+            "exclude_hidden": exclude_hidden,
+            "exclude_extensions": list(self.proxy_model.exclude_extensions),
+            "max_depth": self.render_depth_spinbox.value(),
+            "max_children": self.render_children_spinbox.value(),
+            "order": self.render_order_combo.currentData(),
+            "language": self.localization.language,
+            "jobs": self.scan_workers_spinbox.value(),
+            "use_cache": self.scan_cache_checkbox.isChecked(),
+            "allocated": self.allocated_size_checkbox.isChecked(),
+            "one_filesystem": self.one_filesystem_checkbox.isChecked(),
+            "archives": self.archives_checkbox.isChecked(),
+            "checksums": self.csv_checksums_checkbox.isChecked(),
+            "statistics": self.statistics_checkbox.isChecked(),
+        })
+
+    def start_batch(self, roots, output_dir, options):
+        self.stop_batch()
+        self.batch_output_dir = output_dir
+        self.batch_thread = QThread(self)
+        self.batch_worker = BatchWorker(roots, output_dir, options)
+        self.batch_worker.moveToThread(self.batch_thread)
+        self.batch_thread.started.connect(self.batch_worker.run)
+        self.batch_worker.progress.connect(self.on_batch_progress)
+        self.batch_worker.finished.connect(self.on_batch_finished)
+        self.batch_worker.failed.connect(self.on_batch_failed)
+        for signal in (self.batch_worker.finished, self.batch_worker.failed):
+            signal.connect(self.batch_thread.quit)
+        self.batch_thread.finished.connect(self.batch_worker.deleteLater)
+        self.batch_thread.finished.connect(self.batch_thread.deleteLater)
+
+        self.batch_export_button.setEnabled(False)
+        self.scan_status_label.setText(self.localization.tr(
+            "batch_progress", done=0, total=len(roots), folder=""
+        ))
+        self.batch_thread.start()
+
+    def stop_batch(self):
+        """Let the folders being exported finish, skip the others and wait for the thread."""
+        if self.batch_worker is not None:
+            self.batch_worker.cancel()
+        if self.batch_thread is not None:
+            self.batch_thread.quit()
+            self.batch_thread.wait()
+        self.batch_thread = None
+        self.batch_worker = None
+
+    def finish_batch(self):
+        self.batch_thread = None
+        self.batch_worker = None
+        self.batch_export_button.setEnabled(True)
+
+    def on_batch_progress(self, done, total, folder):
+        if self.sender() is not self.batch_worker:
+            return
+        self.scan_status_label.setText(self.localization.tr("batch_progress", done=done, total=total, folder=folder))
+
+    def on_batch_finished(self, results, index_path):
+        if self.sender() is not self.batch_worker:
+            return
+        self.finish_batch()
+        failures = [result for result in results if result["error"]]
+        message = self.localization.tr(
+            "batch_finished_message",
+            count=len(results) - len(failures),
+            total=len(results),
+            path=self.batch_output_dir,
+            index=index_path,
+        )
+        self.scan_status_label.setText(message.split("\n")[0])
+        if failures:
+            message += "\n\n" + self.localization.tr("batch_failures_heading") + "\n" + "\n".join(
+                f"{result['root']}: {result['error']}" for result in failures
+            )
+            QMessageBox.warning(self, self.localization.tr("batch_finished_title"), message)
+        else:
+            QMessageBox.information(self, self.localization.tr("batch_finished_title"), message)
+
+    def on_batch_failed(self, error):
+        if self.sender() is not self.batch_worker:
+            return
+        self.finish_batch()
+        self.scan_status_label.setText("")
+        QMessageBox.critical(
+            self,
+            self.localization.tr("export_failed_title"),
+            self.localization.tr("export_failed_message", error=error),
+        )
+
+    # ------------------- Diagnostics --------------------
+    def saved_record_trace(self):
+        return self.saved_flag("record_trace", False)
+
+    def on_record_trace_toggled(self, checked):
+        self.settings.setValue("record_trace", checked)
+        metrics.tracing = checked
+
+    def diagnostics_text(self):
+        summary = metrics.summary()
+        if not summary["phases"] and not summary["counters"]:
+            return self.localization.tr("diagnostics_empty")
+        return '\n'.join(format_summary(
+            summary,
+            self.localization.tr("diagnostics_phases_heading"),
+            self.localization.tr("diagnostics_counters_heading"),
+        ))
+
+    def show_diagnostics(self):
+        dialog = QDialog(self)
+        dialog.setWindowTitle(self.localization.tr("diagnostics_title"))
+        dialog.resize(640, 480)
+        layout = QVBoxLayout(dialog)
+
+        summary_view = QPlainTextEdit()
+        summary_view.setReadOnly(True)
+        summary_view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        summary_view.setPlainText(self.diagnostics_text())
+        layout.addWidget(summary_view)
+
+        trace_checkbox = QCheckBox(self.localization.tr("diagnostics_trace_checkbox"))
+        trace_checkbox.setToolTip(self.localization.tr("diagnostics_trace_tooltip"))
+        trace_checkbox.setChecked(metrics.tracing)
+        trace_checkbox.toggled.connect(self.on_record_trace_toggled)
+        layout.addWidget(trace_checkbox)
+
+        def reset():
+            metrics.reset()
+            summary_view.setPlainText(self.diagnostics_text())
+
+        buttons_layout = QHBoxLayout()
+        save_button = QPushButton(self.localization.tr("diagnostics_save_trace"))
+        save_button.clicked.connect(lambda: self.save_trace(dialog))
+        reset_button = QPushButton(self.localization.tr("diagnostics_reset"))
+        reset_button.clicked.connect(reset)
+        close_button = QPushButton(self.localization.tr("diagnostics_close"))
+        close_button.clicked.connect(dialog.accept)
+        buttons_layout.addWidget(save_button)
+        buttons_layout.addWidget(reset_button)
+        buttons_layout.addStretch(1)
+        buttons_layout.addWidget(close_button)
+        layout.addLayout(buttons_layout)
+        dialog.exec_()
+
+    def save_trace(self, parent=None):
+        start_directory = self.current_directory or os.path.expanduser("~")
+        file_path, _ = QFileDialog.getSaveFileName(
+            parent or self,
+            self.localization.tr("diagnostics_save_dialog"),
+            os.path.join(start_directory, self.localization.tr("diagnostics_default_filename")),
+            self.localization.tr("json_file_filter"),
+        )
+        if not file_path:
+            return
+        try:
+            metrics.write_trace(file_path)
+            QMessageBox.information(
+                parent or self,
+                self.localization.tr("export_success_title"),
+                self.localization.tr("export_success_message", path=file_path),
+            )
+        except Exception as e:
+            QMessageBox.critical(
+                parent or self,
+                self.localization.tr("export_failed_title"),
+                self.localization.tr("export_failed_message", error=str(e)),
+            )
+
     # ------------------- About / Info --------------------
     def show_about_info(self):
         about_text = self.localization.tr("about_dialog_body")
@@ -775,10 +2363,11 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    # Batch exports run in spawned processes, which start the frozen executable again.
+    import multiprocessing
+
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
     sys.exit(app.exec_())
-
-
-
@@ -0,0 +1,81 @@
+"""
+Measure how long the scan cache takes to save and load, and how a rescan compares with a full scan.
+
+The save/load part uses in-memory synthetic snapshots, so very large sizes need no files on disk.
+The rescan part builds a synthetic tree, touches ``--changed`` directories and compares a full
+scan with a rescan against the cached snapshot.
+
+    python benchmarks/bench_scan_cache.py --sizes 100000,1000000,5000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_snapshot_memory import load_compact  # noqa: E402
+from treegen.scan_cache import load_snapshot, save_snapshot  # noqa: E402
+from treegen.scanner import scan_directory  # noqa: E402
+from synthetic import build_synthetic_tree  # noqa: E402
+
+
+def _timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def bench_file(sizes, scratch):
+    print(f"{'entries':>10} {'file MB':>9} {'save s':>8} {'load s':>8}")
+    for total in sizes:
+        snapshot = load_compact(total)
+        path = os.path.join(scratch, f"{total}.snapshot")
+        _, save_time = _timed(save_snapshot, snapshot, path)
+        del snapshot
+        _, load_time = _timed(load_snapshot, path)
+        print(f"{total:>10} {os.path.getsize(path) / 1e6:>9.1f} {save_time:>8.3f} {load_time:>8.3f}")
+        os.remove(path)
+
+
+def bench_rescan(scratch, depth, fanout, files_per_dir, changed):
+    root = os.path.join(scratch, "tree")
+    os.mkdir(root)
+    entries = build_synthetic_tree(root, depth, fanout, files_per_dir)
+    directories = [path for path, _, _ in os.walk(root)]
+    past = time.time_ns() - 3600 * 1_000_000_000
+    for path in directories:
+        os.utime(path, ns=(past, past))
+
+    previous, full_time = _timed(scan_directory, root)
+    for index, path in enumerate(random.Random(0).sample(directories, min(changed, len(directories)))):
+        with open(os.path.join(path, f"added_{index}.dat"), "wb") as handle:
+            handle.write(b"x")
+        os.utime(path, ns=(past + 1, past + 1))
+    _, rescan_time = _timed(scan_directory, root, previous=previous)
+    print(f"\n{entries} entries in {len(directories)} directories, {changed} changed")
+    print(f"full scan {full_time:.3f} s, rescan {rescan_time:.3f} s ({full_time / rescan_time:.1f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000", help="Comma-separated snapshot sizes to save and load")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=5)
+    parser.add_argument("--files-per-dir", type=int, default=30)
+    parser.add_argument("--changed", type=int, default=10, help="Directories modified before the rescan")
+    args = parser.parse_args(argv)
+
+    sizes = [int(value) for value in args.sizes.split(",") if value.strip()]
+    with tempfile.TemporaryDirectory(prefix="treegen-bench-") as scratch:
+        bench_file(sizes, scratch)
+        bench_rescan(scratch, args.depth, args.fanout, args.files_per_dir, args.changed)
+
+
+if __name__ == "__main__":
+    main()
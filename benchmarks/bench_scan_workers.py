@@ -0,0 +1,79 @@
+"""
+Measure how scan_directory() scales with the number of worker threads.
+
+Local disks answer metadata calls in microseconds, so the benefit of concurrent listing mostly
+shows on network or parallel filesystems. Point ``--path`` at such a mount, or use
+``--latency-ms`` to add a simulated round trip to every directory listing of a synthetic tree.
+
+    python benchmarks/bench_scan_workers.py --latency-ms 2 --workers 1,2,4,8,16,32
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from treegen import scanner  # noqa: E402
+from synthetic import build_synthetic_tree  # noqa: E402
+
+
+def _with_latency(list_directory, latency):
+    def delayed(path, *args):
+        time.sleep(latency)
+        return list_directory(path, *args)
+    return delayed
+
+
+def run(path, worker_counts, repeat):
+    baseline = None
+    results = []
+    for workers in worker_counts:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            snapshot = scanner.scan_directory(path, workers=workers)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        if baseline is None:
+            baseline = snapshot
+        elif (snapshot.name_buffer, snapshot.parents, snapshot.sizes) != (baseline.name_buffer, baseline.parents, baseline.sizes):
+            raise SystemExit(f"Scan with {workers} workers differs from the sequential scan")
+        results.append((workers, best, len(snapshot)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", help="Existing directory to scan (default: a synthetic tree)")
+    parser.add_argument("--workers", default="1,2,4,8,16", help="Comma-separated worker counts")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated latency per directory listing")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per worker count; the best time is kept")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--files-per-dir", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    worker_counts = [int(value) for value in args.workers.split(",") if value.strip()]
+    if args.latency_ms > 0:
+        scanner.list_directory = _with_latency(scanner.list_directory, args.latency_ms / 1000.0)
+
+    with tempfile.TemporaryDirectory(prefix="treegen-bench-") as scratch:
+        path = args.path
+        if path is None:
+            path = scratch
+            build_synthetic_tree(path, args.depth, args.fanout, args.files_per_dir)
+        results = run(path, worker_counts, args.repeat)
+
+    sequential_time = results[0][1]
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8} {'entries':>10}")
+    for workers, elapsed, entries in results:
+        print(f"{workers:>8} {elapsed:>10.3f} {sequential_time / elapsed:>7.2f}x {entries:>10}")
+
+
+if __name__ == "__main__":
+    main()
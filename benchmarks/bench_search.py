@@ -0,0 +1,80 @@
+"""
+Time the search bar index on a synthetic snapshot of millions of entries.
+
+The snapshot is generated in memory as in bench_snapshot_memory.py. The NameIndex is built
+once, as the scan worker does, then each query is answered the way a keystroke is: a new
+search decides, for every row of a tree expanded two levels deep, whether the row or anything
+below it matches. The slowest query is compared with the interactive budget.
+
+    python benchmarks/bench_search.py --entries 2000000
+    python benchmarks/bench_search.py --entries 1000000 --query "*_0004*" --query dir_
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_snapshot_memory import load_compact  # noqa: E402
+from treegen.search import compile_wildcard  # noqa: E402
+
+BUDGET_MS = 50
+DEFAULT_QUERIES = ("file_00123456", "*_0012*", "dir_000?0", "f[a-i]le_0000001", "?ile", "_", "no-such-name")
+
+
+def visible_rows(snapshot, levels=2):
+    """Rows of a tree whose folders are expanded ``levels`` deep."""
+    rows = []
+    parents = [0]
+    for _ in range(levels):
+        children = [child for parent in parents for child in snapshot.children(parent)]
+        rows.extend(children)
+        parents = [child for child in children if snapshot.is_dir(child)]
+    return rows
+
+
+def keystroke(index, query, rows):
+    search = index.search(compile_wildcard(query))
+    return sum(map(search.accepts, rows))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=2_000_000)
+    parser.add_argument("--query", action="append", help="Query to time (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the fastest one is kept")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    snapshot = load_compact(args.entries)
+    print(f"generated {len(snapshot) - 1:,} entries in {time.perf_counter() - started:.1f} s")
+    started = time.perf_counter()
+    index = snapshot.name_index()
+    print(f"name index built in {time.perf_counter() - started:.2f} s ({len(index.text) / 1e6:.1f} M characters)\n")
+
+    rows = visible_rows(snapshot)
+    slowest = 0.0
+    print(f"{len(rows):,} visible rows\n")
+    print(f"{'query':<20} {'accepted rows':>14} {'ms':>8}")
+    for query in args.query or DEFAULT_QUERIES:
+        runs = []
+        for _ in range(max(1, args.repeat)):
+            started = time.perf_counter()
+            accepted = keystroke(index, query, rows)
+            runs.append((time.perf_counter() - started) * 1000)
+        print(f"{query:<20} {accepted:>14,} {min(runs):>8.1f}")
+        slowest = max(slowest, min(runs))
+    if slowest > args.budget_ms:
+        print(f"\nslowest query took {slowest:.1f} ms, over the {args.budget_ms:g} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Compare the memory footprint of the compact ScanSnapshot with the per-entry representations
+it replaced.
+
+Each measurement runs in a fresh subprocess and reports the growth of its peak resident set
+size while a synthetic tree of the requested size is loaded. No files are created; entries are
+generated in memory with a fixed fan-out.
+
+    python benchmarks/bench_snapshot_memory.py --sizes 100000,1000000,5000000
+    python benchmarks/bench_snapshot_memory.py --sizes 100000,1000000 --models compact,records,qt
+
+Models:
+    compact  ScanSnapshot (array columns, shared name buffer, paths rebuilt on demand)
+    records  one Python list per attribute, absolute path strings stored per entry
+    qt       the former QStandardItemModel population: three QStandardItem objects per entry
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DIRS_PER_DIR = 8
+FILES_PER_DIR = 40
+SYNTHETIC_ROOT = os.path.join(os.sep, "data", "project")
+
+
+def synthetic_listings(total):
+    """Yield (parent_id, parent_path, first_id, entries) in scan order until ``total`` entries exist."""
+    created = 0
+    next_id = 1
+    pending = [(0, SYNTHETIC_ROOT)]
+    while pending and created < total:
+        parent, parent_path = pending.pop(0)
+        entries = []
+        for index in range(FILES_PER_DIR):
+            entries.append((f"file_{created + index:08d}.dat", False, 4096, False, 0, 0, 0, 1))
+        for index in range(DIRS_PER_DIR):
+            entries.append((f"dir_{created + FILES_PER_DIR + index:08d}", True, 0, False, 0, 0, 0, 1))
+        entries = entries[:total - created]
+        for offset, entry in enumerate(entries):
+            if entry[1]:
+                pending.append((next_id + offset, os.path.join(parent_path, entry[0])))
+        yield parent, parent_path, next_id, entries
+        next_id += len(entries)
+        created += len(entries)
+
+
+def load_compact(total):
+    from treegen.scanner import ScanSnapshot
+    snapshot = ScanSnapshot(SYNTHETIC_ROOT)
+    for parent, _, _, entries in synthetic_listings(total):
+        snapshot.add_children(parent, entries)
+    snapshot.aggregate_sizes()
+    return snapshot
+
+
+def load_records(total):
+    columns = {key: [] for key in ("names", "paths", "parents", "is_dir", "hidden", "extensions", "sizes")}
+    for parent, parent_path, _, entries in synthetic_listings(total):
+        for name, is_dir, size, hidden, *_ in entries:
+            columns["names"].append(name)
+            columns["paths"].append(os.path.join(parent_path, name))
+            columns["parents"].append(parent)
+            columns["is_dir"].append(is_dir)
+            columns["hidden"].append(hidden)
+            columns["extensions"].append("" if is_dir else os.path.splitext(name)[1].lower())
+            columns["sizes"].append(size)
+    return columns
+
+
+def load_qt(total):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QStandardItem, QStandardItemModel
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    model = QStandardItemModel()
+    items = {0: model.invisibleRootItem()}
+    for parent, parent_path, first, entries in synthetic_listings(total):
+        parent_item = items.pop(parent)
+        for offset, (name, is_dir, size, *_) in enumerate(entries):
+            item = QStandardItem(name)
+            size_item = QStandardItem(str(size))
+            desc_item = QStandardItem("")
+            item_path = os.path.join(parent_path, name)
+            item.setData(item_path, Qt.UserRole)
+            size_item.setData(size, Qt.UserRole)
+            desc_item.setData("", Qt.UserRole)
+            parent_item.appendRow([item, size_item, desc_item])
+            if is_dir:
+                items[first + offset] = item
+    return app, model
+
+
+LOADERS = {"compact": load_compact, "records": load_records, "qt": load_qt}
+
+
+def _peak_rss_bytes():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure_child(model, total):
+    baseline = _peak_rss_bytes()
+    loaded = LOADERS[model](total)
+    grown = _peak_rss_bytes() - baseline
+    print(grown)
+    del loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000,5000000", help="Comma-separated entry counts")
+    parser.add_argument("--models", default="compact,records", help="Comma-separated models (compact, records, qt)")
+    parser.add_argument("--child", nargs=2, metavar=("MODEL", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        measure_child(args.child[0], int(args.child[1]))
+        return
+
+    sizes = [int(value) for value in args.sizes.split(",") if value.strip()]
+    models = [value.strip() for value in args.models.split(",") if value.strip()]
+    print(f"{'model':>8} {'entries':>10} {'peak MB':>10} {'bytes/entry':>12}")
+    for total in sizes:
+        for model in models:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", model, str(total)],
+                check=True, capture_output=True, text=True,
+            ).stdout.split()
+            grown = int(output[-1])
+            print(f"{model:>8} {total:>10} {grown / 1e6:>10.1f} {grown / total:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
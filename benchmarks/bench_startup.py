@@ -0,0 +1,85 @@
+"""
+Measure how long TreeGen's entry modules take to import, using ``python -X importtime``.
+
+Each module is imported ``--repeat`` times in a fresh interpreter and the fastest cumulative
+import time is compared with its budget. The script exits with status 1 when a module goes over
+budget or when a headless module loads Qt, so it can run as a regression check in CI.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget treegen.cli=50 --budget TreeGen=200
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budgets in milliseconds. The headless modules must stay well below the
+# cost of PyQt5 alone, so any accidental Qt import shows up as a regression.
+DEFAULT_BUDGETS_MS = {
+    "treegen.cli": 75.0,
+    "treegen.rendering": 50.0,
+    "TreeGen": 250.0,
+}
+HEADLESS_MODULES = ("treegen.cli", "treegen.rendering")
+# Modules the headless entry points only import when a feature needs them.
+DEFERRED_MODULES = ("PyQt5", "humanize", "watchdog", "concurrent")
+
+
+def measure(module):
+    """Return ``(cumulative_ms, loaded_top_level_modules)`` for one cold import of ``module``."""
+    program = f"import sys, {module}; print(' '.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", program],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative = None
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            cumulative = int(fields[1]) / 1000.0
+    if cumulative is None:
+        raise RuntimeError(f"no import time reported for {module}")
+    return cumulative, set(result.stdout.split())
+
+
+def parse_budget(text):
+    module, _, value = text.partition("=")
+    if not module or not value:
+        raise argparse.ArgumentTypeError("expected MODULE=MILLISECONDS")
+    return module, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Cold imports per module; the fastest one counts")
+    parser.add_argument(
+        "--budget", type=parse_budget, action="append", default=[], metavar="MODULE=MS",
+        help="Override or add the import budget of a module",
+    )
+    args = parser.parse_args(argv)
+
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    budgets.update(args.budget)
+    failures = []
+    print(f"{'module':<20} {'import ms':>10} {'budget ms':>10}  deferred modules loaded")
+    for module, budget in budgets.items():
+        runs = [measure(module) for _ in range(max(1, args.repeat))]
+        best = min(elapsed for elapsed, _ in runs)
+        loaded = sorted(set(DEFERRED_MODULES) & runs[0][1]) if module in HEADLESS_MODULES else []
+        print(f"{module:<20} {best:>10.1f} {budget:>10.1f}  {', '.join(loaded) or '-'}")
+        if best > budget:
+            failures.append(f"{module} imports in {best:.1f} ms, over its {budget:.1f} ms budget")
+        if loaded:
+            failures.append(f"{module} loads {', '.join(loaded)} at import time")
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
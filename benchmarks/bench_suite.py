@@ -0,0 +1,232 @@
+"""
+End-to-end TreeGen benchmark on a synthetic tree, with JSON results that can be compared.
+
+A tree with the requested depth, fan-out, files per directory, hidden ratio and extension mix
+is built in a temporary directory. Each phase is run ``--repeat`` times and the fastest run is
+kept:
+
+    scan              scan_directory() with --workers threads
+    filter_aggregates the per-directory totals used for instant filter changes
+    populate_tree     MainWindow.populate_tree() (the lazy model over the snapshot)
+    fetch_all_rows    creating the rows of every directory, as a fully expanded tree would
+    markdown          MainWindow.generate_markdown_content() with an empty render cache
+    csv               MainWindow.generate_csv_content() into a discarding writer
+    filter_change     FileFilterProxyModel.setExcludeExtensions() and setExcludeHidden()
+                      over the fully fetched model, then the preview regeneration
+    search            typing --search one character at a time into the search bar filter
+                      over the fully fetched model, then clearing it
+
+The peak resident set size of the process is recorded after each phase. The Qt phases are
+skipped when PyQt5 is not installed or with --no-gui.
+
+    python benchmarks/bench_suite.py --depth 4 --fanout 6 --files-per-dir 30 -o results.json
+    python benchmarks/bench_suite.py -o new.json --compare results.json --tolerance 1.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import build_synthetic_tree, parse_extension_mix  # noqa: E402
+from treegen.scanner import FilterAggregates, scan_directory  # noqa: E402
+
+RESULTS_VERSION = 1
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, or None where ``resource`` is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return round(peak / (1 << 20) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+class _Discard:
+    def write(self, text):
+        return len(text)
+
+
+class Suite:
+    def __init__(self, repeat):
+        self.repeat = max(1, repeat)
+        self.phases = {}
+
+    def time(self, name, function, setup=None):
+        """Run ``function`` ``repeat`` times, calling ``setup`` untimed before each run."""
+        runs = []
+        result = None
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            result = function()
+            runs.append(time.perf_counter() - started)
+        self.phases[name] = {
+            "seconds": min(runs),
+            "runs": [round(run, 6) for run in runs],
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        print(f"{name:<18} {min(runs):>10.4f} s  peak RSS {self.phases[name]['peak_rss_mb']} MB")
+        return result
+
+
+def run_core(suite, root, workers):
+    snapshot = suite.time("scan", lambda: scan_directory(root, workers=workers))
+    suite.time("filter_aggregates", lambda: FilterAggregates(snapshot))
+    snapshot.filter_aggregates()
+    return snapshot
+
+
+def _fetch_all(model, parent):
+    while model.canFetchMore(parent):
+        model.fetchMore(parent)
+    for row in range(model.rowCount(parent)):
+        index = model.index(row, 0, parent)
+        if model.hasChildren(index):
+            _fetch_all(model, index)
+
+
+def run_gui(suite, root, snapshot, exclude_extensions, search):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import QModelIndex
+    from PyQt5.QtWidgets import QApplication
+
+    from TreeGen import MainWindow
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    window = MainWindow()
+    window.current_directory = root
+    window.snapshot = snapshot
+    window.proxy_model.setExcludeExtensions("")
+    window.proxy_model.setExcludeHidden(False)
+
+    suite.time("populate_tree", window.populate_tree)
+    suite.time("fetch_all_rows", lambda: _fetch_all(window.model, QModelIndex()), setup=window.populate_tree)
+    suite.time("markdown", window.generate_markdown_content, setup=window.renderer.reset)
+    suite.time("csv", lambda: window.generate_csv_content(csv.writer(_Discard())))
+
+    def reset_filters():
+        window.proxy_model.setExcludeExtensions("")
+        window.proxy_model.setExcludeHidden(False)
+        window.renderer.reset()
+
+    def change_filters():
+        window.proxy_model.setExcludeExtensions(exclude_extensions)
+        window.proxy_model.setExcludeHidden(True)
+        window.update_markdown_preview()
+
+    suite.time("filter_change", change_filters, setup=reset_filters)
+
+    def type_search():
+        for end in range(1, len(search) + 1):
+            window.proxy_model.setSearchText(search[:end])
+        window.proxy_model.setSearchText("")
+
+    suite.time("search", type_search, setup=reset_filters)
+    window.close()
+
+
+def compare(results, baseline, tolerance):
+    """Print the ratio of each phase to ``baseline`` and return the phases slower than ``tolerance``."""
+    regressions = []
+    print(f"\n{'phase':<18} {'baseline s':>11} {'current s':>11} {'ratio':>7}")
+    for name, phase in results["phases"].items():
+        previous = baseline.get("phases", {}).get(name)
+        if not previous or not previous["seconds"]:
+            continue
+        ratio = phase["seconds"] / previous["seconds"]
+        flag = "  REGRESSION" if ratio > tolerance else ""
+        print(f"{name:<18} {previous['seconds']:>11.4f} {phase['seconds']:>11.4f} {ratio:>7.2f}{flag}")
+        if ratio > tolerance:
+            regressions.append(name)
+    if baseline.get("parameters") != results["parameters"]:
+        print("warning: the baseline was measured with different parameters")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--files-per-dir", type=int, default=30)
+    parser.add_argument("--file-size", type=int, default=64)
+    parser.add_argument("--hidden-ratio", type=float, default=0.05)
+    parser.add_argument(
+        "--extensions", default=".csv:4,.txt:3,.log:2,.tif:1", help="Extension mix as EXT[:WEIGHT],..."
+    )
+    parser.add_argument("--exclude", default=".log,.tmp", help="Extensions excluded by the filter_change phase")
+    parser.add_argument("--search", default="file_001", help="Text typed by the search phase")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="Scan threads")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per phase; the fastest one is kept")
+    parser.add_argument("--no-gui", action="store_true", help="Skip the phases that need PyQt5")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of an earlier run to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=1.25, help="Slowdown ratio over the baseline reported as a regression"
+    )
+    args = parser.parse_args(argv)
+
+    parameters = {
+        "depth": args.depth, "fanout": args.fanout, "files_per_dir": args.files_per_dir,
+        "file_size": args.file_size, "hidden_ratio": args.hidden_ratio, "extensions": args.extensions,
+        "exclude": args.exclude, "search": args.search, "seed": args.seed, "workers": args.workers,
+    }
+    suite = Suite(args.repeat)
+    with tempfile.TemporaryDirectory(prefix="treegen-bench-") as scratch:
+        root = os.path.join(scratch, "tree")
+        os.mkdir(root)
+        started = time.perf_counter()
+        entries = build_synthetic_tree(
+            root, args.depth, args.fanout, args.files_per_dir, args.file_size,
+            args.hidden_ratio, parse_extension_mix(args.extensions), args.seed,
+        )
+        print(f"built {entries} entries in {time.perf_counter() - started:.1f} s\n")
+        snapshot = run_core(suite, root, args.workers)
+        gui = not args.no_gui
+        if gui:
+            try:
+                import PyQt5  # noqa: F401
+            except ImportError:
+                print("PyQt5 is not installed; skipping the GUI phases")
+                gui = False
+        if gui:
+            run_gui(suite, root, snapshot, args.exclude, args.search)
+
+    results = {
+        "version": RESULTS_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "entries": entries,
+        "phases": suite.phases,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} phase(s) slower than {args.tolerance}x the baseline")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Synthetic directory trees for TreeGen benchmarks."""
+
+from __future__ import annotations
+
+import os
+import random
+from typing import Mapping, Sequence, Union
+
+Extensions = Union[Sequence[str], Mapping[str, float]]
+
+
+def parse_extension_mix(text: str) -> dict:
+    """Parse ``".csv:5,.log:2,.txt"`` into ``{".csv": 5.0, ".log": 2.0, ".txt": 1.0}``."""
+    mix = {}
+    for item in text.split(","):
+        extension, _, weight = item.strip().partition(":")
+        if extension:
+            mix[extension] = float(weight) if weight else 1.0
+    return mix
+
+
+def build_synthetic_tree(
+    root,
+    depth: int = 3,
+    fanout: int = 4,
+    files_per_dir: int = 10,
+    file_size: int = 64,
+    hidden_ratio: float = 0.0,
+    extensions: Extensions = (".dat",),
+    seed: int = 0,
+) -> int:
+    """
+    Create a tree of ``fanout`` sub-directories per level, ``depth`` levels deep, with
+    ``files_per_dir`` files of ``file_size`` bytes in every directory. Returns the entry count.
+
+    About ``hidden_ratio`` of the files and directories get a leading dot. File extensions are
+    drawn from ``extensions``, a sequence or a mapping of extension to weight. The same ``seed``
+    always produces the same tree.
+    """
+    rng = random.Random(seed)
+    if isinstance(extensions, Mapping):
+        choices, weights = list(extensions), list(extensions.values())
+    else:
+        choices, weights = list(extensions), None
+    payload = b"x" * file_size
+    created = 0
+    level = [os.fspath(root)]
+    for current_depth in range(depth + 1):
+        next_level = []
+        for directory in level:
+            for index in range(files_per_dir):
+                extension = choices[0] if len(choices) == 1 else rng.choices(choices, weights)[0]
+                name = f"file_{index:04d}{extension}"
+                if hidden_ratio and rng.random() < hidden_ratio:
+                    name = "." + name
+                with open(os.path.join(directory, name), "wb") as handle:
+                    handle.write(payload)
+                created += 1
+            if current_depth == depth:
+                continue
+            for index in range(fanout):
+                name = f"dir_{index:03d}"
+                if hidden_ratio and rng.random() < hidden_ratio:
+                    name = "." + name
+                child = os.path.join(directory, name)
+                os.mkdir(child)
+                next_level.append(child)
+                created += 1
+        level = next_level
+    return created
@@ -0,0 +1,188 @@
+import io
+import os
+import tarfile
+import time
+import zipfile
+
+from treegen import archives
+from treegen.cli import main
+from treegen.instrumentation import metrics
+from treegen.localization import Localization
+from treegen.rendering import iter_csv_rows, iter_markdown_lines
+from treegen.scan_cache import load_snapshot, save_snapshot
+from treegen.scanner import ROOT_NODE, scan_directory
+from treegen.statistics import collect_statistics
+
+# Old enough that a rescan trusts the listings of untouched folders and archives.
+PAST_NS = time.time_ns() - 3600 * 1_000_000_000
+
+
+def _make_tree(root):
+    with zipfile.ZipFile(root / "bundle.zip", "w", zipfile.ZIP_DEFLATED) as bundle:
+        bundle.writestr("docs/guide/intro.txt", "x" * 400)
+        bundle.writestr("docs/notes.md", "x" * 30)
+        bundle.writestr("empty/", "")
+        bundle.writestr("README", "x" * 5)
+    with tarfile.open(root / "data.tar.gz", "w:gz") as data:
+        for name, content in (
+            ("raw/a.bin", b"1" * 1000), ("raw/b.txt", b"22"), ("./top.txt", b"333"), ("../outside.txt", b"4"),
+        ):
+            member = tarfile.TarInfo(name)
+            member.size = len(content)
+            data.addfile(member, io.BytesIO(content))
+        link = tarfile.TarInfo("raw/link")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "a.bin"
+        data.addfile(link)
+    (root / "plain.txt").write_bytes(b"hello")
+    for name in ("bundle.zip", "data.tar.gz", "plain.txt", "."):
+        os.utime(root / name, ns=(PAST_NS, PAST_NS))
+
+
+def _members(snapshot, node):
+    return {
+        snapshot.relative_path(member): snapshot.sizes[member]
+        for member in range(snapshot.member_start, len(snapshot))
+        if snapshot.relative_path(member).startswith(snapshot.name(node) + os.sep)
+    }
+
+
+def _find(snapshot, relative_path):
+    return next(node for node in range(len(snapshot)) if snapshot.relative_path(node) == relative_path)
+
+
+def test_zip_members_are_listed_below_the_archive(tmp_path):
+    _make_tree(tmp_path)
+
+    snapshot = scan_directory(str(tmp_path), archives=True)
+
+    bundle = _find(snapshot, "bundle.zip")
+    assert snapshot.is_archive(bundle) and not snapshot.is_member(bundle)
+    assert [snapshot.name(child) for child in snapshot.children(bundle)] == ["docs", "empty", "README"]
+    assert _members(snapshot, bundle) == {
+        os.path.join("bundle.zip", "docs"): 430,
+        os.path.join("bundle.zip", "docs", "guide"): 400,
+        os.path.join("bundle.zip", "docs", "guide", "intro.txt"): 400,
+        os.path.join("bundle.zip", "docs", "notes.md"): 30,
+        os.path.join("bundle.zip", "empty"): 0,
+        os.path.join("bundle.zip", "README"): 5,
+    }
+    # Uncompressed sizes stay inside the archive; folder totals only count what is on disk.
+    assert snapshot.sizes[ROOT_NODE] == scan_directory(str(tmp_path)).sizes[ROOT_NODE]
+
+
+def test_tar_members_are_read_from_their_headers(tmp_path):
+    _make_tree(tmp_path)
+
+    snapshot = scan_directory(str(tmp_path), archives=True)
+
+    assert _members(snapshot, _find(snapshot, "data.tar.gz")) == {
+        os.path.join("data.tar.gz", "raw"): 1002,
+        os.path.join("data.tar.gz", "raw", "a.bin"): 1000,
+        os.path.join("data.tar.gz", "raw", "b.txt"): 2,
+        os.path.join("data.tar.gz", "raw", "link"): 0,
+        os.path.join("data.tar.gz", "top.txt"): 3,
+    }
+
+
+def test_zip64_directories_and_sizes_are_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(zipfile, "ZIP_FILECOUNT_LIMIT", 1)
+    monkeypatch.setattr(zipfile, "ZIP64_LIMIT", 4)
+    with zipfile.ZipFile(tmp_path / "large.zip", "w") as large:
+        large.writestr("a.txt", "x" * 10)
+        large.writestr("b.txt", "xy")
+
+    members = list(archives.iter_zip_members(str(tmp_path / "large.zip")))
+
+    assert [(name, is_dir, size) for name, is_dir, size, _ in members] == [("a.txt", False, 10), ("b.txt", False, 2)]
+
+
+def test_filters_apply_inside_archives(tmp_path):
+    _make_tree(tmp_path)
+    snapshot = scan_directory(str(tmp_path), archives=True)
+    docs = _find(snapshot, os.path.join("bundle.zip", "docs"))
+
+    exact = snapshot.filtered(False, [".txt"])
+    wildcard = snapshot.filtered(False, ["txt"])
+
+    assert exact.excluded is None and wildcard.excluded is not None
+    assert exact.sizes[docs] == wildcard.sizes[docs] == 30
+    assert exact.sizes[ROOT_NODE] == wildcard.sizes[ROOT_NODE] == snapshot.sizes[ROOT_NODE] - 5
+
+
+def test_exports_list_members_but_count_the_archive(tmp_path):
+    _make_tree(tmp_path)
+    view = scan_directory(str(tmp_path), archives=True).filtered(False, [".md"])
+    tr = Localization("en").tr
+
+    lines = list(iter_markdown_lines(view, {}, tr, "root", statistics=True))
+    rows = list(iter_csv_rows(view, {}))
+
+    plain = scan_directory(str(tmp_path)).filtered(False, [".md"])
+    expected = list(iter_markdown_lines(plain, {}, tr, "root", statistics=True))
+    assert lines[-(len(expected) - 4):] == expected[4:]
+    assert "|   |-- **docs** [ 400 Bytes ]" in lines
+    assert "|   |   \\-- **guide** [ 400 Bytes ]" in lines
+    assert [row[0] for row in rows][:6] == [
+        "bundle.zip", os.path.join("bundle.zip", "docs"), os.path.join("bundle.zip", "docs", "guide"),
+        os.path.join("bundle.zip", "docs", "guide", "intro.txt"), os.path.join("bundle.zip", "empty"),
+        os.path.join("bundle.zip", "README"),
+    ]
+    assert collect_statistics(view).files == 3
+
+
+def test_unchanged_archives_are_not_read_again(tmp_path):
+    _make_tree(tmp_path)
+    first = scan_directory(str(tmp_path), archives=True)
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "a") as bundle:
+        bundle.writestr("added.txt", "new")
+    os.utime(tmp_path, ns=(PAST_NS, PAST_NS + 1))
+    metrics.reset()
+
+    second = scan_directory(str(tmp_path), previous=first, archives=True)
+
+    counters = metrics.summary()["counters"]
+    assert (counters["archives_listed"], counters["archives_reused"]) == (1, 1)
+    assert _members(second, _find(second, "data.tar.gz")) == _members(first, _find(first, "data.tar.gz"))
+    assert os.path.join("bundle.zip", "added.txt") in _members(second, _find(second, "bundle.zip"))
+    metrics.reset()
+
+
+def test_unreadable_and_oversized_archives_stay_files(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    (tmp_path / "broken.zip").write_bytes(b"not a zip")
+    # Both archives have four members that can be placed in the tree.
+    monkeypatch.setattr(archives, "MAX_ARCHIVE_MEMBERS", 3)
+    metrics.reset()
+
+    snapshot = scan_directory(str(tmp_path), archives=True)
+
+    assert snapshot.member_start == len(snapshot)
+    assert not any(snapshot.is_archive(node) for node in range(len(snapshot)))
+    assert metrics.summary()["counters"]["archive_errors"] == 3
+    metrics.reset()
+
+
+def test_scan_cache_keeps_archive_members(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    _make_tree(data)
+    snapshot = scan_directory(str(data), archives=True)
+
+    save_snapshot(snapshot, str(tmp_path / "cache.snapshot"))
+    loaded = load_snapshot(str(tmp_path / "cache.snapshot"))
+
+    assert loaded.member_start == snapshot.member_start
+    assert loaded.same_entries(snapshot)
+
+
+def test_cli_lists_archive_members(tmp_path, capsys):
+    data = tmp_path / "project"
+    data.mkdir()
+    _make_tree(data)
+
+    assert main([str(data), "--format", "text", "--archives"]) == 0
+
+    output = capsys.readouterr().out
+    assert "|   |-- **raw** [ 1.0 kB ]\n|   |   |-- a.bin [ 1.0 kB ]" in output
+    assert "- Total folders: 1\n- Total files: 3\n" in output
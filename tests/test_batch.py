@@ -0,0 +1,135 @@
+import csv
+import json
+import os
+
+from treegen import cli
+from treegen.batch import expand_roots, output_paths, run_batch
+from treegen.cli import main
+from treegen.instrumentation import metrics
+
+
+def _make_dataset(root, description):
+    (root / "raw").mkdir(parents=True)
+    (root / "raw" / "data.csv").write_bytes(b"x" * 10)
+    (root / "raw" / "run.log").write_bytes(b"x" * 3)
+    (root / ".descriptions.json").write_text(json.dumps({"raw": description}), encoding="utf-8")
+
+
+def _index_rows(path):
+    with open(path, newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_globs_are_expanded_to_folders_without_duplicates(tmp_path):
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a").mkdir()
+    (tmp_path / "c.txt").write_text("x")
+
+    roots = expand_roots([str(tmp_path / "*"), str(tmp_path / "a"), str(tmp_path / "missing")])
+
+    assert roots == [str(tmp_path / "a"), str(tmp_path / "b"), str(tmp_path / "missing")]
+
+
+def test_output_names_do_not_collide(tmp_path):
+    roots = ["/data/one/Project", "/data/two/project", "/data/index", "/data/three/Project"]
+
+    names = [os.path.basename(path) for path in output_paths(roots, str(tmp_path), "markdown")]
+
+    assert names == ["Project.md", "project-2.md", "index-2.md", "Project-3.md"]
+
+
+def test_each_folder_is_exported_with_its_own_descriptions(tmp_path):
+    _make_dataset(tmp_path / "first", "First run")
+    _make_dataset(tmp_path / "second", "Second run")
+    roots = [str(tmp_path / "first"), str(tmp_path / "second")]
+    options = {"format": "csv", "exclude_extensions": [".log"]}
+
+    results, index_path = run_batch(roots, str(tmp_path / "out"), options, processes=1)
+
+    assert [result["error"] for result in results] == ["", ""]
+    with open(tmp_path / "out" / "second.csv", newline="", encoding="utf-8") as handle:
+        rows = list(csv.reader(handle))
+    assert [row[0] for row in rows[1:]] == [".descriptions.json", "raw", os.path.join("raw", "data.csv")]
+    assert rows[2][4] == "Second run"
+    index = _index_rows(index_path)
+    assert [(row["Output"], row["Folders"], row["Files"]) for row in index] == [
+        ("first.csv", "1", "2"), ("second.csv", "1", "2"),
+    ]
+
+
+def test_an_unreadable_folder_does_not_stop_the_batch(tmp_path, monkeypatch):
+    _make_dataset(tmp_path / "locked", "Locked")
+    _make_dataset(tmp_path / "open", "Open")
+    real_scandir = os.scandir
+
+    def scandir(path="."):
+        if os.fspath(path) == str(tmp_path / "locked"):
+            raise PermissionError(13, "Permission denied", path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    roots = [str(tmp_path / "locked"), str(tmp_path / "missing"), str(tmp_path / "open")]
+    reported = []
+
+    results, index_path = run_batch(
+        roots, str(tmp_path / "out"), {"format": "csv"}, processes=1, on_result=reported.append
+    )
+
+    assert [result["root"] for result in reported] == roots
+    assert "Permission denied" in results[0]["error"]
+    assert "No such file" in results[1]["error"]
+    assert results[2]["error"] == ""
+    assert sorted(os.listdir(tmp_path / "out")) == ["index.csv", "open.csv"]
+    assert [row["Output"] for row in _index_rows(index_path)] == ["", "", "open.csv"]
+
+
+def test_an_unexpected_error_is_reported_like_in_a_process_pool(tmp_path, monkeypatch):
+    _make_dataset(tmp_path / "broken", "Broken")
+    _make_dataset(tmp_path / "fine", "Fine")
+    real_export_file = cli.export_file
+
+    def export_file(view, *args):
+        if view.snapshot.root == str(tmp_path / "broken"):
+            raise RuntimeError("renderer failed")
+        return real_export_file(view, *args)
+
+    monkeypatch.setattr(cli, "export_file", export_file)
+    roots = [str(tmp_path / "broken"), str(tmp_path / "fine")]
+
+    results, _ = run_batch(roots, str(tmp_path / "out"), {"format": "csv"}, processes=1)
+
+    assert [result["error"] for result in results] == ["renderer failed", ""]
+    assert sorted(os.listdir(tmp_path / "out")) == ["fine.csv", "index.csv"]
+
+
+def test_a_process_pool_reports_the_metrics_of_its_workers(tmp_path):
+    _make_dataset(tmp_path / "first", "First run")
+    _make_dataset(tmp_path / "second", "Second run")
+    metrics.reset()
+
+    results, index_path = run_batch(
+        [str(tmp_path / "first"), str(tmp_path / "second")], str(tmp_path / "out"),
+        {"format": "markdown", "language": "fr"}, processes=2,
+    )
+
+    assert [result["error"] for result in results] == ["", ""]
+    assert (tmp_path / "out" / "first.md").read_text(encoding="utf-8").split("\n")[3] == "    <!-- First run -->"
+    index = open(index_path, encoding="utf-8").read()
+    assert index.startswith("# Export par lot TreeGen\n")
+    assert f"| {tmp_path / 'second'} | [second.md](<second.md>) | 1 | 3 |" in index
+    assert metrics.summary()["phases"]["batch_root"]["calls"] == 2
+    metrics.reset()
+
+
+def test_cli_batch_writes_an_index_and_reports_failures(tmp_path, capsys):
+    _make_dataset(tmp_path / "data" / "first", "First run")
+    _make_dataset(tmp_path / "data" / "second", "Second run")
+
+    status = main([
+        str(tmp_path / "data" / "*"), str(tmp_path / "missing"), "--output-dir", str(tmp_path / "out"),
+        "--format", "text", "--processes", "1",
+    ])
+
+    assert status == 1
+    assert sorted(os.listdir(tmp_path / "out")) == ["first.txt", "index.txt", "second.txt"]
+    assert "1 of 3 directories could not be exported" in capsys.readouterr().err
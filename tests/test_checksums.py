@@ -0,0 +1,134 @@
+import csv
+import hashlib
+import os
+import threading
+
+import pytest
+
+from treegen.checksums import (
+    ChecksumCache, ChecksumCancelled, compute_checksums, iter_manifest_lines, load_checksum_cache, save_checksum_cache
+)
+from treegen.cli import main
+from treegen.instrumentation import metrics
+from treegen.scanner import scan_directory
+
+OLD_MTIME_NS = 1_600_000_000 * 10**9
+RAW_NAME = "100% raw.bin"
+
+
+def _make_tree(root):
+    (root / "sub").mkdir()
+    (root / "sub" / "data.csv").write_bytes(b"x" * 10)
+    (root / "sub" / "trace.log").write_bytes(b"log")
+    (root / "sub" / RAW_NAME).write_bytes(os.urandom(3 << 20))
+    (root / "readme.txt").write_bytes(b"hello")
+    for path in ("sub/data.csv", "sub/trace.log", f"sub/{RAW_NAME}", "readme.txt"):
+        # Old enough for their digests to be cached.
+        os.utime(root / path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+
+def _sha256(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_manifest_lists_the_visible_files_as_bag_payload(tmp_path):
+    _make_tree(tmp_path)
+    view = scan_directory(str(tmp_path)).filtered(False, [".log"])
+
+    lines = list(iter_manifest_lines(view, compute_checksums(view)))
+
+    assert lines == [
+        f"{_sha256(tmp_path / 'readme.txt')}  data/readme.txt",
+        f"{_sha256(tmp_path / 'sub' / RAW_NAME)}  data/sub/100%25 raw.bin",
+        f"{_sha256(tmp_path / 'sub' / 'data.csv')}  data/sub/data.csv",
+    ]
+
+
+def test_worker_threads_give_the_same_digests(tmp_path):
+    _make_tree(tmp_path)
+    view = scan_directory(str(tmp_path)).filtered(False, [])
+
+    assert compute_checksums(view, workers=4) == compute_checksums(view)
+
+
+def test_only_changed_files_are_read_again(tmp_path):
+    _make_tree(tmp_path)
+    view = scan_directory(str(tmp_path)).filtered(False, [])
+    cache = ChecksumCache(tmp_path)
+    first = compute_checksums(view, cache=cache)
+    save_checksum_cache(cache, str(tmp_path / "cache.json"))
+    (tmp_path / "readme.txt").write_bytes(b"hello again")
+    os.utime(tmp_path / "readme.txt", ns=(OLD_MTIME_NS, OLD_MTIME_NS + 1))
+    metrics.reset()
+
+    second = compute_checksums(view, workers=2, cache=load_checksum_cache(str(tmp_path / "cache.json"), tmp_path))
+
+    counters = metrics.summary()["counters"]
+    assert (counters["files_hashed"], counters["checksums_cached"]) == (1, 3)
+    assert counters["bytes_hashed"] == len(b"hello again")
+    changed = [node for node in first if first[node] != second[node]]
+    assert [view.snapshot.name(node) for node in changed] == ["readme.txt"]
+    metrics.reset()
+
+
+def test_recently_modified_files_are_not_cached(tmp_path):
+    (tmp_path / "fresh.txt").write_bytes(b"just written")
+    view = scan_directory(str(tmp_path)).filtered(False, [])
+    cache = ChecksumCache(tmp_path)
+
+    compute_checksums(view, cache=cache)
+
+    assert len(cache) == 0
+
+
+def test_a_cache_of_another_folder_is_rejected(tmp_path):
+    save_checksum_cache(ChecksumCache(tmp_path / "one"), str(tmp_path / "cache.json"))
+
+    with pytest.raises(ValueError):
+        load_checksum_cache(str(tmp_path / "cache.json"), tmp_path / "two")
+
+
+def test_unreadable_files_are_reported_and_left_out(tmp_path):
+    _make_tree(tmp_path)
+    view = scan_directory(str(tmp_path)).filtered(False, [])
+    (tmp_path / "sub" / "data.csv").unlink()
+    failed = []
+
+    checksums = compute_checksums(view, workers=2, failed=failed)
+
+    assert failed == ["sub/data.csv"]
+    assert len(checksums) == 3
+
+
+def test_cancelling_stops_before_the_next_file(tmp_path):
+    _make_tree(tmp_path)
+    view = scan_directory(str(tmp_path)).filtered(False, [])
+    cancel_event = threading.Event()
+    progress = []
+
+    def on_progress(done, total, bytes_read):
+        progress.append(done)
+        cancel_event.set()
+
+    with pytest.raises(ChecksumCancelled):
+        compute_checksums(view, on_progress=on_progress, cancel_event=cancel_event)
+    assert progress == [1]
+
+
+def test_cli_adds_a_checksum_column_to_csv(tmp_path):
+    data = tmp_path / "project"
+    data.mkdir()
+    _make_tree(data)
+    output = tmp_path / "tree.csv"
+
+    assert main([str(data), "-o", str(output), "--checksums", "--exclude-ext", ".bin"]) == 0
+
+    with open(output, newline="", encoding="utf-8") as handle:
+        rows = list(csv.reader(handle))
+    assert rows[0][-1] == "SHA-256"
+    assert [(row[0], row[-1]) for row in rows[1:]] == [
+        ("readme.txt", _sha256(data / "readme.txt")),
+        ("sub", ""),
+        (os.path.join("sub", "data.csv"), _sha256(data / "sub" / "data.csv")),
+        (os.path.join("sub", "trace.log"), _sha256(data / "sub" / "trace.log")),
+    ]
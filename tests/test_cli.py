@@ -0,0 +1,108 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from treegen.cli import main
+from treegen.instrumentation import metrics
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _make_tree(root):
+    (root / "sub").mkdir()
+    (root / "sub" / "data.csv").write_bytes(b"x" * 10)
+    (root / "sub" / "trace.log").write_bytes(b"x" * 3)
+    (root / "readme.txt").write_bytes(b"x" * 7)
+    (root / ".descriptions.json").write_text(json.dumps({str(root / "sub"): "Raw data"}), encoding="utf-8")
+
+
+def test_markdown_export_uses_filters_and_descriptions(tmp_path):
+    data = tmp_path / "project"
+    data.mkdir()
+    _make_tree(data)
+    output = tmp_path / "tree.md"
+
+    assert main([str(data), "-o", str(output), "--exclude-ext", ".LOG", "--exclude-hidden", "--jobs", "2"]) == 0
+
+    lines = output.read_text(encoding="utf-8").split("\n")
+    assert lines[:5] == [
+        "project",
+        "|-- readme.txt [ 7 Bytes ]",
+        "\\-- **sub** [ 10 Bytes ]",
+        "    <!-- Raw data -->",
+        "    \\-- data.csv [ 10 Bytes ]",
+    ]
+    assert lines[-1] == "- Total size: 17 Bytes"
+
+
+def test_csv_format_follows_the_output_extension(tmp_path):
+    _make_tree(tmp_path)
+    output = tmp_path / "out" / "tree.csv"
+    output.parent.mkdir()
+
+    assert main([str(tmp_path), "-o", str(output), "--language", "fr"]) == 0
+
+    with open(output, newline="", encoding="utf-8") as handle:
+        rows = list(csv.reader(handle))
+    assert rows[0] == ["Path", "Type", "Name", "Size (Bytes)", "Description"]
+    assert [row[0] for row in rows[1:]] == [
+        ".descriptions.json", "out", "readme.txt", "sub",
+        os.path.join("sub", "data.csv"), os.path.join("sub", "trace.log"),
+    ]
+    assert rows[4][4] == "Raw data"
+
+
+def test_module_entry_point_never_imports_qt(tmp_path):
+    _make_tree(tmp_path)
+    program = (
+        "import runpy, sys\n"
+        f"sys.argv = ['treegen', {str(tmp_path)!r}, '--format', 'text']\n"
+        "try:\n"
+        "    runpy.run_module('treegen', run_name='__main__')\n"
+        "except SystemExit as exit:\n"
+        "    assert exit.code == 0, exit.code\n"
+        "assert not [name for name in sys.modules if name.split('.')[0] == 'PyQt5'], 'Qt was imported'\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", program], cwd=REPO_ROOT, capture_output=True, text=True, timeout=60
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith(tmp_path.name + "\n")
+    assert "Total files: 4" in result.stdout
+
+
+def test_render_budget_options_bound_the_tree_but_not_the_totals(tmp_path):
+    data = tmp_path / "project"
+    data.mkdir()
+    _make_tree(data)
+    output = tmp_path / "tree.txt"
+
+    assert main([str(data), "-o", str(output), "--max-depth", "1", "--exclude-hidden"]) == 0
+
+    lines = output.read_text(encoding="utf-8").split("\n")
+    assert lines[1:5] == [
+        "|-- readme.txt [ 7 Bytes ]",
+        "\\-- **sub** [ 13 Bytes ]",
+        "    <!-- Raw data -->",
+        "    \\-- … 2 files (13 Bytes)",
+    ]
+    assert lines[-2:] == ["- Total files: 3", "- Total size: 20 Bytes"]
+
+
+def test_a_failed_export_still_writes_its_trace(tmp_path, monkeypatch, capsys):
+    data = tmp_path / "project"
+    data.mkdir()
+    _make_tree(data)
+    trace_path = tmp_path / "trace.json"
+    monkeypatch.setattr(metrics, "tracing", False)
+
+    status = main([str(data), "-o", str(tmp_path / "missing" / "tree.md"), "--trace", str(trace_path), "--stats"])
+
+    assert status == 1
+    assert "cannot write" in capsys.readouterr().err
+    trace = json.loads(trace_path.read_text(encoding="utf-8"))
+    assert "scan" in trace["otherData"]["phases"]
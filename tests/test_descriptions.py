@@ -0,0 +1,94 @@
+import json
+import os
+
+from treegen.descriptions import DescriptionStore, descriptions_path, journal_path, load_descriptions
+
+
+def _stored(root):
+    with open(descriptions_path(root), encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def test_descriptions_are_stored_relative_to_the_root(tmp_path):
+    store = DescriptionStore(tmp_path)
+    store.load()
+    store.set(os.path.join(str(tmp_path), "raw", "data.csv"), "Raw data")
+    store.set(str(tmp_path / "notes.txt"), "Notes")
+    store.close()
+
+    assert _stored(tmp_path) == {"raw/data.csv": "Raw data", "notes.txt": "Notes"}
+    assert not os.path.exists(journal_path(tmp_path))
+    assert DescriptionStore(tmp_path).load() == {
+        os.path.join(str(tmp_path), "raw", "data.csv"): "Raw data",
+        str(tmp_path / "notes.txt"): "Notes",
+    }
+
+
+def test_absolute_keys_from_earlier_versions_are_read(tmp_path):
+    root = tmp_path / "project"
+    root.mkdir()
+    legacy = {
+        str(root / "a.txt"): "Under the root",
+        os.path.join(str(tmp_path), "old", "place", "project", "sub", "b.txt"): "Moved folder",
+        os.path.join(str(tmp_path), "elsewhere.txt"): "Unrelated",
+    }
+    (root / ".descriptions.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    loaded = load_descriptions(descriptions_path(root))
+
+    assert loaded == {
+        str(root / "a.txt"): "Under the root",
+        os.path.join(str(root), "sub", "b.txt"): "Moved folder",
+        os.path.join(str(tmp_path), "elsewhere.txt"): "Unrelated",
+    }
+
+
+def test_edits_are_appended_without_rewriting_the_file(tmp_path):
+    store = DescriptionStore(tmp_path)
+    store.load()
+    store.set(str(tmp_path / "a.txt"), "First")
+    store.compact()
+    before = os.stat(descriptions_path(tmp_path)).st_mtime_ns
+
+    store.set(str(tmp_path / "a.txt"), "Second")
+    store.set(str(tmp_path / "b.txt"), "Other")
+    store.set(str(tmp_path / "b.txt"), "")
+    store.flush()
+
+    assert os.stat(descriptions_path(tmp_path)).st_mtime_ns == before
+    assert _stored(tmp_path) == {"a.txt": "First"}
+    with open(journal_path(tmp_path), encoding="utf-8") as handle:
+        assert len(handle.readlines()) == 3
+    assert DescriptionStore(tmp_path).load() == {str(tmp_path / "a.txt"): "Second"}
+
+
+def test_a_torn_journal_record_is_skipped(tmp_path):
+    with open(journal_path(tmp_path), "w", encoding="utf-8") as handle:
+        handle.write('{"path": "a.txt", "description": "Kept"}\n{"path": "b.txt", "descr')
+
+    store = DescriptionStore(tmp_path)
+    assert store.load() == {str(tmp_path / "a.txt"): "Kept"}
+
+    store.set(str(tmp_path / "c.txt"), "After the crash")
+    store.flush()
+    assert DescriptionStore(tmp_path).load() == {
+        str(tmp_path / "a.txt"): "Kept",
+        str(tmp_path / "c.txt"): "After the crash",
+    }
+
+
+def test_the_journal_is_compacted_once_it_outgrows_the_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(DescriptionStore, "MIN_COMPACT_RECORDS", 3)
+    store = DescriptionStore(tmp_path)
+    store.load()
+    for index in range(2):
+        store.set(str(tmp_path / f"{index}.txt"), f"Edit {index}")
+    store.flush()
+    assert os.path.exists(journal_path(tmp_path))
+
+    store.set(str(tmp_path / "0.txt"), "Edit 2")
+    store.flush()
+
+    assert not os.path.exists(journal_path(tmp_path))
+    assert not os.path.exists(descriptions_path(tmp_path) + ".tmp")
+    assert _stored(tmp_path) == {"0.txt": "Edit 2", "1.txt": "Edit 1"}
@@ -0,0 +1,192 @@
+import os
+import threading
+import zipfile
+
+import pytest
+
+from treegen.cli import main
+from treegen import diff
+from treegen.diff import (
+    CHANGE_ADDED, CHANGE_MODIFIED, CHANGE_REMOVED, CHANGE_RESIZED, STATUS_ADDED, STATUS_CHANGED_BELOW,
+    STATUS_RESIZED, STATUS_UNCHANGED, ComparisonCancelled, SnapshotComparison, iter_changes,
+)
+from treegen.localization import Localization
+from treegen.rendering import iter_diff_csv_rows, iter_diff_lines
+from treegen.scan_cache import load_snapshot, save_snapshot
+from treegen.scanner import ROOT_NODE, scan_directory
+
+PAST_NS = 1_600_000_000 * 1_000_000_000
+
+
+def _make_tree(root):
+    (root / "data").mkdir()
+    (root / "data" / "a.csv").write_bytes(b"x" * 10)
+    (root / "data" / "b.csv").write_bytes(b"x" * 20)
+    (root / "old").mkdir()
+    (root / "old" / "gone.txt").write_bytes(b"x" * 5)
+    (root / "notes.txt").write_bytes(b"x" * 3)
+    (root / "swap").write_bytes(b"x")
+    (root / "run.log").write_bytes(b"x" * 7)
+
+
+def _update_tree(root):
+    (root / "data" / "a.csv").write_bytes(b"x" * 12)
+    os.utime(root / "data" / "b.csv", ns=(PAST_NS, PAST_NS))
+    (root / "old" / "gone.txt").unlink()
+    (root / "old").rmdir()
+    (root / "new").mkdir()
+    (root / "new" / "added.txt").write_bytes(b"x" * 4)
+    (root / "swap").unlink()
+    (root / "swap").mkdir()
+    (root / "run.log").write_bytes(b"x" * 9)
+
+
+def _changes(old_view, new_view):
+    old = old_view.snapshot
+    new = new_view.snapshot
+    return [
+        (change.kind, (new if change.new_node >= 0 else old).relative_path(
+            change.new_node if change.new_node >= 0 else change.old_node
+        ))
+        for change in iter_changes(old_view, new_view)
+    ]
+
+
+def _scans(tmp_path):
+    _make_tree(tmp_path)
+    old = scan_directory(str(tmp_path))
+    _update_tree(tmp_path)
+    return old, scan_directory(str(tmp_path))
+
+
+def test_changes_are_listed_in_tree_order(tmp_path):
+    old, new = _scans(tmp_path)
+
+    assert _changes(old.filtered(False, []), new.filtered(False, [])) == [
+        (CHANGE_RESIZED, os.path.join("data", "a.csv")),
+        (CHANGE_MODIFIED, os.path.join("data", "b.csv")),
+        (CHANGE_ADDED, "new"),
+        (CHANGE_ADDED, os.path.join("new", "added.txt")),
+        (CHANGE_REMOVED, "old"),
+        (CHANGE_REMOVED, os.path.join("old", "gone.txt")),
+        (CHANGE_RESIZED, "run.log"),
+        (CHANGE_REMOVED, "swap"),
+        (CHANGE_ADDED, "swap"),
+    ]
+
+
+def test_filters_apply_to_both_scans(tmp_path):
+    old, new = _scans(tmp_path)
+
+    changes = _changes(old.filtered(False, [".log", "csv"]), new.filtered(False, [".log", "csv"]))
+
+    assert [path for _, path in changes] == ["new", os.path.join("new", "added.txt"), "old",
+                                             os.path.join("old", "gone.txt"), "swap", "swap"]
+
+
+def test_comparison_marks_the_new_tree(tmp_path):
+    old, new = _scans(tmp_path)
+
+    comparison = SnapshotComparison(old.filtered(False, []), new.filtered(False, []))
+
+    status = {new.relative_path(node): comparison.status[node] for node in range(1, len(new))}
+    assert status["new"] == STATUS_ADDED and status["run.log"] == STATUS_RESIZED
+    assert status["data"] == comparison.status[ROOT_NODE] == STATUS_CHANGED_BELOW
+    assert status["notes.txt"] == STATUS_UNCHANGED
+    assert comparison.totals.counts[CHANGE_REMOVED] == [1, 2, 6, 0]
+    assert comparison.totals.counts[CHANGE_RESIZED] == [0, 2, 17, 21]
+
+
+def test_unchanged_scans_have_no_changes(tmp_path):
+    _make_tree(tmp_path)
+    snapshot = scan_directory(str(tmp_path))
+    view = snapshot.filtered(False, [])
+
+    comparison = SnapshotComparison(view, view)
+
+    assert not comparison.totals and not any(comparison.status)
+    assert list(iter_diff_lines(view, view, Localization("en").tr, "root"))[-1] == "- No changes."
+
+
+def test_a_comparison_can_be_cancelled(tmp_path, monkeypatch):
+    old, new = _scans(tmp_path)
+    monkeypatch.setattr(diff, "CANCEL_CHECK_INTERVAL", 2)
+    cancel_event = threading.Event()
+    cancel_event.set()
+
+    with pytest.raises(ComparisonCancelled):
+        SnapshotComparison(old.filtered(False, []), new.filtered(False, []), cancel_event)
+
+
+def test_archive_members_are_compared(tmp_path):
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "w") as bundle:
+        bundle.writestr("docs/readme.txt", "hello")
+    old = scan_directory(str(tmp_path), archives=True)
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "a") as bundle:
+        bundle.writestr("docs/extra.txt", "more")
+
+    changes = _changes(old.filtered(False, []), scan_directory(str(tmp_path), archives=True).filtered(False, []))
+
+    assert changes == [
+        (CHANGE_RESIZED, "bundle.zip"), (CHANGE_ADDED, os.path.join("bundle.zip", "docs", "extra.txt")),
+    ]
+
+
+def test_markdown_and_csv_reports(tmp_path):
+    old, new = _scans(tmp_path)
+    old_view = old.filtered(False, [".log"])
+    new_view = new.filtered(False, [".log"])
+
+    lines = list(iter_diff_lines(old_view, new_view, Localization("en").tr, "root"))
+    rows = list(iter_diff_csv_rows(old_view, new_view))
+
+    assert lines[0].startswith("# Changes in root since the scan of ")
+    assert lines[2] == f"- Resized: {os.path.join('data', 'a.csv')} [ 10 Bytes → 12 Bytes ]"
+    assert "- Added: **new** [ 4 Bytes ]" in lines
+    assert lines[-4:] == [
+        "- Added: 2 folders and 1 file, 4 Bytes",
+        "- Removed: 1 folder and 2 files, 6 Bytes",
+        "- Resized: 1 file, 10 Bytes → 12 Bytes",
+        "- Modified: 1 file, 20 Bytes",
+    ]
+    assert rows[0] == ["resized", os.path.join("data", "a.csv"), "File", 10, 12]
+    assert ["removed", os.path.join("old", "gone.txt"), "File", 5, ""] in rows
+    assert ["added", "swap", "Directory", "", 0] in rows
+
+
+def test_snapshots_of_another_root_can_be_compared(tmp_path):
+    first = tmp_path / "v1"
+    first.mkdir()
+    _make_tree(first)
+    second = tmp_path / "v2"
+    second.mkdir()
+    _make_tree(second)
+    (second / "notes.txt").write_bytes(b"x" * 30)
+    save_snapshot(scan_directory(str(first)), str(tmp_path / "v1.snapshot"))
+
+    old = load_snapshot(str(tmp_path / "v1.snapshot"))
+    changes = _changes(old.filtered(False, []), scan_directory(str(second)).filtered(False, []))
+
+    assert (CHANGE_RESIZED, "notes.txt") in changes
+
+
+def test_cli_saves_and_compares_snapshots(tmp_path, capsys):
+    data = tmp_path / "project"
+    data.mkdir()
+    _make_tree(data)
+    snapshot_path = str(tmp_path / "v1.snapshot")
+    assert main([str(data), "-o", str(tmp_path / "tree.md"), "--save-snapshot", snapshot_path]) == 0
+    _update_tree(data)
+
+    assert main([str(data), "--compare", snapshot_path, "--format", "csv", "--exclude-ext", ".csv,.log"]) == 0
+
+    output = capsys.readouterr().out
+    assert output.splitlines() == [
+        "Change,Path,Type,Old size (Bytes),New size (Bytes)",
+        "added,new,Directory,,4",
+        f"added,{os.path.join('new', 'added.txt')},File,,4",
+        "removed,old,Directory,5,",
+        f"removed,{os.path.join('old', 'gone.txt')},File,5,",
+        "removed,swap,File,1,",
+        "added,swap,Directory,,0",
+    ]
@@ -0,0 +1,101 @@
+import csv
+import io
+import os
+import tracemalloc
+
+from treegen.rendering import CSV_HEADER, TreeTextRenderer, iter_csv_rows, iter_markdown_lines, summary_lines, write_lines
+from treegen.scanner import ScanSnapshot, scan_directory
+
+
+def _tr(key, **kwargs):
+    return f"<{key}:{','.join(str(value) for value in kwargs.values())}>"
+
+
+def _make_tree(root):
+    for branch in ("alpha", "beta"):
+        folder = root / branch / "inner"
+        folder.mkdir(parents=True)
+        (folder / "data.csv").write_bytes(b"x" * 10)
+        (root / branch / "notes.log").write_bytes(b"x" * 3)
+    (root / "empty").mkdir()
+    (root / "readme.txt").write_bytes(b"x" * 7)
+
+
+class _CountingSink:
+    """A text handle that only counts what is written to it."""
+
+    def __init__(self):
+        self.characters = 0
+
+    def write(self, text):
+        self.characters += len(text)
+
+
+def _synthetic_snapshot(depth, fanout=4, files_per_directory=6):
+    snapshot = ScanSnapshot("/synthetic")
+    level = [0]
+    for _ in range(depth):
+        next_level = []
+        for node in level:
+            entries = [(f"dir{index}", True, 0, False, 0, 0, 0, 1) for index in range(fanout)]
+            entries += [(f"file{index}.dat", False, index, False, 0, 0, 0, 1) for index in range(files_per_directory)]
+            first = snapshot.add_children(node, entries)
+            next_level.extend(range(first, first + fanout))
+        level = next_level
+    snapshot.aggregate_sizes()
+    return snapshot
+
+
+def test_streamed_document_matches_the_preview(tmp_path):
+    _make_tree(tmp_path)
+    snapshot = scan_directory(tmp_path)
+    view = snapshot.filtered(exclude_extensions=[".log"])
+    descriptions = {str(tmp_path / "alpha"): "first\nsecond", str(tmp_path / "readme.txt"): "read me"}
+
+    handle = io.StringIO()
+    write_lines(handle, iter_markdown_lines(view, descriptions, _tr, "root"))
+
+    renderer = TreeTextRenderer(_tr)
+    expected = ["root"] + renderer.render_lines(view, descriptions)
+    expected += summary_lines(_tr, renderer.folder_count, renderer.file_count, renderer.total_size)
+    assert handle.getvalue() == "\n".join(expected)
+    assert handle.getvalue().endswith("<summary_total_size:27 Bytes>")
+
+
+def test_csv_rows_are_streamed_depth_first(tmp_path):
+    _make_tree(tmp_path)
+    snapshot = scan_directory(tmp_path)
+
+    handle = io.StringIO()
+    writer = csv.writer(handle)
+    writer.writerow(CSV_HEADER)
+    writer.writerows(iter_csv_rows(snapshot.filtered(), {str(tmp_path / "readme.txt"): "read me"}))
+
+    rows = list(csv.reader(io.StringIO(handle.getvalue())))
+    assert [row[0] for row in rows[1:]] == [
+        "alpha", os.path.join("alpha", "inner"), os.path.join("alpha", "inner", "data.csv"),
+        os.path.join("alpha", "notes.log"), "beta", os.path.join("beta", "inner"),
+        os.path.join("beta", "inner", "data.csv"), os.path.join("beta", "notes.log"), "empty", "readme.txt",
+    ]
+    assert rows[-1] == ["readme.txt", "File", "readme.txt", "7", "read me"]
+
+
+def _peak_streaming_memory(snapshot):
+    view = snapshot.filtered()
+    sink = _CountingSink()
+    tracemalloc.start()
+    try:
+        write_lines(sink, iter_markdown_lines(view, {}, _tr, "root"))
+        csv.writer(sink).writerows(iter_csv_rows(view, {}))
+        return tracemalloc.get_traced_memory()[1], sink.characters
+    finally:
+        tracemalloc.stop()
+
+
+def test_export_memory_stays_flat_as_the_tree_grows():
+    small_peak, small_output = _peak_streaming_memory(_synthetic_snapshot(3))
+    large_peak, large_output = _peak_streaming_memory(_synthetic_snapshot(5))
+
+    assert large_output > 12 * small_output
+    # The documents grow twentyfold; the memory needed to write them must not.
+    assert large_peak < small_peak + 16 * 1024
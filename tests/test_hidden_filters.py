@@ -4,12 +4,8 @@ from pathlib import Path
 
 import pytest
 
-from TreeGen import (
-    FILE_ATTRIBUTE_HIDDEN,
-    calculate_folder_size,
-    iter_visible_children,
-    is_hidden_path,
-)
+from treegen.filters import calculate_folder_size, iter_visible_children, is_hidden_path
+from treegen.scanner import FILE_ATTRIBUTE_HIDDEN
 
 FILE_ATTRIBUTE_DIRECTORY = 0x10
 
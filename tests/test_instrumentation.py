@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from treegen.cli import main
+from treegen.instrumentation import Metrics, format_summary, metrics
+from treegen.scanner import scan_directory
+
+
+@pytest.fixture
+def fresh_metrics():
+    metrics.reset()
+    tracing = metrics.tracing
+    yield metrics
+    metrics.tracing = tracing
+    metrics.reset()
+
+
+def _make_tree(root):
+    for name in ("a", "b", "a/c"):
+        (root / name).mkdir()
+    for name in ("a/one.txt", "a/c/two.txt", "b/three.txt", "four.txt"):
+        (root / name).write_bytes(b"x" * 5)
+
+
+def test_scan_counts_one_listing_per_directory(tmp_path, fresh_metrics):
+    _make_tree(tmp_path)
+
+    scan_directory(str(tmp_path))
+
+    summary = fresh_metrics.summary()
+    assert summary["counters"]["scandir_calls"] == 4
+    assert summary["counters"]["stat_calls"] == 7
+    assert summary["phases"]["list_directory"]["calls"] == 4
+    assert summary["phases"]["scan"]["calls"] == 1
+    assert summary["phases"]["aggregate_sizes"]["calls"] == 1
+
+
+def test_events_are_kept_only_while_tracing():
+    recorder = Metrics()
+    with recorder.timed("quiet"):
+        pass
+    recorder.tracing = True
+    with recorder.timed("traced", format="csv"):
+        pass
+
+    trace = recorder.trace()
+    assert [event["name"] for event in trace["traceEvents"]] == ["traced"]
+    event = trace["traceEvents"][0]
+    assert event["ph"] == "X" and event["args"] == {"format": "csv"}
+    assert trace["otherData"]["phases"]["quiet"]["calls"] == 1
+
+
+def test_events_beyond_the_limit_are_counted_as_dropped():
+    recorder = Metrics()
+    recorder.MAX_EVENTS = 2
+    recorder.tracing = True
+    for _ in range(5):
+        with recorder.timed("phase"):
+            pass
+
+    trace = recorder.trace()
+    assert len(trace["traceEvents"]) == 2
+    assert trace["otherData"]["dropped_events"] == 3
+    assert trace["otherData"]["phases"]["phase"]["calls"] == 5
+
+
+def test_format_summary_lists_phases_and_counters():
+    recorder = Metrics()
+    recorder.add(stat_calls=1200)
+    recorder.record("scan", 0.0, 0.5)
+
+    lines = format_summary(recorder.summary(), "Étapes", "Compteurs")
+
+    assert lines[0] == "Étapes"
+    assert lines[2].split()[:3] == ["scan", "1", "0.500"]
+    assert lines[-2] == "Compteurs"
+    assert lines[-1].split() == ["stat_calls", "1,200"]
+
+
+def test_cli_writes_trace_and_stats(tmp_path, capsys, fresh_metrics):
+    data = tmp_path / "project"
+    data.mkdir()
+    _make_tree(data)
+    trace_path = tmp_path / "trace.json"
+
+    assert main([str(data), "-o", str(tmp_path / "tree.csv"), "--stats", "--trace", str(trace_path)]) == 0
+
+    trace = json.loads(trace_path.read_text(encoding="utf-8"))
+    names = {event["name"] for event in trace["traceEvents"]}
+    assert {"scan", "list_directory", "export"} <= names
+    assert trace["otherData"]["counters"]["rows_exported"] == 7
+    assert "scandir_calls" in capsys.readouterr().err
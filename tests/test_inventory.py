@@ -0,0 +1,138 @@
+import ast
+import csv
+import json
+import os
+import struct
+import zipfile
+
+import pytest
+
+from treegen.batch import run_batch
+from treegen.cli import main
+from treegen.inventory import INVENTORY_FIELDS, iter_inventory_batches, write_inventory
+from treegen.scanner import scan_directory
+
+
+def _make_tree(root):
+    (root / "sub").mkdir()
+    (root / "sub" / "data.CSV").write_bytes(b"x" * 10)
+    (root / "sub" / "trace.log").write_bytes(b"x" * 3)
+    (root / "readme.txt").write_bytes(b"x" * 7)
+    (root / ".descriptions.json").write_text(json.dumps({"sub": "Raw data"}), encoding="utf-8")
+
+
+def _read_npz(path):
+    """The members of an ``.npz`` as ``(dtype, shape, data bytes)``, parsed without NumPy."""
+    members = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            assert info.compress_type == zipfile.ZIP_STORED
+            raw = archive.read(info)
+            assert raw[:8] == b"\x93NUMPY\x01\x00"
+            length = struct.unpack("<H", raw[8:10])[0]
+            assert (10 + length) % 64 == 0
+            header = ast.literal_eval(raw[10:10 + length].decode("latin1"))
+            members[info.filename[:-len(".npy")]] = (header["descr"], header["shape"], raw[10 + length:])
+    return members
+
+
+def test_ndjson_lists_every_entry_depth_first(tmp_path, capsys):
+    _make_tree(tmp_path)
+
+    assert main([str(tmp_path), "--format", "ndjson", "--exclude-ext", ".log"]) == 0
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [tuple(record) for record in records] == [INVENTORY_FIELDS] * 4
+    assert [(record["path"], record["type"], record["size"], record["extension"], record["depth"])
+            for record in records] == [
+        (".descriptions.json", "file", 19, ".json", 1),
+        ("readme.txt", "file", 7, ".txt", 1),
+        ("sub", "directory", 10, "", 1),
+        (os.path.join("sub", "data.CSV"), "file", 10, ".csv", 2),
+    ]
+    assert records[2]["description"] == "Raw data"
+    assert records[3]["mtime_ns"] == os.stat(tmp_path / "sub" / "data.CSV").st_mtime_ns
+
+
+def test_batches_split_the_rows_without_reordering_them(tmp_path):
+    _make_tree(tmp_path)
+    view = scan_directory(str(tmp_path)).filtered(False, [])
+
+    batches = list(iter_inventory_batches(view, {}, batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [path for batch in batches for path in batch.paths] == [
+        ".descriptions.json", "readme.txt", "sub", os.path.join("sub", "data.CSV"), os.path.join("sub", "trace.log"),
+    ]
+
+
+def test_npz_is_written_without_numpy(tmp_path):
+    _make_tree(tmp_path)
+    view = scan_directory(str(tmp_path)).filtered(True, [])
+    output = tmp_path / "inventory.npz"
+
+    write_inventory(view, {str(tmp_path / "sub"): "Données brutes"}, "npz", output)
+
+    members = _read_npz(output)
+    assert sorted(members) == sorted([
+        "path_data", "path_offsets", "is_dir", "size", "mtime_ns", "extension_ids", "extensions", "depth",
+        "description_data", "description_offsets",
+    ])
+    _, shape, offsets = members["path_offsets"]
+    offsets = struct.unpack(f"<{shape[0]}q", offsets)
+    paths = members["path_data"][2]
+    assert [paths[start:end].decode() for start, end in zip(offsets, offsets[1:])] == [
+        "readme.txt", "sub", os.path.join("sub", "data.CSV"), os.path.join("sub", "trace.log"),
+    ]
+    assert members["is_dir"][:2] == ("|b1", (4,)) and members["is_dir"][2] == b"\0\1\0\0"
+    assert members["size"][0] == "<i8" and struct.unpack("<4q", members["size"][2]) == (7, 13, 10, 3)
+    assert struct.unpack("<4i", members["depth"][2]) == (1, 1, 2, 2)
+    dtype, (count,), table = members["extensions"]
+    width = int(dtype[2:])
+    extensions = [table[index * width * 4:(index + 1) * width * 4].decode("utf-32-le").rstrip("\0")
+                  for index in range(count)]
+    assert [extensions[index] for index in struct.unpack("<4I", members["extension_ids"][2])] == [
+        ".txt", "", ".csv", ".log",
+    ]
+    assert members["description_data"][2].decode() == "Données brutes"
+
+
+def test_parquet_keeps_the_row_groups(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    _make_tree(tmp_path)
+    output = tmp_path / "inventory.parquet"
+
+    assert main([str(tmp_path), "-o", str(output), "--exclude-hidden"]) == 0
+
+    table = pq.read_table(output)
+    assert table.column_names == list(INVENTORY_FIELDS)
+    assert table.column("type").to_pylist() == ["file", "directory", "file", "file"]
+    assert table.column("size").to_pylist() == [7, 13, 10, 3]
+    assert table.column("description").to_pylist()[1] == "Raw data"
+
+
+def test_binary_formats_need_an_output_file(tmp_path, capsys):
+    _make_tree(tmp_path)
+
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), "--format", "npz"])
+
+    assert "needs an output file" in capsys.readouterr().err
+
+
+def test_batch_inventories_get_a_csv_index(tmp_path):
+    for name in ("first", "second"):
+        (tmp_path / name).mkdir()
+        _make_tree(tmp_path / name)
+
+    results, index_path = run_batch(
+        [str(tmp_path / "first"), str(tmp_path / "second")], str(tmp_path / "out"), {"format": "ndjson"},
+        processes=1,
+    )
+
+    assert [result["error"] for result in results] == ["", ""]
+    assert sorted(os.listdir(tmp_path / "out")) == ["first.ndjson", "index.csv", "second.ndjson"]
+    with open(index_path, newline="", encoding="utf-8") as handle:
+        assert [row["Output"] for row in csv.DictReader(handle)] == ["first.ndjson", "second.ndjson"]
+    with open(tmp_path / "out" / "second.ndjson", encoding="utf-8") as handle:
+        assert len(handle.readlines()) == 5
@@ -0,0 +1,184 @@
+import os
+import random
+
+import pytest
+
+from treegen import rendering
+from treegen.localization import Localization
+from treegen.rendering import RenderBudget, TreeTextRenderer, common_affixes, iter_markdown_lines
+from treegen.scanner import FLAG_OTHER_FILESYSTEM, ROOT_NODE, scan_directory
+
+
+def _tr(key, **kwargs):
+    return f"<{key}>"
+
+
+def _make_tree(root):
+    for branch in ("alpha", "beta", "gamma"):
+        for leaf in ("one", "two"):
+            folder = root / branch / leaf
+            folder.mkdir(parents=True)
+            (folder / "data.csv").write_bytes(b"x" * 10)
+            (folder / "notes.log").write_bytes(b"x" * 3)
+    (root / "beta" / "empty").mkdir()
+    (root / "readme.txt").write_bytes(b"x" * 7)
+
+
+def _find(snapshot, rel_path):
+    for node in range(len(snapshot)):
+        if node != ROOT_NODE and snapshot.relative_path(node) == rel_path:
+            return node
+    raise AssertionError(rel_path)
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    _make_tree(tmp_path)
+    return scan_directory(tmp_path)
+
+
+def test_tree_lines_and_counts(snapshot):
+    renderer = TreeTextRenderer(_tr)
+    lines = renderer.render_lines(snapshot.filtered(exclude_extensions=[".log"]), {})
+
+    assert lines[:3] == ["|-- **alpha** [ 20 Bytes ]", "|   |-- **one** [ 10 Bytes ]", "|   |   \\-- data.csv [ 10 Bytes ]"]
+    assert "|   |-- **empty** [ 0 Bytes ]" in lines
+    assert "|   |   |-- <empty_folder>" in lines
+    assert lines[-1] == "\\-- readme.txt [ 7 Bytes ]"
+    assert (renderer.folder_count, renderer.file_count, renderer.total_size) == (11, 7, 67)
+
+
+def test_description_edit_rebuilds_only_the_ancestor_blocks(snapshot, monkeypatch):
+    renderer = TreeTextRenderer(_tr)
+    view = snapshot.filtered()
+    descriptions = {}
+    renderer.render_lines(view, descriptions)
+
+    built = []
+
+    class CountingBlock(rendering._Block):
+        __slots__ = ()
+
+        def __init__(self, key):
+            super().__init__(key)
+            built.append(key)
+
+    monkeypatch.setattr(rendering, "_Block", CountingBlock)
+    leaf = _find(snapshot, os.path.join("beta", "two", "data.csv"))
+    descriptions[snapshot.path(leaf)] = "line one\nline two"
+    renderer.description_changed(snapshot, leaf)
+    lines = renderer.render_lines(view, descriptions)
+
+    # beta/two, beta and the root; the other five directories are reused.
+    assert len(built) == 3
+    assert lines == TreeTextRenderer(_tr).render_lines(view, descriptions)
+    position = lines.index("|       |   <!-- line one")
+    assert lines[position - 2:position + 2] == [
+        "|   \\-- **two** [ 13 Bytes ]",
+        "|       |-- data.csv [ 10 Bytes ]",
+        "|       |   <!-- line one",
+        "line two -->",
+    ]
+
+
+def test_filter_signatures_keep_separate_caches(snapshot):
+    renderer = TreeTextRenderer(_tr)
+    unfiltered = renderer.render_lines(snapshot.filtered(), {}, signature=(False, ()))
+    filtered = renderer.render_lines(snapshot.filtered(exclude_extensions=[".csv"]), {}, signature=(False, (".csv",)))
+
+    assert filtered != unfiltered
+    assert renderer.render_lines(snapshot.filtered(), {}, signature=(False, ())) == unfiltered
+    assert renderer.total_size == 7 + 6 * 13
+
+
+def test_budget_summarizes_left_out_entries_and_keeps_exact_totals(snapshot):
+    tr = Localization("en").tr
+    view = snapshot.filtered()
+    full = list(iter_markdown_lines(view, {}, tr, "root"))
+
+    by_size = list(iter_markdown_lines(view, {}, tr, "root", RenderBudget(max_children=2, order="size")))
+    shallow = list(iter_markdown_lines(view, {}, tr, "root", RenderBudget(max_depth=1)))
+
+    assert by_size[1:4] == [
+        "|-- **alpha** [ 26 Bytes ]",
+        "|   |-- **one** [ 13 Bytes ]",
+        "|   |   |-- data.csv [ 10 Bytes ]",
+    ]
+    assert "|   \\-- … and 1 more folder (0 Bytes)" in by_size
+    assert by_size[-7] == "\\-- … and 1 more folder and 1 more file (33 Bytes)"
+    assert shallow[1:5] == [
+        "|-- **alpha** [ 26 Bytes ]",
+        "|   \\-- … 2 folders (26 Bytes)",
+        "|-- **beta** [ 26 Bytes ]",
+        "|   \\-- … 3 folders (26 Bytes)",
+    ]
+    assert by_size[-3:] == shallow[-3:] == full[-3:]
+
+
+def test_renderer_and_export_apply_the_same_budget(snapshot):
+    tr = Localization("fr").tr
+    view = snapshot.filtered(exclude_extensions=[".csv"])
+    renderer = TreeTextRenderer(tr)
+
+    for budget in (RenderBudget(max_children=1), RenderBudget(max_depth=2, max_children=2, order="size")):
+        lines = renderer.render_lines(view, {}, budget=budget)
+        exported = list(iter_markdown_lines(view, {}, tr, "root", budget))
+
+        assert exported[1:len(lines) + 1] == lines
+        assert (renderer.folder_count, renderer.file_count) == (11, 7)
+
+
+def test_common_affixes_never_overlap():
+    rng = random.Random(5)
+    for _ in range(200):
+        old = [str(rng.randrange(4)) for _ in range(rng.randrange(0, 40))]
+        new = list(old)
+        start = rng.randrange(len(new) + 1)
+        stop = rng.randrange(start, len(new) + 1)
+        new[start:stop] = [str(rng.randrange(4)) for _ in range(rng.randrange(0, 5))]
+        prefix, suffix = common_affixes(old, new)
+
+        assert prefix + suffix <= min(len(old), len(new))
+        assert old[:prefix] == new[:prefix]
+        assert old[len(old) - suffix:] == new[len(new) - suffix:]
+
+
+def test_preview_is_spliced_in_place():
+    pytest.importorskip("PyQt5")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QTextEdit
+
+    from TreeGen import splice_preview
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    edit = QTextEdit()
+    rng = random.Random(11)
+    lines = None
+    for _ in range(300):
+        new = list(lines or ["root"])
+        start = rng.randrange(len(new) + 1)
+        stop = rng.randrange(start, len(new) + 1)
+        new[start:stop] = [f"line {rng.randrange(100)}" for _ in range(rng.randrange(0, 4))]
+        if not new:
+            new = ["root"]
+        splice_preview(edit, lines, new)
+        assert edit.toPlainText() == "\n".join(new)
+        lines = new
+
+
+@pytest.mark.skipif(not hasattr(os, "link"), reason="Needs hard links")
+def test_duplicates_are_listed_but_counted_once(tmp_path):
+    _make_tree(tmp_path)
+    os.link(tmp_path / "readme.txt", tmp_path / "gamma" / "two" / "readme.txt")
+    snapshot = scan_directory(tmp_path)
+    snapshot.flags[_find(snapshot, os.path.join("beta", "empty"))] |= FLAG_OTHER_FILESYSTEM
+    view = snapshot.filtered()
+
+    renderer = TreeTextRenderer(_tr)
+    lines = renderer.render_lines(view, {})
+    streamed = list(iter_markdown_lines(view, {}, lambda key, **kwargs: f"<{key}{kwargs}>", "root"))
+
+    assert lines[-2:] == ["|       \\-- readme.txt [ 7 Bytes ]", "\\-- readme.txt [ 7 Bytes ]"]
+    assert "|   |   |-- <other_filesystem>" in lines
+    assert (renderer.folder_count, renderer.file_count, renderer.total_size) == (10, 14, 85)
+    assert streamed[-1] == "<summary_total_size{'size': '85 Bytes'}>"
@@ -0,0 +1,144 @@
+import os
+import time
+
+import pytest
+
+from treegen import scanner
+from treegen.scan_cache import cache_path_for, load_snapshot, save_snapshot
+from treegen.scanner import ROOT_NODE, ScanSnapshot, scan_directory
+
+# Old enough that the rescan trusts the cached listings of untouched directories.
+PAST_NS = time.time_ns() - 3600 * 1_000_000_000
+
+
+def _make_tree(root):
+    for folder in ("a", "a/deep", "b"):
+        (root / folder).mkdir()
+    (root / "top.txt").write_bytes(b"12345")
+    (root / "a" / "one.log").write_bytes(b"1")
+    (root / "a" / "deep" / "two.txt").write_bytes(b"22")
+    (root / "b" / "three.dat").write_bytes(b"333")
+    for folder in ("a/deep", "a", "b", "."):
+        os.utime(root / folder, ns=(PAST_NS, PAST_NS))
+
+
+def _columns(snapshot):
+    columns = {column: getattr(snapshot, column) for column in ScanSnapshot.COLUMNS}
+    columns["flags"] = snapshot.flags
+    columns["names"] = [snapshot.name(node) for node in range(len(snapshot))]
+    columns["extensions"] = [snapshot.extension(node) for node in range(len(snapshot))]
+    del columns["extension_ids"]
+    return columns
+
+
+def _count_listings(monkeypatch):
+    listed = []
+    list_directory = scanner.list_directory
+
+    def counting(path, *args):
+        listed.append(os.path.basename(path))
+        return list_directory(path, *args)
+
+    monkeypatch.setattr(scanner, "list_directory", counting)
+    return listed
+
+
+def test_snapshot_round_trips_through_the_cache_file(tmp_path):
+    root = tmp_path / "data"
+    root.mkdir()
+    _make_tree(root)
+    snapshot = scan_directory(root)
+    path = cache_path_for(root, tmp_path / "cache")
+
+    save_snapshot(snapshot, path)
+    loaded = load_snapshot(path, root=snapshot.root)
+
+    assert _columns(loaded) == _columns(snapshot)
+    assert loaded.scanned_at_ns == snapshot.scanned_at_ns
+    with pytest.raises(ValueError):
+        load_snapshot(path, root=str(tmp_path))
+
+    with open(path, "r+b") as handle:
+        handle.truncate(os.path.getsize(path) - 1)
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+
+def test_rescan_only_relists_changed_directories(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    previous = scan_directory(tmp_path)
+
+    (tmp_path / "a" / "deep" / "new.csv").write_bytes(b"x" * 10)
+    (tmp_path / "b" / "three.dat").unlink()
+    later = PAST_NS + 1_000_000_000
+    for folder in ("a/deep", "b"):
+        os.utime(tmp_path / folder, ns=(later, later))
+
+    listed = _count_listings(monkeypatch)
+    rescanned = scan_directory(tmp_path, previous=previous)
+    assert sorted(listed) == ["b", "deep"]
+
+    monkeypatch.undo()
+    assert _columns(rescanned) == _columns(scan_directory(tmp_path))
+    assert rescanned.sizes[ROOT_NODE] == 5 + 1 + 2 + 10
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_rescan_of_an_unchanged_tree_lists_nothing(tmp_path, monkeypatch, workers):
+    _make_tree(tmp_path)
+    previous = scan_directory(tmp_path)
+
+    listed = _count_listings(monkeypatch)
+    rescanned = scan_directory(tmp_path, workers=workers, previous=previous)
+
+    assert listed == []
+    assert _columns(rescanned) == _columns(previous)
+
+
+def test_recently_modified_directories_are_not_trusted(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    now = time.time_ns()
+    os.utime(tmp_path / "b", ns=(now, now))
+    previous = scan_directory(tmp_path)
+
+    listed = _count_listings(monkeypatch)
+    scan_directory(tmp_path, previous=previous)
+
+    assert listed == ["b"]
+
+
+@pytest.mark.skipif(not hasattr(os, "link"), reason="Needs hard links")
+def test_rescan_recounts_a_hard_link_whose_first_link_is_gone(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    os.link(tmp_path / "top.txt", tmp_path / "b" / "link.txt")
+    os.utime(tmp_path / "b", ns=(PAST_NS, PAST_NS))
+    previous = scan_directory(tmp_path)
+    assert previous.sizes[ROOT_NODE] == 5 + 1 + 2 + 3
+
+    (tmp_path / "top.txt").unlink()
+    later = PAST_NS + 1_000_000_000
+    os.utime(tmp_path, ns=(later, later))
+
+    listed = _count_listings(monkeypatch)
+    rescanned = scan_directory(tmp_path, previous=previous)
+    assert listed == [tmp_path.name]
+
+    monkeypatch.undo()
+    # The copied listing of "b" still flags link.txt as linked, which no longer changes any total.
+    assert rescanned.sizes == scan_directory(tmp_path).sizes
+    b = next(node for node in rescanned.children(ROOT_NODE) if rescanned.name(node) == "b")
+    assert rescanned.sizes[b] == 3 + 5
+    assert rescanned.sizes[ROOT_NODE] == 1 + 2 + 3 + 5
+
+
+def test_snapshots_scanned_with_other_options_are_not_reused(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    previous = scan_directory(tmp_path)
+    path = cache_path_for(tmp_path, tmp_path / "cache")
+    save_snapshot(previous, path)
+
+    listed = _count_listings(monkeypatch)
+    rescanned = scan_directory(tmp_path, previous=load_snapshot(path), allocated=True)
+
+    assert sorted(listed) == sorted([tmp_path.name, "a", "b", "cache", "deep"])
+    assert rescanned.allocated
@@ -0,0 +1,233 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from treegen import scanner
+from treegen.scanner import ERROR_NONE, ROOT_NODE, ScanCancelled, scan_directory
+
+
+def _make_tree(root: Path) -> None:
+    (root / "b.txt").write_bytes(b"12345")
+    (root / "A.log").write_bytes(b"123")
+    (root / ".hidden").write_bytes(b"1")
+    sub = root / "sub"
+    sub.mkdir()
+    (sub / "inner.txt").write_bytes(b"1234567")
+    (sub / "deep").mkdir()
+    (sub / "deep" / "leaf.log").write_bytes(b"12")
+    (root / "empty").mkdir()
+
+
+def _find(snapshot, rel_path):
+    for node in range(len(snapshot)):
+        if node != ROOT_NODE and snapshot.relative_path(node) == rel_path:
+            return node
+    raise AssertionError(f"{rel_path} not in snapshot")
+
+
+def test_scan_records_every_entry_once(tmp_path):
+    _make_tree(tmp_path)
+    snapshot = scan_directory(tmp_path)
+
+    assert len(snapshot) == 9
+    assert all(snapshot.error(node) == ERROR_NONE for node in range(len(snapshot)))
+    names = [snapshot.name(child) for child in snapshot.children(ROOT_NODE)]
+    assert names == [".hidden", "A.log", "b.txt", "empty", "sub"]
+
+    if not sys.platform.startswith("win"):
+        assert snapshot.is_hidden(_find(snapshot, ".hidden"))
+    assert snapshot.extension(_find(snapshot, "A.log")) == ".log"
+    inner = _find(snapshot, os.path.join("sub", "inner.txt"))
+    assert snapshot.path(inner) == str(tmp_path / "sub" / "inner.txt")
+
+
+def test_names_and_paths_are_rebuilt_from_the_shared_buffer(tmp_path):
+    nested = tmp_path / "données" / "été"
+    nested.mkdir(parents=True)
+    (nested / "résumé.TXT").write_bytes(b"abc")
+    snapshot = scan_directory(tmp_path)
+
+    leaf = len(snapshot) - 1
+    assert snapshot.name(leaf) == "résumé.TXT"
+    assert snapshot.extension(leaf) == ".txt"
+    assert snapshot.path(leaf) == str(nested / "résumé.TXT")
+    assert snapshot.relative_path(leaf) == os.path.join("données", "été", "résumé.TXT")
+    assert snapshot.sizes[snapshot.parents[leaf]] == 3
+
+
+def test_folder_sizes_are_aggregated_bottom_up(tmp_path):
+    _make_tree(tmp_path)
+    snapshot = scan_directory(tmp_path)
+
+    assert snapshot.sizes[ROOT_NODE] == 5 + 3 + 1 + 7 + 2
+    assert snapshot.sizes[_find(snapshot, "sub")] == 9
+    assert snapshot.sizes[_find(snapshot, "empty")] == 0
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="Dot-prefix hidden files are a POSIX convention")
+def test_filtered_view_recomputes_sizes_in_memory(tmp_path):
+    _make_tree(tmp_path)
+    snapshot = scan_directory(tmp_path)
+
+    view = snapshot.filtered(exclude_hidden=True, exclude_extensions=[".log"])
+    names = [snapshot.name(child) for child in view.children(ROOT_NODE)]
+
+    assert names == ["b.txt", "empty", "sub"]
+    assert view.sizes[ROOT_NODE] == 5 + 7
+    assert view.sizes[_find(snapshot, "sub")] == 7
+    # The unfiltered totals are left untouched.
+    assert snapshot.sizes[ROOT_NODE] == 18
+
+
+def test_scan_reports_each_directory_and_can_be_cancelled(tmp_path):
+    _make_tree(tmp_path)
+    listed = []
+    scan_directory(tmp_path, on_directory=lambda snapshot, node: listed.append(snapshot.relative_path(node)))
+    assert listed == [".", "empty", "sub", os.path.join("sub", "deep")]
+
+    cancel_event = threading.Event()
+
+    def cancel_after_root(snapshot, node):
+        cancel_event.set()
+
+    with pytest.raises(ScanCancelled):
+        scan_directory(tmp_path, on_directory=cancel_after_root, cancel_event=cancel_event)
+
+
+def test_concurrent_scan_matches_sequential_scan(tmp_path):
+    _make_tree(tmp_path)
+    for index in range(20):
+        folder = tmp_path / "sub" / f"batch{index:02d}"
+        folder.mkdir()
+        (folder / f"data{index}.csv").write_bytes(b"x" * index)
+
+    sequential = scan_directory(tmp_path)
+    concurrent = scan_directory(tmp_path, workers=4)
+
+    assert concurrent.name_buffer == sequential.name_buffer
+    assert concurrent.parents == sequential.parents
+    assert concurrent.sizes == sequential.sizes
+    assert concurrent.flags == sequential.flags
+
+
+def _reference_size(snapshot, node, exclude_hidden, patterns):
+    """Filtered folder size computed the slow way, entry by entry."""
+    if not snapshot.is_dir(node):
+        return snapshot.sizes[node]
+    total = 0
+    for child in snapshot.children(node):
+        if exclude_hidden and snapshot.is_hidden(child):
+            continue
+        if not snapshot.is_dir(child) and snapshot.name(child).lower().endswith(tuple(patterns)):
+            continue
+        total += _reference_size(snapshot, child, exclude_hidden, patterns)
+    return total
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="Dot-prefix hidden files are a POSIX convention")
+@pytest.mark.parametrize("exclude_hidden", [False, True])
+@pytest.mark.parametrize("patterns", [[], [".log"], [".LOG", ".csv", ".missing"], [".bashrc"], [".tar.gz", "txt"]])
+def test_filtered_sizes_match_an_entry_by_entry_walk(tmp_path, monkeypatch, exclude_hidden, patterns):
+    _make_tree(tmp_path)
+    hidden_dir = tmp_path / "sub" / ".cache"
+    hidden_dir.mkdir()
+    (hidden_dir / "blob.csv").write_bytes(b"x" * 11)
+    (hidden_dir / "trace.log").write_bytes(b"x" * 13)
+    (tmp_path / ".bashrc").write_bytes(b"x" * 17)
+    (tmp_path / "sub" / "archive.tar.gz").write_bytes(b"x" * 19)
+    (tmp_path / "sub" / "notxt").write_bytes(b"x" * 23)
+    snapshot = scan_directory(tmp_path)
+
+    def no_syscalls(*args, **kwargs):
+        raise AssertionError("filtering touched the filesystem")
+
+    for name in ("scandir", "stat", "lstat", "listdir"):
+        monkeypatch.setattr(os, name, no_syscalls)
+    view = snapshot.filtered(exclude_hidden=exclude_hidden, exclude_extensions=patterns)
+
+    lowered = [pattern.lower() for pattern in patterns]
+    for node in range(len(snapshot)):
+        if snapshot.is_dir(node) and not view.is_excluded(node):
+            assert view.sizes[node] == _reference_size(snapshot, node, exclude_hidden, lowered), snapshot.relative_path(node)
+    visible = [snapshot.relative_path(child) for child in view.children(_find(snapshot, "sub"))]
+    assert (os.path.join("sub", ".cache") in visible) == (not exclude_hidden)
+
+
+@pytest.mark.skipif(not hasattr(os, "link"), reason="Needs hard links")
+def test_hard_links_are_counted_once(tmp_path):
+    (tmp_path / "data.bin").write_bytes(b"x" * 100)
+    (tmp_path / "sub").mkdir()
+    os.link(tmp_path / "data.bin", tmp_path / "sub" / "copy.bin")
+    (tmp_path / "sub" / "own.log").write_bytes(b"x" * 3)
+    snapshot = scan_directory(tmp_path)
+
+    copy = _find(snapshot, os.path.join("sub", "copy.bin"))
+    assert snapshot.is_duplicate(copy) and not snapshot.is_duplicate(_find(snapshot, "data.bin"))
+    assert snapshot.sizes[copy] == 100
+    assert snapshot.sizes[ROOT_NODE] == 103
+    assert snapshot.sizes[_find(snapshot, "sub")] == 3
+    assert snapshot.filtered(exclude_extensions=[".log"]).sizes[ROOT_NODE] == 100
+    assert snapshot.filtered(exclude_extensions=[".tar.gz"]).sizes[ROOT_NODE] == 103
+
+
+def _with_identity(monkeypatch, identities):
+    """Make the entries named in ``identities`` report another ``(st_dev, st_ino)``."""
+    list_directory = scanner.list_directory
+
+    def listing(path, *args):
+        entries = []
+        for name, is_dir, size, hidden, mtime, dev, ino, links in list_directory(path, *args):
+            dev, ino = identities.get(name, (dev, ino))
+            entries.append((name, is_dir, size, hidden, mtime, dev, ino, links))
+        return entries
+
+    monkeypatch.setattr(scanner, "list_directory", listing)
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="os.DirEntry reports no inode on Windows")
+@pytest.mark.parametrize("workers", [1, 4])
+def test_a_directory_reached_twice_is_entered_once(tmp_path, monkeypatch, workers):
+    _make_tree(tmp_path)
+    (tmp_path / "twin").mkdir()
+    (tmp_path / "twin" / "again.txt").write_bytes(b"x" * 50)
+    # As a bind mount of "sub" would.
+    sub_stat = os.stat(tmp_path / "sub")
+    _with_identity(monkeypatch, {"twin": (sub_stat.st_dev, sub_stat.st_ino)})
+
+    snapshot = scan_directory(tmp_path, workers=workers)
+
+    twin = _find(snapshot, "twin")
+    assert snapshot.is_duplicate(twin)
+    assert snapshot.child_count[twin] == 0
+    assert snapshot.sizes[ROOT_NODE] == 18
+
+
+def test_one_filesystem_scans_leave_other_devices_unlisted(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    sub_stat = os.stat(tmp_path / "sub")
+    _with_identity(monkeypatch, {"sub": (sub_stat.st_dev + 1, sub_stat.st_ino)})
+
+    default = scan_directory(tmp_path)
+    assert not default.on_other_filesystem(_find(default, "sub"))
+    assert default.sizes[ROOT_NODE] == 18
+
+    snapshot = scan_directory(tmp_path, one_filesystem=True)
+    sub = _find(snapshot, "sub")
+    assert snapshot.on_other_filesystem(sub)
+    assert snapshot.child_count[sub] == 0
+    assert snapshot.sizes[ROOT_NODE] == 5 + 3 + 1
+
+
+@pytest.mark.skipif(not hasattr(os.stat_result, "st_blocks"), reason="Needs st_blocks")
+def test_allocated_sizes_come_from_the_blocks_in_use(tmp_path):
+    with open(tmp_path / "sparse.img", "wb") as handle:
+        handle.truncate(1 << 20)
+    blocks = os.stat(tmp_path / "sparse.img").st_blocks
+
+    assert scan_directory(tmp_path).sizes[ROOT_NODE] == 1 << 20
+    allocated = scan_directory(tmp_path, allocated=True)
+    assert allocated.allocated
+    assert allocated.sizes[ROOT_NODE] == blocks * 512
@@ -0,0 +1,95 @@
+import fnmatch
+import random
+import zipfile
+
+import pytest
+
+from treegen.scanner import ScanSnapshot, scan_directory
+from treegen.search import compile_wildcard
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    for path in ("raw/2024/data.csv", "raw/notes.txt", "docs/.drafts/data.csv", "docs/run.log", "Déjà/Été.TXT"):
+        target = tmp_path / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(b"x")
+    return scan_directory(tmp_path)
+
+
+def _matches(snapshot, pattern, excluded=None):
+    search = snapshot.name_index().search(compile_wildcard(pattern), excluded)
+    return [snapshot.relative_path(node) for node in search.matches()]
+
+
+def _accepted(snapshot, pattern, excluded=None):
+    search = snapshot.name_index().search(compile_wildcard(pattern), excluded)
+    return sorted(snapshot.relative_path(node) for node in range(1, len(snapshot)) if search.accepts(node))
+
+
+def test_wildcards_follow_the_search_bar_rules(snapshot):
+    assert _matches(snapshot, "DATA") == ["docs/.drafts/data.csv", "raw/2024/data.csv"]
+    assert _matches(snapshot, "*.txt") == ["Déjà/Été.TXT", "raw/notes.txt"]
+    assert _matches(snapshot, "?ata") == ["docs/.drafts/data.csv", "raw/2024/data.csv"]
+    assert _matches(snapshot, "[!d]ata") == []
+    assert _matches(snapshot, "r[aeiou]?") == ["docs/.drafts", "docs/run.log", "raw"]
+    assert _matches(snapshot, "été") == ["Déjà/Été.TXT"]
+    assert compile_wildcard("**") is None
+
+
+def test_matches_keep_their_ancestors(snapshot):
+    assert _accepted(snapshot, "data.csv") == [
+        "docs", "docs/.drafts", "docs/.drafts/data.csv", "raw", "raw/2024", "raw/2024/data.csv",
+    ]
+    assert _accepted(snapshot, "2024") == ["raw", "raw/2024"]
+
+
+def test_excluded_matches_do_not_keep_their_folders(snapshot):
+    view = snapshot.filtered(exclude_hidden=True, exclude_extensions=[".log"])
+
+    assert _accepted(snapshot, "data", view.is_excluded) == ["raw", "raw/2024", "raw/2024/data.csv"]
+    assert _accepted(snapshot, "run", view.is_excluded) == []
+
+
+def test_members_of_excluded_archives_do_not_keep_their_folders(tmp_path):
+    (tmp_path / "raw").mkdir()
+    with zipfile.ZipFile(tmp_path / "raw" / "bundle.zip", "w") as bundle:
+        bundle.writestr("inner/data.csv", "x")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "data.txt").write_bytes(b"x")
+    snapshot = scan_directory(tmp_path, archives=True)
+    view = snapshot.filtered(exclude_hidden=False, exclude_extensions=[".zip"])
+
+    assert _accepted(snapshot, "data", view.is_excluded) == ["docs", "docs/data.txt"]
+    assert _matches(snapshot, "data", view.is_excluded) == ["docs/data.txt"]
+    assert _matches(snapshot, "data") == ["docs/data.txt", "raw/bundle.zip/inner/data.csv"]
+
+
+def test_answers_do_not_depend_on_the_order_of_questions():
+    rng = random.Random(7)
+    snapshot = ScanSnapshot("/data")
+    directories = [0]
+    while len(snapshot) < 3000:
+        parent = directories.pop(0)
+        entries = []
+        for index in range(rng.randint(0, 12)):
+            is_dir = rng.random() < 0.3
+            name = "".join(rng.choice("abcx_") for _ in range(rng.randint(1, 6)))
+            entries.append((f"{name}{index}" if is_dir else f"{name}{index}.dat", is_dir, 1, False, 0, 0, 0, 1))
+        first = snapshot.add_children(parent, entries)
+        directories.extend(first + offset for offset, entry in enumerate(entries) if entry[1])
+        if not directories:
+            break
+    names = [snapshot.name(node).lower() for node in range(len(snapshot))]
+
+    for pattern in ("ab", "x?c", "[bc]a", "a*x", "_1"):
+        expected = [False] * len(snapshot)
+        for node in range(len(snapshot) - 1, 0, -1):
+            if fnmatch.fnmatchcase(names[node], f"*{pattern}*"):
+                expected[node] = True
+            if expected[node]:
+                expected[snapshot.parents[node]] = True
+        search = snapshot.name_index().search(compile_wildcard(pattern))
+        nodes = list(range(1, len(snapshot)))
+        rng.shuffle(nodes)
+        assert {node: search.accepts(node) for node in nodes} == {node: expected[node] for node in nodes}, pattern
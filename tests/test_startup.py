@@ -0,0 +1,32 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _loaded_modules(statement):
+    program = f"import sys\n{statement}\nprint(' '.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    result = subprocess.run(
+        [sys.executable, "-c", program], cwd=REPO_ROOT, capture_output=True, text=True, timeout=60, check=True
+    )
+    return set(result.stdout.split())
+
+
+def test_core_modules_defer_heavy_imports():
+    loaded = _loaded_modules(
+        "import treegen.batch, treegen.cli, treegen.descriptions, treegen.filters, treegen.instrumentation, treegen.localization, "
+        "treegen.checksums, treegen.inventory, treegen.rendering, treegen.scan_cache, treegen.scanner, treegen.statistics, treegen.archives, treegen.diff"
+    )
+
+    assert not loaded & {"PyQt5", "humanize", "watchdog", "concurrent", "ctypes"}
+
+
+def test_gui_module_imports_watchdog_only_for_watch_mode():
+    pytest.importorskip("PyQt5")
+    loaded = _loaded_modules("import os; os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen'); import TreeGen")
+
+    assert "PyQt5" in loaded
+    assert "watchdog" not in loaded
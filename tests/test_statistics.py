@@ -0,0 +1,94 @@
+from treegen.cli import main
+from treegen.localization import Localization
+from treegen.rendering import iter_markdown_lines, statistics_lines
+from treegen.scanner import ROOT_NODE, scan_directory
+from treegen.statistics import binary_size, collect_statistics, histogram_bounds
+
+
+def _make_tree(root):
+    (root / "data").mkdir()
+    (root / "data" / "big.bin").write_bytes(b"x" * 5000)
+    (root / "data" / "small.bin").write_bytes(b"x" * 20)
+    (root / "data" / "notes.txt").write_bytes(b"x" * 3)
+    (root / "logs").mkdir()
+    (root / "logs" / "run.log").write_bytes(b"x" * 300)
+    (root / "logs" / "empty.log").write_bytes(b"")
+    (root / ".cache").mkdir()
+    (root / ".cache" / "blob.bin").write_bytes(b"x" * 1000)
+    (root / "README").write_bytes(b"x" * 16)
+
+
+def test_extensions_add_up_to_the_visible_total(tmp_path):
+    _make_tree(tmp_path)
+    view = scan_directory(str(tmp_path)).filtered(True, [".log"])
+
+    statistics = collect_statistics(view)
+
+    assert statistics.extensions == [(".bin", 2, 5020), ("", 1, 16), (".txt", 1, 3)]
+    assert (statistics.files, statistics.size) == (4, view.sizes[ROOT_NODE])
+
+
+def test_histogram_buckets_grow_sixteen_times(tmp_path):
+    _make_tree(tmp_path)
+    view = scan_directory(str(tmp_path)).filtered(False, [])
+
+    histogram = collect_statistics(view).histogram
+
+    # Empty, 1-15 B, 16-255 B, 256 B-4 KiB, 4-64 KiB.
+    assert histogram == [1, 1, 2, 2, 1]
+    assert histogram_bounds(3) == (256, 4096)
+    assert [binary_size(size) for size in histogram_bounds(4)] == ["4 KiB", "64 KiB"]
+
+
+def test_other_patterns_give_the_same_statistics(tmp_path):
+    _make_tree(tmp_path)
+    snapshot = scan_directory(str(tmp_path))
+
+    exact = collect_statistics(snapshot.filtered(False, [".log"]))
+    wildcard = collect_statistics(snapshot.filtered(False, ["log"]))
+
+    assert snapshot.filtered(False, ["log"]).excluded is not None
+    assert (wildcard.extensions, wildcard.histogram) == (exact.extensions, exact.histogram)
+    assert wildcard.largest_directories == exact.largest_directories
+
+
+def test_largest_folders_follow_the_filters(tmp_path):
+    _make_tree(tmp_path)
+    snapshot = scan_directory(str(tmp_path))
+
+    assert collect_statistics(snapshot.filtered(False, [])).largest_directories == [
+        ("data", 5023), (".cache", 1000), ("logs", 300),
+    ]
+    assert collect_statistics(snapshot.filtered(True, [".bin"]), largest=2).largest_directories == [
+        ("logs", 300), ("data", 3),
+    ]
+
+
+def test_statistics_follow_the_markdown_summary(tmp_path):
+    _make_tree(tmp_path)
+    view = scan_directory(str(tmp_path)).filtered(True, [])
+    tr = Localization("en").tr
+
+    lines = list(iter_markdown_lines(view, {}, tr, "root", statistics=True))
+
+    section = statistics_lines(tr, collect_statistics(view))
+    assert lines[-len(section):] == section
+    assert lines[-len(section) - 1].startswith("- Total size:")
+    assert section[1:6] == [
+        "**Statistics:**", "- Files by extension:", "  - .bin: 2 files, 5.0 kB", "  - .log: 2 files, 300 Bytes",
+        "  - (no extension): 1 file, 16 Bytes",
+    ]
+    assert "  - 256 B to 4 KiB: 1 file" in section
+    assert section[-1] == "  - logs: 300 Bytes"
+
+
+def test_cli_appends_statistics_to_text(tmp_path, capsys):
+    data = tmp_path / "project"
+    data.mkdir()
+    _make_tree(data)
+
+    assert main([str(data), "--format", "text", "--statistics", "--language", "fr"]) == 0
+
+    output = capsys.readouterr().out
+    assert "**Statistiques :**" in output
+    assert "  - data : 5.0 kB" in output
@@ -0,0 +1,228 @@
+import os
+import zipfile
+
+import pytest
+
+pytest.importorskip("PyQt5")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QModelIndex, QPersistentModelIndex, Qt  # noqa: E402
+from PyQt5.QtWidgets import QApplication, QInputDialog  # noqa: E402
+
+from treegen.diff import STATUS_CHANGED_BELOW, STATUS_RESIZED, SnapshotComparison  # noqa: E402
+from treegen.scanner import ROOT_NODE, scan_directory  # noqa: E402
+from TreeGen import FileFilterProxyModel, MainWindow, SnapshotTreeModel  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    for index in range(5):
+        (tmp_path / f"file{index}.txt").write_bytes(b"x" * index)
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    (sub / "inner.txt").write_bytes(b"abc")
+    return scan_directory(tmp_path)
+
+
+def test_rows_are_created_only_when_fetched(app, snapshot, monkeypatch):
+    monkeypatch.setattr(SnapshotTreeModel, "FETCH_BATCH_SIZE", 4)
+    model = SnapshotTreeModel()
+    model.set_snapshot(snapshot)
+
+    assert model.rowCount() == 0
+    assert model.canFetchMore(QModelIndex())
+    model.fetchMore(QModelIndex())
+    assert model.rowCount() == 4
+    model.fetchMore(QModelIndex())
+    assert model.rowCount() == 6
+    assert not model.canFetchMore(QModelIndex())
+
+    sub = model.index(5, 0)
+    assert sub.data() == "sub"
+    assert model.hasChildren(sub)
+    assert model.rowCount(sub) == 0
+    model.fetchMore(sub)
+    inner = model.index(0, 0, sub)
+    assert inner.data() == "inner.txt"
+    assert model.parent(inner) == sub
+    assert model.index(0, 1, sub).data(Qt.UserRole) == 3
+    assert model.index(5, 1).data(Qt.UserRole) == snapshot.sizes[snapshot.first_child[0] + 5]
+
+
+def test_descriptions_are_served_and_edited_by_path(app, snapshot):
+    model = SnapshotTreeModel()
+    model.set_snapshot(snapshot)
+    descriptions = {os.path.join(snapshot.root, "file1.txt"): "first"}
+    model.set_descriptions(descriptions)
+    model.fetchMore(QModelIndex())
+
+    assert model.index(1, 2).data() == "first"
+    assert model.setData(model.index(2, 2), "second", Qt.EditRole)
+    assert descriptions[os.path.join(snapshot.root, "file2.txt")] == "second"
+
+
+def test_refreshed_snapshot_keeps_fetched_rows_and_persistent_indexes(app, snapshot, tmp_path):
+    from treegen.scanner import refresh_snapshot
+
+    model = SnapshotTreeModel()
+    model.set_snapshot(snapshot)
+    model.fetchMore(QModelIndex())
+    sub = model.index(5, 0)
+    model.fetchMore(sub)
+    kept = QPersistentModelIndex(model.index(0, 0, sub))
+    removed = QPersistentModelIndex(model.index(0, 0))
+
+    (tmp_path / "file0.txt").unlink()
+    (tmp_path / "sub" / "added.txt").write_bytes(b"12345")
+    refreshed, node_map = refresh_snapshot(snapshot, [str(tmp_path), str(tmp_path / "sub")])
+    model.replace_snapshot(refreshed, node_map)
+
+    assert model.rowCount() == 5
+    assert not removed.isValid()
+    assert kept.isValid() and kept.data() == "inner.txt"
+    sub = model.index(4, 0)
+    assert sub.data() == "sub"
+    assert [model.index(row, 0, sub).data() for row in range(model.rowCount(sub))] == ["added.txt", "inner.txt"]
+    assert model.index(4, 1).data(Qt.UserRole) == 8
+
+
+def _visible_names(proxy, parent=QModelIndex()):
+    names = []
+    for row in range(proxy.rowCount(parent)):
+        index = proxy.index(row, 0, parent)
+        names.append(index.data())
+        names.extend(_visible_names(proxy, index))
+    return names
+
+
+def test_proxy_filters_from_scan_data_without_touching_the_disk(app, tmp_path, monkeypatch):
+    (tmp_path / "keep.csv").write_bytes(b"x")
+    (tmp_path / "drop.LOG").write_bytes(b"x")
+    (tmp_path / "archive.tar.gz").write_bytes(b"x")
+    (tmp_path / ".hidden.txt").write_bytes(b"x")
+    hidden_dir = tmp_path / ".cache"
+    hidden_dir.mkdir()
+    (hidden_dir / "inside.csv").write_bytes(b"x")
+    model = SnapshotTreeModel()
+    model.set_snapshot(scan_directory(tmp_path))
+    model.fetchMore(QModelIndex())
+    model.fetchMore(model.index(0, 0))
+    proxy = FileFilterProxyModel()
+    proxy.setSourceModel(model)
+
+    def no_disk(*args, **kwargs):
+        raise AssertionError("filtering touched the filesystem")
+
+    for name in ("stat", "lstat", "scandir", "listdir"):
+        monkeypatch.setattr(os, name, no_disk)
+    monkeypatch.setattr(os.path, "isfile", no_disk)
+
+    proxy.setExcludeHidden(True)
+    proxy.setExcludeExtensions(".log, .tar.gz")
+    assert _visible_names(proxy) == ["keep.csv"]
+
+    proxy.setExcludeHidden(False)
+    proxy.setExcludeExtensions("")
+    assert sorted(_visible_names(proxy)) == sorted(
+        [".cache", "inside.csv", ".hidden.txt", "archive.tar.gz", "drop.LOG", "keep.csv"]
+    )
+
+
+def test_search_keeps_the_folders_leading_to_matches(app, tmp_path):
+    deep = tmp_path / "a" / "b"
+    deep.mkdir(parents=True)
+    (deep / "Target.csv").write_bytes(b"x")
+    (tmp_path / "a" / "other.csv").write_bytes(b"x")
+    (tmp_path / "c").mkdir()
+    (tmp_path / "c" / "target.log").write_bytes(b"x")
+    model = SnapshotTreeModel()
+    model.set_snapshot(scan_directory(tmp_path))
+    proxy = FileFilterProxyModel()
+    proxy.setSourceModel(model)
+    for node in range(len(model.snapshot)):
+        if model.snapshot.is_dir(node):
+            model.fetchMore(model.index_for_node(node))
+
+    proxy.setSearchText("TARG*")
+    assert _visible_names(proxy) == ["a", "b", "Target.csv", "c", "target.log"]
+
+    proxy.setExcludeExtensions(".log")
+    assert _visible_names(proxy) == ["a", "b", "Target.csv"]
+
+    proxy.setSearchText("")
+    assert "other.csv" in _visible_names(proxy)
+
+
+def test_archives_expand_like_folders(app, tmp_path):
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "w") as bundle:
+        bundle.writestr("docs/readme.txt", "hello")
+    model = SnapshotTreeModel()
+    model.set_snapshot(scan_directory(tmp_path, archives=True))
+    model.set_complete()
+    model.fetchMore(QModelIndex())
+
+    archive = model.index(0, 0)
+    assert archive.data() == "bundle.zip"
+    assert model.hasChildren(archive) and model.canFetchMore(archive)
+    model.fetchMore(archive)
+    docs = model.index(0, 0, archive)
+    assert docs.data() == "docs"
+    model.fetchMore(docs)
+    assert model.index(0, 1, docs).data(Qt.UserRole) == 5
+
+
+def test_comparison_colours_changed_names(app, tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "kept.txt").write_bytes(b"a")
+    old = scan_directory(tmp_path)
+    (tmp_path / "sub" / "kept.txt").write_bytes(b"abc")
+    new = scan_directory(tmp_path)
+    model = SnapshotTreeModel()
+    model.set_snapshot(new)
+    model.set_change_labels({STATUS_CHANGED_BELOW: "below", STATUS_RESIZED: "resized"})
+    model.set_comparison(SnapshotComparison(old.filtered(False, []), new.filtered(False, [])).status)
+    model.fetchMore(QModelIndex())
+    sub = model.index(0, 0)
+    model.fetchMore(sub)
+
+    assert sub.data(Qt.ToolTipRole) == "below"
+    assert model.index(0, 0, sub).data(Qt.ForegroundRole) == SnapshotTreeModel.CHANGE_COLORS[STATUS_RESIZED]
+    model.set_snapshot(new)
+    model.fetchMore(QModelIndex())
+    assert model.index(0, 0).data(Qt.ToolTipRole) is None
+
+
+def test_descriptions_can_be_edited_while_scanning(app, snapshot, monkeypatch):
+    window = MainWindow()
+    window.current_directory = snapshot.root
+    window.load_descriptions()
+    # As during a scan: the model shows the listed folders, but the scan has not finished.
+    window.model.set_snapshot(snapshot, complete=False)
+    window.model.directories_listed([ROOT_NODE])
+    window.model.fetchMore(QModelIndex())
+    monkeypatch.setattr(QInputDialog, "getMultiLineText", lambda *args: ("first file", True))
+
+    window.add_description(window.proxy_model.mapFromSource(window.model.index(0, 0)))
+
+    assert window.model.index(0, SnapshotTreeModel.COLUMN_DESCRIPTION).data() == "first file"
+    window.close()
+
+
+def test_a_comparison_is_kept_only_for_the_same_folder(app, tmp_path):
+    (tmp_path / "first").mkdir()
+    (tmp_path / "second").mkdir()
+    window = MainWindow()
+    saved = scan_directory(tmp_path / "first")
+    window.comparison_snapshot = saved
+    window.comparison_root = str(tmp_path / "first")
+
+    window.start_scan(str(tmp_path / "first"))
+    assert window.comparison_snapshot is saved
+    window.start_scan(str(tmp_path / "second"))
+    assert window.comparison_snapshot is None
+    window.close()
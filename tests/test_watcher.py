@@ -0,0 +1,100 @@
+import os
+import threading
+
+import pytest
+
+from treegen import scanner, watcher
+from treegen.scanner import ROOT_NODE, ScanSnapshot, refresh_snapshot, scan_directory
+
+
+def _make_tree(root):
+    (root / "keep").mkdir()
+    (root / "keep" / "same.txt").write_bytes(b"123")
+    (root / "busy").mkdir()
+    (root / "busy" / "grow.log").write_bytes(b"1")
+    (root / "busy" / "gone.txt").write_bytes(b"22")
+    (root / "top.txt").write_bytes(b"4444")
+
+
+def _paths(snapshot):
+    return [snapshot.relative_path(node) for node in range(len(snapshot))]
+
+
+def test_refresh_relists_only_the_reported_directories(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    previous = scan_directory(tmp_path)
+    (tmp_path / "busy" / "grow.log").write_bytes(b"1" * 50)
+    (tmp_path / "busy" / "gone.txt").unlink()
+    (tmp_path / "busy" / "fresh").mkdir()
+    (tmp_path / "busy" / "fresh" / "new.csv").write_bytes(b"12")
+
+    listed = []
+    list_directory = scanner.list_directory
+
+    def counting(path, *args):
+        listed.append(os.path.relpath(path, tmp_path))
+        return list_directory(path, *args)
+
+    monkeypatch.setattr(scanner, "list_directory", counting)
+    snapshot, node_map = refresh_snapshot(previous, [str(tmp_path / "busy")])
+    monkeypatch.undo()
+
+    assert sorted(listed) == ["busy", os.path.join("busy", "fresh")]
+    full = scan_directory(tmp_path)
+    assert _paths(snapshot) == _paths(full)
+    assert snapshot.sizes == full.sizes
+    assert snapshot.sizes[ROOT_NODE] == 3 + 50 + 2 + 4
+
+    for old in range(len(previous)):
+        new = node_map[old]
+        if previous.relative_path(old) == os.path.join("busy", "gone.txt"):
+            assert new == -1
+        else:
+            assert snapshot.relative_path(new) == previous.relative_path(old)
+
+
+def test_refresh_without_changes_keeps_the_same_entries(tmp_path):
+    _make_tree(tmp_path)
+    previous = scan_directory(tmp_path)
+    snapshot, node_map = refresh_snapshot(previous, [])
+
+    assert snapshot.same_entries(previous)
+    assert list(node_map) == list(range(len(previous)))
+    assert isinstance(snapshot, ScanSnapshot)
+
+
+def test_polling_watcher_asks_for_a_full_check(tmp_path):
+    called = threading.Event()
+    changes = []
+
+    def on_change(directories):
+        changes.append(directories)
+        called.set()
+
+    poller = watcher.PollingWatcher(tmp_path, on_change, interval=0.01)
+    poller.start()
+    try:
+        assert called.wait(5)
+    finally:
+        poller.stop()
+    assert changes[0] is None
+
+
+@pytest.mark.skipif(watcher.Observer is None, reason="watchdog is not installed")
+def test_native_watcher_reports_changed_directories(tmp_path):
+    (tmp_path / "sub").mkdir()
+    seen = set()
+    reported = threading.Event()
+
+    def on_change(directories):
+        seen.update(directories)
+        if os.path.join(str(tmp_path), "sub") in seen:
+            reported.set()
+
+    native = watcher.create_watcher(tmp_path, on_change)
+    assert native.backend == "native"
+    try:
+        (tmp_path / "sub" / "data.bin").write_bytes(b"x")
+        assert reported.wait(5)
+    finally:
+        native.stop()
@@ -0,0 +1,6 @@
+"""
+Qt-free core of TreeGen: scanning, filtering, rendering, description storage and localization.
+
+``TreeGen.py`` builds the PyQt5 interface on top of this package, and ``python -m treegen``
+runs the same pipeline headless (see :mod:`treegen.cli`).
+"""
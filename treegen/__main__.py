@@ -0,0 +1,5 @@
+import sys
+
+from treegen.cli import main
+
+sys.exit(main())
@@ -0,0 +1,329 @@
+"""
+Archive members listed as virtual subtrees of a scan.
+
+With ``archives``, :func:`~treegen.scanner.scan_directory` calls :func:`expand_archives` once
+the walk is over. The members of every ``.zip`` and ``.tar`` file (plain or compressed with
+gzip, bzip2 or xz) are appended to the snapshot as the children of the archive, exactly like
+the listing of a folder, so the tree, the preview and the CSV and inventory exports show them
+as a subtree. Members come after every scanned entry, from :attr:`ScanSnapshot.member_start`
+on. Their uncompressed sizes add up in the folders inside an archive, but never in the archive
+or the folders around it, so totals keep describing what is on disk.
+
+Nothing is extracted. A zip listing is read record by record from the central directory at
+the end of the file. A tar listing streams the member headers; the data of uncompressed tars
+is seeked over, compressed ones are decompressed on the fly without being stored. Given the
+previous snapshot of a rescan, an archive whose path, size and mtime did not change has its
+members copied from it instead of being read again. An archive that cannot be read, or that has
+more than :data:`MAX_ARCHIVE_MEMBERS` members, stays a plain file.
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+from array import array
+from collections import deque
+from itertools import compress
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from treegen.instrumentation import metrics
+from treegen.scanner import (
+    FLAG_DIR, FLAG_DUPLICATE, RACY_MTIME_WINDOW_NS, DirectoryEntry, ScanCancelled, ScanSnapshot
+)
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tbz", ".tar.xz", ".txz")
+# Bounds the listing held in memory while one archive is parsed.
+MAX_ARCHIVE_MEMBERS = 1_000_000
+
+# Extensions (as recorded by the scanner) of the files whose names are then checked against
+# ARCHIVE_SUFFIXES; ".gz" also matches plain gzip files, which are not archives.
+_ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tgz", ".gz", ".tbz2", ".tbz", ".bz2", ".xz", ".txz")
+
+_EOCD = struct.Struct("<4s4H2LH")
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_ZIP64_LOCATOR = struct.Struct("<4sLQL")
+_ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+_ZIP64_EOCD = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+_CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+_CENTRAL_SIGNATURE = b"PK\x01\x02"
+_ZIP64_EXTRA_ID = 0x0001
+_ZIP_UTF8_FLAG = 0x800
+_ZIP_MAX_COMMENT = 0xFFFF
+
+# (is_dir, size, mtime_ns) of one member, by name, in its folder.
+_Member = Tuple[bool, int, int]
+
+
+def is_archive_name(name: str) -> bool:
+    """True when ``name`` has one of the :data:`ARCHIVE_SUFFIXES` (case-insensitively)."""
+    return name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def iter_zip_members(path: str) -> Iterator[Tuple[str, bool, int, int]]:
+    """
+    Yield ``(name, is_dir, uncompressed size, mtime_ns)`` for every entry of the zip central
+    directory, reading one record at a time. Zip64 archives are supported. Raises ``ValueError``
+    for a file that is not a zip archive.
+    """
+    with open(path, "rb") as handle:
+        handle.seek(0, 2)
+        file_size = handle.tell()
+        tail_size = min(file_size, _EOCD.size + _ZIP_MAX_COMMENT)
+        handle.seek(file_size - tail_size)
+        tail = handle.read(tail_size)
+        position = tail.rfind(_EOCD_SIGNATURE)
+        if position < 0 or len(tail) - position < _EOCD.size:
+            raise ValueError(f"{path} is not a zip archive")
+        _, _, _, _, count, directory_size, _, _ = _EOCD.unpack_from(tail, position)
+        end = file_size - tail_size + position
+        locator = position - _ZIP64_LOCATOR.size
+        if locator >= 0 and tail[locator:locator + 4] == _ZIP64_LOCATOR_SIGNATURE:
+            _, _, record_offset, _ = _ZIP64_LOCATOR.unpack_from(tail, locator)
+            handle.seek(record_offset)
+            record = handle.read(_ZIP64_EOCD.size)
+            if len(record) != _ZIP64_EOCD.size or record[:4] != _ZIP64_EOCD_SIGNATURE:
+                raise ValueError(f"{path} has a corrupt zip64 directory")
+            _, _, _, _, _, _, _, count, directory_size, _ = _ZIP64_EOCD.unpack(record)
+            end = record_offset
+        if count > MAX_ARCHIVE_MEMBERS:
+            raise ValueError(f"{path} has more than {MAX_ARCHIVE_MEMBERS} members")
+        # Data prepended to the archive (self-extracting stubs) shifts every offset; the central
+        # directory always ends where the end records start.
+        handle.seek(end - directory_size)
+        read = handle.read
+        # Members written together share their timestamps; each is converted once.
+        mtimes = {}
+        for _ in range(count):
+            header = read(_CENTRAL_HEADER.size)
+            if len(header) != _CENTRAL_HEADER.size or header[:4] != _CENTRAL_SIGNATURE:
+                raise ValueError(f"{path} has a corrupt central directory")
+            (_, _, _, flags, _, dos_time, dos_date, _, _, size, name_length, extra_length, comment_length,
+             _, _, _, _) = _CENTRAL_HEADER.unpack(header)
+            raw_name = read(name_length)
+            extra = read(extra_length)
+            if comment_length:
+                handle.seek(comment_length, 1)
+            if size == 0xFFFFFFFF:
+                size = _zip64_size(extra)
+            name = raw_name.decode("utf-8" if flags & _ZIP_UTF8_FLAG else "cp437", "replace")
+            mtime = mtimes.get((dos_date, dos_time))
+            if mtime is None:
+                mtime = mtimes[dos_date, dos_time] = _dos_mtime_ns(dos_date, dos_time)
+            yield name, name.endswith("/"), size, mtime
+
+
+def _zip64_size(extra: bytes) -> int:
+    position = 0
+    while position + 4 <= len(extra):
+        header_id, length = struct.unpack_from("<2H", extra, position)
+        if header_id == _ZIP64_EXTRA_ID and length >= 8:
+            return struct.unpack_from("<Q", extra, position + 4)[0]
+        position += 4 + length
+    raise ValueError("zip64 size missing from the extra field")
+
+
+def _dos_mtime_ns(dos_date: int, dos_time: int) -> int:
+    # Zip timestamps are local times with a two-second resolution.
+    try:
+        seconds = time.mktime((
+            (dos_date >> 9) + 1980, (dos_date >> 5) & 0xF, dos_date & 0x1F,
+            dos_time >> 11, (dos_time >> 5) & 0x3F, (dos_time & 0x1F) * 2, 0, 0, -1,
+        ))
+    except (OverflowError, ValueError):
+        return 0
+    return int(seconds) * 1_000_000_000
+
+
+def iter_tar_members(path: str) -> Iterator[Tuple[str, bool, int, int]]:
+    """
+    Yield ``(name, is_dir, size, mtime_ns)`` for every member header of a tar archive, plain or
+    compressed. Only regular files have a size; links and devices count as empty files.
+    """
+    # Imported here: tarfile is only needed when archives are expanded.
+    import tarfile
+
+    with tarfile.open(path, "r:*") as archive:
+        while True:
+            member = archive.next()
+            if member is None:
+                return
+            # TarFile keeps every header it has read; this walk needs each one only once.
+            archive.members.clear()
+            yield member.name, member.isdir(), member.size if member.isreg() else 0, int(member.mtime * 1e9)
+
+
+def read_archive(path: str) -> Dict[str, Dict[str, _Member]]:
+    """
+    The members of the archive at ``path`` grouped by folder: ``{folder: {name: (is_dir, size,
+    mtime_ns)}}``, where folders are ``/``-separated paths inside the archive and ``""`` is its
+    top level. Folders that only appear in member paths are added; a member listed twice keeps
+    its last entry. Raises ``ValueError`` when the archive has more than
+    :data:`MAX_ARCHIVE_MEMBERS` members.
+    """
+    members = iter_zip_members(path) if path.lower().endswith(".zip") else iter_tar_members(path)
+    folders: Dict[str, Dict[str, _Member]] = {"": {}}
+    count = 0
+    for name, is_dir, size, mtime in members:
+        parts = [part for part in name.split("/") if part and part != "."]
+        # Names with ".." point outside the archive; they cannot be placed in the tree.
+        if not parts or ".." in parts:
+            continue
+        count += 1
+        if count > MAX_ARCHIVE_MEMBERS:
+            raise ValueError(f"{path} has more than {MAX_ARCHIVE_MEMBERS} members")
+        folder = ""
+        for part in parts[:-1]:
+            listing = folders[folder]
+            folder = f"{folder}/{part}" if folder else part
+            entry = listing.get(part)
+            if entry is None or not entry[0]:
+                listing[part] = (True, 0, 0)
+                folders.setdefault(folder, {})
+        listing = folders[folder]
+        name = parts[-1]
+        if is_dir:
+            listing[name] = (True, 0, mtime)
+            folders.setdefault(f"{folder}/{name}" if folder else name, {})
+        elif not listing.get(name, (False,))[0]:
+            listing[name] = (False, size, mtime)
+    return folders
+
+
+def _listing(members: Dict[str, _Member]) -> List[DirectoryEntry]:
+    """One folder of an archive as directory entries, sorted as by :func:`~treegen.scanner.list_directory`."""
+    entries = [
+        (name, is_dir, size, name.startswith("."), mtime, 0, 0, 1)
+        for name, (is_dir, size, mtime) in members.items()
+    ]
+    entries.sort(key=lambda item: (item[0].lower(), item[0]))
+    return entries
+
+
+def archive_nodes(snapshot: ScanSnapshot, end: Optional[int] = None) -> List[int]:
+    """Ids of the files below ``end`` (default: every scanned entry) whose names are archive names."""
+    if end is None:
+        end = len(snapshot) if snapshot.member_start is None else snapshot.member_start
+    extension_ids = {snapshot.find_extension_id(extension) for extension in _ARCHIVE_EXTENSIONS} - {None}
+    if not extension_ids:
+        return []
+    candidates = compress(range(end), map(extension_ids.__contains__, snapshot.extension_ids[:end]))
+    flags = snapshot.flags
+    return [
+        node for node in candidates
+        if not flags[node] & (FLAG_DIR | FLAG_DUPLICATE) and is_archive_name(snapshot.name(node))
+    ]
+
+
+def expand_archives(
+    snapshot: ScanSnapshot,
+    on_directory: Optional[Callable[[ScanSnapshot, int], None]] = None,
+    cancel_event=None,
+    previous: Optional[ScanSnapshot] = None,
+    node_map: Optional[array] = None,
+) -> None:
+    """
+    Append the members of every archive of ``snapshot`` below it and set ``member_start``.
+
+    ``on_directory(snapshot, node)`` is called after the members of each archive and of each
+    folder inside one have been added, as during the walk. Setting ``cancel_event`` stops before
+    the next archive and raises :class:`~treegen.scanner.ScanCancelled`. With the ``previous``
+    snapshot of a rescan and its ``node_map``, unchanged archives are copied from ``previous``
+    (which must share the extension table of ``snapshot``) and ``node_map`` is extended to
+    their members.
+    """
+    snapshot.member_start = len(snapshot)
+    reusable = _reusable_archives(snapshot, previous, node_map)
+    listed = reused = errors = 0
+    with metrics.timed("archives"):
+        for node in archive_nodes(snapshot, snapshot.member_start):
+            if cancel_event is not None and cancel_event.is_set():
+                raise ScanCancelled(snapshot.root)
+            old = reusable.get(node)
+            if old is not None:
+                _copy_members(snapshot, node, previous, old, node_map, on_directory)
+                reused += 1
+                continue
+            try:
+                folders = read_archive(snapshot.path(node))
+            except Exception:
+                # Corrupt archives raise errors from zlib, bz2 or lzma as well as OSError,
+                # ValueError and tarfile's own; any of them leaves the archive a plain file.
+                errors += 1
+                continue
+            _add_members(snapshot, node, folders, on_directory)
+            listed += 1
+    metrics.add(
+        archives_listed=listed, archives_reused=reused, archive_errors=errors,
+        archive_members=len(snapshot) - snapshot.member_start,
+    )
+
+
+def _reusable_archives(snapshot, previous, node_map) -> Dict[int, int]:
+    """Archives of ``snapshot`` mapped to the same, unchanged and expanded archive in ``previous``."""
+    if previous is None or node_map is None or previous.member_start is None:
+        return {}
+    reusable = {}
+    stable_before = previous.scanned_at_ns - RACY_MTIME_WINDOW_NS
+    for old in archive_nodes(previous):
+        node = node_map[old]
+        if node < 0 or not previous.child_count[old]:
+            continue
+        mtime = previous.mtimes[old]
+        # An archive rewritten within the mtime tick of the previous scan may have changed since.
+        if mtime == snapshot.mtimes[node] and previous.sizes[old] == snapshot.sizes[node] and mtime < stable_before:
+            reusable[node] = old
+    return reusable
+
+
+def _copy_members(snapshot, node, previous, old, node_map, on_directory) -> None:
+    # Breadth first, like the walk, so the children of each folder stay contiguous. Folder
+    # sizes inside the archive are copied with their totals.
+    pending = deque([(node, old)])
+    flags = snapshot.flags
+    while pending:
+        parent, old_parent = pending.popleft()
+        first = snapshot.copy_children(parent, previous, old_parent)
+        old_first = previous.first_child[old_parent]
+        count = previous.child_count[old_parent]
+        node_map[old_first:old_first + count] = array("i", range(first, first + count))
+        for offset in range(count):
+            if flags[first + offset] & FLAG_DIR:
+                pending.append((first + offset, old_first + offset))
+        if on_directory is not None:
+            on_directory(snapshot, parent)
+
+
+def _add_members(snapshot, node, folders, on_directory) -> None:
+    start = len(snapshot)
+    pending = deque([(node, "")])
+    flags = snapshot.flags
+    while pending:
+        parent, folder = pending.popleft()
+        # Each folder's listing is dropped once added, so the parsed archive shrinks as it is copied.
+        entries = _listing(folders.pop(folder))
+        first = snapshot.add_children(parent, entries)
+        for offset, entry in enumerate(entries):
+            if flags[first + offset] & FLAG_DIR:
+                pending.append((first + offset, f"{folder}/{entry[0]}" if folder else entry[0]))
+        if on_directory is not None:
+            on_directory(snapshot, parent)
+    # Folder sizes are summed inside the archive only; the archive keeps its size on disk.
+    sizes = snapshot.sizes
+    parents = snapshot.parents
+    for member in range(len(snapshot) - 1, start - 1, -1):
+        parent = parents[member]
+        if parent >= start:
+            sizes[parent] += sizes[member]
+
+
+__all__ = [
+    "ARCHIVE_SUFFIXES",
+    "MAX_ARCHIVE_MEMBERS",
+    "archive_nodes",
+    "expand_archives",
+    "is_archive_name",
+    "iter_tar_members",
+    "iter_zip_members",
+    "read_archive",
+]
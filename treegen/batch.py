@@ -0,0 +1,323 @@
+"""
+Batch exports of many folders at once.
+
+Each root is scanned, filtered and exported by :func:`export_root` with its own descriptions,
+exactly as a single export would be. :func:`run_batch` hands the roots to a pool of processes,
+so the parts of a scan that hold the GIL (building the snapshot, aggregating sizes, rendering)
+run on every core, and a large folder does not hold up the others. Once every root is done,
+:func:`write_index` writes the combined index. A root that cannot be read or written is
+reported there instead of stopping the batch.
+
+Qt is never imported, so the GUI and ``python -m treegen`` share this module.
+"""
+
+from __future__ import annotations
+
+import csv
+import errno
+import glob
+import os
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from treegen.descriptions import DescriptionStore
+from treegen.instrumentation import metrics
+from treegen.inventory import INVENTORY_FORMATS
+from treegen.localization import DEFAULT_LANGUAGE, Localization
+from treegen.rendering import RenderBudget, naturalsize
+from treegen.scanner import ERROR_NONE, ERROR_NOT_FOUND, FLAG_ERRORS, ROOT_NODE
+
+INDEX_BASENAME = "index"
+OUTPUT_SUFFIXES = {
+    "markdown": ".md", "text": ".txt", "csv": ".csv", "ndjson": ".ndjson", "parquet": ".parquet", "npz": ".npz",
+    "manifest": "-manifest-sha256.txt",
+}
+INDEX_CSV_HEADER = ["Folder", "Output", "Folders", "Files", "Size (Bytes)", "Unreadable folders", "Seconds", "Error"]
+
+_GLOB_CHARACTERS = re.compile(r"[*?[]")
+
+
+def expand_roots(patterns: Iterable[str]) -> List[str]:
+    """
+    Absolute paths of the folders named by ``patterns``, in order and without duplicates.
+    Patterns containing ``*``, ``?`` or ``[`` are expanded to the folders they match, sorted;
+    other paths are kept as given, so a missing folder is reported by the batch.
+    """
+    roots = []
+    seen = set()
+    for pattern in patterns:
+        if _GLOB_CHARACTERS.search(pattern):
+            paths = sorted(path for path in glob.glob(pattern) if os.path.isdir(path))
+        else:
+            paths = [pattern]
+        for path in paths:
+            path = os.path.abspath(path)
+            if path not in seen:
+                seen.add(path)
+                roots.append(path)
+    return roots
+
+
+def output_paths(roots: List[str], output_dir: str, output_format: str) -> List[str]:
+    """
+    One export file per root in ``output_dir``, named after the root. Repeated names, compared
+    case-insensitively and including the index, get "-2", "-3", ... appended.
+    """
+    suffix = OUTPUT_SUFFIXES[output_format]
+    used = {INDEX_BASENAME}
+    paths = []
+    for root in roots:
+        name = os.path.basename(root) or "root"
+        candidate = name
+        number = 1
+        while candidate.casefold() in used:
+            number += 1
+            candidate = f"{name}-{number}"
+        used.add(candidate.casefold())
+        paths.append(os.path.join(output_dir, candidate + suffix))
+    return paths
+
+
+def _visible_totals(view) -> Dict[str, int]:
+    snapshot = view.snapshot
+    flags = snapshot.flags
+    folders = files = unreadable = 0
+    stack = [ROOT_NODE]
+    while stack:
+        for child in view.children(stack.pop()):
+            if snapshot.is_dir(child):
+                folders += 1
+                if flags[child] & FLAG_ERRORS:
+                    unreadable += 1
+                stack.append(child)
+            else:
+                files += 1
+    return {"folders": folders, "files": files, "size": view.sizes[ROOT_NODE], "unreadable": unreadable}
+
+
+def _empty_row(root: str, output: str, error: str = "") -> dict:
+    return {
+        "root": root, "output": output, "folders": 0, "files": 0, "size": 0, "unreadable": 0,
+        "seconds": 0.0, "error": error,
+    }
+
+
+def export_root(root: str, output: str, options: dict) -> dict:
+    """
+    Scan ``root``, apply the filters in ``options`` and write its export to ``output``.
+
+    ``options`` holds ``format``, ``exclude_hidden``, ``exclude_extensions``, ``language``,
+    the :class:`~treegen.rendering.RenderBudget` fields ``max_depth``, ``max_children`` and
+    ``order``, ``jobs`` (directories listed and files hashed in parallel), ``use_cache``, the scan
+    options ``allocated``, ``one_filesystem`` and ``archives``, ``checksums`` (a SHA-256 column
+    in CSV exports) and ``statistics`` (the statistics section of Markdown/text exports).
+    Returns the row of the batch index; ``error`` is empty unless the root could not be read or
+    the export written. Any error is recorded in the row, so one broken root never stops a batch.
+    """
+    # Imported here: the CLI imports this module to run batches.
+    from treegen.cli import export_file, hash_files, scan
+
+    started = time.perf_counter()
+    result = _empty_row(root, output)
+    written = False
+    try:
+        with metrics.timed("batch_root"):
+            if not os.path.isdir(root):
+                code = errno.ENOTDIR if os.path.exists(root) else errno.ENOENT
+                raise OSError(code, os.strerror(code), root)
+            descriptions = DescriptionStore(root).load()
+            snapshot = scan(
+                root, jobs=options.get("jobs", 1), use_cache=options.get("use_cache", False),
+                allocated=options.get("allocated", False), one_filesystem=options.get("one_filesystem", False),
+                archives=options.get("archives", False),
+            )
+            error = snapshot.error(ROOT_NODE)
+            if error != ERROR_NONE:
+                # The scanner records an unreadable root instead of raising; OSError picks the subclass.
+                code = errno.ENOENT if error == ERROR_NOT_FOUND else errno.EACCES
+                raise OSError(code, os.strerror(code), root)
+            view = snapshot.filtered(options.get("exclude_hidden", False), options.get("exclude_extensions"))
+            localization = Localization(options.get("language", DEFAULT_LANGUAGE))
+            budget = RenderBudget(
+                options.get("max_depth", 0), options.get("max_children", 0), options.get("order", "name")
+            )
+            output_format = options.get("format", "markdown")
+            checksums = None
+            if output_format == "manifest" or (output_format == "csv" and options.get("checksums")):
+                checksums = hash_files(view, options.get("jobs", 1), options.get("use_cache", False))
+            written = True
+            export_file(view, descriptions, output_format, output, localization, os.path.basename(root) or root,
+                        budget, checksums, options.get("statistics", False))
+            result.update(_visible_totals(view))
+    except Exception as error:
+        result["error"] = str(error) or type(error).__name__
+        if written:
+            # A partial export would look complete in the output folder.
+            try:
+                os.remove(output)
+            except OSError:
+                pass
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def _export_in_worker(root: str, output: str, options: dict) -> dict:
+    """:func:`export_root` in a pool process, returning that process's metrics with the row."""
+    metrics.reset()
+    result = export_root(root, output, options)
+    result["metrics"] = metrics.summary()
+    return result
+
+
+def run_batch(
+    roots: List[str],
+    output_dir: str,
+    options: dict,
+    processes: Optional[int] = None,
+    on_result: Optional[Callable[[dict], None]] = None,
+    cancel_event=None,
+) -> "tuple[List[dict], str]":
+    """
+    Export every root into ``output_dir`` and write the index; return ``(results, index_path)``.
+
+    ``options`` are those of :func:`export_root`. Up to ``processes`` roots (default: one per
+    CPU) are exported at the same time, each in its own process; with a single process the
+    roots are exported one after the other in this process. ``on_result`` is called with each
+    row as its root finishes. Setting ``cancel_event`` lets running roots finish and reports
+    the others as cancelled.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = output_paths(roots, output_dir, options.get("format", "markdown"))
+    processes = max(1, min(processes or os.cpu_count() or 1, len(roots) or 1))
+    results: List[Optional[dict]] = [None] * len(roots)
+    with metrics.timed("batch", roots=len(roots), processes=processes):
+        if processes == 1:
+            for index, (root, output) in enumerate(zip(roots, outputs)):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                results[index] = export_root(root, output, options)
+                if on_result is not None:
+                    on_result(results[index])
+        else:
+            _run_pool(roots, outputs, options, processes, results, on_result, cancel_event)
+    for index, result in enumerate(results):
+        if result is None:
+            results[index] = _empty_row(roots[index], outputs[index], "cancelled")
+    index_path = write_index(results, output_dir, options.get("format", "markdown"),
+                             options.get("language", DEFAULT_LANGUAGE))
+    return results, index_path
+
+
+def _run_pool(roots, outputs, options, processes, results, on_result, cancel_event):
+    # Imported here so that loading the module does not pull in concurrent.futures.
+    import multiprocessing
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    # Forking a process that runs scan threads (or Qt) is unsafe, so workers are always spawned.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        futures = {
+            executor.submit(_export_in_worker, root, output, options): index
+            for index, (root, output) in enumerate(zip(roots, outputs))
+        }
+        pending = set(futures)
+        while pending:
+            # Woken at least every second so that a cancellation is noticed.
+            done, pending = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures[future]
+                try:
+                    result = future.result()
+                except Exception as error:
+                    # The worker process died (for example out of memory) or the root broke pickling.
+                    result = _empty_row(roots[index], outputs[index], str(error) or type(error).__name__)
+                summary = result.pop("metrics", None)
+                if summary is not None:
+                    metrics.merge(summary)
+                results[index] = result
+                if on_result is not None:
+                    on_result(result)
+            if cancel_event is not None and cancel_event.is_set():
+                for future in pending:
+                    future.cancel()
+                pending = {future for future in pending if not future.cancelled()}
+
+
+def _markdown_cell(text) -> str:
+    return str(text).replace("\\", "\\\\").replace("|", "\\|").replace("\n", " ")
+
+
+def write_index(results: List[dict], output_dir: str, output_format: str, language: str = DEFAULT_LANGUAGE) -> str:
+    """
+    Write the index of a batch next to its exports and return its path: a CSV file for CSV
+    exports, inventories and manifests, else a localized Markdown table (``index.txt`` for
+    plain-text exports).
+    """
+    machine_readable = output_format in ("csv", "manifest") or output_format in INVENTORY_FORMATS
+    path = os.path.join(output_dir, INDEX_BASENAME + OUTPUT_SUFFIXES["csv" if machine_readable else output_format])
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        if machine_readable:
+            writer = csv.writer(handle)
+            writer.writerow(INDEX_CSV_HEADER)
+            for result in results:
+                writer.writerow([
+                    result["root"], "" if result["error"] else os.path.basename(result["output"]),
+                    result["folders"], result["files"], result["size"], result["unreadable"],
+                    result["seconds"], result["error"],
+                ])
+            return path
+        tr = Localization(language).tr
+        lines = [
+            tr("batch_index_title"),
+            "",
+            "| " + " | ".join(tr(key) for key in (
+                "batch_column_folder", "batch_column_output", "batch_column_folders", "batch_column_files",
+                "batch_column_size", "batch_column_status",
+            )) + " |",
+            "|---|---|---:|---:|---:|---|",
+        ]
+        failed = 0
+        total_size = 0
+        for result in results:
+            if result["error"]:
+                failed += 1
+                output = ""
+                status = tr("batch_status_failed", error=result["error"])
+            else:
+                total_size += result["size"]
+                name = os.path.basename(result["output"])
+                output = _markdown_cell(name)
+                if output_format == "markdown":
+                    output = f"[{output}](<{name}>)"
+                if result["unreadable"]:
+                    status = tr("batch_status_unreadable", count=result["unreadable"])
+                else:
+                    status = tr("batch_status_ok")
+            cells = [
+                _markdown_cell(result["root"]), output, str(result["folders"]), str(result["files"]),
+                naturalsize(result["size"]), _markdown_cell(status),
+            ]
+            lines.append("| " + " | ".join(cells) + " |")
+        lines.extend([
+            "",
+            "---",
+            tr("summary_heading"),
+            tr("batch_summary_exported", count=len(results) - failed, total=len(results)),
+            tr("batch_summary_failed", count=failed),
+            tr("summary_total_size", size=naturalsize(total_size)),
+        ])
+        handle.write("\n".join(lines) + "\n")
+    return path
+
+
+__all__ = [
+    "INDEX_BASENAME",
+    "INDEX_CSV_HEADER",
+    "OUTPUT_SUFFIXES",
+    "expand_roots",
+    "export_root",
+    "output_paths",
+    "run_batch",
+    "write_index",
+]
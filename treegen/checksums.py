@@ -0,0 +1,258 @@
+"""
+Fixity checksums of the files in a scan, for deposit manifests and the CSV export.
+
+:func:`compute_checksums` hashes the visible files of a :class:`~treegen.scanner.FilteredView`
+with SHA-256, in the depth-first order of the CSV export. Files are read in blocks of
+:data:`READ_SIZE` into one reused buffer per read; ``hashlib`` releases the GIL while it digests
+a block, so with ``workers`` greater than one several files are read and hashed at once on a
+bounded thread pool, as the scanner lists directories.
+
+A :class:`ChecksumCache` remembers the digest of every file by its path relative to the root,
+together with the size and ``st_mtime_ns`` it had when it was read. Each file is stat'ed before
+it is opened and only read again when either changed, so re-exporting a large deposit only
+hashes the files that changed since. Caches are stored next to the scan snapshots.
+
+:func:`iter_manifest_lines` writes the result as a BagIt ``manifest-sha256.txt`` (RFC 8493),
+treating the scanned folder as the bag's ``data/`` payload directory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from treegen.instrumentation import metrics
+from treegen.scan_cache import cache_path_for
+from treegen.scanner import FLAG_DIR, PREFETCH_PER_WORKER, RACY_MTIME_WINDOW_NS, ROOT_NODE, FilteredView
+
+CHECKSUM_ALGORITHM = "sha256"
+CHECKSUM_CACHE_VERSION = 1
+MANIFEST_FILENAME = f"manifest-{CHECKSUM_ALGORITHM}.txt"
+PAYLOAD_PREFIX = "data/"
+READ_SIZE = 1 << 20
+
+# BagIt paths escape the characters that would break a manifest line.
+_MANIFEST_ESCAPES = str.maketrans({"%": "%25", "\n": "%0A", "\r": "%0D"})
+
+
+class ChecksumCancelled(Exception):
+    """Raised by :func:`compute_checksums` when its cancel event is set."""
+
+
+class ChecksumCache:
+    """
+    Digests of the files under ``root`` by ``/``-separated relative path, each valid while the
+    file keeps the ``(size, mtime_ns)`` stored with it.
+    """
+
+    def __init__(self, root) -> None:
+        self.root = os.path.abspath(os.fspath(root))
+        self.entries: Dict[str, Tuple[int, int, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, path: str, size: int, mtime_ns: int) -> Optional[str]:
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == size and entry[1] == mtime_ns:
+            return entry[2]
+        return None
+
+
+def checksum_cache_path(root, cache_dir: Optional[str] = None) -> str:
+    """Return the checksum cache used for ``root``, next to its scan snapshot."""
+    return cache_path_for(root, cache_dir, suffix=f".{CHECKSUM_ALGORITHM}")
+
+
+def load_checksum_cache(path: str, root) -> ChecksumCache:
+    """
+    Read a cache written by :func:`save_checksum_cache`. Raises ``ValueError`` when the file is
+    corrupt, from another format version or belongs to a different directory.
+    """
+    with open(path, encoding="utf-8") as handle:
+        try:
+            data = json.load(handle)
+        except ValueError:
+            raise ValueError(f"{path} is not a TreeGen checksum cache") from None
+    cache = ChecksumCache(root)
+    if not isinstance(data, dict) or data.get("version") != CHECKSUM_CACHE_VERSION \
+            or data.get("algorithm") != CHECKSUM_ALGORITHM:
+        raise ValueError(f"{path} was written by an incompatible TreeGen version")
+    if os.path.normcase(data.get("root", "")) != os.path.normcase(cache.root):
+        raise ValueError(f"{path} belongs to {data.get('root')}")
+    cache.entries = {name: tuple(entry) for name, entry in data["files"].items()}
+    return cache
+
+
+def save_checksum_cache(cache: ChecksumCache, path: str) -> None:
+    """Write ``cache`` to ``path`` atomically (through a temporary file and ``os.replace``)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump({
+                "version": CHECKSUM_CACHE_VERSION, "algorithm": CHECKSUM_ALGORITHM, "root": cache.root,
+                "files": cache.entries,
+            }, handle, separators=(",", ":"))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def iter_files(view: FilteredView) -> Iterator[Tuple[int, str]]:
+    """Yield ``(node, relative path)`` for every visible file of ``view``, depth first, with ``/`` separators."""
+    snapshot = view.snapshot
+    flags = snapshot.flags
+    stack = [(iter(view.children(ROOT_NODE)), "")]
+    while stack:
+        children, prefix = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            continue
+        path = prefix + snapshot.name(child)
+        if flags[child] & FLAG_DIR:
+            stack.append((iter(view.children(child)), path + "/"))
+        else:
+            yield child, path
+
+
+def _digest(path: str, cached: Optional[ChecksumCache], relative_path: str):
+    """``(size, mtime_ns, hex digest, bytes read)`` of one file; bytes read is None for a cached digest."""
+    stat_result = os.stat(path)
+    if cached is not None:
+        digest = cached.lookup(relative_path, stat_result.st_size, stat_result.st_mtime_ns)
+        if digest is not None:
+            return stat_result.st_size, stat_result.st_mtime_ns, digest, None
+    hasher = hashlib.new(CHECKSUM_ALGORITHM)
+    buffer = bytearray(min(READ_SIZE, max(stat_result.st_size, 1)))
+    data = memoryview(buffer)
+    read = 0
+    with open(path, "rb", buffering=0) as handle:
+        while True:
+            count = handle.readinto(buffer)
+            if not count:
+                break
+            hasher.update(data[:count])
+            read += count
+    return stat_result.st_size, stat_result.st_mtime_ns, hasher.hexdigest(), read
+
+
+def compute_checksums(
+    view: FilteredView,
+    workers: int = 1,
+    cache: Optional[ChecksumCache] = None,
+    on_progress: Optional[Callable[[int, int, int], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    failed: Optional[List[str]] = None,
+) -> Dict[int, str]:
+    """
+    Return the hex SHA-256 digest of every visible file of ``view``, by node id.
+
+    Files that cannot be read are left out; their relative paths are appended to ``failed``.
+    With a ``cache``, files whose size and mtime match it are not read, and the cache is then
+    replaced by the digests of this run; digests of files modified in the last
+    :data:`~treegen.scanner.RACY_MTIME_WINDOW_NS` are not kept, since a later write in the same
+    timestamp tick would go unnoticed. ``on_progress(done, total, bytes_read)`` is called after
+    each file. Setting ``cancel_event`` stops before the next file and raises
+    :class:`ChecksumCancelled`.
+    """
+    root = view.snapshot.root
+    files = list(iter_files(view))
+    entries = {}
+    digests: Dict[int, str] = {}
+    started_ns = time.time_ns()
+    read_total = hashed = cached = errors = 0
+
+    def task(relative_path):
+        return _digest(os.path.join(root, *relative_path.split("/")), cache, relative_path)
+
+    with metrics.timed("checksums", files=len(files), workers=workers):
+        executor = None
+        if workers > 1:
+            # Imported here so that loading the module does not pull in concurrent.futures.
+            from concurrent.futures import ThreadPoolExecutor
+
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="treegen-checksum")
+        try:
+            in_flight = deque()
+            window = workers * PREFETCH_PER_WORKER
+            submitted = 0
+            for done, (node, relative_path) in enumerate(files, 1):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ChecksumCancelled(root)
+                try:
+                    if executor is not None:
+                        while submitted < len(files) and len(in_flight) < window:
+                            in_flight.append(executor.submit(task, files[submitted][1]))
+                            submitted += 1
+                        size, mtime_ns, digest, read = in_flight.popleft().result()
+                    else:
+                        size, mtime_ns, digest, read = task(relative_path)
+                except OSError:
+                    errors += 1
+                    if failed is not None:
+                        failed.append(relative_path)
+                else:
+                    digests[node] = digest
+                    if read is None:
+                        cached += 1
+                    else:
+                        hashed += 1
+                        read_total += read
+                    if mtime_ns < started_ns - RACY_MTIME_WINDOW_NS:
+                        entries[relative_path] = (size, mtime_ns, digest)
+                if on_progress is not None:
+                    on_progress(done, len(files), read_total)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+    metrics.add(files_hashed=hashed, bytes_hashed=read_total, checksums_cached=cached,
+                checksum_errors=errors)
+    if cache is not None:
+        cache.entries = entries
+    return digests
+
+
+def iter_manifest_lines(view: FilteredView, checksums: Dict[int, str], prefix: str = PAYLOAD_PREFIX) -> Iterator[str]:
+    """Yield one ``"<digest>  <prefix><path>"`` manifest line per file with a checksum, depth first."""
+    for node, path in iter_files(view):
+        digest = checksums.get(node)
+        if digest is not None:
+            yield f"{digest}  {prefix}{path.translate(_MANIFEST_ESCAPES)}"
+
+
+def write_manifest(view: FilteredView, checksums: Dict[int, str], handle, prefix: str = PAYLOAD_PREFIX) -> None:
+    """Write the BagIt manifest of ``view`` to the text ``handle``, one line per file."""
+    written = 0
+    for line in iter_manifest_lines(view, checksums, prefix):
+        handle.write(line + "\n")
+        written += 1
+    metrics.add(lines_exported=written)
+
+
+__all__ = [
+    "CHECKSUM_ALGORITHM",
+    "CHECKSUM_CACHE_VERSION",
+    "ChecksumCache",
+    "ChecksumCancelled",
+    "MANIFEST_FILENAME",
+    "PAYLOAD_PREFIX",
+    "READ_SIZE",
+    "checksum_cache_path",
+    "compute_checksums",
+    "iter_files",
+    "iter_manifest_lines",
+    "load_checksum_cache",
+    "save_checksum_cache",
+    "write_manifest",
+]
@@ -0,0 +1,419 @@
+"""
+Headless tree generation for scheduled jobs and machines without a display.
+
+Scans a directory with the same scanner, filters and renderers as the GUI, reads the
+descriptions stored at its root (``.descriptions.json`` and its journal) and writes the
+Markdown, plain-text or CSV export, an NDJSON, Parquet or NumPy inventory for analysis tools, or
+a BagIt SHA-256 manifest for repository deposits. ``--save-snapshot`` keeps the scan, and
+``--compare`` writes what was added, removed, resized or modified since such a snapshot instead
+of the tree. Qt is never imported.
+
+    python -m treegen /data/project -o tree.md --exclude-hidden --exclude-ext .log,.tmp --jobs 16
+    python -m treegen /data/project --compare v1.snapshot -o changes.md --save-snapshot v2.snapshot
+
+Given several directories, a quoted glob or ``--output-dir``, every directory is exported into
+the output folder by a pool of processes, followed by an index of the batch. ``@FILE`` reads
+further arguments, such as a list of directories, one per line.
+
+    python -m treegen "/data/datasets/*" --output-dir trees --processes 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import sys
+from contextlib import contextmanager
+
+from treegen.batch import expand_roots, run_batch
+from treegen.checksums import (
+    ChecksumCache, checksum_cache_path, compute_checksums, load_checksum_cache, save_checksum_cache, write_manifest
+)
+from treegen.descriptions import DescriptionStore, load_descriptions
+from treegen.instrumentation import format_summary, metrics
+from treegen.inventory import INVENTORY_FORMATS, have_pyarrow, write_inventory, write_ndjson
+from treegen.localization import AVAILABLE_LANGUAGES, DEFAULT_LANGUAGE, Localization
+from treegen.rendering import (
+    CSV_CHECKSUM_HEADER, CSV_HEADER, DIFF_CSV_HEADER, RenderBudget, iter_csv_rows, iter_diff_csv_rows, iter_diff_lines,
+    iter_markdown_lines, write_lines
+)
+from treegen.scan_cache import cache_path_for, load_snapshot, save_snapshot
+from treegen.scanner import scan_directory
+
+DEFAULT_JOBS = 8
+EXPORT_BUFFER_SIZE = 1 << 20
+
+FORMATS = ("markdown", "text", "csv") + INVENTORY_FORMATS + ("manifest",)
+# Written to a file by path rather than streamed to a text handle.
+BINARY_FORMATS = ("parquet", "npz")
+_FORMAT_BY_SUFFIX = {
+    ".md": "markdown", ".markdown": "markdown", ".txt": "text", ".csv": "csv",
+    ".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet", ".npz": "npz",
+}
+
+
+def parse_extensions(text):
+    """Split a comma-separated list such as ``".log, .TMP"`` the way the GUI filter box does."""
+    return [ext.strip().lower() for ext in (text or "").split(",") if ext.strip()]
+
+
+def scan(root, jobs=1, use_cache=False, allocated=False, one_filesystem=False, archives=False):
+    """
+    Scan ``root``, reusing and refreshing its cached snapshot when ``use_cache`` is set.
+    ``allocated``, ``one_filesystem`` and ``archives`` are passed to
+    :func:`~treegen.scanner.scan_directory`.
+    """
+    cache_path = cache_path_for(root) if use_cache else None
+    previous = None
+    if cache_path is not None:
+        try:
+            previous = load_snapshot(cache_path, root=root)
+        except (OSError, ValueError):
+            previous = None
+    snapshot = scan_directory(
+        root, workers=jobs, previous=previous, allocated=allocated, one_filesystem=one_filesystem,
+        archives=archives,
+    )
+    if cache_path is not None:
+        try:
+            save_snapshot(snapshot, cache_path)
+        except OSError:
+            pass
+    return snapshot
+
+
+def hash_files(view, jobs=1, use_cache=False, failed=None):
+    """
+    SHA-256 digests of the visible files of ``view`` by node id, reusing and refreshing the
+    checksum cache of its root when ``use_cache`` is set. Unreadable files are appended to ``failed``.
+    """
+    root = view.snapshot.root
+    cache_path = checksum_cache_path(root) if use_cache else None
+    cache = None
+    if cache_path is not None:
+        try:
+            cache = load_checksum_cache(cache_path, root)
+        except (OSError, ValueError):
+            cache = ChecksumCache(root)
+    checksums = compute_checksums(view, workers=jobs, cache=cache, failed=failed)
+    if cache_path is not None:
+        try:
+            save_checksum_cache(cache, cache_path)
+        except OSError:
+            pass
+    return checksums
+
+
+def export(
+    view, descriptions, output_format, handle, localization, root_name, budget=None, checksums=None, statistics=False
+):
+    """
+    Write one export to a text ``handle``; ``budget`` bounds the Markdown/text tree, while CSV
+    and NDJSON always list every entry. ``checksums`` (from :func:`hash_files`) add a column to
+    the CSV export and are required by the manifest. ``statistics`` appends the statistics
+    section to Markdown/text. :data:`BINARY_FORMATS` go through :func:`export_file`.
+    """
+    with metrics.timed("export", format=output_format):
+        if output_format == "csv":
+            writer = csv.writer(handle)
+            writer.writerow(CSV_HEADER if checksums is None else CSV_HEADER + [CSV_CHECKSUM_HEADER])
+            writer.writerows(iter_csv_rows(view, descriptions, checksums))
+        elif output_format == "ndjson":
+            write_ndjson(view, descriptions, handle)
+        elif output_format == "manifest":
+            write_manifest(view, checksums, handle)
+        else:
+            write_lines(handle, iter_markdown_lines(
+                view, descriptions, localization.tr, root_name, budget, statistics
+            ))
+
+
+def export_file(
+    view, descriptions, output_format, path, localization, root_name, budget=None, checksums=None, statistics=False
+):
+    """:func:`export` into the file ``path``, for every format."""
+    if output_format in INVENTORY_FORMATS:
+        write_inventory(view, descriptions, output_format, path)
+        return
+    with open(path, "w", newline="", encoding="utf-8", buffering=EXPORT_BUFFER_SIZE) as handle:
+        export(view, descriptions, output_format, handle, localization, root_name, budget, checksums, statistics)
+
+
+def export_changes(old_view, new_view, output_format, handle, localization, root_name):
+    """
+    Write the changes from ``old_view`` (a saved snapshot) to ``new_view`` to a text ``handle``,
+    as a Markdown/text report or as CSV rows.
+    """
+    with metrics.timed("export", format=output_format):
+        if output_format == "csv":
+            writer = csv.writer(handle)
+            writer.writerow(DIFF_CSV_HEADER)
+            writer.writerows(iter_diff_csv_rows(old_view, new_view))
+        else:
+            write_lines(handle, iter_diff_lines(old_view, new_view, localization.tr, root_name))
+
+
+@contextmanager
+def _open_output(path):
+    if path in (None, "-"):
+        yield sys.stdout
+        return
+    with open(path, "w", newline="", encoding="utf-8", buffering=EXPORT_BUFFER_SIZE) as handle:
+        yield handle
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="treegen", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+        fromfile_prefix_chars="@",
+    )
+    parser.add_argument(
+        "directory", nargs="+", help="Directory to describe; several directories or a quoted glob run a batch"
+    )
+    parser.add_argument("-o", "--output", help="Output file (default: standard output)")
+    parser.add_argument(
+        "--output-dir", metavar="DIR", help="Write one export per directory and an index into DIR (batch mode)"
+    )
+    parser.add_argument(
+        "-p", "--processes", type=int,
+        help="Directories exported at the same time in batch mode (default: one per CPU)",
+    )
+    parser.add_argument(
+        "-f", "--format", choices=FORMATS,
+        help="Output format (default: from the output file extension, else markdown); ndjson, parquet "
+        "and npz write an inventory of every entry for analysis tools, manifest a BagIt manifest-sha256.txt",
+    )
+    parser.add_argument(
+        "--checksums", action="store_true",
+        help="Add the SHA-256 of every file to the CSV export; files are read --jobs at a time",
+    )
+    parser.add_argument(
+        "--statistics", action="store_true",
+        help="Append files and bytes per extension, a file size histogram and the largest folders "
+        "to the markdown and text formats",
+    )
+    parser.add_argument("--exclude-hidden", action="store_true", help="Leave out hidden files and folders")
+    parser.add_argument(
+        "--exclude-ext", default="", metavar="EXTS", help="Comma-separated extensions to leave out, e.g. .log,.tmp"
+    )
+    parser.add_argument(
+        "--max-depth", type=int, default=0, metavar="N",
+        help="List folders at most N levels deep and summarize deeper contents in one line (default: no limit)",
+    )
+    parser.add_argument(
+        "--max-children", type=int, default=0, metavar="N",
+        help="List at most N entries per folder and summarize the others in one line (default: no limit)",
+    )
+    parser.add_argument(
+        "--order", choices=RenderBudget.ORDERS, default="name",
+        help="Entries kept by --max-children: the first by name or the largest (default: name)",
+    )
+    parser.add_argument(
+        "--descriptions", metavar="FILE",
+        help="Descriptions JSON file; relative keys are resolved against the directory "
+        "(default: the descriptions stored in the directory)",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=DEFAULT_JOBS, help=f"Directories listed in parallel (default: {DEFAULT_JOBS})"
+    )
+    parser.add_argument(
+        "-x", "--one-file-system", action="store_true",
+        help="Do not enter folders on other filesystems than the directory's, such as mounted drives",
+    )
+    parser.add_argument(
+        "--allocated", action="store_true",
+        help="Size files by the disk space allocated to them (st_blocks) instead of their length",
+    )
+    parser.add_argument(
+        "--archives", action="store_true",
+        help="List the contents of .zip and .tar (.gz, .bz2, .xz) files below them, read from their "
+        "index without extracting anything",
+    )
+    parser.add_argument(
+        "--cache", action="store_true",
+        help="Reuse the scan and checksum caches shared with the GUI; only changed folders are rescanned "
+        "and only changed files hashed again",
+    )
+    parser.add_argument(
+        "--save-snapshot", metavar="FILE", help="Save the scan to FILE, to compare later versions with it"
+    )
+    parser.add_argument(
+        "--compare", metavar="SNAPSHOT",
+        help="Write the entries added, removed, resized or modified since SNAPSHOT (from --save-snapshot "
+        "or the GUI) instead of the tree, as markdown, text or csv; the filters apply to both scans",
+    )
+    parser.add_argument("--language", choices=tuple(AVAILABLE_LANGUAGES), default=DEFAULT_LANGUAGE)
+    parser.add_argument(
+        "--stats", action="store_true", help="Print phase timings and syscall counters to standard error"
+    )
+    parser.add_argument(
+        "--trace", metavar="FILE", help="Write a JSON trace of every timed phase (Chrome trace-event format)"
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.processes is not None and args.processes < 1:
+        parser.error("--processes must be at least 1")
+    if args.max_depth < 0 or args.max_children < 0:
+        parser.error("--max-depth and --max-children cannot be negative")
+    if args.checksums and _output_format(args) != "csv":
+        parser.error("--checksums applies to the csv format; use --format manifest for a manifest")
+    if args.statistics and _output_format(args) not in ("markdown", "text"):
+        parser.error("--statistics applies to the markdown and text formats")
+    if args.compare and _output_format(args) not in ("markdown", "text", "csv"):
+        parser.error("--compare writes the markdown, text and csv formats")
+    if args.compare and (args.checksums or args.statistics):
+        parser.error("--checksums and --statistics do not apply to --compare")
+    if (args.format == "parquet" or (args.output or "").lower().endswith(".parquet")) and not have_pyarrow():
+        parser.error("the parquet format needs pyarrow; install it or use --format npz")
+    roots = expand_roots(args.directory)
+    if not roots:
+        parser.error(f"no directory matches {' '.join(args.directory)}")
+    if args.trace:
+        metrics.tracing = True
+
+    if args.output_dir or len(roots) > 1:
+        if not args.output_dir:
+            parser.error("several directories need --output-dir")
+        if args.output or args.descriptions or args.compare or args.save_snapshot:
+            parser.error("--output, --descriptions, --compare and --save-snapshot apply to a single directory")
+        status = _export_batch(args, roots)
+    else:
+        if not os.path.isdir(roots[0]):
+            parser.error(f"not a directory: {args.directory[0]}")
+        if args.format in BINARY_FORMATS and args.output in (None, "-"):
+            parser.error(f"the {args.format} format needs an output file (-o FILE)")
+        status = _export_directory(args, roots[0])
+    if args.stats:
+        print("\n".join(format_summary(metrics.summary())), file=sys.stderr)
+    if args.trace:
+        try:
+            metrics.write_trace(args.trace)
+        except OSError as error:
+            print(f"treegen: cannot write {args.trace}: {error}", file=sys.stderr)
+            return 1
+    return status
+
+
+def _output_format(args):
+    return args.format or _FORMAT_BY_SUFFIX.get(os.path.splitext(args.output or "")[1].lower(), "markdown")
+
+
+def _export_directory(args, root):
+    output_format = _output_format(args)
+    try:
+        if args.descriptions:
+            descriptions = load_descriptions(args.descriptions, root)
+        else:
+            descriptions = DescriptionStore(root).load()
+    except (OSError, ValueError) as error:
+        print(f"treegen: cannot read descriptions: {error}", file=sys.stderr)
+        return 1
+    snapshot = scan(
+        root, jobs=args.jobs, use_cache=args.cache, allocated=args.allocated, one_filesystem=args.one_file_system,
+        archives=args.archives,
+    )
+    if args.save_snapshot:
+        try:
+            save_snapshot(snapshot, args.save_snapshot)
+        except OSError as error:
+            print(f"treegen: cannot write {args.save_snapshot}: {error}", file=sys.stderr)
+            return 1
+    excluded = parse_extensions(args.exclude_ext)
+    view = snapshot.filtered(args.exclude_hidden, excluded)
+    root_name = os.path.basename(root) or root
+    localization = Localization(args.language)
+    if args.compare:
+        try:
+            previous = load_snapshot(args.compare)
+        except (OSError, ValueError) as error:
+            print(f"treegen: cannot read {args.compare}: {error}", file=sys.stderr)
+            return 1
+        try:
+            with _open_output(args.output) as handle:
+                export_changes(
+                    previous.filtered(args.exclude_hidden, excluded), view, output_format, handle, localization,
+                    root_name,
+                )
+        except OSError as error:
+            print(f"treegen: cannot write {args.output}: {error}", file=sys.stderr)
+            return 1
+        return 0
+    budget = RenderBudget(args.max_depth, args.max_children, args.order)
+    checksums = None
+    unreadable = []
+    if output_format == "manifest" or args.checksums:
+        checksums = hash_files(view, args.jobs, args.cache, unreadable)
+    try:
+        if output_format in BINARY_FORMATS:
+            export_file(view, descriptions, output_format, args.output, localization, root_name, budget)
+        else:
+            with _open_output(args.output) as handle:
+                export(
+                    view, descriptions, output_format, handle, localization, root_name, budget, checksums,
+                    args.statistics,
+                )
+    except (OSError, ValueError) as error:
+        print(f"treegen: cannot write {args.output}: {error}", file=sys.stderr)
+        return 1
+    if unreadable:
+        # The export is still written, but a manifest missing files must not pass unnoticed.
+        for path in unreadable:
+            print(f"treegen: cannot read {path}; it has no checksum", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _report(result):
+    if result["error"]:
+        print(f"treegen: {result['root']}: {result['error']}", file=sys.stderr)
+    else:
+        print(f"treegen: {result['root']} -> {result['output']}", file=sys.stderr)
+
+
+def _export_batch(args, roots):
+    options = {
+        "format": args.format or "markdown",
+        "exclude_hidden": args.exclude_hidden,
+        "exclude_extensions": parse_extensions(args.exclude_ext),
+        "language": args.language,
+        "max_depth": args.max_depth,
+        "max_children": args.max_children,
+        "order": args.order,
+        "jobs": args.jobs,
+        "use_cache": args.cache,
+        "allocated": args.allocated,
+        "one_filesystem": args.one_file_system,
+        "archives": args.archives,
+        "checksums": args.checksums,
+        "statistics": args.statistics,
+    }
+    try:
+        results, index_path = run_batch(roots, args.output_dir, options, args.processes, on_result=_report)
+    except OSError as error:
+        print(f"treegen: cannot write {args.output_dir}: {error}", file=sys.stderr)
+        return 1
+    failed = sum(1 for result in results if result["error"])
+    print(f"treegen: index written to {index_path}", file=sys.stderr)
+    if failed:
+        print(f"treegen: {failed} of {len(results)} directories could not be exported", file=sys.stderr)
+        return 1
+    return 0
+
+
+__all__ = [
+    "build_parser",
+    "export",
+    "export_changes",
+    "export_file",
+    "hash_files",
+    "main",
+    "parse_extensions",
+    "scan",
+]
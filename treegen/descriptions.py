@@ -0,0 +1,191 @@
+"""
+Storage of the per-entry descriptions kept at the root of a described folder.
+
+``.descriptions.json`` holds a compacted copy of the descriptions and ``.descriptions.journal``
+the edits made since, one JSON record per line. On disk, entries are keyed by their path
+relative to the root with "/" separators, so a folder keeps its descriptions when it is moved or
+opened from another machine. In memory they are keyed by absolute path, as the tree model and
+the renderers expect. Absolute keys written by earlier versions are still read: keys under the
+root are taken as they are, and keys from a folder that has since been moved are re-rooted on
+the folder's name.
+
+:class:`DescriptionStore` appends each edit to the journal instead of rewriting the whole file,
+and folds the journal back into ``.descriptions.json`` with an atomic replace once the journal
+holds more records than the compacted copy, so an edit costs O(1) amortised.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Dict, List
+
+from treegen.instrumentation import metrics
+
+DESCRIPTIONS_FILENAME = ".descriptions.json"
+JOURNAL_FILENAME = ".descriptions.journal"
+
+_SEPARATORS = re.compile(r"[\\/]")
+
+
+def descriptions_path(root) -> str:
+    return os.path.join(os.fspath(root), DESCRIPTIONS_FILENAME)
+
+
+def journal_path(root) -> str:
+    return os.path.join(os.fspath(root), JOURNAL_FILENAME)
+
+
+def _relative_key(path: str, root: str) -> str:
+    """The on-disk key of ``path``: relative to ``root`` with "/" separators, else unchanged."""
+    try:
+        relative = os.path.relpath(path, root)
+    except ValueError:
+        # Another drive on Windows.
+        return path
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep) or os.path.isabs(relative):
+        return path
+    return relative.replace(os.sep, "/")
+
+
+def _absolute_path(key: str, root: str) -> str:
+    """The in-memory key of an on-disk ``key``; see the module docstring for absolute keys."""
+    if not (os.path.isabs(key) or _SEPARATORS.match(key) or re.match(r"[A-Za-z]:[\\/]", key)):
+        return os.path.join(root, *key.split("/"))
+    normalized = os.path.normpath(key)
+    if normalized == root or normalized.startswith(os.path.join(root, "")):
+        return normalized
+    parts = [part for part in _SEPARATORS.split(key) if part]
+    name = os.path.basename(root)
+    if name in parts:
+        last = len(parts) - 1 - parts[::-1].index(name)
+        return os.path.join(root, *parts[last + 1:])
+    return key
+
+
+def load_descriptions(path, root=None) -> Dict[str, str]:
+    """
+    Return the descriptions stored in ``path`` keyed by absolute path, or an empty mapping when
+    there is no file. Relative keys are resolved against ``root`` (default: the file's folder).
+    """
+    if not os.path.exists(path):
+        return {}
+    root = os.path.abspath(root if root is not None else os.path.dirname(os.path.abspath(path)))
+    with open(path, "r", encoding="utf-8") as handle:
+        stored = json.load(handle)
+    return {_absolute_path(key, root): description for key, description in stored.items()}
+
+
+def save_descriptions(path, descriptions: Dict[str, str], root=None) -> None:
+    """
+    Write ``descriptions`` to ``path`` with keys relative to ``root`` (default: the file's
+    folder). The file is written next to its destination and renamed over it, so readers see
+    either the old or the new copy.
+    """
+    root = os.path.abspath(root if root is not None else os.path.dirname(os.path.abspath(path)))
+    stored = {_relative_key(key, root): description for key, description in descriptions.items() if description}
+    temporary = f"{path}.tmp"
+    with metrics.timed("description_save"):
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(stored, handle, indent=4, ensure_ascii=False)
+        os.replace(temporary, path)
+
+
+class DescriptionStore:
+    """
+    The descriptions of one folder, with edits journaled and compacted.
+
+    :meth:`load` returns the mapping shared with the GUI; :meth:`set` records one edit,
+    :meth:`flush` appends the recorded edits to the journal in a single write, and :meth:`close`
+    flushes and compacts.
+    """
+
+    # The journal is only folded back once it holds at least this many records.
+    MIN_COMPACT_RECORDS = 256
+
+    def __init__(self, root) -> None:
+        self.root = os.path.abspath(os.fspath(root))
+        self.path = descriptions_path(self.root)
+        self.journal = journal_path(self.root)
+        self.descriptions: Dict[str, str] = {}
+        self._pending: List[str] = []
+        self._journal_records = 0
+        # A journal whose last record was cut short gets a newline before the next append.
+        self._journal_torn = False
+
+    def load(self) -> Dict[str, str]:
+        descriptions = load_descriptions(self.path, self.root)
+        records = 0
+        torn = False
+        if os.path.exists(self.journal):
+            with open(self.journal, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    torn = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                        path = _absolute_path(record["path"], self.root)
+                        description = record["description"]
+                    except (ValueError, KeyError, TypeError):
+                        # A record cut short by a crash; the edits before it are kept.
+                        continue
+                    if description:
+                        descriptions[path] = description
+                    else:
+                        descriptions.pop(path, None)
+                    records += 1
+        self.descriptions = descriptions
+        self._pending = []
+        self._journal_records = records
+        self._journal_torn = torn
+        return descriptions
+
+    def set(self, path: str, description: str) -> None:
+        """Record the description of ``path``; an empty one removes it."""
+        if description:
+            self.descriptions[path] = description
+        else:
+            self.descriptions.pop(path, None)
+        record = {"path": _relative_key(path, self.root), "description": description}
+        self._pending.append(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def flush(self) -> None:
+        """Append the edits recorded since the last flush, then compact if the journal is due."""
+        if self._pending:
+            data = "".join(self._pending)
+            if self._journal_torn:
+                data = "\n" + data
+            with metrics.timed("description_journal"), open(self.journal, "a", encoding="utf-8") as handle:
+                handle.write(data)
+            metrics.add(description_records=len(self._pending))
+            self._journal_records += len(self._pending)
+            self._journal_torn = False
+            self._pending = []
+        if self._journal_records >= max(self.MIN_COMPACT_RECORDS, len(self.descriptions)):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite ``.descriptions.json`` from memory and drop the journal."""
+        save_descriptions(self.path, self.descriptions, self.root)
+        self._pending = []
+        # Replaying a journal that outlived a crash here would only repeat the same edits.
+        if os.path.exists(self.journal):
+            os.remove(self.journal)
+        self._journal_records = 0
+        self._journal_torn = False
+
+    def close(self) -> None:
+        self.flush()
+        if self._journal_records:
+            self.compact()
+
+
+__all__ = [
+    "DESCRIPTIONS_FILENAME",
+    "DescriptionStore",
+    "JOURNAL_FILENAME",
+    "descriptions_path",
+    "journal_path",
+    "load_descriptions",
+    "save_descriptions",
+]
@@ -0,0 +1,235 @@
+"""
+Changes between two scans of a dataset, such as two versions of a deposit.
+
+A scan is saved with :func:`~treegen.scan_cache.save_snapshot` and loaded again with
+:func:`~treegen.scan_cache.load_snapshot`, whatever its root, so a snapshot taken before an
+update can be compared with the current tree or with a copy elsewhere. :func:`iter_changes`
+walks both trees at once. The children of every directory are stored sorted by
+``(name.lower(), name)``, so the two listings of a folder present in both scans are merged like
+sorted lists, and the walk only descends into folders present in both (or, for an added or
+removed folder, into that side alone). Memory stays in the order of the widest folder times the
+depth, instead of a set of every path of either scan.
+
+Every entry that is only in the newer scan is ``added`` and every entry only in the older one is
+``removed``; the contents of added and removed folders are listed too. A file present in both is
+``resized`` when its size changed and ``modified`` when only its mtime did. Folders present in
+both are not reported themselves. An entry that changed type is removed, then added. Archive
+members are compared when both scans list them.
+
+:class:`SnapshotComparison` marks those changes on the nodes of the newer snapshot for the GUI
+tree; the Markdown and CSV reports are written by :mod:`treegen.rendering`.
+"""
+
+from __future__ import annotations
+
+import threading
+from itertools import chain
+from typing import Iterator, NamedTuple, Optional
+
+from treegen.instrumentation import metrics
+from treegen.scanner import FLAG_DIR, FLAG_UNLISTED, ROOT_NODE, FilteredView, ScanSnapshot
+
+CHANGE_ADDED = "added"
+CHANGE_REMOVED = "removed"
+CHANGE_RESIZED = "resized"
+CHANGE_MODIFIED = "modified"
+CHANGE_KINDS = (CHANGE_ADDED, CHANGE_REMOVED, CHANGE_RESIZED, CHANGE_MODIFIED)
+
+# Marks of SnapshotComparison.status, one byte per node of the newer snapshot.
+STATUS_UNCHANGED = 0
+STATUS_ADDED = 1
+STATUS_RESIZED = 2
+STATUS_MODIFIED = 3
+STATUS_CHANGED_BELOW = 4
+
+_STATUS_BY_KIND = {CHANGE_ADDED: STATUS_ADDED, CHANGE_RESIZED: STATUS_RESIZED, CHANGE_MODIFIED: STATUS_MODIFIED}
+
+# The cancel event is checked every this many compared entries.
+CANCEL_CHECK_INTERVAL = 4096
+
+
+class ComparisonCancelled(Exception):
+    """Raised by :func:`iter_changes` when its cancel event is set."""
+
+
+class Change(NamedTuple):
+    """
+    One change: ``old_node`` and ``new_node`` are the entry's ids in the older and newer
+    snapshots (-1 on the side it is missing from). ``parent`` is the folder of the newer snapshot
+    it was found in; for the contents of a removed folder, the closest folder that still exists.
+    """
+
+    kind: str
+    old_node: int
+    new_node: int
+    parent: int
+
+
+class ChangeTotals:
+    """
+    Entries and bytes of every kind of change: ``counts[kind]`` is ``[folders, files, old
+    bytes, new bytes]``, where bytes are file sizes before and after the change.
+    """
+
+    __slots__ = ("counts",)
+
+    def __init__(self) -> None:
+        self.counts = {kind: [0, 0, 0, 0] for kind in CHANGE_KINDS}
+
+    def add(self, change: Change, old: ScanSnapshot, new: ScanSnapshot) -> None:
+        counts = self.counts[change.kind]
+        snapshot, node = (old, change.old_node) if change.new_node < 0 else (new, change.new_node)
+        if snapshot.flags[node] & FLAG_DIR:
+            counts[0] += 1
+            return
+        counts[1] += 1
+        if change.old_node >= 0:
+            counts[2] += old.sizes[change.old_node]
+        if change.new_node >= 0:
+            counts[3] += new.sizes[change.new_node]
+
+    def __bool__(self) -> bool:
+        return any(counts[0] or counts[1] for counts in self.counts.values())
+
+
+def _sort_key(snapshot: ScanSnapshot, node: int):
+    name = snapshot.name(node)
+    return name.lower(), name
+
+
+def _merged_children(old_view, old_dir: int, new_view, new_dir: int) -> Iterator[tuple]:
+    """Yield ``(old child, new child)`` pairs in name order, with -1 for a side without the name."""
+    old_children = iter(old_view.children(old_dir) if old_dir >= 0 else ())
+    new_children = iter(new_view.children(new_dir) if new_dir >= 0 else ())
+    old_node = next(old_children, -1)
+    new_node = next(new_children, -1)
+    old_key = _sort_key(old_view.snapshot, old_node) if old_node >= 0 else None
+    new_key = _sort_key(new_view.snapshot, new_node) if new_node >= 0 else None
+    while old_node >= 0 or new_node >= 0:
+        if new_node < 0 or (old_node >= 0 and old_key < new_key):
+            yield old_node, -1
+            advance_old, advance_new = True, False
+        elif old_node < 0 or new_key < old_key:
+            yield -1, new_node
+            advance_old, advance_new = False, True
+        else:
+            yield old_node, new_node
+            advance_old = advance_new = True
+        if advance_old:
+            old_node = next(old_children, -1)
+            old_key = _sort_key(old_view.snapshot, old_node) if old_node >= 0 else None
+        if advance_new:
+            new_node = next(new_children, -1)
+            new_key = _sort_key(new_view.snapshot, new_node) if new_node >= 0 else None
+
+
+def iter_changes(
+    old_view: FilteredView, new_view: FilteredView, cancel_event: Optional[threading.Event] = None
+) -> Iterator[Change]:
+    """
+    Yield the changes from ``old_view`` to ``new_view``, depth first and in name order, as the
+    tree is listed. Entries hidden by either view's filters are not compared. Setting
+    ``cancel_event`` raises :class:`ComparisonCancelled` within :data:`CANCEL_CHECK_INTERVAL`
+    entries.
+    """
+    old = old_view.snapshot
+    new = new_view.snapshot
+    members = old.member_start is not None and new.member_start is not None
+
+    def descends(snapshot, node):
+        flags = snapshot.flags[node]
+        if flags & FLAG_DIR:
+            # Unreadable, unlisted and already listed folders have no contents to compare.
+            return not flags & FLAG_UNLISTED
+        return members and snapshot.child_count[node] > 0
+
+    compared = 0
+    stack = [(_merged_children(old_view, ROOT_NODE, new_view, ROOT_NODE), ROOT_NODE)]
+    while stack:
+        pairs, parent = stack[-1]
+        pair = next(pairs, None)
+        if pair is None:
+            stack.pop()
+            continue
+        compared += 1
+        if cancel_event is not None and not compared % CANCEL_CHECK_INTERVAL and cancel_event.is_set():
+            metrics.add(entries_compared=compared)
+            raise ComparisonCancelled()
+        old_node, new_node = pair
+        if old_node >= 0 and new_node >= 0 and (old.flags[old_node] ^ new.flags[new_node]) & FLAG_DIR:
+            # A file replaced by a folder or the reverse: the old entry is removed with its
+            # contents, then the new one is added in the same folder.
+            yield Change(CHANGE_REMOVED, old_node, -1, parent)
+            added = iter(((-1, new_node),))
+            if descends(old, old_node):
+                stack.append((chain(_merged_children(old_view, old_node, new_view, -1), added), parent))
+            else:
+                stack.append((added, parent))
+        elif new_node < 0:
+            yield Change(CHANGE_REMOVED, old_node, -1, parent)
+            if descends(old, old_node):
+                stack.append((_merged_children(old_view, old_node, new_view, -1), parent))
+        elif old_node < 0:
+            yield Change(CHANGE_ADDED, -1, new_node, parent)
+            if descends(new, new_node):
+                stack.append((_merged_children(old_view, -1, new_view, new_node), new_node))
+        elif new.flags[new_node] & FLAG_DIR:
+            if descends(old, old_node) and descends(new, new_node):
+                stack.append((_merged_children(old_view, old_node, new_view, new_node), new_node))
+        else:
+            if old.sizes[old_node] != new.sizes[new_node]:
+                yield Change(CHANGE_RESIZED, old_node, new_node, parent)
+            elif old.mtimes[old_node] != new.mtimes[new_node]:
+                yield Change(CHANGE_MODIFIED, old_node, new_node, parent)
+            if descends(old, old_node) and descends(new, new_node):
+                stack.append((_merged_children(old_view, old_node, new_view, new_node), new_node))
+    metrics.add(entries_compared=compared)
+
+
+class SnapshotComparison:
+    """
+    The changes from ``old_view`` to ``new_view`` as one ``STATUS_*`` mark per node of the newer
+    snapshot, with their :class:`ChangeTotals`. Added, resized and modified entries carry their
+    own mark; the folders above them, and the folders that lost entries, are marked
+    :data:`STATUS_CHANGED_BELOW`. Removed entries have no node to mark. ``cancel_event`` is
+    passed to :func:`iter_changes`.
+    """
+
+    def __init__(
+        self, old_view: FilteredView, new_view: FilteredView, cancel_event: Optional[threading.Event] = None
+    ) -> None:
+        old = old_view.snapshot
+        new = new_view.snapshot
+        self.old_scanned_at_ns = old.scanned_at_ns
+        self.status = bytearray(len(new))
+        self.totals = ChangeTotals()
+        status = self.status
+        parents = new.parents
+        with metrics.timed("comparison"):
+            for change in iter_changes(old_view, new_view, cancel_event):
+                self.totals.add(change, old, new)
+                if change.new_node >= 0:
+                    status[change.new_node] = _STATUS_BY_KIND[change.kind]
+                node = change.parent
+                while node >= 0 and not status[node]:
+                    status[node] = STATUS_CHANGED_BELOW
+                    node = parents[node]
+
+
+__all__ = [
+    "CHANGE_ADDED",
+    "CHANGE_KINDS",
+    "CHANGE_MODIFIED",
+    "CHANGE_REMOVED",
+    "CHANGE_RESIZED",
+    "STATUS_ADDED",
+    "STATUS_CHANGED_BELOW",
+    "STATUS_MODIFIED",
+    "STATUS_RESIZED",
+    "STATUS_UNCHANGED",
+    "Change",
+    "ChangeTotals",
+    "ComparisonCancelled",
+    "SnapshotComparison",
+    "iter_changes",
+]
@@ -0,0 +1,88 @@
+"""
+Filesystem helpers that apply the hidden/extension filters by querying the disk directly.
+
+The scanner, the tree and the exports work from the in-memory snapshot instead; these helpers
+remain for callers that need an answer for a single path without scanning.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+from treegen.scanner import FILE_ATTRIBUTE_HIDDEN, FILE_ATTRIBUTE_SYSTEM
+
+
+def is_hidden_path(path):
+    """
+    Determine whether a path should be treated as hidden.
+    On Windows this checks the hidden/system file attributes; elsewhere it falls back to dot-prefix.
+    """
+    path_str = os.fspath(path)
+    if sys.platform.startswith("win"):
+        import ctypes
+
+        try:
+            attrs = ctypes.windll.kernel32.GetFileAttributesW(path_str)
+        except (AttributeError, ValueError):
+            attrs = 0xFFFFFFFF
+        if attrs == 0xFFFFFFFF:
+            return os.path.basename(path_str).startswith(".")
+        return bool(attrs & (FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM))
+    return os.path.basename(path_str).startswith(".")
+
+
+def should_exclude_entry(path, is_dir, exclude_hidden=False, exclude_extensions=None):
+    exclude_extensions = exclude_extensions or []
+    if exclude_hidden and is_hidden_path(path):
+        return True
+    if not is_dir and exclude_extensions:
+        lower_path = os.fspath(path).lower()
+        for ext in exclude_extensions:
+            if lower_path.endswith(ext):
+                return True
+    return False
+
+
+def iter_visible_children(path, exclude_hidden=False, exclude_extensions=None):
+    exclude_extensions = exclude_extensions or []
+    entries = []
+    with os.scandir(path) as iterator:
+        for entry in iterator:
+            child_path = entry.path
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if should_exclude_entry(child_path, is_dir, exclude_hidden, exclude_extensions):
+                continue
+            entries.append((entry.name, child_path, is_dir))
+    entries.sort(key=lambda item: item[0].lower())
+    return entries
+
+
+def calculate_folder_size(path, exclude_hidden=False, exclude_extensions=None):
+    exclude_extensions = exclude_extensions or []
+    total_size = 0
+    try:
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                entry_path = entry.path
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if should_exclude_entry(entry_path, is_dir, exclude_hidden, exclude_extensions):
+                    continue
+                if is_dir:
+                    total_size += calculate_folder_size(entry_path, exclude_hidden, exclude_extensions)
+                else:
+                    try:
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                    except (OSError, PermissionError):
+                        pass
+    except (PermissionError, FileNotFoundError):
+        pass
+    return total_size
+
+
+__all__ = [
+    "calculate_folder_size",
+    "is_hidden_path",
+    "iter_visible_children",
+    "should_exclude_entry",
+]
@@ -0,0 +1,150 @@
+"""
+Low-overhead phase timers and counters for diagnosing slow scans.
+
+The scanner, renderers, exporters and GUI report into the shared :data:`metrics` object:
+:meth:`Metrics.timed` accumulates the call count and wall time of a phase, and
+:meth:`Metrics.add` bumps counters such as ``scandir_calls`` or ``stat_calls``. Both work at
+directory or document granularity, never per entry, so they stay on all the time.
+
+When :attr:`Metrics.tracing` is set, every timed call is also kept as an event, and
+:meth:`Metrics.write_trace` saves them in the Chrome trace-event format (viewable in Perfetto or
+``chrome://tracing``) together with the totals, so a trace can be attached to a support ticket.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+TRACE_FORMAT_VERSION = 1
+
+
+class Metrics:
+    """Counters and per-phase timings, safe to update from scan worker threads."""
+
+    # Events kept while tracing; later ones are dropped and counted in ``dropped_events``.
+    MAX_EVENTS = 200_000
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.tracing = False
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters: Dict[str, int] = {}
+            # phase -> [calls, total seconds, longest call in seconds]
+            self.phases: Dict[str, List[float]] = {}
+            self.events: List[tuple] = []
+            self.dropped_events = 0
+            self.started = time.perf_counter()
+
+    def add(self, **amounts: int) -> None:
+        with self._lock:
+            counters = self.counters
+            for name, amount in amounts.items():
+                counters[name] = counters.get(name, 0) + amount
+
+    @contextmanager
+    def timed(self, phase: str, **details):
+        """Time the body as one call of ``phase``; ``details`` are only kept in trace events."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, started, time.perf_counter() - started, details)
+
+    def record(self, phase: str, started: float, elapsed: float, details=None) -> None:
+        with self._lock:
+            totals = self.phases.get(phase)
+            if totals is None:
+                self.phases[phase] = [1, elapsed, elapsed]
+            else:
+                totals[0] += 1
+                totals[1] += elapsed
+                totals[2] = max(totals[2], elapsed)
+            if self.tracing:
+                if len(self.events) < self.MAX_EVENTS:
+                    self.events.append((phase, started, elapsed, threading.get_ident(), details or None))
+                else:
+                    self.dropped_events += 1
+
+    def merge(self, summary: dict) -> None:
+        """Add the counters and phase totals of another process's :meth:`summary`."""
+        self.add(**summary["counters"])
+        with self._lock:
+            for phase, other in summary["phases"].items():
+                totals = self.phases.setdefault(phase, [0, 0.0, 0.0])
+                totals[0] += other["calls"]
+                totals[1] += other["seconds"]
+                totals[2] = max(totals[2], other["longest_seconds"])
+
+    def summary(self) -> dict:
+        """A JSON-ready copy of the counters and phase totals."""
+        with self._lock:
+            return {
+                "counters": dict(sorted(self.counters.items())),
+                "phases": {
+                    phase: {"calls": int(calls), "seconds": round(total, 6), "longest_seconds": round(longest, 6)}
+                    for phase, (calls, total, longest) in sorted(self.phases.items())
+                },
+            }
+
+    def trace(self) -> dict:
+        """The recorded events in Chrome trace-event format, with the summary as metadata."""
+        summary = self.summary()
+        with self._lock:
+            events = list(self.events)
+            dropped = self.dropped_events
+            origin = self.started
+        pid = os.getpid()
+        trace_events = []
+        for phase, started, elapsed, thread_id, details in events:
+            event = {
+                "name": phase, "ph": "X", "pid": pid, "tid": thread_id,
+                "ts": round((started - origin) * 1e6, 1), "dur": round(elapsed * 1e6, 1),
+            }
+            if details:
+                event["args"] = details
+            trace_events.append(event)
+        return {
+            "traceEvents": trace_events,
+            "displayTimeUnit": "ms",
+            "otherData": {"version": TRACE_FORMAT_VERSION, "dropped_events": dropped, **summary},
+        }
+
+    def write_trace(self, path) -> None:
+        import json
+
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.trace(), handle, indent=1)
+
+
+def format_summary(summary: dict, phases_heading: str = "Phases", counters_heading: str = "Counters") -> List[str]:
+    """Plain-text table of a :meth:`Metrics.summary`, for the CLI and the diagnostics dialog."""
+    lines = [phases_heading, f"  {'':<22} {'calls':>8} {'total s':>10} {'mean ms':>10} {'max ms':>10}"]
+    for phase, totals in summary["phases"].items():
+        calls, seconds = totals["calls"], totals["seconds"]
+        lines.append(
+            f"  {phase:<22} {calls:>8} {seconds:>10.3f} {seconds * 1000 / calls:>10.3f} "
+            f"{totals['longest_seconds'] * 1000:>10.3f}"
+        )
+    lines.append("")
+    lines.append(counters_heading)
+    for name, value in summary["counters"].items():
+        lines.append(f"  {name:<22} {value:>14,}")
+    return lines
+
+
+metrics = Metrics()
+
+
+__all__ = [
+    "Metrics",
+    "TRACE_FORMAT_VERSION",
+    "format_summary",
+    "metrics",
+]
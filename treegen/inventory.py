@@ -0,0 +1,273 @@
+"""
+Machine-readable inventories of a scanned tree, for loading into analysis tools.
+
+Every visible entry becomes one record with the fields of :data:`INVENTORY_FIELDS`: its path
+relative to the root, type, size in bytes, modification time in nanoseconds since the epoch,
+lowercase extension, depth below the root (1 for its direct children) and description. Archive
+members, when listed, follow their archive with paths that run through it. Records
+are produced depth first, in the order of the CSV export, by :func:`iter_inventory_batches`,
+which reads the snapshot columns directly and hands them over in row groups of
+:data:`ROW_GROUP_SIZE` records, so no format holds more than one row group of Python objects.
+
+Three formats are written:
+
+``ndjson``
+    One JSON object per line, streamed to a text handle.
+``parquet``
+    A Parquet file with one row group per batch, written with ``pyarrow`` (imported when first
+    needed; the format is unavailable without it). ``type`` and ``extension`` are
+    dictionary-encoded.
+``npz``
+    A NumPy archive written with the standard library alone, for machines without ``pyarrow``.
+    Numbers are stored as plain arrays (``is_dir``, ``size``, ``mtime_ns``, ``depth``). Paths
+    and descriptions are one UTF-8 buffer each, with ``*_offsets`` marking where every record
+    starts. Extensions are indices into a small ``extensions`` table. Loading a million records
+    with ``numpy.load`` is a few buffer reads::
+
+        data = numpy.load("inventory.npz")
+        paths, offsets = data["path_data"].tobytes(), data["path_offsets"]
+        path = paths[offsets[i]:offsets[i + 1]].decode("utf-8", "surrogatepass")
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import zipfile
+from array import array
+from typing import Dict, Iterator
+
+from treegen.instrumentation import metrics
+from treegen.scanner import FLAG_DIR, ROOT_NODE, FilteredView
+
+INVENTORY_FORMATS = ("ndjson", "parquet", "npz")
+INVENTORY_FIELDS = ("path", "type", "size", "mtime_ns", "extension", "depth", "description")
+ROW_GROUP_SIZE = 65_536
+NPY_ALIGNMENT = 64
+
+_TYPES = ("file", "directory")
+# array typecode -> NumPy dtype character.
+_NPY_KINDS = {"b": "i1", "B": "u1", "i": "i4", "I": "u4", "q": "i8"}
+
+
+def have_pyarrow() -> bool:
+    """True when the Parquet format can be written, without importing pyarrow."""
+    from importlib.util import find_spec
+
+    return find_spec("pyarrow") is not None
+
+
+class InventoryBatch:
+    """
+    One row group: ``paths``, ``extension_ids`` (into the snapshot's extension table) and
+    ``descriptions`` as lists, ``is_dir`` as a bytearray and ``sizes``, ``mtimes`` and ``depths``
+    as arrays.
+    """
+
+    __slots__ = ("paths", "is_dir", "sizes", "mtimes", "extension_ids", "depths", "descriptions")
+
+    def __init__(self) -> None:
+        self.paths = []
+        self.is_dir = bytearray()
+        self.sizes = array("q")
+        self.mtimes = array("q")
+        self.extension_ids = array("I")
+        self.depths = array("i")
+        self.descriptions = []
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+
+def iter_inventory_batches(
+    view: FilteredView, descriptions: Dict[str, str], batch_size: int = ROW_GROUP_SIZE
+) -> Iterator[InventoryBatch]:
+    """Yield the visible entries of ``view``, depth first, in batches of up to ``batch_size``."""
+    snapshot = view.snapshot
+    sizes = view.sizes
+    flags = snapshot.flags
+    mtimes = snapshot.mtimes
+    extension_ids = snapshot.extension_ids
+    root = snapshot.root
+    # Paths are built from the prefix of their parent instead of walking the parent chain.
+    stack = [(iter(view.children(ROOT_NODE)), "", 1)]
+    batch = InventoryBatch()
+    rows = 0
+    while stack:
+        children, prefix, depth = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            continue
+        path = prefix + snapshot.name(child)
+        is_dir = flags[child] & FLAG_DIR
+        batch.paths.append(path)
+        batch.is_dir.append(1 if is_dir else 0)
+        batch.sizes.append(sizes[child])
+        batch.mtimes.append(mtimes[child])
+        batch.extension_ids.append(extension_ids[child])
+        batch.depths.append(depth)
+        batch.descriptions.append(descriptions.get(os.path.join(root, path), "") if descriptions else "")
+        if is_dir or snapshot.is_archive(child):
+            stack.append((iter(view.children(child)), path + os.sep, depth + 1))
+        if len(batch) >= batch_size:
+            rows += len(batch)
+            yield batch
+            batch = InventoryBatch()
+    if len(batch):
+        rows += len(batch)
+        yield batch
+    metrics.add(rows_exported=rows)
+
+
+def write_ndjson(view: FilteredView, descriptions: Dict[str, str], handle) -> None:
+    """Write one JSON object per visible entry to the text ``handle``."""
+    extension_table = view.snapshot.extension_table
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    for batch in iter_inventory_batches(view, descriptions):
+        handle.write("".join(
+            encode({
+                "path": path, "type": _TYPES[is_dir], "size": size, "mtime_ns": mtime,
+                "extension": extension_table[extension_id], "depth": depth, "description": description,
+            }) + "\n"
+            for path, is_dir, size, mtime, extension_id, depth, description in zip(
+                batch.paths, batch.is_dir, batch.sizes, batch.mtimes, batch.extension_ids, batch.depths,
+                batch.descriptions,
+            )
+        ))
+
+
+def write_parquet(view: FilteredView, descriptions: Dict[str, str], path) -> None:
+    """Write a Parquet file with one row group per batch. Requires ``pyarrow``."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet inventories need pyarrow; install it or use the npz format") from None
+
+    extension_table = pa.array(view.snapshot.extension_table, pa.string())
+    type_table = pa.array(_TYPES, pa.string())
+    schema = pa.schema([
+        ("path", pa.string()),
+        ("type", pa.dictionary(pa.int8(), pa.string())),
+        ("size", pa.int64()),
+        ("mtime_ns", pa.int64()),
+        ("extension", pa.dictionary(pa.int32(), pa.string())),
+        ("depth", pa.int32()),
+        ("description", pa.string()),
+    ])
+    def column(data_type, values):
+        # The array and bytearray columns are handed to Arrow as they are, without a copy.
+        return pa.Array.from_buffers(data_type, len(values), [None, pa.py_buffer(values)])
+
+    with pq.ParquetWriter(os.fspath(path), schema) as writer:
+        for batch in iter_inventory_batches(view, descriptions):
+            writer.write_batch(pa.record_batch([
+                pa.array(batch.paths, pa.string()),
+                pa.DictionaryArray.from_arrays(column(pa.int8(), batch.is_dir), type_table),
+                column(pa.int64(), batch.sizes),
+                column(pa.int64(), batch.mtimes),
+                # Extension ids are far below 2**31, so their uint32 buffer reads as int32.
+                pa.DictionaryArray.from_arrays(column(pa.int32(), batch.extension_ids), extension_table),
+                column(pa.int32(), batch.depths),
+                pa.array(batch.descriptions, pa.string()),
+            ], schema=schema))
+
+
+def _npy_header(dtype: str, length: int) -> bytes:
+    """A version 1.0 ``.npy`` header for a one-dimensional array, padded as NumPy pads it."""
+    header = f"{{'descr': '{dtype}', 'fortran_order': False, 'shape': ({length},), }}"
+    padding = NPY_ALIGNMENT - (10 + len(header) + 1) % NPY_ALIGNMENT
+    header = (header + " " * padding + "\n").encode("latin1")
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header
+
+
+def _write_npy(archive: zipfile.ZipFile, name: str, values, dtype: str = "|u1") -> None:
+    """Store ``values``, an array or a byte buffer (of ``dtype``), as the member ``name``."""
+    if isinstance(values, array):
+        dtype = ("<" if sys.byteorder == "little" else ">") + _NPY_KINDS[values.typecode]
+    with archive.open(name + ".npy", "w", force_zip64=True) as member:
+        member.write(_npy_header(dtype, len(values)))
+        member.write(values)
+
+
+def _write_unicode_npy(archive: zipfile.ZipFile, name: str, strings) -> None:
+    width = max((len(text) for text in strings), default=0) or 1
+    data = b"".join(text.encode("utf-32-le", "surrogatepass").ljust(width * 4, b"\0") for text in strings)
+    with archive.open(name + ".npy", "w", force_zip64=True) as member:
+        member.write(_npy_header(f"<U{width}", len(strings)))
+        member.write(data)
+
+
+class _StringColumn:
+    """Strings stored NumPy-friendly: one UTF-8 buffer and the offset where each one starts."""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+
+    def extend(self, strings) -> None:
+        data = self.data
+        offsets = self.offsets
+        for text in strings:
+            data += text.encode("utf-8", "surrogatepass")
+            offsets.append(len(data))
+
+
+def write_npz(view: FilteredView, descriptions: Dict[str, str], path) -> None:
+    """Write an uncompressed NumPy ``.npz`` archive without needing NumPy; see the module docstring."""
+    paths = _StringColumn()
+    notes = _StringColumn()
+    is_dir = bytearray()
+    sizes = array("q")
+    mtimes = array("q")
+    extension_ids = array("I")
+    depths = array("i")
+    for batch in iter_inventory_batches(view, descriptions):
+        paths.extend(batch.paths)
+        notes.extend(batch.descriptions)
+        is_dir += batch.is_dir
+        sizes.extend(batch.sizes)
+        mtimes.extend(batch.mtimes)
+        extension_ids.extend(batch.extension_ids)
+        depths.extend(batch.depths)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+        _write_npy(archive, "path_data", paths.data)
+        _write_npy(archive, "path_offsets", paths.offsets)
+        _write_npy(archive, "is_dir", is_dir, "|b1")
+        _write_npy(archive, "size", sizes)
+        _write_npy(archive, "mtime_ns", mtimes)
+        _write_npy(archive, "extension_ids", extension_ids)
+        _write_unicode_npy(archive, "extensions", view.snapshot.extension_table)
+        _write_npy(archive, "depth", depths)
+        _write_npy(archive, "description_data", notes.data)
+        _write_npy(archive, "description_offsets", notes.offsets)
+
+
+def write_inventory(view: FilteredView, descriptions: Dict[str, str], output_format: str, path) -> None:
+    """Write the inventory of ``view`` to the file ``path`` in one of :data:`INVENTORY_FORMATS`."""
+    with metrics.timed("export", format=output_format):
+        if output_format == "ndjson":
+            with open(path, "w", encoding="utf-8", newline="\n", buffering=1 << 20) as handle:
+                write_ndjson(view, descriptions, handle)
+        elif output_format == "parquet":
+            write_parquet(view, descriptions, path)
+        elif output_format == "npz":
+            write_npz(view, descriptions, path)
+        else:
+            raise ValueError(f"unknown inventory format {output_format!r}")
+
+
+__all__ = [
+    "INVENTORY_FIELDS",
+    "INVENTORY_FORMATS",
+    "InventoryBatch",
+    "ROW_GROUP_SIZE",
+    "have_pyarrow",
+    "iter_inventory_batches",
+    "write_inventory",
+    "write_ndjson",
+    "write_npz",
+    "write_parquet",
+]
@@ -0,0 +1,483 @@
+"""Localization utilities and translations for TreeGen."""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable
+
+AVAILABLE_LANGUAGES: Iterable[str] = ("en", "fr")
+DEFAULT_LANGUAGE = "en"
+
+TRANSLATIONS: Dict[str, Dict[str, str]] = {
+    "en": {
+        "app_title": "TreeGen: File tree generator for research data",
+        "usage_instructions": (
+            "<div style='font-size:15px; line-height:1.4; margin:0; padding:0;'>"
+            "<table border='0' cellspacing='0' cellpadding='2' style='margin-top:5px; margin-bottom:5px; margin-left:10px;'>"
+            "<tr><td valign='top' width='20'>1.</td><td><b>Select Directory</b>: Choose the folder you want to describe.</td></tr>"
+            "<tr><td valign='top' width='20'>2.</td><td><b>Describe</b>: Browse the file tree, double-click the description column, and use the filters as needed.</td></tr>"
+            "<tr><td valign='top' width='20'>3.</td><td><b>Export</b>: Review the preview, then export to Markdown or plain text.</td></tr>"
+            "</table>"
+            "<p style='margin-top:5px; margin-left:40px'>For additional guidance, visit the "
+            "<a href='https://alliance-rdm-gdr.github.io/CUR_Res_OnePagers/RDM_TreeGen_en.html'>TreeGen one-pager</a> "
+            "or the "
+            "<a href='https://github.com/Alliance-RDM-GDR/RDM_FileTree'>GitHub repository</a>.</p>"
+            "</div>"
+        ),
+        "security_note": "<b>Security & Privacy:</b> Please review our <a href='https://github.com/Alliance-RDM-GDR/RDM_FileTree#security--data-privacy'>guidelines on sensitive data</a>.",
+        "select_directory_button": "Select Directory",
+        "about_button": "About / Info",
+        "language_label": "Language:",
+        "scan_workers_label": "Scan threads:",
+        "scan_workers_tooltip": "Number of directories listed in parallel. Higher values help on network or parallel filesystems (NFS, SMB, Lustre).",
+        "scan_cache_checkbox": "Reuse scan cache",
+        "scan_cache_tooltip": "Remember each scan in your user cache folder and, when the folder is opened again, only re-list the directories that changed. Files rewritten in place keep their cached size until their folder changes; untick for a full rescan.",
+        "watch_checkbox": "Watch for changes",
+        "watch_tooltip": "Keep the tree, sizes and preview up to date while files are added, removed or modified in the selected folder.",
+        "allocated_size_checkbox": "Disk usage",
+        "allocated_size_tooltip": "Size files by the disk space allocated to them instead of their length, so sparse files and compressed filesystems show their real usage. Applies to the next scan.",
+        "one_filesystem_checkbox": "Stay on one filesystem",
+        "one_filesystem_tooltip": "Do not enter folders that are mount points of other drives or network shares. Applies to the next scan.",
+        "archives_checkbox": "List archive contents",
+        "archives_tooltip": "Show the files inside .zip and .tar archives below them, read from the archive index without extracting anything. Their sizes are not added to folder totals. Applies to the next scan.",
+        "watch_backend_native": "system notifications",
+        "watch_backend_polling": "polling",
+        "watch_started": "Watching for changes ({backend}).",
+        "watch_stopped": "Stopped watching for changes.",
+        "watch_updated": "Updated after changes at {time}: {entries} entries.",
+        "watch_failed": "Could not refresh after changes: {error}",
+        "diagnostics_button": "Diagnostics",
+        "diagnostics_title": "Diagnostics",
+        "diagnostics_phases_heading": "Phases",
+        "diagnostics_counters_heading": "Counters",
+        "diagnostics_empty": "Nothing has been measured yet.",
+        "diagnostics_trace_checkbox": "Record a detailed trace",
+        "diagnostics_trace_tooltip": "Keep every timed step, with its thread and duration, so it can be saved as a JSON trace and attached to a support request.",
+        "diagnostics_save_trace": "Save Trace...",
+        "diagnostics_reset": "Reset",
+        "diagnostics_close": "Close",
+        "diagnostics_save_dialog": "Save Diagnostics Trace",
+        "diagnostics_default_filename": "treegen-trace.json",
+        "json_file_filter": "JSON Files (*.json);;All Files (*)",
+        "language_name_en": "English",
+        "language_name_fr": "French",
+        "search_label": "Search:",
+        "search_placeholder": "Search...",
+        "exclude_extensions_label": "Exclude Extensions:",
+        "exclude_extensions_placeholder": "e.g., .txt, .py",
+        "exclude_hidden_checkbox": "Exclude Hidden",
+        "tree_column_name": "Name",
+        "tree_column_size": "Size",
+        "tree_column_description": "Description",
+        "export_md_button": "Export Markdown (.md)",
+        "export_txt_button": "Export Plain Text (.txt)",
+        "export_csv_button": "Export CSV (.csv)",
+        "export_inventory_button": "Export Inventory...",
+        "export_checksums_button": "Export Checksums...",
+        "save_snapshot_button": "Save Snapshot...",
+        "compare_snapshot_button": "Compare with Snapshot...",
+        "export_changes_button": "Export Changes...",
+        "csv_checksums_checkbox": "SHA-256 in CSV",
+        "csv_checksums_tooltip": "Add the SHA-256 checksum of every file to CSV exports. Files that did not change since the last export are not read again when the scan cache is on.",
+        "statistics_checkbox": "Statistics",
+        "statistics_tooltip": "Follow the summary with files and bytes per extension, a file size histogram and the largest folders, in the preview and the Markdown and text exports.",
+        "cancel_scan_button": "Cancel",
+        "scan_started": "Scanning...",
+        "scan_progress": "Scanning: {entries} entries, {size} - {directory}",
+        "scan_complete": "Scan complete: {entries} entries.",
+        "scan_cancelled": "Scan cancelled.",
+        "checksum_started": "Computing checksums...",
+        "checksum_progress": "Checksums: {done} of {total} files, {size} read",
+        "checksum_complete": "Checksums computed for {count} files.",
+        "checksum_cancelled": "Checksums cancelled; nothing was exported.",
+        "checksum_unreadable_title": "Unreadable Files",
+        "checksum_unreadable_message": "{count} files could not be read and have no checksum:\n{paths}",
+        "compare_started": "Comparing with the snapshot...",
+        "compare_complete": "Compared with the snapshot of {date}: {count} changes.",
+        "compare_failed_title": "Comparison Failed",
+        "compare_failed_message": "The snapshot could not be compared:\n{error}",
+        "change_added": "Added since the snapshot",
+        "change_resized": "Resized since the snapshot",
+        "change_modified": "Modified since the snapshot",
+        "change_below": "Contains changes since the snapshot",
+        "scan_failed_title": "Scan Failed",
+        "scan_failed_message": "The directory could not be scanned:\n{error}",
+        "select_directory_dialog": "Select Directory",
+        "add_description_title": "Add Description",
+        "add_description_prompt": "Enter description for:\n{path}",
+        "summary_heading": "**Summary:**",
+        "summary_total_folders": "- Total folders: {count}",
+        "summary_total_files": "- Total files: {count}",
+        "summary_total_size": "- Total size: {size}",
+        "statistics_heading": "**Statistics:**",
+        "statistics_by_extension": "- Files by extension:",
+        "statistics_extension": "  - {extension}: {files}, {size}",
+        "statistics_no_extension": "(no extension)",
+        "statistics_other_extension": "1 other extension",
+        "statistics_other_extensions": "{count} other extensions",
+        "statistics_size_histogram": "- File sizes:",
+        "statistics_empty_files": "  - Empty: {files}",
+        "statistics_size_bucket": "  - {low} to {high}: {files}",
+        "statistics_largest_folders": "- Largest folders:",
+        "statistics_folder": "  - {path}: {size}",
+        "diff_title": "# Changes in {root} since the scan of {date}",
+        "diff_added": "- Added: {path} [ {size} ]",
+        "diff_removed": "- Removed: {path} [ {size} ]",
+        "diff_resized": "- Resized: {path} [ {old} → {new} ]",
+        "diff_modified": "- Modified: {path} [ {size} ]",
+        "diff_no_changes": "- No changes.",
+        "diff_summary_added": "- Added: {entries}, {size}",
+        "diff_summary_removed": "- Removed: {entries}, {size}",
+        "diff_summary_resized": "- Resized: {entries}, {old} → {new}",
+        "diff_summary_modified": "- Modified: {entries}, {size}",
+        "thousands_separator": ",",
+        "render_folder": "1 folder",
+        "render_folders": "{count} folders",
+        "render_file": "1 file",
+        "render_files": "{count} files",
+        "render_more_folder": "1 more folder",
+        "render_more_folders": "{count} more folders",
+        "render_more_file": "1 more file",
+        "render_more_files": "{count} more files",
+        "render_and": "{first} and {second}",
+        "render_omitted": "… and {entries} ({size})",
+        "render_collapsed": "… {entries} ({size})",
+        "render_depth_label": "Max depth:",
+        "render_depth_tooltip": "Deepest folder level listed in the preview and the Markdown/text exports; deeper contents are summarized in one line. The totals still count everything.",
+        "render_children_label": "Entries per folder:",
+        "render_children_tooltip": "Entries listed per folder in the preview and the Markdown/text exports; the others are summarized in one line with their count and size. The totals still count everything.",
+        "render_no_limit": "No limit",
+        "render_order_name": "First by name",
+        "render_order_size": "Largest first",
+        "batch_export_button": "Batch Export...",
+        "batch_parent_dialog": "Select the Folder Containing the Folders to Export",
+        "batch_output_dialog": "Select the Output Folder",
+        "batch_no_folders_message": "{path} contains no folders to export.",
+        "batch_format_title": "Batch Export",
+        "batch_format_prompt": "Export each of the {count} folders in {path} as:",
+        "batch_format_manifest": "BagIt manifest (SHA-256)",
+        "batch_progress": "Batch export: {done} of {total} folders - {folder}",
+        "batch_cancelled": "Batch export cancelled.",
+        "batch_finished_title": "Batch Export Finished",
+        "batch_finished_message": "{count} of {total} folders exported to {path}.\nIndex: {index}",
+        "batch_failures_heading": "Folders that could not be exported:",
+        "batch_index_title": "# TreeGen batch export",
+        "batch_column_folder": "Folder",
+        "batch_column_output": "Export",
+        "batch_column_folders": "Folders",
+        "batch_column_files": "Files",
+        "batch_column_size": "Size",
+        "batch_column_status": "Status",
+        "batch_status_ok": "OK",
+        "batch_status_unreadable": "{count} unreadable folders",
+        "batch_status_failed": "Failed: {error}",
+        "batch_summary_exported": "- Exported folders: {count} of {total}",
+        "batch_summary_failed": "- Failed folders: {count}",
+        "permission_denied": "[Permission Denied]",
+        "not_found": "[Not Found]",
+        "empty_folder": "[Empty Folder]",
+        "other_filesystem": "[Other Filesystem, Not Scanned]",
+        "already_listed": "[Already Listed Under Another Path]",
+        "no_directory_title": "No Directory Selected",
+        "no_directory_message": "Please select a directory first.",
+        "save_markdown_dialog": "Save Markdown File",
+        "save_markdown_default_filename": "file_tree.md",
+        "markdown_file_filter": "Markdown Files (*.md);;All Files (*)",
+        "save_plain_text_dialog": "Save Plain Text File",
+        "save_plain_text_default_filename": "file_tree.txt",
+        "plain_text_file_filter": "Text Files (*.txt);;All Files (*)",
+        "save_csv_dialog": "Save CSV File",
+        "save_csv_default_filename": "file_tree.csv",
+        "csv_file_filter": "CSV Files (*.csv);;All Files (*)",
+        "save_inventory_dialog": "Save Inventory",
+        "save_inventory_default_filename": "file_tree.ndjson",
+        "inventory_ndjson_filter": "NDJSON (*.ndjson)",
+        "inventory_parquet_filter": "Parquet (*.parquet)",
+        "inventory_npz_filter": "NumPy archive (*.npz)",
+        "save_manifest_dialog": "Save Checksum Manifest",
+        "save_manifest_default_filename": "manifest-sha256.txt",
+        "manifest_file_filter": "BagIt manifest (*.txt);;All Files (*)",
+        "save_snapshot_dialog": "Save Scan Snapshot",
+        "open_snapshot_dialog": "Open Scan Snapshot",
+        "save_snapshot_default_filename": "file_tree.snapshot",
+        "snapshot_file_filter": "TreeGen snapshots (*.snapshot);;All Files (*)",
+        "save_changes_dialog": "Save Changes",
+        "save_changes_default_filename": "changes.md",
+        "changes_markdown_filter": "Markdown (*.md)",
+        "changes_csv_filter": "CSV (*.csv)",
+        "snapshot_saved_message": "Scan snapshot saved to {path}",
+        "export_success_title": "Export Successful",
+        "export_success_message": "File tree exported to {path}",
+        "export_failed_title": "Export Failed",
+        "export_failed_message": "An error occurred:\n{error}",
+        "about_dialog_title": "About / Info",
+        "about_dialog_body": (
+            "TreeGen: File tree generator for research data\n"
+            "---------------------\n"
+            "This application is developed and maintained by the Curation Services team of the "
+            "Digital Research Alliance of Canada (https://alliancecan.ca).\n\n"
+            "Including a clear file tree helps repositories evaluate submissions faster. Consider FRDR "
+            "(https://www.frdr-dfdr.ca/repo/) and Borealis (https://borealisdata.ca) when sharing "
+            "Canadian research data.\n\n"
+            "For more information or support, contact us at rdm-gdr@alliancecan.ca.\n"
+        ),
+    },
+    "fr": {
+        "app_title": "TreeGen : Générateur d'arborescence de fichiers pour les données de recherche",
+        "usage_instructions": (
+            "<div style='font-size:15px; line-height:1.4; margin:0; padding:0;'>"
+            "<table border='0' cellspacing='0' cellpadding='2' style='margin-top:5px; margin-bottom:5px; margin-left:10px;'>"
+            "<tr><td valign='top' width='20'>1.</td><td><b>Sélectionner un dossier</b> : Choisissez le dossier que vous souhaitez décrire.</td></tr>"
+            "<tr><td valign='top' width='20'>2.</td><td><b>Décrire</b> : Parcourez l'arborescence, double-cliquez la colonne Description et utilisez les filtres au besoin.</td></tr>"
+            "<tr><td valign='top' width='20'>3.</td><td><b>Exporter</b> : Vérifiez l'aperçu, puis exportez en Markdown ou en texte brut.</td></tr>"
+            "</table>"
+            "<p style='margin-top:5px; margin-left:40px'>Pour plus de détails, consultez la "
+            "<a href='https://alliance-rdm-gdr.github.io/CUR_Res_OnePagers/RDM_TreeGen_en.html'>fiche TreeGen</a> "
+            "ou le "
+            "<a href='https://github.com/Alliance-RDM-GDR/RDM_FileTree'>dépôt GitHub</a>.</p>"
+            "</div>"
+        ),
+        "security_note": "<b>Sécurité et confidentialité :</b> Veuillez consulter nos <a href='https://github.com/Alliance-RDM-GDR/RDM_FileTree#s%C3%A9curit%C3%A9-et-confidentialit%C3%A9-des-donn%C3%A9es'>directives sur les données sensibles</a>.",
+        "select_directory_button": "Sélectionner un dossier",
+        "about_button": "À propos / Info",
+        "language_label": "Langue :",
+        "scan_workers_label": "Fils d'analyse :",
+        "scan_workers_tooltip": "Nombre de dossiers listés en parallèle. Des valeurs plus élevées aident sur les systèmes de fichiers réseau ou parallèles (NFS, SMB, Lustre).",
+        "scan_cache_checkbox": "Réutiliser le cache d'analyse",
+        "scan_cache_tooltip": "Conserver chaque analyse dans votre dossier de cache et, lorsque le dossier est rouvert, ne relister que les dossiers modifiés. Les fichiers réécrits sur place conservent leur taille en cache jusqu'à ce que leur dossier change ; décochez pour une analyse complète.",
+        "watch_checkbox": "Suivre les modifications",
+        "watch_tooltip": "Garder l'arborescence, les tailles et l'aperçu à jour lorsque des fichiers sont ajoutés, supprimés ou modifiés dans le dossier sélectionné.",
+        "allocated_size_checkbox": "Espace disque",
+        "allocated_size_tooltip": "Mesurer les fichiers par l'espace disque qui leur est alloué plutôt que par leur longueur, afin que les fichiers creux et les systèmes de fichiers compressés indiquent leur occupation réelle. S'applique à la prochaine analyse.",
+        "one_filesystem_checkbox": "Rester sur un seul système de fichiers",
+        "one_filesystem_tooltip": "Ne pas entrer dans les dossiers qui sont des points de montage d'autres disques ou de partages réseau. S'applique à la prochaine analyse.",
+        "archives_checkbox": "Lister le contenu des archives",
+        "archives_tooltip": "Afficher les fichiers des archives .zip et .tar sous chacune d'elles, lus dans l'index de l'archive sans rien extraire. Leurs tailles ne sont pas ajoutées à celles des dossiers. S'applique à la prochaine analyse.",
+        "watch_backend_native": "notifications du système",
+        "watch_backend_polling": "interrogation périodique",
+        "watch_started": "Suivi des modifications ({backend}).",
+        "watch_stopped": "Suivi des modifications arrêté.",
+        "watch_updated": "Mis à jour après des modifications à {time} : {entries} éléments.",
+        "watch_failed": "Impossible d'actualiser après les modifications : {error}",
+        "diagnostics_button": "Diagnostic",
+        "diagnostics_title": "Diagnostic",
+        "diagnostics_phases_heading": "Étapes",
+        "diagnostics_counters_heading": "Compteurs",
+        "diagnostics_empty": "Aucune mesure pour l'instant.",
+        "diagnostics_trace_checkbox": "Enregistrer une trace détaillée",
+        "diagnostics_trace_tooltip": "Conserver chaque étape mesurée, avec son fil d'exécution et sa durée, pour l'enregistrer en trace JSON et la joindre à une demande d'assistance.",
+        "diagnostics_save_trace": "Enregistrer la trace...",
+        "diagnostics_reset": "Réinitialiser",
+        "diagnostics_close": "Fermer",
+        "diagnostics_save_dialog": "Enregistrer la trace de diagnostic",
+        "diagnostics_default_filename": "treegen-trace.json",
+        "json_file_filter": "Fichiers JSON (*.json);;Tous les fichiers (*)",
+        "language_name_en": "Anglais",
+        "language_name_fr": "Français",
+        "search_label": "Recherche :",
+        "search_placeholder": "Recherche...",
+        "exclude_extensions_label": "Exclure les extensions :",
+        "exclude_extensions_placeholder": "p. ex., .txt, .py",
+        "exclude_hidden_checkbox": "Exclure les éléments cachés",
+        "tree_column_name": "Nom",
+        "tree_column_size": "Taille",
+        "tree_column_description": "Description",
+        "export_md_button": "Exporter en Markdown (.md)",
+        "export_txt_button": "Exporter en texte brut (.txt)",
+        "export_csv_button": "Exporter en CSV (.csv)",
+        "export_inventory_button": "Exporter l'inventaire...",
+        "export_checksums_button": "Exporter les sommes de contrôle...",
+        "save_snapshot_button": "Enregistrer un instantané...",
+        "compare_snapshot_button": "Comparer avec un instantané...",
+        "export_changes_button": "Exporter les changements...",
+        "csv_checksums_checkbox": "SHA-256 dans le CSV",
+        "csv_checksums_tooltip": "Ajouter la somme de contrôle SHA-256 de chaque fichier aux exports CSV. Les fichiers inchangés depuis le dernier export ne sont pas relus lorsque le cache d'analyse est activé.",
+        "statistics_checkbox": "Statistiques",
+        "statistics_tooltip": "Ajouter après le résumé les fichiers et octets par extension, un histogramme des tailles de fichiers et les plus gros dossiers, dans l'aperçu et les exports Markdown et texte.",
+        "cancel_scan_button": "Annuler",
+        "scan_started": "Analyse en cours...",
+        "scan_progress": "Analyse : {entries} éléments, {size} - {directory}",
+        "scan_complete": "Analyse terminée : {entries} éléments.",
+        "scan_cancelled": "Analyse annulée.",
+        "checksum_started": "Calcul des sommes de contrôle...",
+        "checksum_progress": "Sommes de contrôle : {done} fichiers sur {total}, {size} lus",
+        "checksum_complete": "Sommes de contrôle calculées pour {count} fichiers.",
+        "checksum_cancelled": "Calcul des sommes de contrôle annulé ; rien n'a été exporté.",
+        "checksum_unreadable_title": "Fichiers illisibles",
+        "checksum_unreadable_message": "{count} fichiers n'ont pas pu être lus et n'ont pas de somme de contrôle :\n{paths}",
+        "compare_started": "Comparaison avec l'instantané...",
+        "compare_complete": "Comparé avec l'instantané du {date} : {count} changements.",
+        "compare_failed_title": "Échec de la comparaison",
+        "compare_failed_message": "L'instantané n'a pas pu être comparé :\n{error}",
+        "change_added": "Ajouté depuis l'instantané",
+        "change_resized": "Taille modifiée depuis l'instantané",
+        "change_modified": "Modifié depuis l'instantané",
+        "change_below": "Contient des changements depuis l'instantané",
+        "scan_failed_title": "Échec de l'analyse",
+        "scan_failed_message": "Le dossier n'a pas pu être analysé :\n{error}",
+        "select_directory_dialog": "Sélectionner un dossier",
+        "add_description_title": "Ajouter une description",
+        "add_description_prompt": "Saisissez la description pour :\n{path}",
+        "summary_heading": "**Résumé :**",
+        "summary_total_folders": "- Total de dossiers : {count}",
+        "summary_total_files": "- Total de fichiers : {count}",
+        "summary_total_size": "- Taille totale : {size}",
+        "statistics_heading": "**Statistiques :**",
+        "statistics_by_extension": "- Fichiers par extension :",
+        "statistics_extension": "  - {extension} : {files}, {size}",
+        "statistics_no_extension": "(sans extension)",
+        "statistics_other_extension": "1 autre extension",
+        "statistics_other_extensions": "{count} autres extensions",
+        "statistics_size_histogram": "- Tailles des fichiers :",
+        "statistics_empty_files": "  - Vides : {files}",
+        "statistics_size_bucket": "  - De {low} à {high} : {files}",
+        "statistics_largest_folders": "- Plus gros dossiers :",
+        "statistics_folder": "  - {path} : {size}",
+        "diff_title": "# Changements dans {root} depuis l'analyse du {date}",
+        "diff_added": "- Ajouté : {path} [ {size} ]",
+        "diff_removed": "- Supprimé : {path} [ {size} ]",
+        "diff_resized": "- Taille modifiée : {path} [ {old} → {new} ]",
+        "diff_modified": "- Modifié : {path} [ {size} ]",
+        "diff_no_changes": "- Aucun changement.",
+        "diff_summary_added": "- Ajoutés : {entries}, {size}",
+        "diff_summary_removed": "- Supprimés : {entries}, {size}",
+        "diff_summary_resized": "- Taille modifiée : {entries}, {old} → {new}",
+        "diff_summary_modified": "- Modifiés : {entries}, {size}",
+        "thousands_separator": "\u202f",
+        "render_folder": "1 dossier",
+        "render_folders": "{count} dossiers",
+        "render_file": "1 fichier",
+        "render_files": "{count} fichiers",
+        "render_more_folder": "1 autre dossier",
+        "render_more_folders": "{count} autres dossiers",
+        "render_more_file": "1 autre fichier",
+        "render_more_files": "{count} autres fichiers",
+        "render_and": "{first} et {second}",
+        "render_omitted": "… et {entries} ({size})",
+        "render_collapsed": "… {entries} ({size})",
+        "render_depth_label": "Profondeur max. :",
+        "render_depth_tooltip": "Niveau de dossier le plus profond listé dans l'aperçu et les exports Markdown/texte; le contenu plus profond est résumé en une ligne. Les totaux comptent toujours tout.",
+        "render_children_label": "Éléments par dossier :",
+        "render_children_tooltip": "Nombre d'éléments listés par dossier dans l'aperçu et les exports Markdown/texte; les autres sont résumés en une ligne avec leur nombre et leur taille. Les totaux comptent toujours tout.",
+        "render_no_limit": "Aucune limite",
+        "render_order_name": "Premiers par nom",
+        "render_order_size": "Plus gros d'abord",
+        "batch_export_button": "Export par lot...",
+        "batch_parent_dialog": "Sélectionner le dossier contenant les dossiers à exporter",
+        "batch_output_dialog": "Sélectionner le dossier de destination",
+        "batch_no_folders_message": "{path} ne contient aucun dossier à exporter.",
+        "batch_format_title": "Export par lot",
+        "batch_format_prompt": "Exporter chacun des {count} dossiers de {path} en :",
+        "batch_format_manifest": "Manifeste BagIt (SHA-256)",
+        "batch_progress": "Export par lot : {done} dossiers sur {total} - {folder}",
+        "batch_cancelled": "Export par lot annulé.",
+        "batch_finished_title": "Export par lot terminé",
+        "batch_finished_message": "{count} dossiers sur {total} exportés dans {path}.\nIndex : {index}",
+        "batch_failures_heading": "Dossiers qui n'ont pas pu être exportés :",
+        "batch_index_title": "# Export par lot TreeGen",
+        "batch_column_folder": "Dossier",
+        "batch_column_output": "Export",
+        "batch_column_folders": "Dossiers",
+        "batch_column_files": "Fichiers",
+        "batch_column_size": "Taille",
+        "batch_column_status": "État",
+        "batch_status_ok": "OK",
+        "batch_status_unreadable": "{count} dossiers illisibles",
+        "batch_status_failed": "Échec : {error}",
+        "batch_summary_exported": "- Dossiers exportés : {count} sur {total}",
+        "batch_summary_failed": "- Dossiers en échec : {count}",
+        "permission_denied": "[Permission refusée]",
+        "not_found": "[Introuvable]",
+        "empty_folder": "[Dossier vide]",
+        "other_filesystem": "[Autre système de fichiers, non analysé]",
+        "already_listed": "[Déjà listé sous un autre chemin]",
+        "no_directory_title": "Aucun dossier sélectionné",
+        "no_directory_message": "Veuillez d'abord sélectionner un dossier.",
+        "save_markdown_dialog": "Enregistrer le fichier Markdown",
+        "save_markdown_default_filename": "arborescence.md",
+        "markdown_file_filter": "Fichiers Markdown (*.md);;Tous les fichiers (*)",
+        "save_plain_text_dialog": "Enregistrer le fichier texte",
+        "save_plain_text_default_filename": "arborescence.txt",
+        "plain_text_file_filter": "Fichiers texte (*.txt);;Tous les fichiers (*)",
+        "save_csv_dialog": "Enregistrer le fichier CSV",
+        "save_csv_default_filename": "arborescence.csv",
+        "csv_file_filter": "Fichiers CSV (*.csv);;Tous les fichiers (*)",
+        "save_inventory_dialog": "Enregistrer l'inventaire",
+        "save_inventory_default_filename": "arborescence.ndjson",
+        "inventory_ndjson_filter": "NDJSON (*.ndjson)",
+        "inventory_parquet_filter": "Parquet (*.parquet)",
+        "inventory_npz_filter": "Archive NumPy (*.npz)",
+        "save_manifest_dialog": "Enregistrer le manifeste de sommes de contrôle",
+        "save_manifest_default_filename": "manifest-sha256.txt",
+        "manifest_file_filter": "Manifeste BagIt (*.txt);;Tous les fichiers (*)",
+        "save_snapshot_dialog": "Enregistrer l'instantané d'analyse",
+        "open_snapshot_dialog": "Ouvrir un instantané d'analyse",
+        "save_snapshot_default_filename": "arborescence.snapshot",
+        "snapshot_file_filter": "Instantanés TreeGen (*.snapshot);;Tous les fichiers (*)",
+        "save_changes_dialog": "Enregistrer les changements",
+        "save_changes_default_filename": "changements.md",
+        "changes_markdown_filter": "Markdown (*.md)",
+        "changes_csv_filter": "CSV (*.csv)",
+        "snapshot_saved_message": "Instantané d'analyse enregistré dans {path}",
+        "export_success_title": "Exportation réussie",
+        "export_success_message": "Arborescence exportée vers {path}",
+        "export_failed_title": "Échec de l'exportation",
+        "export_failed_message": "Une erreur s'est produite :\n{error}",
+        "about_dialog_title": "À propos / Info",
+        "about_dialog_body": (
+            "TreeGen : Générateur d'arborescence de fichiers pour les données de recherche\n"
+            "---------------------\n"
+            "Cette application est développée et maintenue par l'équipe des services de curation de "
+            "l'Alliance de recherche numérique du Canada (https://alliancecan.ca).\n\n"
+            "Fournir une arborescence claire aide les dépôts à évaluer les dépôts plus rapidement. Pensez à FRDR "
+            "(https://www.frdr-dfdr.ca/repo/) et Borealis (https://borealisdata.ca) pour partager vos données de recherche canadiennes.\n\n"
+            "Pour plus d'information ou de soutien, écrivez-nous à rdm-gdr@alliancecan.ca.\n"
+        ),
+    },
+}
+
+LANGUAGE_DISPLAY_NAMES: Dict[str, Dict[str, str]] = {
+    "en": {"en": "English", "fr": "French"},
+    "fr": {"en": "Anglais", "fr": "Français"},
+}
+
+
+class Localization:
+    """Simple dictionary-based localization helper with graceful fallbacks."""
+
+    def __init__(self, language: str = DEFAULT_LANGUAGE) -> None:
+        self._language = DEFAULT_LANGUAGE
+        self.set_language(language)
+
+    @property
+    def language(self) -> str:
+        return self._language
+
+    def set_language(self, language: str) -> None:
+        """Select the active language, falling back to the default when missing."""
+        self._language = language if language in TRANSLATIONS else DEFAULT_LANGUAGE
+
+    def tr(self, key: str, **kwargs) -> str:
+        """Translate a key using the current language with formatting support."""
+        lang_map = TRANSLATIONS.get(self._language, {})
+        text = lang_map.get(key)
+        if text is None:
+            text = TRANSLATIONS[DEFAULT_LANGUAGE].get(key, key)
+        if kwargs:
+            try:
+                text = text.format(**kwargs)
+            except (KeyError, IndexError):
+                # Leave text unformatted if placeholders do not match.
+                pass
+        return text
+
+    def available_languages(self) -> Iterable[str]:
+        return AVAILABLE_LANGUAGES
+
+    def language_name(self, language: str) -> str:
+        names = LANGUAGE_DISPLAY_NAMES.get(self._language)
+        if names is None:
+            names = LANGUAGE_DISPLAY_NAMES[DEFAULT_LANGUAGE]
+        return names.get(language, language)
+
+
+__all__ = ["Localization", "AVAILABLE_LANGUAGES", "DEFAULT_LANGUAGE"]
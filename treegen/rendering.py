@@ -0,0 +1,599 @@
+"""Text rendering of a filtered scan snapshot for TreeGen's preview and exports.
+
+:class:`TreeTextRenderer` produces the ``|--``/``\\--`` tree used by the Markdown and plain-text
+preview. The lines below each directory are kept as a cached block, keyed by the block's prefix
+and by a per-directory description version, inside a cache for the active filter signature.
+Editing one description only bumps the versions of its ancestors, so the next render rebuilds
+the blocks along that path and reuses every other block as is.
+
+The exporters use the streaming generators instead: :func:`iter_markdown_lines` and
+:func:`iter_csv_rows` walk the view with an explicit stack and yield one line or row at a time,
+so :func:`write_lines` can write a document of any size without holding it in memory.
+
+A :class:`RenderBudget` bounds the Markdown and plain-text tree: folders below ``max_depth`` and
+the entries of a folder beyond ``max_children`` are replaced by one line that counts them. The
+summary totals still cover every entry.
+
+:func:`iter_diff_lines` and :func:`iter_diff_csv_rows` stream the changes found by
+:func:`treegen.diff.iter_changes` between a saved scan and the current one in the same way.
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from treegen.diff import CHANGE_KINDS, CHANGE_REMOVED, CHANGE_RESIZED, ChangeTotals, iter_changes
+from treegen.instrumentation import metrics
+from treegen.statistics import TOP_EXTENSIONS, DatasetStatistics, binary_size, collect_statistics, histogram_bounds
+from treegen.scanner import (
+    ERROR_NOT_FOUND, ERROR_PERMISSION_DENIED, FLAG_UNLISTED, ROOT_NODE, FilteredView, ScanSnapshot
+)
+
+BRANCH = '|-- '
+LAST_BRANCH = '\\-- '
+PIPE_INDENT = '|   '
+SPACE_INDENT = '    '
+
+CSV_HEADER = ['Path', 'Type', 'Name', 'Size (Bytes)', 'Description']
+CSV_CHECKSUM_HEADER = 'SHA-256'
+DIFF_CSV_HEADER = ['Change', 'Path', 'Type', 'Old size (Bytes)', 'New size (Bytes)']
+
+_naturalsize = None
+
+
+def naturalsize(size: int) -> str:
+    """``humanize.naturalsize``; humanize is imported on first use to keep startup light."""
+    global _naturalsize
+    if _naturalsize is None:
+        from humanize import naturalsize as _naturalsize
+    return _naturalsize(size)
+
+
+class RenderBudget:
+    """
+    How much of the tree is written out. ``max_depth`` is the deepest level listed (1 lists the
+    root's entries only) and ``max_children`` the number of entries listed per folder: the first
+    ones by name, or the largest when ``order`` is "size". Zero means no limit.
+    """
+
+    __slots__ = ("max_depth", "max_children", "order")
+
+    ORDERS = ("name", "size")
+
+    def __init__(self, max_depth: int = 0, max_children: int = 0, order: str = "name") -> None:
+        if max_depth < 0 or max_children < 0:
+            raise ValueError("render limits cannot be negative")
+        if order not in self.ORDERS:
+            raise ValueError(f"unknown order: {order}")
+        self.max_depth = max_depth
+        self.max_children = max_children
+        self.order = order
+
+    @property
+    def key(self) -> tuple:
+        return (self.max_depth, self.max_children, self.order)
+
+    def __bool__(self) -> bool:
+        return bool(self.max_depth or self.max_children)
+
+
+class _Block:
+    """The rendered lines below one directory; ``parts`` mixes lines and child blocks."""
+
+    __slots__ = ("key", "parts", "folders", "files", "size")
+
+    def __init__(self, key) -> None:
+        self.key = key
+        self.parts: List[object] = []
+        self.folders = 0
+        self.files = 0
+        self.size = 0
+
+
+class TreeTextRenderer:
+    """
+    Renders the tree text for a :class:`~scanner.FilteredView`, reusing unchanged directory blocks.
+
+    ``tr`` is the translation lookup (``Localization.tr``). Call :meth:`reset` when the snapshot
+    is replaced and :meth:`description_changed` after editing the description of one node.
+    """
+
+    # Filter signatures whose blocks are kept, so toggling a filter back and forth stays cheap.
+    CACHED_SIGNATURES = 2
+
+    def __init__(self, tr: Callable[..., str]) -> None:
+        self.tr = tr
+        self.folder_count = 0
+        self.file_count = 0
+        self.total_size = 0
+        self._caches: "OrderedDict[tuple, Dict[int, _Block]]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+
+    def reset(self) -> None:
+        self._caches.clear()
+        self._versions.clear()
+
+    def description_changed(self, snapshot: ScanSnapshot, node: int) -> None:
+        """Invalidate the blocks that show the description of ``node``: its parent and up."""
+        parents = snapshot.parents
+        node = parents[node]
+        while node >= 0:
+            self._versions[node] = self._versions.get(node, 0) + 1
+            node = parents[node]
+
+    def render_lines(
+        self, view: FilteredView, descriptions: Dict[str, str], signature=(), budget: Optional[RenderBudget] = None
+    ) -> List[str]:
+        """
+        Return the tree lines below the root of ``view`` and update the folder/file/size counts.
+        ``signature`` identifies everything besides descriptions and ``budget`` that changes the
+        text (filters, language); blocks rendered under another signature are not reused.
+        """
+        signature = (signature, budget.key if budget else None)
+        cache = self._caches.pop(signature, None)
+        if cache is None:
+            cache = {}
+        self._caches[signature] = cache
+        while len(self._caches) > self.CACHED_SIGNATURES:
+            self._caches.popitem(last=False)
+
+        with metrics.timed("rendering"):
+            block = self._block(view, descriptions, cache, ROOT_NODE, '', True, 0, budget)
+            self.folder_count = block.folders
+            self.file_count = block.files
+            self.total_size = block.size
+            lines: List[str] = []
+            _flatten(block, lines)
+        metrics.add(lines_rendered=len(lines))
+        return lines
+
+    def _block(self, view, descriptions, cache, node, prefix, is_last, depth, budget) -> _Block:
+        key = (prefix, is_last, self._versions.get(node, 0))
+        block = cache.get(node)
+        if block is not None and block.key == key:
+            return block
+        block = _Block(key)
+        cache[node] = block
+        parts = block.parts
+        snapshot = view.snapshot
+        connector = LAST_BRANCH if is_last else BRANCH
+
+        items = view.children(node)
+        status = _status_key(snapshot, node, items)
+        block.folders = int(status is None or status == 'empty_folder')
+        if status is not None:
+            parts.append(f"{prefix}{connector}{self.tr(status)}")
+            return block
+
+        items, omitted_line, omitted = _apply_budget(view, items, depth, budget, self.tr, prefix)
+        if omitted_line is not None:
+            block.folders += omitted[0]
+            block.files += omitted[1]
+            block.size += omitted[2]
+        sizes = view.sizes
+        last = items[-1] if items and omitted_line is None else None
+        for child in items:
+            child_is_last = child == last
+            child_prefix = prefix + (SPACE_INDENT if child_is_last else PIPE_INDENT)
+            is_dir = snapshot.is_dir(child)
+            parts.append(_entry_line(snapshot, sizes, child, is_dir, prefix, child_is_last))
+            if not is_dir:
+                block.files += 1
+                if not snapshot.is_duplicate(child):
+                    block.size += sizes[child]
+
+            description = descriptions.get(snapshot.path(child), "")
+            if description:
+                parts.extend(_description_lines(child_prefix, description))
+
+            if is_dir:
+                child_block = self._block(
+                    view, descriptions, cache, child, child_prefix, child_is_last, depth + 1, budget
+                )
+                parts.append(child_block)
+                block.folders += child_block.folders
+                block.files += child_block.files
+                block.size += child_block.size
+            elif _lists_members(view, child):
+                # Members are shown like a folder but only the archive counts in the summary.
+                parts.append(self._block(
+                    view, descriptions, cache, child, child_prefix, child_is_last, depth + 1, budget
+                ))
+        if omitted_line is not None:
+            parts.append(omitted_line)
+        return block
+
+
+def _lists_members(view: FilteredView, node: int) -> bool:
+    """True for an archive with visible members, which are listed below it like a folder."""
+    return view.snapshot.is_archive(node) and bool(view.children(node))
+
+
+def _subtree_counts(view: FilteredView, node: int) -> Tuple[int, int]:
+    """The folders and files that the summary counts for directory ``node`` and everything under it."""
+    snapshot = view.snapshot
+    folders = files = 0
+    stack = [node]
+    while stack:
+        directory = stack.pop()
+        if snapshot.flags[directory] & FLAG_UNLISTED:
+            continue
+        folders += 1
+        for child in view.children(directory):
+            if snapshot.is_dir(child):
+                stack.append(child)
+            else:
+                files += 1
+    return folders, files
+
+
+def _count_phrase(tr: Callable[..., str], count: int, key: str) -> str:
+    if count == 1:
+        return tr(key)
+    return tr(key + "s", count=f"{count:,}".replace(",", tr("thousands_separator")))
+
+
+def _apply_budget(view: FilteredView, items: List[int], depth: int, budget, tr, prefix: str):
+    """
+    Apply ``budget`` to the visible ``items`` of a directory at ``depth``. Return the entries to
+    list, the line standing for the others (None when nothing is left out) and the
+    ``(folders, files, bytes)`` the summary counts for the others.
+    """
+    if not budget:
+        return items, None, None
+    if budget.max_depth and depth >= budget.max_depth:
+        shown, omitted, more = [], items, False
+    elif budget.max_children and len(items) > budget.max_children:
+        if budget.order == "size":
+            shown = heapq.nlargest(budget.max_children, items, key=view.sizes.__getitem__)
+            kept = set(shown)
+            omitted = [child for child in items if child not in kept]
+        else:
+            shown, omitted = items[:budget.max_children], items[budget.max_children:]
+        more = True
+    else:
+        return items, None, None
+
+    snapshot = view.snapshot
+    sizes = view.sizes
+    direct_folders = direct_files = folders = files = size = 0
+    for child in omitted:
+        if not snapshot.is_duplicate(child):
+            size += sizes[child]
+        if snapshot.is_dir(child):
+            direct_folders += 1
+            child_folders, child_files = _subtree_counts(view, child)
+            folders += child_folders
+            files += child_files
+        else:
+            direct_files += 1
+    files += direct_files
+    phrases = []
+    if direct_folders:
+        phrases.append(_count_phrase(tr, direct_folders, "render_more_folder" if more else "render_folder"))
+    if direct_files:
+        phrases.append(_count_phrase(tr, direct_files, "render_more_file" if more else "render_file"))
+    entries = phrases[0] if len(phrases) == 1 else tr("render_and", first=phrases[0], second=phrases[1])
+    text = tr("render_omitted" if more else "render_collapsed", entries=entries, size=naturalsize(size))
+    return shown, f"{prefix}{LAST_BRANCH}{text}", (folders, files, size)
+
+
+def _status_key(snapshot: ScanSnapshot, node: int, items: Sequence[int]):
+    """Translation key of the line shown instead of the visible ``items`` of ``node``, if any."""
+    error = snapshot.error(node)
+    if error == ERROR_PERMISSION_DENIED:
+        return 'permission_denied'
+    if error == ERROR_NOT_FOUND:
+        return 'not_found'
+    if snapshot.on_other_filesystem(node):
+        return 'other_filesystem'
+    if snapshot.is_duplicate(node):
+        return 'already_listed'
+    if not items:
+        return 'empty_folder'
+    return None
+
+
+def _entry_line(snapshot: ScanSnapshot, sizes, child: int, is_dir: bool, prefix: str, is_last: bool) -> str:
+    connector = LAST_BRANCH if is_last else BRANCH
+    name = f"**{snapshot.name(child)}**" if is_dir else snapshot.name(child)
+    return f"{prefix}{connector}{name} [ {naturalsize(sizes[child])} ]"
+
+
+def _description_lines(prefix: str, description: str) -> List[str]:
+    # Multi-line descriptions are split so that every element is exactly one line.
+    return f"{prefix}<!-- {description} -->".split("\n")
+
+
+def summary_lines(tr: Callable[..., str], folders: int, files: int, size: int) -> List[str]:
+    """The localized summary that ends the Markdown and plain-text documents."""
+    return [
+        '',
+        '---',
+        tr("summary_heading"),
+        tr("summary_total_folders", count=folders),
+        tr("summary_total_files", count=files),
+        tr("summary_total_size", size=naturalsize(size)),
+    ]
+
+
+def statistics_lines(tr: Callable[..., str], statistics: DatasetStatistics) -> List[str]:
+    """The localized statistics section that optionally follows the summary."""
+    lines = ['', tr("statistics_heading"), tr("statistics_by_extension")]
+    for extension, count, size in statistics.extensions[:TOP_EXTENSIONS]:
+        lines.append(tr(
+            "statistics_extension", extension=extension or tr("statistics_no_extension"),
+            files=_count_phrase(tr, count, "render_file"), size=naturalsize(size),
+        ))
+    others = statistics.extensions[TOP_EXTENSIONS:]
+    if others:
+        lines.append(tr(
+            "statistics_extension", extension=_count_phrase(tr, len(others), "statistics_other_extension"),
+            files=_count_phrase(tr, sum(row[1] for row in others), "render_file"),
+            size=naturalsize(sum(row[2] for row in others)),
+        ))
+    lines.append(tr("statistics_size_histogram"))
+    for bucket, count in enumerate(statistics.histogram):
+        if not count:
+            continue
+        files = _count_phrase(tr, count, "render_file")
+        if bucket == 0:
+            lines.append(tr("statistics_empty_files", files=files))
+        else:
+            low, high = histogram_bounds(bucket)
+            lines.append(tr("statistics_size_bucket", low=binary_size(low), high=binary_size(high), files=files))
+    if statistics.largest_directories:
+        lines.append(tr("statistics_largest_folders"))
+        for path, size in statistics.largest_directories:
+            lines.append(tr("statistics_folder", path=path, size=naturalsize(size)))
+    return lines
+
+
+def iter_markdown_lines(
+    view: FilteredView, descriptions: Dict[str, str], tr: Callable[..., str], root_name: str,
+    budget: Optional[RenderBudget] = None, statistics: bool = False,
+) -> Iterator[str]:
+    """
+    Yield the Markdown/plain-text document line by line: the root name, the tree and, once the
+    walk is over, the summary and, with ``statistics``, the statistics section. Only the stack of
+    open directories is kept in memory. ``budget`` bounds the tree as in :class:`TreeTextRenderer`.
+    """
+    snapshot = view.snapshot
+    sizes = view.sizes
+    folders = files = total_size = 0
+    # Archive members are listed but, as in folder sizes, only their archive is counted.
+    first_member = snapshot.scanned_count
+    yield root_name
+
+    stack = []
+    node, prefix, is_last, depth = ROOT_NODE, '', True, 0
+    while True:
+        if node is not None:
+            items = view.children(node)
+            status = _status_key(snapshot, node, items)
+            counted = node < first_member and snapshot.is_dir(node)
+            if counted and (status is None or status == 'empty_folder'):
+                folders += 1
+            if status is None:
+                items, omitted_line, omitted = _apply_budget(view, items, depth, budget, tr, prefix)
+                if omitted_line is not None and counted:
+                    folders += omitted[0]
+                    files += omitted[1]
+                    total_size += omitted[2]
+                last = items[-1] if items and omitted_line is None else None
+                stack.append((iter(items), last, prefix, depth, omitted_line))
+            else:
+                yield f"{prefix}{LAST_BRANCH if is_last else BRANCH}{tr(status)}"
+            node = None
+        if not stack:
+            break
+        children, last, parent_prefix, parent_depth, omitted_line = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if omitted_line is not None:
+                yield omitted_line
+            continue
+        child_is_last = child == last
+        child_prefix = parent_prefix + (SPACE_INDENT if child_is_last else PIPE_INDENT)
+        is_dir = snapshot.is_dir(child)
+        yield _entry_line(snapshot, sizes, child, is_dir, parent_prefix, child_is_last)
+        if not is_dir and child < first_member:
+            files += 1
+            if not snapshot.is_duplicate(child):
+                total_size += sizes[child]
+        description = descriptions.get(snapshot.path(child), "")
+        if description:
+            yield from _description_lines(child_prefix, description)
+        if is_dir or _lists_members(view, child):
+            node, prefix, is_last, depth = child, child_prefix, child_is_last, parent_depth + 1
+
+    yield from summary_lines(tr, folders, files, total_size)
+    if statistics:
+        yield from statistics_lines(tr, collect_statistics(view))
+
+
+def iter_csv_rows(
+    view: FilteredView, descriptions: Dict[str, str], checksums: Optional[Dict[int, str]] = None
+) -> Iterator[list]:
+    """
+    Yield one CSV row per visible entry, depth first, below the root of ``view``; archive
+    members follow their archive. With
+    ``checksums`` (digests by node id), each row ends with the file's digest, or an empty cell.
+    """
+    snapshot = view.snapshot
+    sizes = view.sizes
+    stack = [iter(view.children(ROOT_NODE))]
+    rows = 0
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            continue
+        is_dir = snapshot.is_dir(child)
+        row = [
+            snapshot.relative_path(child),
+            "Directory" if is_dir else "File",
+            snapshot.name(child),
+            sizes[child],
+            descriptions.get(snapshot.path(child), ""),
+        ]
+        if checksums is not None:
+            row.append(checksums.get(child, ""))
+        yield row
+        if is_dir or snapshot.is_archive(child):
+            stack.append(iter(view.children(child)))
+        rows += 1
+    metrics.add(rows_exported=rows)
+
+
+def scan_date(scanned_at_ns: int) -> str:
+    """The local date and time of a scan, as shown in diff reports."""
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(scanned_at_ns // 1_000_000_000))
+
+
+def _entries_phrase(tr: Callable[..., str], folders: int, files: int) -> str:
+    phrases = []
+    if folders:
+        phrases.append(_count_phrase(tr, folders, "render_folder"))
+    if files or not folders:
+        phrases.append(_count_phrase(tr, files, "render_file"))
+    return phrases[0] if len(phrases) == 1 else tr("render_and", first=phrases[0], second=phrases[1])
+
+
+def diff_summary_lines(tr: Callable[..., str], totals: ChangeTotals) -> List[str]:
+    """The localized summary that ends a diff report, one line per kind of change found."""
+    lines = ['', '---', tr("summary_heading")]
+    for kind in CHANGE_KINDS:
+        folders, files, old_bytes, new_bytes = totals.counts[kind]
+        if not folders and not files:
+            continue
+        entries = _entries_phrase(tr, folders, files)
+        if kind == CHANGE_RESIZED:
+            lines.append(tr("diff_summary_resized", entries=entries, old=naturalsize(old_bytes),
+                            new=naturalsize(new_bytes)))
+        else:
+            size = old_bytes if kind == CHANGE_REMOVED else new_bytes
+            lines.append(tr(f"diff_summary_{kind}", entries=entries, size=naturalsize(size)))
+    if not totals:
+        lines.append(tr("diff_no_changes"))
+    return lines
+
+
+def iter_diff_lines(
+    old_view: FilteredView, new_view: FilteredView, tr: Callable[..., str], root_name: str
+) -> Iterator[str]:
+    """
+    Yield the Markdown/plain-text report of the changes from ``old_view`` (a saved scan) to
+    ``new_view``: a title, one line per change in tree order, then the summary.
+    """
+    old = old_view.snapshot
+    new = new_view.snapshot
+    totals = ChangeTotals()
+    yield tr("diff_title", root=root_name, date=scan_date(old.scanned_at_ns))
+    yield ''
+    for change in iter_changes(old_view, new_view):
+        totals.add(change, old, new)
+        if change.new_node >= 0:
+            snapshot, sizes, node = new, new_view.sizes, change.new_node
+        else:
+            snapshot, sizes, node = old, old_view.sizes, change.old_node
+        path = snapshot.relative_path(node)
+        if snapshot.is_dir(node):
+            path = f"**{path}**"
+        if change.kind == CHANGE_RESIZED:
+            yield tr("diff_resized", path=path, old=naturalsize(old.sizes[change.old_node]),
+                     new=naturalsize(new.sizes[change.new_node]))
+        else:
+            yield tr(f"diff_{change.kind}", path=path, size=naturalsize(sizes[node]))
+    yield from diff_summary_lines(tr, totals)
+
+
+def iter_diff_csv_rows(old_view: FilteredView, new_view: FilteredView) -> Iterator[list]:
+    """Yield one :data:`DIFF_CSV_HEADER` row per change from ``old_view`` to ``new_view``."""
+    old = old_view.snapshot
+    new = new_view.snapshot
+    rows = 0
+    for change in iter_changes(old_view, new_view):
+        snapshot, node = (new, change.new_node) if change.new_node >= 0 else (old, change.old_node)
+        yield [
+            change.kind,
+            snapshot.relative_path(node),
+            "Directory" if snapshot.is_dir(node) else "File",
+            old_view.sizes[change.old_node] if change.old_node >= 0 else "",
+            new_view.sizes[change.new_node] if change.new_node >= 0 else "",
+        ]
+        rows += 1
+    metrics.add(rows_exported=rows)
+
+
+def write_lines(handle, lines) -> None:
+    """Write ``lines`` separated by newlines, as ``'\\n'.join`` would, without joining them."""
+    separator = ''
+    written = 0
+    for line in lines:
+        handle.write(separator + line)
+        separator = '\n'
+        written += 1
+    metrics.add(lines_exported=written)
+
+
+def _flatten(block: _Block, lines: List[str]) -> None:
+    stack = [iter(block.parts)]
+    while stack:
+        for part in stack[-1]:
+            if part.__class__ is str:
+                lines.append(part)
+            else:
+                stack.append(iter(part.parts))
+                break
+        else:
+            stack.pop()
+
+
+def common_affixes(old: List[str], new: List[str]) -> "tuple[int, int]":
+    """
+    Return ``(prefix, suffix)``: how many leading and trailing lines ``old`` and ``new`` share,
+    without letting the two overlap. Runs of lines are compared as slices, so the scan stays in C.
+    """
+    limit = min(len(old), len(new))
+    prefix = _matching_run(old, new, limit, lambda start, stop: old[start:stop] == new[start:stop])
+    old_end = len(old)
+    new_end = len(new)
+    suffix = _matching_run(
+        old, new, limit - prefix,
+        lambda start, stop: old[old_end - stop:old_end - start] == new[new_end - stop:new_end - start],
+    )
+    return prefix, suffix
+
+
+def _matching_run(old, new, limit: int, same: Callable[[int, int], bool], chunk: int = 4096) -> int:
+    matched = 0
+    while chunk:
+        while matched + chunk <= limit and same(matched, matched + chunk):
+            matched += chunk
+        chunk //= 2
+    return matched
+
+
+__all__ = [
+    "CSV_CHECKSUM_HEADER",
+    "CSV_HEADER",
+    "DIFF_CSV_HEADER",
+    "RenderBudget",
+    "TreeTextRenderer",
+    "common_affixes",
+    "diff_summary_lines",
+    "iter_csv_rows",
+    "iter_diff_csv_rows",
+    "iter_diff_lines",
+    "iter_markdown_lines",
+    "naturalsize",
+    "scan_date",
+    "statistics_lines",
+    "summary_lines",
+    "write_lines",
+]
@@ -0,0 +1,132 @@
+"""Persistent scan snapshots for TreeGen.
+
+A :class:`~scanner.ScanSnapshot` is written as a small JSON header followed by the raw bytes of
+each array column, so loading a multi-million-entry snapshot is a handful of buffer copies rather
+than a parse. Snapshots live in the per-user cache directory, one file per scanned root, and are
+passed back to :func:`scanner.scan_directory` so a reopened dataset only re-lists the directories
+that changed since the last session.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+from typing import Optional
+
+from treegen.scanner import ScanSnapshot
+
+CACHE_MAGIC = b"TREEGEN-SNAPSHOT\n"
+CACHE_FORMAT_VERSION = 4
+
+
+def default_cache_dir() -> str:
+    """Return the per-user cache directory for TreeGen on this platform."""
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "TreeGen", "Cache")
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Caches", "TreeGen")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "treegen")
+
+
+def cache_path_for(root, cache_dir: Optional[str] = None, suffix: str = ".snapshot") -> str:
+    """
+    Return the snapshot file used for ``root``, keyed by a hash of its absolute path. Other
+    caches of the same root use the same name with another ``suffix``.
+    """
+    key = os.path.normcase(os.path.abspath(os.fspath(root)))
+    digest = hashlib.sha1(key.encode("utf-8", "surrogatepass")).hexdigest()
+    return os.path.join(cache_dir or default_cache_dir(), f"{digest}{suffix}")
+
+
+def save_snapshot(snapshot: ScanSnapshot, path: str) -> None:
+    """Write ``snapshot`` to ``path`` atomically (through a temporary file and ``os.replace``)."""
+    header = {
+        "version": CACHE_FORMAT_VERSION,
+        "root": snapshot.root,
+        "byteorder": sys.byteorder,
+        "count": len(snapshot),
+        "scanned_at_ns": snapshot.scanned_at_ns,
+        "allocated": snapshot.allocated,
+        "one_filesystem": snapshot.one_filesystem,
+        "member_start": snapshot.member_start,
+        "extension_table": snapshot.extension_table,
+        "name_bytes": len(snapshot.name_buffer),
+        "columns": [
+            [column, getattr(snapshot, column).typecode, getattr(snapshot, column).itemsize]
+            for column in ScanSnapshot.COLUMNS
+        ],
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as handle:
+            handle.write(CACHE_MAGIC)
+            handle.write(json.dumps(header).encode("utf-8") + b"\n")
+            handle.write(snapshot.flags)
+            handle.write(snapshot.name_buffer)
+            for column in ScanSnapshot.COLUMNS:
+                getattr(snapshot, column).tofile(handle)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_snapshot(path: str, root=None) -> ScanSnapshot:
+    """
+    Read a snapshot written by :func:`save_snapshot`.
+    Raises ``ValueError`` when the file is truncated, from another format version or platform
+    layout, or (when ``root`` is given) belongs to a different directory.
+    """
+    with open(path, "rb") as handle:
+        if handle.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+            raise ValueError(f"{path} is not a TreeGen snapshot")
+        try:
+            header = json.loads(handle.readline())
+        except ValueError:
+            raise ValueError(f"{path} has a corrupt header") from None
+        if header.get("version") != CACHE_FORMAT_VERSION or header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{path} was written by an incompatible TreeGen version")
+        if [column[0] for column in header.get("columns", ())] != list(ScanSnapshot.COLUMNS):
+            raise ValueError(f"{path} was written by an incompatible TreeGen version")
+        if root is not None and os.path.normcase(header["root"]) != os.path.normcase(os.fspath(root)):
+            raise ValueError(f"{path} belongs to {header['root']}")
+
+        count = header["count"]
+        snapshot = ScanSnapshot(header["root"], header["allocated"], header["one_filesystem"])
+        snapshot.scanned_at_ns = header["scanned_at_ns"]
+        snapshot.member_start = header["member_start"]
+        snapshot.set_extension_table(header["extension_table"])
+        snapshot.flags = bytearray(_read_exact(handle, count))
+        snapshot.name_buffer = bytearray(_read_exact(handle, header["name_bytes"]))
+        for column, typecode, itemsize in header["columns"]:
+            values = getattr(snapshot, column)
+            if values.typecode != typecode or values.itemsize != itemsize:
+                raise ValueError(f"{path} was written by an incompatible TreeGen version")
+            length = count + 1 if column == "name_offsets" else count
+            del values[:]
+            values.frombytes(_read_exact(handle, length * itemsize))
+    return snapshot
+
+
+def _read_exact(handle, size: int) -> bytes:
+    data = handle.read(size)
+    if len(data) != size:
+        raise ValueError(f"{handle.name} is truncated")
+    return data
+
+
+__all__ = [
+    "CACHE_FORMAT_VERSION",
+    "cache_path_for",
+    "default_cache_dir",
+    "load_snapshot",
+    "save_snapshot",
+]
@@ -0,0 +1,1003 @@
+"""Single-pass directory scanning for TreeGen.
+
+The selected directory is walked once with ``os.scandir`` and every entry is recorded in a
+:class:`ScanSnapshot`. The tree model, the Markdown preview and the exporters all read from the
+snapshot instead of listing the filesystem again, and folder sizes are aggregated bottom-up at the
+end of the walk rather than recomputed for every directory.
+
+Given the snapshot of a previous scan, :func:`scan_directory` only re-lists directories whose
+``(st_dev, st_ino, st_mtime_ns)`` changed and reuses the cached listing of everything else.
+
+Every ``(st_dev, st_ino)`` is counted once: a file with several hard links adds its size to the
+folder totals only at its first link in scan order, and a directory reached again through a
+bind mount is recorded but not entered, so a mount of an ancestor cannot loop the walk.
+
+With ``archives``, the members of zip and tar files are appended once the walk is over and
+listed below each archive like a folder (see :mod:`treegen.archives`).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from itertools import accumulate
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from treegen.instrumentation import metrics
+from treegen.search import NameIndex
+
+FILE_ATTRIBUTE_HIDDEN = 0x2
+FILE_ATTRIBUTE_SYSTEM = 0x4
+IO_REPARSE_TAG_MOUNT_POINT = 0xA0000003
+
+ERROR_NONE = 0
+ERROR_PERMISSION_DENIED = 1
+ERROR_NOT_FOUND = 2
+
+ROOT_NODE = 0
+
+# Bits of ScanSnapshot.flags.
+FLAG_DIR = 0x1
+FLAG_HIDDEN = 0x2
+FLAG_PERMISSION_DENIED = 0x4
+FLAG_NOT_FOUND = 0x8
+# Set on hidden entries and on everything underneath a hidden directory.
+FLAG_HIDDEN_PATH = 0x10
+FLAG_ERRORS = FLAG_PERMISSION_DENIED | FLAG_NOT_FOUND
+# A file with more than one hard link.
+FLAG_HARD_LINK = 0x20
+# A hard link to a file counted earlier in the scan, or a directory already entered under
+# another path. Neither adds to the folder totals, and such a directory is not entered.
+FLAG_DUPLICATE = 0x40
+# A directory on another filesystem than the root, left unlisted by a one-filesystem scan.
+FLAG_OTHER_FILESYSTEM = 0x80
+# Directories without a listing of their own.
+FLAG_UNLISTED = FLAG_ERRORS | FLAG_DUPLICATE | FLAG_OTHER_FILESYSTEM
+
+# Copying cached flags keeps the type, hidden and hard-link bits; the others depend on the rest
+# of the tree and are re-evaluated by every scan.
+_FLAG_COPY_TABLE = bytes(value & ~FLAG_UNLISTED for value in range(256))
+# Map a flag byte to 1 for files with several links, so that bytearray.find() locates them.
+_HARD_LINK_TABLE = bytes(int(value & (FLAG_HARD_LINK | FLAG_DIR) == FLAG_HARD_LINK) for value in range(256))
+_DUPLICATE_FILE_TABLE = bytes(int(value & (FLAG_DUPLICATE | FLAG_DIR) == FLAG_DUPLICATE) for value in range(256))
+
+# st_blocks counts 512-byte units on every platform that reports it.
+BLOCK_SIZE = 512
+
+# Directories modified this close to the start of a scan may change again within the same
+# mtime tick, so a rescan lists them again instead of trusting the cached listing.
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+# Listings kept in flight per worker thread when scanning concurrently.
+PREFETCH_PER_WORKER = 4
+
+_IS_WINDOWS = sys.platform.startswith("win")
+
+# (name, is_dir, size, hidden, mtime_ns, dev, ino, nlink) as produced by a single directory listing.
+DirectoryEntry = Tuple[str, bool, int, bool, int, int, int, int]
+
+
+def normalize_extensions(exclude_extensions: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """Return the exclusion patterns as a lowercase tuple suitable for ``str.endswith``."""
+    if not exclude_extensions:
+        return ()
+    return tuple(ext.lower() for ext in exclude_extensions if ext)
+
+
+def split_extension_patterns(exclude_extensions: Optional[Iterable[str]]) -> Tuple[frozenset, Tuple[str, ...]]:
+    """
+    Split exclusion patterns into the exact extensions (".txt"), matched by a set lookup on
+    :meth:`ScanSnapshot.extension`, and the other suffixes (".tar.gz", "txt") matched on the name.
+    """
+    patterns = normalize_extensions(exclude_extensions)
+    exact = frozenset(pattern for pattern in patterns if _exact_extension(pattern))
+    return exact, tuple(pattern for pattern in patterns if pattern not in exact)
+
+
+def _entry_is_hidden(entry: os.DirEntry, stat_result: Optional[os.stat_result]) -> bool:
+    if _IS_WINDOWS and stat_result is not None:
+        attrs = getattr(stat_result, "st_file_attributes", None)
+        if attrs is not None:
+            return bool(attrs & (FILE_ATTRIBUTE_HIDDEN | FILE_ATTRIBUTE_SYSTEM))
+    return entry.name.startswith(".")
+
+
+def _entry_is_junction(stat_result: Optional[os.stat_result]) -> bool:
+    # is_dir(follow_symlinks=False) is true for directory junctions; they are not followed,
+    # like symlinks, since they can point back up the tree.
+    return _IS_WINDOWS and stat_result is not None \
+        and getattr(stat_result, "st_reparse_tag", 0) == IO_REPARSE_TAG_MOUNT_POINT
+
+
+def allocated_size(stat_result: os.stat_result) -> int:
+    """Bytes the entry occupies on disk, or its apparent size where ``st_blocks`` is missing (Windows)."""
+    blocks = getattr(stat_result, "st_blocks", None)
+    return stat_result.st_size if blocks is None else blocks * BLOCK_SIZE
+
+
+def list_directory(path: str, allocated: bool = False) -> List[DirectoryEntry]:
+    """
+    List one directory and return its entries sorted case-insensitively by name.
+    Each entry is stat'ed once (without following symlinks); unreadable entries report a size,
+    mtime and identity of 0. File sizes are apparent sizes, or allocated sizes with ``allocated``.
+    """
+    entries = []
+    with metrics.timed("list_directory"):
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                try:
+                    stat_result = entry.stat(follow_symlinks=False)
+                except OSError:
+                    stat_result = None
+                if stat_result is None:
+                    size = mtime = device = inode = 0
+                    links = 1
+                else:
+                    if is_dir:
+                        is_dir = not _entry_is_junction(stat_result)
+                        size = 0
+                    else:
+                        size = allocated_size(stat_result) if allocated else stat_result.st_size
+                    mtime, device, inode = stat_result.st_mtime_ns, stat_result.st_dev, stat_result.st_ino
+                    links = stat_result.st_nlink
+                entries.append(
+                    (entry.name, is_dir, size, _entry_is_hidden(entry, stat_result), mtime, device, inode, links)
+                )
+        entries.sort(key=lambda item: (item[0].lower(), item[0]))
+    metrics.add(scandir_calls=1, stat_calls=len(entries))
+    return entries
+
+
+class ScanSnapshot:
+    """
+    In-memory record of a directory tree produced by :func:`scan_directory`.
+
+    Nodes are addressed by integer ids; node 0 is the scanned root. The children of a directory
+    are stored contiguously, in name order, so they can be enumerated as a ``range`` of ids, and
+    every child id is larger than its parent id. Directory sizes hold the unfiltered total of
+    everything underneath them.
+
+    Storage is columnar to keep very large trees compact: parent and child ranges live in
+    ``array('i')`` columns, sizes in ``array('q')`` and the type/hidden/error state in a one-byte
+    flag column. Names are UTF-8 slices of one shared buffer, extensions are indices into a small
+    table, and full paths are rebuilt from the parent chain on demand instead of being stored.
+    ``mtimes``, ``devices`` and ``inodes`` keep the stat identity of every entry so that a later
+    scan can tell which directories changed, and which files are hard links to the same inode.
+
+    ``allocated`` and ``one_filesystem`` are the options the snapshot was scanned with: file
+    sizes are allocated rather than apparent sizes, and directories on other filesystems than
+    the root were left unlisted.
+
+    Archive members, when listed, are the children of their archive file and take the ids from
+    ``member_start`` on. Folders inside an archive hold the uncompressed total of their members;
+    the archive itself, and the folders around it, count only its size on disk.
+    """
+
+    # Array columns, in the order they are persisted by scan_cache.
+    COLUMNS = (
+        "name_offsets", "parents", "first_child", "child_count", "sizes",
+        "extension_ids", "mtimes", "devices", "inodes",
+    )
+
+    def __init__(self, root: str, allocated: bool = False, one_filesystem: bool = False) -> None:
+        self.root = os.fspath(root)
+        self.allocated = bool(allocated)
+        self.one_filesystem = bool(one_filesystem)
+        self.name_buffer = bytearray()
+        self.name_offsets = array("q", [0])
+        self.parents = array("i", [-1])
+        self.first_child = array("i", [0])
+        self.child_count = array("i", [0])
+        self.sizes = array("q", [0])
+        self.flags = bytearray([FLAG_DIR])
+        self.extension_ids = array("I", [0])
+        self.mtimes = array("q", [0])
+        self.devices = array("Q", [0])
+        self.inodes = array("Q", [0])
+        self.extension_table: List[str] = [""]
+        self._extension_lookup = {"": 0}
+        self.scanned_at_ns = time.time_ns()
+        self._filter_aggregates = None
+        self._name_index = None
+        self._file_statistics = None
+        # Id of the first archive member (members follow every scanned entry), or None when
+        # archives were not expanded.
+        self.member_start: Optional[int] = None
+        self._append_name(os.path.basename(self.root) or self.root)
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+    def _append_name(self, name: str) -> None:
+        self.name_buffer += name.encode("utf-8", "surrogatepass")
+        self.name_offsets.append(len(self.name_buffer))
+
+    def name(self, node: int) -> str:
+        offsets = self.name_offsets
+        return self.name_buffer[offsets[node]:offsets[node + 1]].decode("utf-8", "surrogatepass")
+
+    def is_dir(self, node: int) -> bool:
+        return bool(self.flags[node] & FLAG_DIR)
+
+    def is_hidden(self, node: int) -> bool:
+        return bool(self.flags[node] & FLAG_HIDDEN)
+
+    def in_hidden_path(self, node: int) -> bool:
+        """True for hidden entries and for everything underneath a hidden directory."""
+        return bool(self.flags[node] & FLAG_HIDDEN_PATH)
+
+    def is_duplicate(self, node: int) -> bool:
+        """True for a file or directory already counted under another path."""
+        return bool(self.flags[node] & FLAG_DUPLICATE)
+
+    def on_other_filesystem(self, node: int) -> bool:
+        return bool(self.flags[node] & FLAG_OTHER_FILESYSTEM)
+
+    def is_archive(self, node: int) -> bool:
+        """True for a file whose archive members are listed below it."""
+        return not self.flags[node] & FLAG_DIR and self.child_count[node] > 0
+
+    def is_member(self, node: int) -> bool:
+        """True for an entry listed from inside an archive rather than from the filesystem."""
+        return self.member_start is not None and node >= self.member_start
+
+    @property
+    def scanned_count(self) -> int:
+        """Number of entries listed from the filesystem; archive members come after them."""
+        return len(self) if self.member_start is None else self.member_start
+
+    @property
+    def options(self) -> Tuple[bool, bool]:
+        """``(allocated, one_filesystem)``; a rescan only reuses snapshots with the same options."""
+        return self.allocated, self.one_filesystem
+
+    def extension(self, node: int) -> str:
+        return self.extension_table[self.extension_ids[node]]
+
+    def error(self, node: int) -> int:
+        flags = self.flags[node]
+        if flags & FLAG_PERMISSION_DENIED:
+            return ERROR_PERMISSION_DENIED
+        if flags & FLAG_NOT_FOUND:
+            return ERROR_NOT_FOUND
+        return ERROR_NONE
+
+    def set_error(self, node: int, error: int) -> None:
+        if error == ERROR_PERMISSION_DENIED:
+            self.flags[node] |= FLAG_PERMISSION_DENIED
+        elif error == ERROR_NOT_FOUND:
+            self.flags[node] |= FLAG_NOT_FOUND
+
+    def children(self, node: int) -> range:
+        first = self.first_child[node]
+        return range(first, first + self.child_count[node])
+
+    def path_parts(self, node: int) -> List[str]:
+        """Names from the first level below the root down to ``node``."""
+        parts = []
+        parents = self.parents
+        while node != ROOT_NODE:
+            parts.append(self.name(node))
+            node = parents[node]
+        parts.reverse()
+        return parts
+
+    def path(self, node: int) -> str:
+        if node == ROOT_NODE:
+            return self.root
+        return os.path.join(self.root, *self.path_parts(node))
+
+    def relative_path(self, node: int) -> str:
+        if node == ROOT_NODE:
+            return os.curdir
+        return os.path.join(*self.path_parts(node))
+
+    def find_extension_id(self, extension: str) -> Optional[int]:
+        return self._extension_lookup.get(extension)
+
+    def _extension_id(self, name: str) -> int:
+        # The lowercase suffix from the last dot, so ``name.lower().endswith(".ext")`` holds
+        # exactly when the extension is ".ext" (dot files such as ".bashrc" included).
+        dot = name.rfind(".")
+        extension = name[dot:].lower() if dot >= 0 else ""
+        extension_id = self._extension_lookup.get(extension)
+        if extension_id is None:
+            extension_id = len(self.extension_table)
+            self.extension_table.append(extension)
+            self._extension_lookup[extension] = extension_id
+        return extension_id
+
+    def set_extension_table(self, extension_table: Sequence[str]) -> None:
+        self.extension_table = list(extension_table)
+        self._extension_lookup = {extension: index for index, extension in enumerate(self.extension_table)}
+
+    def adopt_extensions(self, other: "ScanSnapshot") -> None:
+        """Start from the extension table of ``other`` so its extension ids stay valid here."""
+        self.set_extension_table(other.extension_table)
+
+    def set_identity(self, node: int, mtime_ns: int, device: int, inode: int) -> None:
+        self.mtimes[node] = mtime_ns
+        self.devices[node] = device
+        self.inodes[node] = inode
+
+    def add_children(self, parent: int, entries: Sequence[DirectoryEntry]) -> int:
+        """Append the listing of ``parent`` and return the id of its first child."""
+        first = len(self.flags)
+        inherited = self.flags[parent] & FLAG_HIDDEN_PATH
+        for name, is_dir, size, hidden, mtime, device, inode, links in entries:
+            self._append_name(name)
+            self.parents.append(parent)
+            self.first_child.append(0)
+            self.child_count.append(0)
+            self.sizes.append(size)
+            self.flags.append(
+                (FLAG_DIR if is_dir else FLAG_HARD_LINK if links > 1 else 0)
+                | (FLAG_HIDDEN | FLAG_HIDDEN_PATH if hidden else inherited)
+            )
+            self.extension_ids.append(0 if is_dir else self._extension_id(name))
+            self.mtimes.append(mtime)
+            self.devices.append(device)
+            self.inodes.append(inode)
+        self.first_child[parent] = first
+        self.child_count[parent] = len(entries)
+        return first
+
+    def copy_children(self, parent: int, other: "ScanSnapshot", other_parent: int) -> int:
+        """
+        Append the children of ``other_parent`` in ``other`` as the children of ``parent`` and
+        return the id of the first one. Columns are copied slice by slice; directory sizes keep
+        the totals aggregated by ``other``. Requires :meth:`adopt_extensions` on ``other``.
+        """
+        first = len(self.flags)
+        start = other.first_child[other_parent]
+        count = other.child_count[other_parent]
+        stop = start + count
+        name_start = other.name_offsets[start]
+        shift = len(self.name_buffer) - name_start
+        self.name_buffer += other.name_buffer[name_start:other.name_offsets[stop]]
+        self.name_offsets.extend(offset + shift for offset in other.name_offsets[start + 1:stop + 1])
+        self.parents.extend(array("i", [parent]) * count)
+        self.first_child.extend(array("i", [0]) * count)
+        self.child_count.extend(array("i", [0]) * count)
+        self.sizes.extend(other.sizes[start:stop])
+        self.flags += other.flags[start:stop].translate(_FLAG_COPY_TABLE)
+        inherited = self.flags[parent] & FLAG_HIDDEN_PATH
+        if inherited != other.flags[other_parent] & FLAG_HIDDEN_PATH:
+            flags = self.flags
+            for node in range(first, first + count):
+                flags[node] = (flags[node] & ~FLAG_HIDDEN_PATH) | (FLAG_HIDDEN_PATH if flags[node] & FLAG_HIDDEN else inherited)
+        self.extension_ids.extend(other.extension_ids[start:stop])
+        self.mtimes.extend(other.mtimes[start:stop])
+        self.devices.extend(other.devices[start:stop])
+        self.inodes.extend(other.inodes[start:stop])
+        self.first_child[parent] = first
+        self.child_count[parent] = count
+        return first
+
+    def mark_duplicate_links(self) -> List[int]:
+        """
+        Flag every hard link to a file already seen at a smaller node id as a duplicate and return
+        the ids of the duplicates. Ids are in breadth-first order, so the link nearest the root
+        is the one counted. Only files with several links are looked at.
+        """
+        flags = self.flags
+        devices = self.devices
+        inodes = self.inodes
+        linked = flags.translate(_HARD_LINK_TABLE)
+        seen = set()
+        duplicates = []
+        node = linked.find(1)
+        while node >= 0:
+            identity = (devices[node], inodes[node])
+            if identity in seen:
+                flags[node] |= FLAG_DUPLICATE
+                duplicates.append(node)
+            elif inodes[node]:
+                seen.add(identity)
+            node = linked.find(1, node + 1)
+        metrics.add(duplicate_links=len(duplicates))
+        return duplicates
+
+    def aggregate_sizes(self) -> None:
+        """
+        Sum sizes into every ancestor directory in a single reverse pass over the node ids, then
+        take the duplicate hard links back out along their ancestor chains.
+        """
+        sizes = self.sizes
+        parents = self.parents
+        with metrics.timed("aggregate_sizes"):
+            duplicates = self.mark_duplicate_links()
+            # Children always have larger ids than their parent, so a directory total is complete
+            # by the time the reverse pass reaches it.
+            for node in range(len(sizes) - 1, 0, -1):
+                sizes[parents[node]] += sizes[node]
+            for node in duplicates:
+                size = sizes[node]
+                parent = parents[node]
+                while parent >= 0:
+                    sizes[parent] -= size
+                    parent = parents[parent]
+        metrics.add(bytes_aggregated=sizes[ROOT_NODE])
+
+    def same_entries(self, other: "ScanSnapshot") -> bool:
+        """True when ``other`` records the same names, types, sizes and structure."""
+        return (
+            self.name_buffer == other.name_buffer
+            and self.name_offsets == other.name_offsets
+            and self.flags == other.flags
+            and self.sizes == other.sizes
+            and self.parents == other.parents
+        )
+
+    def filter_aggregates(self) -> "FilterAggregates":
+        """Per-directory byte totals by extension and hidden status, built once per snapshot."""
+        aggregates = self._filter_aggregates
+        if aggregates is None or aggregates.count != len(self):
+            with metrics.timed("filter_aggregates"):
+                aggregates = self._filter_aggregates = FilterAggregates(self)
+        return aggregates
+
+    def name_index(self) -> NameIndex:
+        """Lowercase names prepared for the search bar, built once per snapshot."""
+        index = self._name_index
+        if index is None or index.count != len(self):
+            with metrics.timed("name_index"):
+                index = self._name_index = NameIndex(self)
+        return index
+
+    def file_statistics(self):
+        """Entry counts by extension, hidden status and size for the statistics section, built once per snapshot."""
+        # Imported here: treegen.statistics reads the flags defined in this module.
+        from treegen.statistics import FileStatistics
+
+        statistics = self._file_statistics
+        if statistics is None or statistics.count != len(self):
+            with metrics.timed("file_statistics"):
+                statistics = self._file_statistics = FileStatistics(self)
+        return statistics
+
+    def filtered(self, exclude_hidden: bool = False, exclude_extensions=None) -> "FilteredView":
+        return FilteredView(self, exclude_hidden, exclude_extensions)
+
+
+class FilterAggregates:
+    """
+    Byte totals that let a :class:`FilteredView` size folders by subtraction.
+
+    For every directory, a run of ``(key, all_bytes, visible_bytes)`` records is kept, sorted by
+    key: for an extension id, the bytes of files with that extension anywhere underneath, in
+    total and outside hidden paths; for :attr:`HIDDEN_KEY`, the bytes inside hidden paths. The
+    runs are built in one reverse pass over the snapshot and stored in flat arrays. Archive
+    members add up to the folders inside their archive, never past the archive file.
+    """
+
+    HIDDEN_KEY = 0xFFFFFFFF
+
+    def __init__(self, snapshot: ScanSnapshot) -> None:
+        self.count = len(snapshot)
+        self.keys = array("I")
+        self.all_bytes = array("q")
+        self.visible_bytes = array("q")
+        run_lengths = array("i", [0]) * self.count
+        flags = snapshot.flags
+        parents = snapshot.parents
+        sizes = snapshot.sizes
+        extension_ids = snapshot.extension_ids
+        hidden_key = self.HIDDEN_KEY
+        pending = {}
+        for node in range(self.count - 1, -1, -1):
+            node_flags = flags[node]
+            if node_flags & FLAG_DIR:
+                totals = pending.pop(node, None)
+                if not totals:
+                    continue
+                # Runs are written back to front and the arrays reversed at the end.
+                for key in sorted(totals, reverse=True):
+                    all_bytes, visible_bytes = totals[key]
+                    self.keys.append(key)
+                    self.all_bytes.append(all_bytes)
+                    self.visible_bytes.append(visible_bytes)
+                run_lengths[node] = len(totals)
+                if node == ROOT_NODE:
+                    continue
+                parent_totals = pending.setdefault(parents[node], {})
+                for key, (all_bytes, visible_bytes) in totals.items():
+                    entry = parent_totals.get(key)
+                    if entry is None:
+                        parent_totals[key] = [all_bytes, visible_bytes]
+                    else:
+                        entry[0] += all_bytes
+                        entry[1] += visible_bytes
+                continue
+            size = 0 if node_flags & FLAG_DUPLICATE else sizes[node]
+            parent_totals = pending.setdefault(parents[node], {})
+            key = extension_ids[node]
+            entry = parent_totals.get(key)
+            if entry is None:
+                entry = parent_totals[key] = [0, 0]
+            entry[0] += size
+            if node_flags & FLAG_HIDDEN_PATH:
+                hidden = parent_totals.get(hidden_key)
+                if hidden is None:
+                    parent_totals[hidden_key] = [size, 0]
+                else:
+                    hidden[0] += size
+            else:
+                entry[1] += size
+        self.keys.reverse()
+        self.all_bytes.reverse()
+        self.visible_bytes.reverse()
+        self.run_starts = array("q", accumulate(run_lengths, initial=0))
+
+    def excluded_bytes(self, node: int, exclude_hidden: bool, extension_ids: frozenset) -> int:
+        """Bytes under directory ``node`` removed by the given filters."""
+        removed = 0
+        keys = self.keys
+        for position in range(self.run_starts[node], self.run_starts[node + 1]):
+            key = keys[position]
+            if key == self.HIDDEN_KEY:
+                if exclude_hidden:
+                    removed += self.all_bytes[position]
+            elif key in extension_ids:
+                removed += self.visible_bytes[position] if exclude_hidden else self.all_bytes[position]
+        return removed
+
+
+def _exact_extension(pattern: str) -> bool:
+    """True for patterns such as ".txt" that can only match one extension id."""
+    return pattern.startswith(".") and pattern.count(".") == 1
+
+
+class _AggregatedSizes:
+    """Sequence of filtered sizes computed per node on access from :class:`FilterAggregates`."""
+
+    def __init__(self, view: "FilteredView") -> None:
+        self.view = view
+        self.aggregates = view.snapshot.filter_aggregates()
+
+    def __len__(self) -> int:
+        return len(self.view.snapshot)
+
+    def __getitem__(self, node: int) -> int:
+        view = self.view
+        snapshot = view.snapshot
+        size = snapshot.sizes[node]
+        if snapshot.flags[node] & FLAG_DIR:
+            size -= self.aggregates.excluded_bytes(node, view.exclude_hidden, view.excluded_extension_ids)
+        return size
+
+
+class FilteredView:
+    """
+    The snapshot as seen through the hidden/extension filters.
+    Exclusion and filtered folder sizes are computed in memory, without touching the filesystem.
+
+    Exclusion patterns of the form ".ext" are answered from :class:`FilterAggregates`, so a new
+    filter costs nothing up front and each folder size is a subtraction over a short run.
+    Other patterns (".tar.gz", "txt") fall back to one in-memory pass over every node.
+    """
+
+    def __init__(self, snapshot: ScanSnapshot, exclude_hidden: bool = False, exclude_extensions=None) -> None:
+        self.snapshot = snapshot
+        self.exclude_hidden = bool(exclude_hidden)
+        self.exclude_extensions = normalize_extensions(exclude_extensions)
+        self.excluded_extension_ids = None
+        self.excluded = None
+        if not self.exclude_hidden and not self.exclude_extensions:
+            self.excluded_extension_ids = frozenset()
+            self.sizes = snapshot.sizes
+        elif all(_exact_extension(pattern) for pattern in self.exclude_extensions):
+            extension_ids = (snapshot.find_extension_id(pattern) for pattern in self.exclude_extensions)
+            self.excluded_extension_ids = frozenset(ext_id for ext_id in extension_ids if ext_id is not None)
+            self.sizes = _AggregatedSizes(self)
+        else:
+            with metrics.timed("filtering"):
+                self.excluded = self._compute_excluded()
+                self.sizes = self._compute_sizes()
+
+    def _compute_excluded(self) -> bytearray:
+        snapshot = self.snapshot
+        count = len(snapshot)
+        excluded = bytearray(count)
+        flags = snapshot.flags
+        hidden_mask = FLAG_HIDDEN_PATH if self.exclude_hidden else 0
+        for node in range(1, count):
+            node_flags = flags[node]
+            if node_flags & hidden_mask:
+                excluded[node] = 1
+            elif not node_flags & FLAG_DIR and snapshot.name(node).lower().endswith(self.exclude_extensions):
+                excluded[node] = 1
+        return excluded
+
+    def _compute_sizes(self) -> array:
+        snapshot = self.snapshot
+        sizes = array("q", snapshot.sizes)
+        parents = snapshot.parents
+        flags = snapshot.flags
+        excluded = self.excluded
+        for node in range(len(sizes)):
+            if flags[node] & FLAG_DIR:
+                sizes[node] = 0
+        # Members add up inside their archive only; the archive keeps its own size.
+        start = snapshot.scanned_count
+        for node in range(len(sizes) - 1, start - 1, -1):
+            if not excluded[node] and parents[node] >= start:
+                sizes[parents[node]] += sizes[node]
+        for node in range(start - 1, 0, -1):
+            if not excluded[node] and not flags[node] & FLAG_DUPLICATE:
+                sizes[parents[node]] += sizes[node]
+        return sizes
+
+    def is_excluded(self, node: int) -> bool:
+        if self.excluded is not None:
+            return bool(self.excluded[node])
+        node_flags = self.snapshot.flags[node]
+        if self.exclude_hidden and node_flags & FLAG_HIDDEN_PATH:
+            return True
+        return not node_flags & FLAG_DIR and self.snapshot.extension_ids[node] in self.excluded_extension_ids
+
+    def children(self, node: int) -> List[int]:
+        excluded = self.excluded
+        if excluded is not None:
+            return [child for child in self.snapshot.children(node) if not excluded[child]]
+        flags = self.snapshot.flags
+        extension_ids = self.snapshot.extension_ids
+        hidden_mask = FLAG_HIDDEN_PATH if self.exclude_hidden else 0
+        excluded_ids = self.excluded_extension_ids
+        return [
+            child for child in self.snapshot.children(node)
+            if not flags[child] & hidden_mask
+            and (flags[child] & FLAG_DIR or extension_ids[child] not in excluded_ids)
+        ]
+
+
+class ScanCancelled(Exception):
+    """Raised by :func:`scan_directory` when its cancel event is set."""
+
+
+def scan_directory(
+    root,
+    on_directory: Optional[Callable[[ScanSnapshot, int], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    workers: int = 1,
+    previous: Optional[ScanSnapshot] = None,
+    allocated: bool = False,
+    one_filesystem: bool = False,
+    archives: bool = False,
+) -> ScanSnapshot:
+    """
+    Walk ``root`` once and return a :class:`ScanSnapshot` of everything underneath it.
+
+    Directories are listed breadth-first; unreadable directories are recorded with an error code
+    instead of aborting the scan. ``on_directory(snapshot, node)`` is called after the children of
+    each directory have been added, which lets callers stream entries as they are discovered.
+    Setting ``cancel_event`` stops the walk before the next directory and raises
+    :class:`ScanCancelled`.
+
+    With ``workers`` greater than one, directory listings (``scandir`` plus one ``stat`` per
+    entry) run concurrently on a bounded thread pool, which hides round-trip latency on network
+    and parallel filesystems. Listings are still committed in breadth-first order, so the
+    resulting snapshot is identical to a sequential scan.
+
+    ``previous`` is an earlier snapshot of the same root, typically loaded from the scan cache.
+    Each of its directories is then stat'ed once and only re-listed when its
+    ``(st_dev, st_ino, st_mtime_ns)`` changed; unchanged listings are copied from ``previous``
+    and folder sizes are re-aggregated only along the ancestor chains of re-listed directories.
+    A directory's mtime does not change when a file inside it is rewritten in place, or when
+    a hard link to one of its files is made elsewhere, so such changes are only picked up by a
+    full scan. A ``previous`` scanned with other options is ignored.
+
+    With ``allocated``, files are sized by the blocks allocated to them (``st_blocks``) instead
+    of their length, so sparse files and compressed filesystems report their real usage. With
+    ``one_filesystem``, directories on another filesystem than the root are recorded but not
+    entered. Both come from the single ``stat`` of each entry.
+
+    With ``archives``, the members of every zip and tar file are listed below it once the walk
+    is over, from the archive's central directory or headers, without extracting anything (see
+    :func:`treegen.archives.expand_archives`). Archives unchanged since ``previous`` keep their
+    listing from it.
+    """
+    if previous is not None and previous.options != (bool(allocated), bool(one_filesystem)):
+        previous = None
+    with metrics.timed("scan", workers=workers, rescan=previous is not None):
+        snapshot, _ = _scan(root, on_directory, cancel_event, workers, previous, allocated=allocated,
+                            one_filesystem=one_filesystem, archives=archives)
+    return snapshot
+
+
+def refresh_snapshot(
+    previous: ScanSnapshot,
+    changed_directories: Optional[Iterable[str]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    workers: int = 1,
+) -> Tuple[ScanSnapshot, array]:
+    """
+    Rescan ``previous.root`` after filesystem changes and return ``(snapshot, node_map)``.
+
+    ``changed_directories`` are the absolute paths of directories whose contents changed, as
+    reported by a filesystem watcher. They are always listed again, together with directories
+    that did not exist before, while every other listing is copied from ``previous`` without a
+    syscall. Without ``changed_directories`` this is a stat-based rescan, as in
+    :func:`scan_directory`. ``node_map[old]`` is the id of node ``old`` in the new snapshot, or
+    -1 when it no longer exists. The new snapshot keeps the options of ``previous``, and lists
+    archive members when ``previous`` does.
+    """
+    if changed_directories is not None:
+        changed_directories = {os.path.normpath(path) for path in changed_directories}
+    with metrics.timed("refresh", workers=workers):
+        return _scan(previous.root, None, cancel_event, workers, previous, changed_directories, *previous.options,
+                     archives=previous.member_start is not None)
+
+
+def _scan(root, on_directory, cancel_event, workers, previous, changed_directories=None, allocated=False,
+          one_filesystem=False, archives=False):
+    snapshot = ScanSnapshot(root, allocated, one_filesystem)
+    try:
+        stat_result = os.stat(snapshot.root)
+    except OSError:
+        pass
+    else:
+        snapshot.set_identity(ROOT_NODE, stat_result.st_mtime_ns, stat_result.st_dev, stat_result.st_ino)
+    rescan = _Rescan(snapshot, previous, changed_directories) if previous is not None else None
+    if workers > 1:
+        # Imported here so that loading the scanner does not pull in concurrent.futures and logging.
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="treegen-scan") as executor:
+            try:
+                _walk(snapshot, on_directory, cancel_event, executor, workers * PREFETCH_PER_WORKER, rescan)
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+    else:
+        _walk(snapshot, on_directory, cancel_event, rescan=rescan)
+    if rescan is None:
+        snapshot.aggregate_sizes()
+        node_map = None
+    else:
+        rescan.aggregate_sizes()
+        node_map = rescan.node_map
+    if archives:
+        # Imported here: treegen.archives builds on the snapshot defined in this module.
+        from treegen.archives import expand_archives
+
+        expand_archives(snapshot, on_directory, cancel_event, previous, node_map)
+    return snapshot, node_map
+
+
+class _Rescan:
+    """Decides, directory by directory, whether a rescan can reuse the listing in ``previous``."""
+
+    def __init__(self, snapshot: ScanSnapshot, previous: ScanSnapshot, changed_directories=None) -> None:
+        self.snapshot = snapshot
+        self.previous = previous
+        self.changed_directories = changed_directories
+        # Directories of the new snapshot mapped to the same directory in ``previous``.
+        self.origin = {ROOT_NODE: ROOT_NODE}
+        # Directories whose size must be summed again: re-listed ones and all their ancestors.
+        self.stale = set()
+        # New id of every node of ``previous``, or -1 once it is gone.
+        self.node_map = array("i", [-1]) * len(previous)
+        self.node_map[ROOT_NODE] = ROOT_NODE
+        snapshot.adopt_extensions(previous)
+
+    def task(self, node: int, path: str):
+        """Return the ``(function, args)`` that produces the listing of ``node``."""
+        changed = self.changed_directories
+        if changed is None:
+            return self.probe, (path, self.cached_identity(node), self.snapshot.allocated)
+        old = self.origin.get(node)
+        if old is None or self.previous.flags[old] & FLAG_UNLISTED or os.path.normpath(path) in changed:
+            return self.probe, (path, None, self.snapshot.allocated)
+        return _reuse_listing, ()
+
+    def cached_identity(self, node: int) -> Optional[Tuple[int, int, int]]:
+        old = self.origin.get(node)
+        if old is None:
+            return None
+        previous = self.previous
+        mtime = previous.mtimes[old]
+        if previous.flags[old] & FLAG_UNLISTED or mtime >= previous.scanned_at_ns - RACY_MTIME_WINDOW_NS:
+            return None
+        return mtime, previous.devices[old], previous.inodes[old]
+
+    @staticmethod
+    def probe(path: str, cached: Optional[Tuple[int, int, int]], allocated: bool = False):
+        """Return ``(identity, entries)``; ``entries`` is None when the cached listing still holds."""
+        if cached is None:
+            return None, list_directory(path, allocated)
+        with metrics.timed("stat"):
+            stat_result = os.stat(path, follow_symlinks=False)
+        metrics.add(stat_calls=1)
+        identity = (stat_result.st_mtime_ns, stat_result.st_dev, stat_result.st_ino)
+        if _same_directory(identity, cached):
+            return identity, None
+        return identity, list_directory(path, allocated)
+
+    def commit(self, node: int, listing) -> None:
+        identity, entries = listing
+        snapshot = self.snapshot
+        previous = self.previous
+        old = self.origin.pop(node, None)
+        if identity is not None:
+            snapshot.set_identity(node, *identity)
+        if entries is None:
+            snapshot.sizes[node] = previous.sizes[old]
+            first = snapshot.copy_children(node, previous, old)
+            old_first = previous.first_child[old]
+            count = previous.child_count[old]
+            self.node_map[old_first:old_first + count] = array("i", range(first, first + count))
+            flags = previous.flags
+            for offset in range(count):
+                if flags[old_first + offset] & FLAG_DIR:
+                    self.origin[first + offset] = old_first + offset
+            return
+        snapshot.add_children(node, entries)
+        self.mark_stale(node)
+        if old is None:
+            return
+        old_children = {previous.name(child): child for child in previous.children(old)}
+        flags = snapshot.flags
+        for child in snapshot.children(node):
+            old_child = old_children.get(snapshot.name(child))
+            if old_child is None or (flags[child] ^ previous.flags[old_child]) & FLAG_DIR:
+                continue
+            self.node_map[old_child] = child
+            if flags[child] & FLAG_DIR:
+                self.origin[child] = old_child
+                snapshot.sizes[child] = previous.sizes[old_child]
+
+    def mark_stale(self, node: int) -> None:
+        self.origin.pop(node, None)
+        parents = self.snapshot.parents
+        stale = self.stale
+        while node >= 0 and node not in stale:
+            stale.add(node)
+            node = parents[node]
+
+    def aggregate_sizes(self) -> None:
+        snapshot = self.snapshot
+        sizes = snapshot.sizes
+        flags = snapshot.flags
+        with metrics.timed("aggregate_sizes"):
+            # Copied totals still hold where a hard link is a duplicate in both snapshots or in
+            # neither; the folders of links that changed status are summed again.
+            changed = set(snapshot.mark_duplicate_links())
+            node_map = self.node_map
+            old_duplicates = self.previous.flags.translate(_DUPLICATE_FILE_TABLE)
+            old = old_duplicates.find(1)
+            while old >= 0:
+                node = node_map[old]
+                if node >= 0:
+                    changed ^= {node}
+                old = old_duplicates.find(1, old + 1)
+            for node in changed:
+                self.mark_stale(snapshot.parents[node])
+            for node in sorted(self.stale, reverse=True):
+                sizes[node] = sum(sizes[child] for child in snapshot.children(node) if not flags[child] & FLAG_DUPLICATE)
+        metrics.add(bytes_aggregated=sizes[ROOT_NODE], directories_resummed=len(self.stale))
+
+
+def _same_directory(identity: Tuple[int, int, int], cached: Tuple[int, int, int]) -> bool:
+    mtime, device, inode = identity
+    cached_mtime, cached_device, cached_inode = cached
+    if mtime != cached_mtime:
+        return False
+    # os.DirEntry.stat() reports no inode on Windows; fall back to the mtime alone there.
+    if not inode or not cached_inode:
+        return True
+    return (device, inode) == (cached_device, cached_inode)
+
+
+def _reuse_listing():
+    return None, None
+
+
+def _listing_task(snapshot, node, rescan):
+    path = snapshot.path(node)
+    if rescan is None:
+        return list_directory, (path, snapshot.allocated)
+    return rescan.task(node, path)
+
+
+def _skipped_directory(snapshot, node, root_device, visited) -> int:
+    """The flag recording why directory ``node`` is not entered, or 0 to list it."""
+    device = snapshot.devices[node]
+    if snapshot.one_filesystem and device and root_device and device != root_device:
+        return FLAG_OTHER_FILESYSTEM
+    inode = snapshot.inodes[node]
+    # os.DirEntry.stat() reports no inode on Windows, where junctions are already not followed.
+    if inode:
+        inodes = visited.setdefault(device, set())
+        if inode in inodes:
+            return FLAG_DUPLICATE
+        inodes.add(inode)
+    return 0
+
+
+def _walk(snapshot, on_directory, cancel_event, executor=None, window=1, rescan=None):
+    pending = deque([ROOT_NODE])
+    unsubmitted = deque([ROOT_NODE])
+    in_flight = {}
+    flags = snapshot.flags
+    # Inodes of the directories entered so far, by device.
+    root_device = snapshot.devices[ROOT_NODE]
+    visited = {root_device: {snapshot.inodes[ROOT_NODE]}}
+    while pending:
+        if cancel_event is not None and cancel_event.is_set():
+            raise ScanCancelled(snapshot.root)
+        if executor is not None:
+            while unsubmitted and len(in_flight) < window:
+                queued = unsubmitted.popleft()
+                function, args = _listing_task(snapshot, queued, rescan)
+                in_flight[queued] = executor.submit(function, *args)
+        node = pending.popleft()
+        try:
+            if executor is not None:
+                listing = in_flight.pop(node).result()
+            else:
+                function, args = _listing_task(snapshot, node, rescan)
+                listing = function(*args)
+        except OSError as error:
+            snapshot.set_error(node, ERROR_NOT_FOUND if isinstance(error, FileNotFoundError) else ERROR_PERMISSION_DENIED)
+            if rescan is not None:
+                rescan.mark_stale(node)
+            continue
+        if rescan is None:
+            snapshot.add_children(node, listing)
+        else:
+            rescan.commit(node, listing)
+        metrics.add(entries_visited=snapshot.child_count[node])
+        for child in snapshot.children(node):
+            if flags[child] & FLAG_DIR:
+                skipped = _skipped_directory(snapshot, child, root_device, visited)
+                if skipped:
+                    flags[child] |= skipped
+                    metrics.add(directories_skipped=1)
+                    if rescan is not None:
+                        # Its cached total no longer counts.
+                        snapshot.sizes[child] = 0
+                        rescan.mark_stale(child)
+                    continue
+                pending.append(child)
+                if executor is not None:
+                    unsubmitted.append(child)
+        if on_directory is not None:
+            on_directory(snapshot, node)
+
+
+__all__ = [
+    "FILE_ATTRIBUTE_HIDDEN",
+    "FILE_ATTRIBUTE_SYSTEM",
+    "IO_REPARSE_TAG_MOUNT_POINT",
+    "ERROR_NONE",
+    "ERROR_PERMISSION_DENIED",
+    "ERROR_NOT_FOUND",
+    "FLAG_DIR",
+    "FLAG_DUPLICATE",
+    "FLAG_ERRORS",
+    "FLAG_HARD_LINK",
+    "FLAG_HIDDEN",
+    "FLAG_HIDDEN_PATH",
+    "FLAG_NOT_FOUND",
+    "FLAG_OTHER_FILESYSTEM",
+    "FLAG_PERMISSION_DENIED",
+    "FLAG_UNLISTED",
+    "RACY_MTIME_WINDOW_NS",
+    "ROOT_NODE",
+    "ScanCancelled",
+    "ScanSnapshot",
+    "FilterAggregates",
+    "FilteredView",
+    "allocated_size",
+    "list_directory",
+    "normalize_extensions",
+    "refresh_snapshot",
+    "scan_directory",
+    "split_extension_patterns",
+]
@@ -0,0 +1,269 @@
+"""
+Name search over a scan snapshot for the search bar.
+
+:class:`NameIndex` joins the lowercase names of every node, in depth-first order, into one
+NUL-separated string, so the names of a folder and everything underneath it form one contiguous
+span. Whether a folder has a match anywhere below it is then a single ``re`` search over that
+span, run in C. A :class:`NameSearch` remembers the hits it has found, so answering every row
+of the tree for one keystroke reads each part of the string at most once.
+
+The search bar uses ``QRegExp.Wildcard`` rules: a case-insensitive substring match in which
+``*`` stands for any run of characters, ``?`` for one character and ``[...]`` for a set.
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_right
+from collections import deque
+from itertools import accumulate
+from typing import Callable, Iterator, List, Optional
+
+SEPARATOR = "\0"
+
+_ANY_CHARS = f"[^{SEPARATOR}]*"
+_ANY_CHAR = f"[^{SEPARATOR}]"
+
+
+def _wildcard_tokens(pattern: str) -> List[tuple]:
+    """Split a wildcard pattern into ``(kind, regex)`` tokens; kind is "literal", "char" or "any"."""
+    tokens = []
+    position = 0
+    while position < len(pattern):
+        char = pattern[position]
+        end = -1
+        if char == "[":
+            negated = pattern[position + 1:position + 2] in ("!", "^")
+            first = position + 2 if negated else position + 1
+            # A "]" right after the opening bracket is a member, as in shell patterns.
+            end = pattern.find("]", first + 1)
+        if char == "*":
+            if not tokens or tokens[-1][0] != "any":
+                tokens.append(("any", _ANY_CHARS))
+        elif char == "?":
+            tokens.append(("char", _ANY_CHAR))
+        elif end > 0:
+            members = pattern[first:end].replace("\\", "\\\\").replace("[", "\\[").replace("]", "\\]")
+            tokens.append(("char", f"[^{members}{SEPARATOR}]" if negated else f"[{members}]"))
+            position = end
+        else:
+            tokens.append(("literal", re.escape(char)))
+        position += 1
+    while tokens and tokens[0][0] == "any":
+        tokens.pop(0)
+    while tokens and tokens[-1][0] == "any":
+        tokens.pop()
+    return tokens
+
+
+class WildcardQuery:
+    """
+    A compiled search bar pattern. Every match runs to the end of its name, so consecutive
+    searches report each matching name once.
+
+    ``re`` only skips quickly through a string when the pattern starts with a literal, so a
+    pattern such as ``?ile`` or ``[fd]ata`` is searched from its first literal character with
+    ``finder`` and each candidate is confirmed with ``regex`` ``lead`` characters earlier.
+    """
+
+    def __init__(self, tokens: List[tuple]) -> None:
+        self.regex = re.compile("".join(piece for _, piece in tokens) + _ANY_CHARS)
+        self.finder = None
+        self.lead = 0
+        kinds = [kind for kind, _ in tokens]
+        if "literal" in kinds:
+            lead = kinds.index("literal")
+            if lead and "any" not in kinds[:lead]:
+                self.lead = lead
+                self.finder = re.compile("".join(piece for _, piece in tokens[lead:]) + _ANY_CHARS)
+
+    def search(self, text: str, position: int, limit: int) -> int:
+        """Start of the first match in ``text[position:limit]``, or -1."""
+        finder = self.finder
+        if finder is None:
+            match = self.regex.search(text, position, limit)
+            return -1 if match is None else match.start()
+        lead = self.lead
+        position += lead
+        while True:
+            match = finder.search(text, position, limit)
+            if match is None:
+                return -1
+            start = match.start() - lead
+            if self.regex.match(text, start):
+                return start
+            position = match.start() + 1
+
+    def matches(self, name: str) -> bool:
+        return self.regex.search(name.lower()) is not None
+
+
+def compile_wildcard(pattern: str) -> Optional[WildcardQuery]:
+    """Compile a search bar pattern, or return None when it matches every name ("" or "*")."""
+    tokens = _wildcard_tokens(pattern.lower().replace(SEPARATOR, ""))
+    return WildcardQuery(tokens) if tokens else None
+
+
+class NameIndex:
+    """Lowercase names of a :class:`~treegen.scanner.ScanSnapshot`, laid out for subtree searches."""
+
+    def __init__(self, snapshot) -> None:
+        count = self.count = len(snapshot)
+        buffer = bytes(snapshot.name_buffer)
+        offsets = snapshot.name_offsets
+        if buffer.isascii():
+            # Byte offsets are character offsets, so the names are sliced out of one decoded string.
+            text = buffer.decode("ascii").lower()
+            names = list(map(text.__getitem__, map(slice, offsets[:-1], offsets[1:])))
+        else:
+            names = [
+                buffer[start:stop].decode("utf-8", "surrogatepass").lower()
+                for start, stop in zip(offsets[:-1], offsets[1:])
+            ]
+
+        # Depth-first order; the children of a node are the contiguous ids first_child..+count.
+        first_child = snapshot.first_child
+        child_count = snapshot.child_count
+        order = array("i")
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            children = child_count[node]
+            if children:
+                first = first_child[node]
+                stack.extend(range(first + children - 1, first - 1, -1))
+
+        # Archive members are searched like files, but are hidden with their archive.
+        self.parents = snapshot.parents
+        self.member_start = snapshot.member_start
+        ordered = list(map(names.__getitem__, order))
+        self.text = SEPARATOR.join(ordered) + SEPARATOR
+        lengths = array("q", map((1).__add__, map(len, names)))
+        # order_starts[k] is where the name of order[k] starts; it is sorted, for bisection.
+        self.order = order
+        self.order_starts = array("q", accumulate(map(lengths.__getitem__, order), initial=0))
+        self.starts = array("q", bytes(8 * count))
+        deque(map(self.starts.__setitem__, order, self.order_starts), maxlen=0)
+        spans = lengths
+        parents = snapshot.parents
+        for node in range(count - 1, 0, -1):
+            spans[parents[node]] += spans[node]
+        # ends[node] is where the span of ``node`` and everything underneath it stops.
+        self.ends = array("q", map(int.__add__, self.starts, spans))
+
+    def node_at(self, position: int) -> int:
+        """Id of the node whose name contains ``position`` of :attr:`text`."""
+        return self.order[bisect_right(self.order_starts, position) - 1]
+
+    def search(self, query: WildcardQuery, excluded: Optional[Callable[[int], bool]] = None) -> "NameSearch":
+        return NameSearch(self, query, excluded)
+
+
+class NameSearch:
+    """
+    One query over a :class:`NameIndex`. :meth:`accepts` is true for the nodes whose name
+    matches and for their ancestors, which keeps the path to every match visible. Matches for
+    which ``excluded`` returns True are skipped together with everything underneath them, and so
+    are archive members whose archive, or a folder of it, is excluded.
+
+    Rows are asked about in any order, so the parts of the text already searched are kept as
+    sorted, disjoint ``[start, stop)`` intervals holding no accepted match, plus the matches
+    found at their ends; a later question only searches what no earlier one covered.
+    """
+
+    def __init__(self, index: NameIndex, query: WildcardQuery, excluded=None) -> None:
+        self.index = index
+        self.query = query
+        self.excluded = excluded
+        self._starts: List[int] = []
+        self._stops: List[int] = []
+        self._hits = set()
+
+    def first_hit(self, position: int, end: int) -> int:
+        """Where the first accepted match in ``[position, end)`` starts, or -1."""
+        starts, stops, hits = self._starts, self._stops, self._hits
+        while position < end:
+            if position in hits:
+                return position
+            known = bisect_right(starts, position) - 1
+            if known >= 0 and position < stops[known]:
+                position = stops[known]
+                continue
+            limit = starts[known + 1] if known + 1 < len(starts) else end
+            hit = self._scan(position, min(limit, end))
+            stop = min(limit, end) if hit < 0 else hit
+            self._searched(known, position, stop)
+            if hit >= 0:
+                hits.add(hit)
+                return hit
+            position = stop
+        return -1
+
+    def _scan(self, position: int, limit: int) -> int:
+        index = self.index
+        while position < limit:
+            hit = self.query.search(index.text, position, limit)
+            if hit < 0 or self.excluded is None:
+                return hit
+            node = index.node_at(hit)
+            if self.excluded(node):
+                position = index.ends[node]
+                continue
+            hidden = self._excluded_container(node)
+            if hidden < 0:
+                return hit
+            position = index.ends[hidden]
+        return -1
+
+    def _excluded_container(self, node: int) -> int:
+        """The excluded archive or archive folder holding the member ``node``, or -1."""
+        index = self.index
+        member_start = index.member_start
+        if member_start is None:
+            return -1
+        while node >= member_start:
+            node = index.parents[node]
+            if self.excluded(node):
+                return node
+        return -1
+
+    def _searched(self, known: int, start: int, stop: int) -> None:
+        """Record that ``[start, stop)`` holds no accepted match, merging touching intervals."""
+        starts, stops = self._starts, self._stops
+        if known >= 0 and stops[known] == start:
+            stops[known] = stop
+        else:
+            known += 1
+            starts.insert(known, start)
+            stops.insert(known, stop)
+        following = known + 1
+        if following < len(starts) and starts[following] == stops[known]:
+            stops[known] = stops[following]
+            del starts[following], stops[following]
+
+    def accepts(self, node: int) -> bool:
+        index = self.index
+        return self.first_hit(index.starts[node], index.ends[node]) >= 0
+
+    def matches(self) -> Iterator[int]:
+        """Ids of the matching nodes below the root, in depth-first order."""
+        index = self.index
+        text = index.text
+        # The root's own name is not part of the tree, so the search starts after it.
+        position = text.index(SEPARATOR) + 1
+        while True:
+            hit = self.first_hit(position, len(text))
+            if hit < 0:
+                return
+            yield index.node_at(hit)
+            position = text.index(SEPARATOR, hit) + 1
+
+
+__all__ = [
+    "NameIndex",
+    "NameSearch",
+    "WildcardQuery",
+    "compile_wildcard",
+]
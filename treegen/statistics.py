@@ -0,0 +1,171 @@
+"""
+What a dataset is made of, for the optional statistics section of the preview and exports.
+
+:class:`FileStatistics` is built once per snapshot, right after the scan, like the name index.
+It counts entries by ``(extension id, hidden/dir flags, size.bit_length())``, with a
+``collections.Counter`` over the zipped snapshot columns, so the whole pass runs in C and costs a
+fraction of a second per million entries. Bytes per extension are not summed again: they are the
+root run of :class:`~treegen.scanner.FilterAggregates`.
+
+:func:`collect_statistics` combines those counts for a :class:`~treegen.scanner.FilteredView`:
+files and bytes per extension, a histogram of file sizes in power-of-two buckets grouped
+:data:`HISTOGRAM_BITS` at a time, and the largest folders. A filter change only re-combines a few
+thousand counts; views with patterns other than ".ext" fall back to one pass over their nodes.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from itertools import compress, repeat
+from operator import and_, not_
+from typing import List, Tuple
+
+from treegen.scanner import FLAG_DIR, FLAG_DUPLICATE, FLAG_HIDDEN_PATH, ROOT_NODE, FilteredView
+
+# Each histogram bucket spans a factor of 2**HISTOGRAM_BITS (16): 1 B to 16 B, 16 B to 256 B...
+HISTOGRAM_BITS = 4
+TOP_EXTENSIONS = 10
+LARGEST_DIRECTORIES = 10
+
+_BINARY_UNITS = ("B", "KiB", "MiB", "GiB", "TiB", "PiB", "EiB")
+
+
+class FileStatistics:
+    """
+    Entry counts of a :class:`~treegen.scanner.ScanSnapshot` keyed by ``(extension id,
+    flags & (FLAG_DIR | FLAG_HIDDEN_PATH), size.bit_length())``, and its directories, largest first.
+    """
+
+    def __init__(self, snapshot) -> None:
+        self.count = len(snapshot)
+        # Archive members are left out, as they are of folder sizes.
+        end = snapshot.scanned_count
+        flags = snapshot.flags[:end]
+        sizes = snapshot.sizes
+        self.counts = Counter(zip(
+            snapshot.extension_ids, map(and_, flags, repeat(FLAG_DIR | FLAG_HIDDEN_PATH)), map(int.bit_length, sizes)
+        ))
+        directories = compress(range(1, end), map(and_, flags[1:], repeat(FLAG_DIR)))
+        self.directories = sorted(directories, key=sizes.__getitem__, reverse=True)
+
+
+class DatasetStatistics:
+    """
+    The statistics of one filtered view, archive members left out. ``extensions`` holds ``(extension, files, bytes)``
+    sorted by bytes, ``histogram`` the file count of every bucket (bucket 0 holds empty files,
+    bucket ``b`` sizes below ``2 ** (b * HISTOGRAM_BITS)``) and ``largest_directories``
+    ``(relative path, bytes)``.
+    """
+
+    __slots__ = ("files", "size", "extensions", "histogram", "largest_directories")
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.size = 0
+        self.extensions: List[Tuple[str, int, int]] = []
+        self.histogram: List[int] = []
+        self.largest_directories: List[Tuple[str, int]] = []
+
+
+def histogram_bounds(bucket: int) -> Tuple[int, int]:
+    """Smallest size and the size just past the largest one in histogram ``bucket`` (from 1)."""
+    return 1 << ((bucket - 1) * HISTOGRAM_BITS), 1 << (bucket * HISTOGRAM_BITS)
+
+
+def binary_size(size: int) -> str:
+    """A power-of-two size such as ``4 KiB``, for the exact bucket bounds of the histogram."""
+    unit = 0
+    while size >= 1024 and size % 1024 == 0 and unit < len(_BINARY_UNITS) - 1:
+        size //= 1024
+        unit += 1
+    return f"{size} {_BINARY_UNITS[unit]}"
+
+
+def collect_statistics(view: FilteredView, largest: int = LARGEST_DIRECTORIES) -> DatasetStatistics:
+    """Files and bytes per extension, the size histogram and the ``largest`` folders of ``view``."""
+    snapshot = view.snapshot
+    result = DatasetStatistics()
+    files_by_extension = Counter()
+    histogram = Counter()
+    if view.excluded is None:
+        hidden_mask = FLAG_HIDDEN_PATH if view.exclude_hidden else 0
+        excluded_ids = view.excluded_extension_ids
+        for (extension_id, flags, bits), count in snapshot.file_statistics().counts.items():
+            if flags & FLAG_DIR or flags & hidden_mask or extension_id in excluded_ids:
+                continue
+            files_by_extension[extension_id] += count
+            histogram[(bits + HISTOGRAM_BITS - 1) // HISTOGRAM_BITS] += count
+        aggregates = snapshot.filter_aggregates()
+        bytes_by_extension = {
+            aggregates.keys[position]: (
+                aggregates.visible_bytes[position] if view.exclude_hidden else aggregates.all_bytes[position]
+            )
+            for position in range(aggregates.run_starts[ROOT_NODE], aggregates.run_starts[ROOT_NODE + 1])
+        }
+    else:
+        bytes_by_extension = Counter()
+        flags = snapshot.flags
+        sizes = snapshot.sizes
+        extension_ids = snapshot.extension_ids
+        for node in compress(range(1, snapshot.scanned_count), map(not_, view.excluded[1:])):
+            node_flags = flags[node]
+            if node_flags & FLAG_DIR:
+                continue
+            extension_id = extension_ids[node]
+            files_by_extension[extension_id] += 1
+            histogram[(sizes[node].bit_length() + HISTOGRAM_BITS - 1) // HISTOGRAM_BITS] += 1
+            if not node_flags & FLAG_DUPLICATE:
+                bytes_by_extension[extension_id] += sizes[node]
+
+    table = snapshot.extension_table
+    result.extensions = sorted(
+        ((table[extension_id], count, bytes_by_extension.get(extension_id, 0))
+         for extension_id, count in files_by_extension.items()),
+        key=lambda row: (-row[2], -row[1], row[0]),
+    )
+    result.files = sum(files_by_extension.values())
+    result.size = sum(row[2] for row in result.extensions)
+    result.histogram = [histogram.get(bucket, 0) for bucket in range(max(histogram, default=-1) + 1)]
+    result.largest_directories = [
+        (snapshot.relative_path(node), size) for size, node in _largest_directories(view, largest)
+    ]
+    return result
+
+
+def _largest_directories(view: FilteredView, count: int) -> List[Tuple[int, int]]:
+    # Directories are visited largest first by unfiltered size; filters only shrink a folder,
+    # so the walk stops once no remaining folder can beat the smallest one kept.
+    snapshot = view.snapshot
+    unfiltered = snapshot.sizes
+    sizes = view.sizes
+    flags = snapshot.flags
+    hidden_mask = FLAG_HIDDEN_PATH if view.exclude_hidden else 0
+    excluded = view.excluded
+    kept: List[Tuple[int, int]] = []
+    if count <= 0:
+        return kept
+    for node in snapshot.file_statistics().directories:
+        if len(kept) == count and unfiltered[node] <= kept[0][0]:
+            break
+        if flags[node] & hidden_mask or (excluded is not None and excluded[node]):
+            continue
+        size = sizes[node]
+        # Ties keep the folder found first (the larger unfiltered one), hence the negated id.
+        if len(kept) < count:
+            heapq.heappush(kept, (size, -node))
+        elif size > kept[0][0]:
+            heapq.heapreplace(kept, (size, -node))
+    return [(size, -node) for size, node in sorted(kept, reverse=True)]
+
+
+__all__ = [
+    "DatasetStatistics",
+    "FileStatistics",
+    "HISTOGRAM_BITS",
+    "LARGEST_DIRECTORIES",
+    "TOP_EXTENSIONS",
+    "binary_size",
+    "collect_statistics",
+    "histogram_bounds",
+]
@@ -0,0 +1,122 @@
+"""Filesystem change notification for TreeGen's watch mode.
+
+When the optional ``watchdog`` package is installed, changes are reported by the native
+notification API of the platform (inotify on Linux, FSEvents on macOS, ReadDirectoryChangesW on
+Windows) as the set of directories whose contents changed. Otherwise, or when the native watch
+cannot be set up (for example when the inotify watch limit is reached), a polling watcher asks
+for a stat-based rescan at a fixed interval.
+
+Callbacks run on a background thread; callers are expected to hand them over to their own
+thread and debounce them.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Callable, Optional, Set
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog is optional; fall back to polling.
+    FileSystemEventHandler = object
+    Observer = None
+
+DEFAULT_POLL_INTERVAL = 5.0
+
+# ``on_change(directories)`` receives the absolute paths of changed directories, or None when
+# the watcher cannot tell which directories changed and everything should be checked.
+ChangeCallback = Callable[[Optional[Set[str]]], None]
+
+_CHANGE_EVENTS = {"created", "deleted", "modified", "moved"}
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    def __init__(self, on_change: ChangeCallback) -> None:
+        super().__init__()
+        self.on_change = on_change
+
+    def on_any_event(self, event) -> None:
+        if event.event_type not in _CHANGE_EVENTS:
+            return
+        directories = set()
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            if not path:
+                continue
+            path = os.fsdecode(path)
+            if event.is_directory and event.event_type == "modified":
+                # A directory's own modification means its list of entries changed.
+                directories.add(path)
+            else:
+                directories.add(os.path.dirname(path))
+        self.on_change(directories)
+
+
+class NativeWatcher:
+    """Recursive watch through ``watchdog``."""
+
+    backend = "native"
+
+    def __init__(self, root: str, on_change: ChangeCallback) -> None:
+        if Observer is None:
+            raise RuntimeError("watchdog is not installed")
+        self.root = os.fspath(root)
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.schedule(_ChangeHandler(on_change), self.root, recursive=True)
+
+    def start(self) -> None:
+        self._observer.start()
+
+    def stop(self) -> None:
+        self._observer.stop()
+        if self._observer.is_alive():
+            self._observer.join()
+
+
+class PollingWatcher:
+    """Requests a full stat-based check every ``interval`` seconds."""
+
+    backend = "polling"
+
+    def __init__(self, root: str, on_change: ChangeCallback, interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        self.root = os.fspath(root)
+        self.on_change = on_change
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="treegen-poll", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.on_change(None)
+
+
+def create_watcher(root, on_change: ChangeCallback, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """Start and return a native watcher when possible, else a polling one."""
+    if Observer is not None:
+        try:
+            watcher = NativeWatcher(root, on_change)
+            watcher.start()
+            return watcher
+        except OSError:
+            pass
+    watcher = PollingWatcher(root, on_change, poll_interval)
+    watcher.start()
+    return watcher
+
+
+__all__ = [
+    "DEFAULT_POLL_INTERVAL",
+    "NativeWatcher",
+    "PollingWatcher",
+    "create_watcher",
+]